@@ -16,11 +16,12 @@ Best practices из:
 - Research papers (ToT, ReAct, Reflexion)
 """
 
-from typing import List, Dict, Any, Optional, Callable
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from dataclasses import dataclass, field
 from enum import Enum
 import json
 import asyncio
+import time
 
 
 class ReasoningPattern(Enum):
@@ -52,6 +53,7 @@ class ReasoningTrace:
     confidence: float
     verification_passed: bool = False
     reflection: Optional[str] = None
+    branch_latencies_ms: Dict[str, float] = field(default_factory=dict)  # branch -> latency
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -69,10 +71,62 @@ class ReasoningTrace:
             "final_answer": self.final_answer,
             "confidence": self.confidence,
             "verification_passed": self.verification_passed,
-            "reflection": self.reflection
+            "reflection": self.reflection,
+            "branch_latencies_ms": self.branch_latencies_ms
         }
 
 
+# ============================================================================
+# PARALLEL FAN-OUT
+# ============================================================================
+
+@dataclass
+class BranchResult:
+    """Результат одной независимой ветки reasoning."""
+    index: int
+    value: Any
+    latency_ms: float
+
+
+async def run_branches(
+    factories: List[Callable[[], Awaitable[Any]]],
+    max_concurrency: int = 4,
+    should_stop: Optional[Callable[[List[BranchResult]], bool]] = None
+) -> List[BranchResult]:
+    """
+    Запустить независимые ветки параллельно (не более max_concurrency сразу).
+    
+    should_stop вызывается после каждой завершённой ветки с уже готовыми
+    результатами; если вернул True - оставшиеся ветки отменяются.
+    Результаты возвращаются в исходном порядке веток. Latency считается
+    от захвата семафора, без времени ожидания в очереди.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    
+    async def run(index: int, factory: Callable[[], Awaitable[Any]]) -> BranchResult:
+        async with semaphore:
+            started = time.perf_counter()
+            value = await factory()
+            return BranchResult(index, value, round((time.perf_counter() - started) * 1000, 2))
+    
+    tasks = [asyncio.ensure_future(run(i, f)) for i, f in enumerate(factories)]
+    done: List[BranchResult] = []
+    
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            done.append(await next_done)
+            if should_stop and should_stop(done):
+                break
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    done.sort(key=lambda r: r.index)
+    return done
+
+
 # ============================================================================
 # CHAIN-OF-THOUGHT (CoT)
 # ============================================================================
@@ -288,9 +342,16 @@ Output JSON:
         llm_call: Callable,
         context: Dict[str, Any] = None,
         num_thoughts: int = 3,
-        depth: int = 2
+        depth: int = 2,
+        max_concurrency: int = 4,
+        score_threshold: Optional[float] = None
     ) -> ReasoningTrace:
-        """Execute ToT reasoning."""
+        """
+        Execute ToT reasoning.
+        
+        Approaches are evaluated concurrently; with score_threshold set,
+        evaluation stops as soon as one approach reaches it.
+        """
         
         thoughts = []
         
@@ -308,18 +369,29 @@ Output JSON:
             alternatives=[a["idea"] for a in approaches]
         ))
         
-        # Step 2: Evaluate each approach
-        evaluations = []
-        for approach in approaches:
+        # Step 2: Evaluate approaches in parallel
+        async def evaluate(approach: Dict[str, Any]) -> Dict[str, Any]:
             eval_prompt = TreeOfThoughtsReasoning.build_evaluation_prompt(
                 approach, task
             )
             eval_response = await llm_call(eval_prompt)
-            evaluation = json.loads(eval_response)
-            evaluations.append({
-                "approach": approach,
-                "evaluation": evaluation
-            })
+            return json.loads(eval_response)
+        
+        def good_enough(done: List[BranchResult]) -> bool:
+            return score_threshold is not None and any(
+                r.value["overall_score"] >= score_threshold for r in done
+            )
+        
+        branches = await run_branches(
+            [lambda a=approach: evaluate(a) for approach in approaches],
+            max_concurrency=max_concurrency,
+            should_stop=good_enough
+        )
+        evaluations = [
+            {"approach": approaches[r.index], "evaluation": r.value}
+            for r in branches
+        ]
+        branch_latencies = {f"evaluate_{r.index + 1}": r.latency_ms for r in branches}
         
         # Sort by score
         evaluations.sort(
@@ -355,7 +427,8 @@ Output JSON:
             pattern=ReasoningPattern.TREE_OF_THOUGHTS,
             thoughts=thoughts,
             final_answer=cot_data["final_answer"],
-            confidence=best["evaluation"]["overall_score"] * cot_data["confidence"]
+            confidence=best["evaluation"]["overall_score"] * cot_data["confidence"],
+            branch_latencies_ms=branch_latencies
         )
 
 
@@ -374,6 +447,9 @@ class SelfConsistencyReasoning:
     4. If no consensus, use highest confidence
     
     Improves accuracy by averaging out mistakes.
+    
+    Samples are generated concurrently; with early_stop the remaining
+    samples are cancelled once one answer has a strict majority.
     """
     
     @staticmethod
@@ -381,17 +457,30 @@ class SelfConsistencyReasoning:
         task: str,
         llm_call: Callable,
         context: Dict[str, Any] = None,
-        num_samples: int = 3
+        num_samples: int = 3,
+        max_concurrency: int = 4,
+        early_stop: bool = True
     ) -> ReasoningTrace:
         """Execute self-consistency reasoning."""
         
-        # Generate multiple solutions
-        solutions = []
-        for i in range(num_samples):
-            cot_trace = await ChainOfThoughtReasoning.execute(
-                task, llm_call, context
-            )
-            solutions.append(cot_trace)
+        def has_majority(done: List[BranchResult]) -> bool:
+            if not early_stop:
+                return False
+            counts: Dict[str, int] = {}
+            for r in done:
+                counts[r.value.final_answer] = counts.get(r.value.final_answer, 0) + 1
+            return max(counts.values()) * 2 > num_samples
+        
+        # Generate multiple solutions in parallel
+        branches = await run_branches(
+            [
+                lambda: ChainOfThoughtReasoning.execute(task, llm_call, context)
+                for _ in range(num_samples)
+            ],
+            max_concurrency=max_concurrency,
+            should_stop=has_majority
+        )
+        solutions = [r.value for r in branches]
         
         # Count answers
         answer_counts: Dict[str, List[ReasoningTrace]] = {}
@@ -418,13 +507,13 @@ class SelfConsistencyReasoning:
             ThoughtStep(
                 1,
                 "generation",
-                f"Generated {num_samples} independent solutions",
+                f"Generated {len(solutions)}/{num_samples} independent solutions",
                 alternatives=[s.final_answer for s in solutions]
             ),
             ThoughtStep(
                 2,
                 "consensus",
-                f"Answer '{final_answer}' chosen by {len(supporting_traces)}/{num_samples} solutions",
+                f"Answer '{final_answer}' chosen by {len(supporting_traces)}/{len(solutions)} solutions",
                 confidence=avg_confidence
             )
         ]
@@ -433,7 +522,8 @@ class SelfConsistencyReasoning:
             pattern=ReasoningPattern.SELF_CONSISTENCY,
             thoughts=thoughts,
             final_answer=final_answer,
-            confidence=avg_confidence
+            confidence=avg_confidence,
+            branch_latencies_ms={f"sample_{r.index + 1}": r.latency_ms for r in branches}
         )
 
 
@@ -453,6 +543,10 @@ class ReflectionReasoning:
     5. Repeat if needed
     
     Based on "Reflexion" paper.
+    
+    Iterations depend on each other and stay sequential; within an
+    iteration num_candidates improved solutions are generated
+    concurrently and the most confident one is kept.
     """
     
     @staticmethod
@@ -491,16 +585,22 @@ Output JSON:
         task: str,
         llm_call: Callable,
         context: Dict[str, Any] = None,
-        max_iterations: int = 3
+        max_iterations: int = 3,
+        num_candidates: int = 1,
+        max_concurrency: int = 4,
+        quality_threshold: float = 0.9
     ) -> ReasoningTrace:
         """Execute reflection reasoning."""
         
         thoughts = []
+        branch_latencies: Dict[str, float] = {}
         
         # Initial solution
+        started = time.perf_counter()
         current_trace = await ChainOfThoughtReasoning.execute(
             task, llm_call, context
         )
+        branch_latencies["initial"] = round((time.perf_counter() - started) * 1000, 2)
         
         thoughts.append(ThoughtStep(
             1,
@@ -528,7 +628,7 @@ Output JSON:
             ))
             
             # If good enough, stop
-            if critique["is_correct"] and critique["overall_quality"] > 0.9:
+            if critique["is_correct"] and critique["overall_quality"] > quality_threshold:
                 break
             
             # Generate improved solution
@@ -546,9 +646,16 @@ Suggested improvements:
 Generate an improved solution addressing these issues.
 """
             
-            current_trace = await ChainOfThoughtReasoning.execute(
-                improvement_task, llm_call, context
+            branches = await run_branches(
+                [
+                    lambda: ChainOfThoughtReasoning.execute(improvement_task, llm_call, context)
+                    for _ in range(max(1, num_candidates))
+                ],
+                max_concurrency=max_concurrency
             )
+            for r in branches:
+                branch_latencies[f"iteration_{iteration + 1}_candidate_{r.index + 1}"] = r.latency_ms
+            current_trace = max((r.value for r in branches), key=lambda t: t.confidence)
             
             thoughts.append(ThoughtStep(
                 len(thoughts) + 1,
@@ -562,7 +669,8 @@ Generate an improved solution addressing these issues.
             thoughts=thoughts,
             final_answer=current_trace.final_answer,
             confidence=current_trace.confidence,
-            reflection=f"Refined through {len(thoughts) // 2} iterations"
+            reflection=f"Refined through {len(thoughts) // 2} iterations",
+            branch_latencies_ms=branch_latencies
         )
 
 
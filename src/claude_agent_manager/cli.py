@@ -5,7 +5,7 @@ import shutil
 import subprocess
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 from rich.console import Console
@@ -250,6 +250,8 @@ def config_set(
     worker_script: Optional[str] = typer.Option(None, "--worker-script"),
     agent_root: Optional[str] = typer.Option(None, "--agent-root"),
     browser: Optional[str] = typer.Option(None, "--browser"),
+    worker_pool_size: Optional[int] = typer.Option(None, "--worker-pool-size", help="Прогретых workers в пуле (0 = выкл)"),
+    worker_pool_idle_timeout: Optional[int] = typer.Option(None, "--worker-pool-idle-timeout", help="Секунд простоя до остановки worker пула"),
 ) -> None:
     """Сохранить/обновить конфиг."""
     cfg = load_config()
@@ -262,6 +264,10 @@ def config_set(
         data["agent_root"] = agent_root
     if browser is not None:
         data["browser"] = browser
+    if worker_pool_size is not None:
+        data["worker_pool_size"] = worker_pool_size
+    if worker_pool_idle_timeout is not None:
+        data["worker_pool_idle_timeout_sec"] = worker_pool_idle_timeout
 
     save_config(AppConfig(**data))
     console.print("OK")
@@ -386,6 +392,112 @@ def stop_all(
     console.print("Stopped all agents")
 
 
+@app.command()
+def start(
+    agent_ids: Optional[List[str]] = typer.Argument(None, help="ID агентов для запуска"),
+    all_agents: bool = typer.Option(False, "--all", help="Запустить всех агентов"),
+    concurrency: int = typer.Option(4, "--concurrency", "-j", help="Сколько агентов запускать параллельно"),
+    claude: bool = typer.Option(True, "--claude/--no-claude", help="Открывать окно claude"),
+    timings: bool = typer.Option(False, "--timings", help="Показать время по фазам запуска"),
+) -> None:
+    """Запустить одного или нескольких агентов параллельно."""
+    cfg = load_config()
+    cfg.validate_ready()
+    _ensure_prereqs()
+
+    if all_agents:
+        agent_ids = [a.id for a in iter_agents(_agent_root(cfg))]
+    if not agent_ids:
+        console.print("[yellow]Укажите ID агентов или --all[/yellow]")
+        raise typer.Exit(1)
+
+    results = manager.start_agents(agent_ids, cfg=cfg, skip_cmd=not claude, max_concurrency=concurrency)
+
+    phases = ["allocate", "lock_wait", "prepare", "worker", "viewer", "cmd", "finalize", "total"]
+    table = Table(title="Agent start")
+    table.add_column("id")
+    table.add_column("status")
+    if timings:
+        for phase in phases:
+            table.add_column(f"{phase}, ms", justify="right")
+
+    for r in results:
+        status = "[green]started[/green]" if r.ok else f"[red]failed: {r.error}[/red]"
+        row = [r.agent_id, status]
+        if timings:
+            row += [f"{r.timings_ms[p]:.0f}" if p in r.timings_ms else "-" for p in phases]
+        table.add_row(*row)
+
+    console.print(table)
+    failed = sum(1 for r in results if not r.ok)
+    if failed:
+        raise typer.Exit(1)
+
+
+@app.command("pool-status")
+def pool_status() -> None:
+    """Показать пул прогретых memory workers."""
+    from .worker_pool import WorkerPool
+
+    cfg = load_config()
+    pool = WorkerPool(cfg)
+    slots = pool.slots()
+
+    table = Table(title=f"Worker pool ({len(slots)}/{pool.size}, idle timeout {pool.idle_timeout_sec}s)")
+    table.add_column("agent id")
+    table.add_column("port", justify="right")
+    table.add_column("idle, s", justify="right")
+    for slot in slots:
+        table.add_row(slot.agent_id, str(slot.port), f"{slot.idle_seconds():.0f}")
+    console.print(table)
+
+
+@app.command("pool-fill")
+def pool_fill(
+    size: Optional[int] = typer.Option(None, "--size", help="Размер пула (по умолчанию из конфига)"),
+) -> None:
+    """Запустить прогретые memory workers до размера пула."""
+    from .worker_pool import WorkerPool
+
+    cfg = load_config()
+    cfg.validate_ready()
+    _ensure_prereqs()
+
+    started = WorkerPool(cfg, size=size).fill()
+    console.print(f"Started warm workers: {started}")
+
+
+@app.command("pool-drain")
+def pool_drain() -> None:
+    """Остановить все простаивающие workers пула."""
+    from .worker_pool import WorkerPool
+
+    stopped = WorkerPool(load_config()).drain()
+    console.print(f"Stopped warm workers: {stopped}")
+
+
+@app.command("gc-runs")
+def gc_runs(
+    keep_last: Optional[int] = typer.Option(None, "--keep-last", help="Хранить последних run'ов на агента"),
+    keep_days: Optional[float] = typer.Option(None, "--keep-days", help="Хранить run'ы моложе N дней"),
+) -> None:
+    """Удалить старые run-каталоги и их строки в registry."""
+    from .run_gc import RunCollector, RunRetention
+
+    cfg = load_config()
+    retention = RunRetention.from_config(cfg)
+    if keep_last is not None:
+        retention.keep_last = keep_last
+    if keep_days is not None:
+        retention.keep_days = keep_days
+
+    report = RunCollector(cfg, retention=retention).collect()
+    console.print(
+        f"Agents: {report.agents_scanned}  deleted dirs: {report.dirs_deleted}  "
+        f"deleted rows: {report.rows_deleted}  kept: {report.kept}"
+    )
+
+
 @app.command()
 def open(
     agent_id: str = typer.Argument(...),
@@ -921,6 +1033,8 @@ def worktree_create(
     task_name: str = typer.Argument(..., help="Название задачи"),
     project_path: str = typer.Option(None, "--project", "-p", help="Путь к проекту (default: cwd)"),
     base_branch: str = typer.Option("main", "--base", "-b", help="Базовая ветка"),
+    scope: Optional[List[str]] = typer.Option(None, "--scope", "-s", help="Sparse checkout: только эти пути (можно несколько)"),
+    no_reuse: bool = typer.Option(False, "--no-reuse", help="Не переиспользовать освобождённые worktrees"),
 ) -> None:
     """Создать изолированный worktree для задачи агента."""
     from .worktree_manager import WorktreeManager
@@ -929,7 +1043,7 @@ def worktree_create(
 
     try:
         wm = WorktreeManager(project)
-        worktree = wm.create_task_worktree(agent_id, task_name, base_branch)
+        worktree = wm.create_task_worktree(agent_id, task_name, base_branch, scope=scope, reuse=not no_reuse)
         console.print(f"[green]Agent {agent_id} now working in worktree: {worktree.path}[/green]")
     except ValueError as e:
         console.print(f"[red]Error: {e}[/red]")
@@ -1016,6 +1130,55 @@ def worktree_merge(
         raise typer.Exit(1)
 
 
+@app.command("worktree-merge-all")
+def worktree_merge_all(
+    project_path: str = typer.Option(None, "--project", "-p", help="Путь к проекту"),
+    target_branch: str = typer.Option(None, "--target", "-t", help="Целевая ветка (по умолчанию base branch)"),
+    resolve: bool = typer.Option(False, "--resolve", "-r", help="Разрешать реальные конфликты через ConflictResolver"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Только предсказать конфликты"),
+) -> None:
+    """Смёржить все worktrees агентов через merge queue (с предсказанием конфликтов)."""
+    from .git.merge_queue import MergeQueue, MergeQueueError
+    from .worktree_manager import WorktreeManager
+
+    project = Path(project_path) if project_path else Path.cwd()
+
+    try:
+        wm = WorktreeManager(project)
+        worktrees = [wt for wt in wm.list_worktrees() if wt.is_agent_branch]
+        if not worktrees:
+            console.print("[yellow]No agent worktrees[/yellow]")
+            return
+
+        if dry_run:
+            plan = MergeQueue(project, target_branch=target_branch or wm.base_branch).plan(
+                [wt.branch_name for wt in worktrees]
+            )
+            table = Table(title=f"Merge plan -> {plan.target}")
+            table.add_column("Branch", style="yellow")
+            table.add_column("Step")
+            table.add_column("Conflicts", style="red")
+            for step, branches in (("batch", plan.batch), ("sequential", plan.sequential),
+                                   ("conflict", plan.conflicts), ("up to date", plan.up_to_date)):
+                for branch in branches:
+                    table.add_row(branch, step, ", ".join(plan.predictions[branch].conflicted_files))
+            for branch, reason in plan.failed.items():
+                table.add_row(branch, "failed", reason)
+            console.print(table)
+            return
+
+        report = wm.merge_worktrees(worktrees, target_branch, resolve_conflicts=resolve)
+        console.print(
+            f"[green]Merged: {len(report.merged)}  resolved: {len(report.resolved)}[/green]  "
+            f"[red]failed: {len(report.failed)}[/red]"
+        )
+        if report.failed:
+            raise typer.Exit(1)
+    except (ValueError, MergeQueueError) as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+
 @app.command("worktree-discard")
 def worktree_discard(
     agent_id: str = typer.Argument(..., help="ID агента"),
@@ -1330,6 +1493,8 @@ def resolve_conflicts_cmd(
     project_path: str = typer.Option(None, "--project", "-p", help="Путь к проекту"),
     file_path: str = typer.Option(None, "--file", "-f", help="Конкретный файл"),
     auto_apply: bool = typer.Option(False, "--apply", "-a", help="Автоматически применить"),
+    workers: int = typer.Option(None, "--workers", "-w", help="Потоков для разбора и валидации"),
+    ai_concurrency: int = typer.Option(4, "--ai-concurrency", help="Одновременных AI-merge"),
 ) -> None:
     """AI-powered разрешение git конфликтов."""
     from .git.conflict_resolver import ConflictResolver, print_conflict
@@ -1354,10 +1519,17 @@ def resolve_conflicts_cmd(
                 print_conflict(conflict)
     else:
         # Разрешаем все конфликты
-        results = resolver.resolve_all(auto_apply=auto_apply)
+        report = resolver.resolve_all_parallel(
+            auto_apply=auto_apply, max_workers=workers, ai_concurrency=ai_concurrency
+        )
 
-        success_count = sum(1 for r in results if r.success)
-        console.print(f"\n[green]Resolved: {success_count}/{len(results)} files[/green]")
+        for result in report.results:
+            mark = "[green]✓[/green]" if result.success else "[yellow]![/yellow]"
+            console.print(f"{mark} {result.file_path} ({result.duration_ms:.0f} ms): {result.explanation}")
+        console.print(
+            f"\n[green]Resolved: {len(report.resolved_files)}/{len(report.results)} files[/green] "
+            f"[dim]in {report.duration_ms:.0f} ms[/dim]"
+        )
 
 
 # ==============================================================================
@@ -21,6 +21,16 @@ class AppConfig(BaseModel):
     port_min: int = 37700
     port_max: int = 37799
 
+    # Пул заранее запущенных claude-mem workers (0 = выключен)
+    worker_pool_size: int = 0
+    worker_pool_idle_timeout_sec: int = 1800
+
+    # Хранение run-каталогов: последние N + моложе D дней (failed - дольше)
+    run_retention_keep_last: int = 20
+    run_retention_days: float = 14
+    run_retention_failed_days: float = 30
+    run_gc_interval_sec: int = 3600  # 0 = фоновая очистка выключена
+
     def validate_ready(self) -> None:
         """Validate that essential config is set. worker_script is optional."""
         if not self.claude_mem_root:
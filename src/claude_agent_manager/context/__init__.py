@@ -1,5 +1,15 @@
 """Context Engineering module for codebase analysis."""
 
 from .analyzer import CodebaseAnalyzer, CodebaseContext, print_context
+from .packer import ContextPacker, ContextSnippet, PackedContext, estimate_tokens, pack_task_context
 
-__all__ = ["CodebaseAnalyzer", "CodebaseContext", "print_context"]
+__all__ = [
+    "CodebaseAnalyzer",
+    "CodebaseContext",
+    "print_context",
+    "ContextPacker",
+    "ContextSnippet",
+    "PackedContext",
+    "estimate_tokens",
+    "pack_task_context",
+]
@@ -0,0 +1,251 @@
+"""
+Context Packer - упаковка контекста в бюджет токенов.
+
+Вместо json.dumps всего контекста задачи в system prompt собирает
+кандидатов (outputs зависимостей, узлы памяти, session insights),
+ранжирует их по релевантности запросу и важности, убирает дубликаты и
+заполняет заданный бюджет токенов.
+
+Использование:
+    from claude_agent_manager.context.packer import ContextPacker
+
+    packer = ContextPacker(token_budget=3000)
+    packer.add_dependency_outputs(task.get_context_output())
+    packer.add_session_memory(session_memory)
+    text = packer.render(query=task.description)
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..memory.session import SessionMemory
+
+# Грубая оценка: ~4 символа на токен для английского текста и кода
+CHARS_PER_TOKEN = 4
+
+_WORD_RE = re.compile(r"[a-zA-Zа-яА-Я0-9_]{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    """Оценить число токенов в тексте (без токенизатора)."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _terms(text: str) -> set:
+    return {w.lower() for w in _WORD_RE.findall(text or "")}
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+@dataclass
+class ContextSnippet:
+    """Кандидат на включение в контекст."""
+    source: str            # dependency, memory, session, context
+    key: str               # Заголовок секции
+    content: str
+    importance: float = 0.5  # 0-1, задаётся источником
+    payload: Any = None      # Исходный объект (для обратного маппинга)
+    score: float = 0.0
+    tokens: int = 0
+
+    def render(self) -> str:
+        return f"### {self.key}\n{self.content}"
+
+
+@dataclass
+class PackedContext:
+    """Результат упаковки."""
+    snippets: List[ContextSnippet] = field(default_factory=list)
+    tokens_used: int = 0
+    token_budget: int = 0
+    dropped: int = 0
+    duplicates: int = 0
+    truncated: int = 0
+
+    def render(self) -> str:
+        return "\n\n".join(s.render() for s in self.snippets)
+
+
+class ContextPacker:
+    """
+    Ранжирование и упаковка сниппетов контекста в бюджет токенов.
+
+    score = relevance_weight * relevance + importance_weight * importance,
+    где relevance - доля терминов запроса, встречающихся в сниппете.
+    """
+
+    # Минимальный остаток бюджета, ради которого стоит обрезать сниппет
+    MIN_TRUNCATE_TOKENS = 64
+
+    def __init__(
+        self,
+        token_budget: int = 4000,
+        relevance_weight: float = 0.6,
+        importance_weight: float = 0.4
+    ):
+        self.token_budget = token_budget
+        self.relevance_weight = relevance_weight
+        self.importance_weight = importance_weight
+        self.candidates: List[ContextSnippet] = []
+
+    # =========================================================================
+    # CANDIDATES
+    # =========================================================================
+
+    def add(
+        self,
+        source: str,
+        key: str,
+        content: Any,
+        importance: float = 0.5,
+        payload: Any = None
+    ) -> None:
+        """Добавить кандидата. Не-строки сериализуются в JSON."""
+        if content is None:
+            return
+        if not isinstance(content, str):
+            content = json.dumps(content, indent=2, sort_keys=True, default=str, ensure_ascii=False)
+        if not content.strip():
+            return
+        self.candidates.append(ContextSnippet(
+            source=source,
+            key=key,
+            content=content.strip(),
+            importance=max(0.0, min(1.0, importance)),
+            payload=payload
+        ))
+
+    def add_dependency_outputs(self, context: Dict[str, Any]) -> None:
+        """
+        Добавить контекст задачи (Task.get_context_output + служебные ключи).
+
+        Summary зависимости важнее сырого output - он короче и обычно
+        достаточен; сырой output попадёт, если останется бюджет.
+        """
+        for key, data in (context or {}).items():
+            if isinstance(data, dict) and "role" in data and ("output" in data or "summary" in data):
+                title = f"{data.get('role', 'agent')} ({key})"
+                meta = {
+                    k: data[k] for k in ("description", "interfaces") if data.get(k)
+                }
+                if data.get("artifacts"):
+                    meta["artifacts"] = sorted(data["artifacts"].keys()) if isinstance(data["artifacts"], dict) else data["artifacts"]
+                if data.get("summary"):
+                    self.add("dependency", f"{title} summary", data["summary"], 0.9, payload=key)
+                if meta:
+                    self.add("dependency", f"{title} details", meta, 0.7, payload=key)
+                if data.get("output"):
+                    self.add("dependency", f"{title} output", data["output"], 0.6, payload=key)
+            else:
+                self.add("context", key, data, 0.5, payload=key)
+
+    def add_memory_nodes(self, nodes: Iterable[Any]) -> None:
+        """Добавить узлы памяти (MemoryNode или dict с content/importance)."""
+        for node in nodes:
+            if isinstance(node, dict):
+                content = node.get("content") or node.get("narrative") or node.get("title")
+                importance = node.get("importance", 0.5)
+                node_type = node.get("type", "memory")
+            else:
+                content = getattr(node, "content", None)
+                importance = getattr(node, "importance", 0.5)
+                node_type = getattr(getattr(node, "node_type", None), "value", "memory")
+            self.add("memory", f"memory: {node_type}", content, importance, payload=node)
+
+    def add_session_memory(self, memory: "SessionMemory") -> None:
+        """Добавить recommendations / gotchas / patterns из SessionMemory."""
+        for rec in memory.get_recommendations():
+            self.add("session", "recommendation", rec, 0.75)
+        for gotcha in memory.get_gotchas():
+            self.add("session", "gotcha", gotcha, 0.9)
+        for pattern in memory.get_patterns():
+            self.add("session", "pattern", pattern, 0.8)
+
+    # =========================================================================
+    # PACKING
+    # =========================================================================
+
+    def _score(self, snippet: ContextSnippet, query_terms: set) -> float:
+        relevance = 0.0
+        if query_terms:
+            relevance = len(query_terms & _terms(snippet.key + " " + snippet.content)) / len(query_terms)
+        return self.relevance_weight * relevance + self.importance_weight * snippet.importance
+
+    def pack(
+        self,
+        query: str = "",
+        token_budget: Optional[int] = None,
+        truncate: bool = True
+    ) -> PackedContext:
+        """
+        Выбрать сниппеты под бюджет.
+
+        Жадно по убыванию score; сниппет, не влезающий целиком,
+        обрезается, если остаток бюджета не меньше MIN_TRUNCATE_TOKENS
+        (truncate=False - такие сниппеты просто пропускаются).
+        """
+        budget = self.token_budget if token_budget is None else token_budget
+        result = PackedContext(token_budget=budget)
+        query_terms = _terms(query)
+
+        for snippet in self.candidates:
+            snippet.score = self._score(snippet, query_terms)
+            snippet.tokens = estimate_tokens(snippet.render())
+
+        ranked = sorted(
+            enumerate(self.candidates),
+            key=lambda item: (-item[1].score, item[0])
+        )
+
+        seen: List[str] = []
+        for _, snippet in ranked:
+            normalized = _normalize(snippet.content)
+            if any(normalized == s or normalized in s for s in seen):
+                result.duplicates += 1
+                continue
+
+            remaining = budget - result.tokens_used
+            if snippet.tokens <= remaining:
+                chosen = snippet
+            elif truncate and remaining >= self.MIN_TRUNCATE_TOKENS:
+                header = estimate_tokens(f"### {snippet.key}\n") + 1
+                max_chars = max(0, (remaining - header) * CHARS_PER_TOKEN - 3)
+                chosen = ContextSnippet(
+                    source=snippet.source,
+                    key=snippet.key,
+                    content=snippet.content[:max_chars] + "...",
+                    importance=snippet.importance,
+                    payload=snippet.payload,
+                    score=snippet.score
+                )
+                chosen.tokens = estimate_tokens(chosen.render())
+                result.truncated += 1
+            else:
+                result.dropped += 1
+                continue
+
+            seen.append(normalized)
+            result.snippets.append(chosen)
+            result.tokens_used += chosen.tokens
+
+        return result
+
+    def render(self, query: str = "", token_budget: Optional[int] = None) -> str:
+        """pack() + рендер в markdown-секции."""
+        return self.pack(query, token_budget).render()
+
+
+def pack_task_context(context: Dict[str, Any], query: str = "", token_budget: int = 4000) -> str:
+    """Упаковать контекст задачи агента (Task.get_context_output) в бюджет."""
+    packer = ContextPacker(token_budget=token_budget)
+    packer.add_dependency_outputs(context)
+    return packer.render(query)
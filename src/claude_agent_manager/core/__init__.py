@@ -1,5 +1,5 @@
-from .locks import FileLock, LockMeta  # noqa: F401
+from .locks import FileLock, LockMeta, LockStats, lock_stats, read_lock_holder, reset_lock_stats  # noqa: F401
 from .models import AgentSpec, RunSpec  # noqa: F401
-from .paths import WorkspacePaths, atomic_write_json, ensure_dir, create_workspace_paths  # noqa: F401
+from .paths import WorkspacePaths, atomic_write_json, ensure_dir, create_workspace_paths, read_latest_run, write_latest_run  # noqa: F401
 from .registry import Registry  # noqa: F401
 from .runner_env import RunnerEnv, build_run_sandbox_env  # noqa: F401
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 import time
 from contextlib import AbstractContextManager
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -71,80 +72,202 @@ class LockMeta:
     extra: dict[str, Any] | None = None
 
 
+# Размер штампа владельца в начале lock-файла (pid/thread/mode/since)
+_HOLDER_STAMP_SIZE = 256
+
+
+@dataclass(slots=True)
+class LockStats:
+    """Счётчики contention одного lock-файла в этом процессе."""
+    acquisitions: int = 0
+    contended: int = 0
+    timeouts: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    last_holder: dict[str, Any] | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["total_wait_ms"] = round(self.total_wait_ms, 3)
+        data["max_wait_ms"] = round(self.max_wait_ms, 3)
+        return data
+
+
+_stats: dict[str, LockStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _record_stats(path: Path, wait_ms: float, contended: bool, timed_out: bool, holder: dict[str, Any] | None) -> None:
+    with _stats_lock:
+        st = _stats.setdefault(str(path), LockStats())
+        if timed_out:
+            st.timeouts += 1
+        else:
+            st.acquisitions += 1
+        if contended:
+            st.contended += 1
+            st.total_wait_ms += wait_ms
+            st.max_wait_ms = max(st.max_wait_ms, wait_ms)
+            if holder is not None:
+                st.last_holder = holder
+
+
+def lock_stats() -> dict[str, dict[str, Any]]:
+    """Contention-метрики по lock-файлам (путь -> LockStats.to_dict())."""
+    with _stats_lock:
+        return {path: st.to_dict() for path, st in _stats.items()}
+
+
+def reset_lock_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def read_lock_holder(lock_path: Path) -> dict[str, Any] | None:
+    """Последний владелец lock-файла по штампу (может быть уже отпущен)."""
+    try:
+        with open(lock_path, "rb") as f:
+            raw = f.read(_HOLDER_STAMP_SIZE)
+        holder = json.loads(raw.rstrip(b"\0 \n").decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    holder["alive"] = _pid_exists(int(holder.get("pid", 0)))
+    return holder
+
+
+def _flock_wait(fd: int, op: int, timeout_sec: float) -> bool:
+    """
+    Блокирующий flock с таймаутом: ждёт в ядре во вспомогательном потоке.
+
+    При таймауте поток не прерывается: fd переходит в его владение, и
+    полученная позже блокировка сразу освобождается закрытием fd.
+    """
+    import fcntl
+
+    done = threading.Event()
+    state = threading.Lock()
+    abandoned = False
+    error: list[OSError] = []
+
+    def wait() -> None:
+        try:
+            fcntl.flock(fd, op)
+        except OSError as e:
+            error.append(e)
+        with state:
+            if abandoned:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+                return
+            done.set()
+
+    threading.Thread(target=wait, daemon=True, name="file-lock-wait").start()
+    if not done.wait(timeout_sec):
+        with state:
+            if not done.is_set():
+                abandoned = True
+                return False
+    if error:
+        raise error[0]
+    return True
+
+
 class FileLock(AbstractContextManager["FileLock"]):
     """
-    Кроссплатформенный advisory file lock с stale-recovery.
+    Кроссплатформенный advisory file lock.
+
+    POSIX: flock(LOCK_EX | LOCK_SH). Свободный lock берётся одним
+    неблокирующим вызовом; занятый - ожиданием в ядре (без опроса).
+    Ядро само снимает lock умершего процесса, поэтому stale-recovery не
+    нужна. shared=True - режим читателя: читатели не мешают друг другу,
+    но исключают писателей (exclusive).
+
+    Метаданные пишутся лениво: при захвате - только штамп владельца в сам
+    lock-файл (без fsync), meta.json - только при heartbeat() для долгих
+    удержаний. После __enter__ доступны wait_ms, contended и holder
+    (владелец, которого пришлось ждать); сводка - lock_stats().
+
+    Windows: msvcrt.locking без shared-режима (shared = exclusive),
+    ожидание - опрос с экспоненциальным backoff до poll_interval_sec.
     """
 
     def __init__(
         self,
         lock_path: Path,
         *,
+        shared: bool = False,
         stale_ttl_sec: int | None = 60,
         poll_interval_sec: float = 0.2,
         timeout_sec: float = 10.0,
     ) -> None:
         self.lock_path = lock_path
         self.meta_path = lock_path.with_suffix(lock_path.suffix + ".meta.json")
+        self.shared = shared
         self.stale_ttl_sec = stale_ttl_sec
         self.poll_interval_sec = poll_interval_sec
         self.timeout_sec = timeout_sec
-        self._fh = None
+        self.wait_ms = 0.0
+        self.contended = False
+        self.holder: dict[str, Any] | None = None
+        self._fd: int | None = None
+        self._meta_written = False
+
+    @property
+    def mode(self) -> str:
+        return "shared" if self.shared else "exclusive"
 
     def __enter__(self) -> "FileLock":
         ensure_dir(self.lock_path.parent)
-        deadline = time.time() + self.timeout_sec
-
-        while True:
-            try:
-                self._fh = open(self.lock_path, "a+b")
-                self._acquire_os_lock(self._fh)
-                self._write_meta(owner_pid=os.getpid())
-                return self
-            except BlockingIOError:
-                if self._is_stale():
-                    self._try_break_stale()
-                else:
-                    if time.time() >= deadline:
-                        raise TimeoutError(f"Lock timeout: {self.lock_path}")
-                    time.sleep(self.poll_interval_sec)
-            finally:
-                if self._fh is not None and not self._is_locked_by_me():
-                    try:
-                        self._fh.close()
-                    except Exception:
-                        pass
-                    self._fh = None
+        started = time.perf_counter()
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            acquired = self._try_acquire(fd)
+            if not acquired:
+                self.contended = True
+                self.holder = read_lock_holder(self.lock_path)
+                acquired = self._wait_acquire(fd)
+        except BaseException:
+            os.close(fd)
+            raise
+
+        self.wait_ms = (time.perf_counter() - started) * 1000
+        if not acquired:
+            # fd уже закрыт или передан потоку ожидания
+            _record_stats(self.lock_path, self.wait_ms, True, True, self.holder)
+            raise TimeoutError(f"Lock timeout: {self.lock_path}")
+
+        self._fd = fd
+        self._write_holder_stamp()
+        _record_stats(self.lock_path, self.wait_ms, self.contended, False, self.holder)
+        return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
-        try:
+        if self._meta_written:
             self._delete_meta()
-        finally:
-            if self._fh is not None:
+            self._meta_written = False
+        if self._fd is not None:
+            try:
+                self._release_os_lock(self._fd)
+            finally:
                 try:
-                    self._release_os_lock(self._fh)
-                finally:
-                    try:
-                        self._fh.close()
-                    except Exception:
-                        pass
-                    self._fh = None
+                    os.close(self._fd)
+                except OSError:
+                    pass
+                self._fd = None
 
     def heartbeat(self) -> None:
-        meta = self._read_meta()
-        if meta is None:
-            return
+        """Записать/обновить meta.json владельца (для долгих удержаний)."""
+        meta = self._read_meta() if self._meta_written else None
         data = {
-            "owner_pid": meta.owner_pid,
-            "owner_started_at": meta.owner_started_at,
+            "owner_pid": os.getpid(),
+            "owner_started_at": meta.owner_started_at if meta else utc_iso(),
             "last_heartbeat_ts": utc_ts(),
-            "extra": meta.extra or {},
+            "extra": {"mode": self.mode, **((meta.extra if meta else None) or {})},
         }
         atomic_write_json(self.meta_path, data)
-
-    def _is_locked_by_me(self) -> bool:
-        meta = self._read_meta()
-        return meta is not None and meta.owner_pid == os.getpid()
+        self._meta_written = True
 
     def _read_meta(self) -> LockMeta | None:
         if not self.meta_path.exists():
@@ -160,15 +283,6 @@ class FileLock(AbstractContextManager["FileLock"]):
         except Exception:
             return None
 
-    def _write_meta(self, owner_pid: int) -> None:
-        data = {
-            "owner_pid": owner_pid,
-            "owner_started_at": utc_iso(),
-            "last_heartbeat_ts": utc_ts(),
-            "extra": {},
-        }
-        atomic_write_json(self.meta_path, data)
-
     def _delete_meta(self) -> None:
         try:
             if self.meta_path.exists():
@@ -176,40 +290,69 @@ class FileLock(AbstractContextManager["FileLock"]):
         except Exception:
             pass
 
-    def _is_stale(self) -> bool:
-        meta = self._read_meta()
-        if meta is None:
-            return False
+    def _write_holder_stamp(self) -> None:
+        stamp = json.dumps({
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "mode": self.mode,
+            "since": utc_ts(),
+        }).encode("utf-8")[:_HOLDER_STAMP_SIZE]
+        try:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.write(self._fd, stamp.ljust(_HOLDER_STAMP_SIZE, b" "))
+            os.lseek(self._fd, 0, os.SEEK_SET)
+        except OSError:
+            pass  # штамп - только диагностика
 
-        if meta.owner_pid and not _pid_exists(meta.owner_pid):
-            return True
+    def _try_acquire(self, fd: int) -> bool:
+        if os.name == "posix":
+            import fcntl
 
-        if self.stale_ttl_sec is not None and meta.last_heartbeat_ts is not None:
-            return (utc_ts() - float(meta.last_heartbeat_ts)) > float(self.stale_ttl_sec)
+            op = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+            try:
+                fcntl.flock(fd, op | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                return False
 
-        return False
+        import msvcrt
 
-    def _try_break_stale(self) -> None:
-        self._delete_meta()
+        try:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _wait_acquire(self, fd: int) -> bool:
+        if self.timeout_sec <= 0:
+            os.close(fd)
+            return False
 
-    @staticmethod
-    def _acquire_os_lock(fh) -> None:
         if os.name == "posix":
             import fcntl
 
-            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-        else:
-            import msvcrt
-
-            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+            op = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+            return _flock_wait(fd, op, self.timeout_sec)
+
+        deadline = time.monotonic() + self.timeout_sec
+        delay = 0.001
+        while time.monotonic() < deadline:
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            if self._try_acquire(fd):
+                return True
+            delay = min(delay * 2, self.poll_interval_sec)
+        os.close(fd)
+        return False
 
     @staticmethod
-    def _release_os_lock(fh) -> None:
+    def _release_os_lock(fd: int) -> None:
         if os.name == "posix":
             import fcntl
 
-            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            fcntl.flock(fd, fcntl.LOCK_UN)
         else:
             import msvcrt
 
-            msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
@@ -7,6 +7,12 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+# Файл-указатель на последний запущенный run агента (runs/LATEST)
+LATEST_RUN_FILE = "LATEST"
+
+# Sandbox (HOME/XDG) тёплого worker'а из пула: не run, живёт пока жив worker
+WARM_RUN_DIR = "warm"
+
 
 @dataclass(frozen=True, slots=True)
 class WorkspacePaths:
@@ -30,6 +36,12 @@ class WorkspacePaths:
     def agent_runs_dir(self, agent_id: str) -> Path:
         return self.agent_dir(agent_id) / "runs"
 
+    def agent_warm_dir(self, agent_id: str) -> Path:
+        return self.agent_runs_dir(agent_id) / WARM_RUN_DIR
+
+    def agent_latest_run_path(self, agent_id: str) -> Path:
+        return self.agent_runs_dir(agent_id) / LATEST_RUN_FILE
+
     def run_dir(self, agent_id: str, run_id: str) -> Path:
         return self.agent_runs_dir(agent_id) / run_id
 
@@ -86,6 +98,24 @@ def atomic_write_json(path: Path, data: dict[str, Any]) -> None:
     os.replace(tmp_name, path)
 
 
+def write_latest_run(runs_dir: Path, run_id: str) -> None:
+    """Атомарно обновить указатель runs/LATEST."""
+    ensure_dir(runs_dir)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=str(runs_dir), delete=False) as f:
+        f.write(run_id)
+        tmp_name = f.name
+    os.replace(tmp_name, runs_dir / LATEST_RUN_FILE)
+
+
+def read_latest_run(runs_dir: Path) -> str | None:
+    """run_id из runs/LATEST или None, если указателя нет."""
+    try:
+        run_id = (runs_dir / LATEST_RUN_FILE).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return run_id or None
+
+
 def create_workspace_paths(root: Path | str) -> WorkspacePaths:
     """
     Build WorkspacePaths and ensure top-level directories exist.
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import os
 import sqlite3
-from contextlib import contextmanager
-from dataclasses import dataclass
+import threading
+import time
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterator, Iterable
+from typing import Callable, Iterator, Iterable
 
 from .models import AgentSpec, RunSpec
 
@@ -17,7 +20,12 @@ CREATE TABLE IF NOT EXISTS agents (
   agent_id TEXT PRIMARY KEY,
   name TEXT NOT NULL,
   role TEXT NOT NULL,
-  created_at TEXT NOT NULL
+  created_at TEXT NOT NULL,
+  record_json TEXT,
+  project_path TEXT,
+  port INTEGER,
+  status TEXT,
+  record_mtime_ns INTEGER
 );
 
 CREATE TABLE IF NOT EXISTS runs (
@@ -43,39 +51,175 @@ CREATE TABLE IF NOT EXISTS resources_ports (
   port INTEGER NOT NULL,
   run_id TEXT,
   allocated_at TEXT,
+  lease_expires_at REAL,
   UNIQUE(port),
   FOREIGN KEY(run_id) REFERENCES runs(run_id)
 );
 """
 
+# Columns added to `agents` after the first schema version (for ALTER TABLE on old DBs)
+AGENT_RECORD_COLUMNS = {
+    "record_json": "TEXT",
+    "project_path": "TEXT",
+    "port": "INTEGER",
+    "status": "TEXT",
+    "record_mtime_ns": "INTEGER",
+}
+
+# Columns added to `resources_ports` after the first schema version
+PORT_COLUMNS = {
+    "lease_expires_at": "REAL",
+}
+
+# Ports that failed the bind test are parked under this prefix until the lease expires
+PORT_QUARANTINE_PREFIX = "quarantine:"
+
+# Rows claimed under a temporary name (pending:<uuid>:port) expire after this
+# unless renamed, so a claimer that crashed mid-create does not leak the port
+PENDING_PORT_LEASE_SEC = 60.0
+
+# Runs in these states no longer own their leased ports
+TERMINAL_RUN_STATUSES = ("stopped", "failed")
+
+# First-fit over gaps: candidates are range start and port+1 of every occupied
+# port, so the query touches only occupied rows (UNIQUE(port) / idx_agents_port),
+# never the whole range
+FREE_PORT_CANDIDATES = """
+WITH occupied(port) AS (
+  SELECT port FROM resources_ports WHERE port BETWEEN :lo AND :hi
+  UNION
+  SELECT port FROM agents WHERE record_json IS NOT NULL AND port BETWEEN :lo AND :hi
+)
+SELECT c.port FROM (
+  SELECT :lo AS port
+  UNION
+  SELECT port + 1 FROM occupied WHERE port < :hi
+) AS c
+WHERE c.port NOT IN (SELECT port FROM occupied)
+ORDER BY c.port
+LIMIT :limit
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_agents_project ON agents(project_path);
+CREATE INDEX IF NOT EXISTS idx_agents_status ON agents(status);
+CREATE INDEX IF NOT EXISTS idx_agents_port ON agents(port);
+CREATE INDEX IF NOT EXISTS idx_runs_agent ON runs(agent_id, created_at);
+"""
+
+
+class _Connection(sqlite3.Connection):
+    """Persistent per-thread connection: `with conn` neither commits nor closes."""
+
+    def __enter__(self) -> "_Connection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+# Per-thread state shared by all Registry instances of the same DB file:
+# {db_path: connection} and {db_path: tx depth}. pid detects fork.
+_local = threading.local()
+
+
+def _thread_state() -> tuple[dict[str, _Connection], dict[str, int]]:
+    if getattr(_local, "pid", None) != os.getpid():
+        _local.pid = os.getpid()
+        _local.conns = {}
+        _local.depth = {}
+    return _local.conns, _local.depth
+
 
 @dataclass(slots=True)
 class Registry:
     db_path: Path
+    _key: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Same file via different spellings must share the thread's connection
+        self._key = os.path.realpath(self.db_path)
 
     def connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA busy_timeout=10000;")
+        """
+        Connection of the current thread (opened once, WAL + pragmas set).
+
+        Statements are prepared once per connection and reused via the
+        sqlite3 statement cache.
+        """
+        conns, _ = _thread_state()
+        key = self._key
+        conn = conns.get(key)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=10.0,
+                isolation_level=None,
+                factory=_Connection,
+                cached_statements=256,
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout=10000;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+            conns[key] = conn
         return conn
 
+    def close(self) -> None:
+        """Close the current thread's connection (reopened on next use)."""
+        conns, depth = _thread_state()
+        conn = conns.pop(self._key, None)
+        depth.pop(self._key, None)
+        if conn is not None:
+            conn.close()
+
     def init(self) -> None:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         with self.connect() as conn:
             conn.executescript(SCHEMA)
+            existing = {r["name"] for r in conn.execute("PRAGMA table_info(agents)").fetchall()}
+            for column, sql_type in AGENT_RECORD_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE agents ADD COLUMN {column} {sql_type}")
+            existing = {r["name"] for r in conn.execute("PRAGMA table_info(resources_ports)").fetchall()}
+            for column, sql_type in PORT_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE resources_ports ADD COLUMN {column} {sql_type}")
+            conn.executescript(INDEXES)
 
     @contextmanager
     def tx(self) -> Iterator[sqlite3.Connection]:
+        """
+        BEGIN IMMEDIATE ... COMMIT on the thread's connection.
+
+        Nested tx() (including registry methods called inside a batch())
+        joins the outer transaction; only the outermost one commits or
+        rolls back.
+        """
         conn = self.connect()
+        _, depth = _thread_state()
+        key = self._key
+        if depth.get(key, 0) > 0:
+            depth[key] += 1
+            try:
+                yield conn
+            finally:
+                depth[key] -= 1
+            return
+
+        conn.execute("BEGIN IMMEDIATE;")
+        depth[key] = 1
         try:
-            conn.execute("BEGIN IMMEDIATE;")
             yield conn
             conn.execute("COMMIT;")
-        except Exception:
+        except BaseException:
             conn.execute("ROLLBACK;")
             raise
         finally:
-            conn.close()
+            depth[key] = 0
+
+    def batch(self) -> AbstractContextManager[sqlite3.Connection]:
+        """Group several registry calls into one commit: `with registry.batch(): ...`."""
+        return self.tx()
 
     def upsert_agent(self, spec: AgentSpec) -> None:
         with self.tx() as conn:
@@ -111,15 +255,44 @@ class Registry:
         with self.tx() as conn:
             conn.execute("UPDATE runs SET status=? WHERE run_id=?", (status, run_id))
 
+    def list_runs(self, agent_id: str | None = None) -> list[sqlite3.Row]:
+        """Runs (newest first), optionally of one agent."""
+        with self.connect() as conn:
+            if agent_id is None:
+                return conn.execute("SELECT * FROM runs ORDER BY created_at DESC").fetchall()
+            return conn.execute(
+                "SELECT * FROM runs WHERE agent_id=? ORDER BY created_at DESC", (agent_id,)
+            ).fetchall()
+
+    def delete_runs(self, run_ids: Iterable[str]) -> int:
+        """Delete runs with their pids and ports. Returns deleted runs count."""
+        params = [(run_id,) for run_id in run_ids]
+        if not params:
+            return 0
+        with self.tx() as conn:
+            conn.executemany("DELETE FROM run_pids WHERE run_id=?", params)
+            conn.executemany("DELETE FROM resources_ports WHERE run_id=?", params)
+            return conn.executemany("DELETE FROM runs WHERE run_id=?", params).rowcount
+
+    def get_run_pids(self, run_id: str) -> dict[str, int]:
+        with self.connect() as conn:
+            rows = conn.execute("SELECT key, pid FROM run_pids WHERE run_id=?", (run_id,)).fetchall()
+            return {r["key"]: int(r["pid"]) for r in rows}
+
     def attach_pid(self, run_id: str, key: str, pid: int) -> None:
+        self.attach_pids(run_id, {key: pid})
+
+    def attach_pids(self, run_id: str, pids: dict[str, int]) -> None:
+        if not pids:
+            return
         with self.tx() as conn:
-            conn.execute(
+            conn.executemany(
                 """
                 INSERT INTO run_pids(run_id, key, pid)
                 VALUES (?, ?, ?)
                 ON CONFLICT(run_id, key) DO UPDATE SET pid=excluded.pid
                 """,
-                (run_id, key, pid),
+                [(run_id, key, pid) for key, pid in pids.items()],
             )
 
     def allocate_port(self, name: str, port: int, run_id: str | None, allocated_at_iso: str) -> None:
@@ -141,10 +314,190 @@ class Registry:
             rows = conn.execute("SELECT port FROM resources_ports").fetchall()
             return {int(r["port"]) for r in rows}
 
+    def claim_port(
+        self,
+        name: str,
+        port_min: int,
+        port_max: int,
+        run_id: str | None = None,
+        allocated_at_iso: str | None = None,
+        lease_sec: float | None = None,
+        verify: Callable[[int], bool] | None = None,
+        quarantine_sec: float = 60.0,
+    ) -> int:
+        """
+        Atomically claim the lowest free port in [port_min, port_max] under `name`.
+
+        Runs in one BEGIN IMMEDIATE transaction: expired leases are reclaimed,
+        the free candidate is picked by an indexed gap query and inserted.
+        `verify` (e.g. a bind test) is called only for the chosen candidate; a
+        port that fails it is quarantined for `quarantine_sec` so other claims
+        skip it without another syscall. With `lease_sec` the row expires
+        after that many seconds (see expire_port_leases()).
+        """
+        with self.tx() as conn:
+            now = time.time()
+            self._expire_port_leases(conn, now)
+            while True:
+                candidates = [
+                    int(r["port"])
+                    for r in conn.execute(
+                        FREE_PORT_CANDIDATES, {"lo": port_min, "hi": port_max, "limit": 16}
+                    ).fetchall()
+                ]
+                if not candidates:
+                    raise RuntimeError(f"No free port in range [{port_min}-{port_max}]")
+                for port in candidates:
+                    if verify is None or verify(port):
+                        conn.execute(
+                            """
+                            INSERT INTO resources_ports(name, port, run_id, allocated_at, lease_expires_at)
+                            VALUES (?, ?, ?, ?, ?)
+                            """,
+                            (name, port, run_id, allocated_at_iso, now + lease_sec if lease_sec else None),
+                        )
+                        return port
+                    conn.execute(
+                        """
+                        INSERT INTO resources_ports(name, port, run_id, allocated_at, lease_expires_at)
+                        VALUES (?, ?, NULL, NULL, ?)
+                        """,
+                        (f"{PORT_QUARANTINE_PREFIX}{port}", port, now + quarantine_sec),
+                    )
+
+    def rename_port(self, name: str, new_name: str) -> None:
+        """Rename a port row; the renamed row is permanent (its lease is cleared)."""
+        with self.tx() as conn:
+            cur = conn.execute(
+                "UPDATE resources_ports SET name=?, lease_expires_at=NULL WHERE name=?", (new_name, name)
+            )
+            if cur.rowcount == 0:
+                raise KeyError(name)
+
+    def bind_port(self, name: str, port: int, run_id: str, allocated_at_iso: str) -> None:
+        """
+        Attach a port row to a run (insert it if missing).
+
+        The row is then released together with the run: when it is
+        stopped, or marked failed after a crash (see run_gc).
+        """
+        with self.tx() as conn:
+            conn.execute(
+                """
+                INSERT INTO resources_ports(name, port, run_id, allocated_at, lease_expires_at)
+                VALUES (?, ?, ?, ?, NULL)
+                ON CONFLICT(name) DO UPDATE SET
+                  port=excluded.port, run_id=excluded.run_id, lease_expires_at=NULL
+                """,
+                (name, port, run_id, allocated_at_iso),
+            )
+
+    def expire_port_leases(self) -> int:
+        """Release expired leases and ports of finished runs. Returns released count."""
+        with self.tx() as conn:
+            return self._expire_port_leases(conn, time.time())
+
+    @staticmethod
+    def _expire_port_leases(conn: sqlite3.Connection, now: float) -> int:
+        placeholders = ",".join("?" for _ in TERMINAL_RUN_STATUSES)
+        cur = conn.execute(
+            f"""
+            DELETE FROM resources_ports
+            WHERE (lease_expires_at IS NOT NULL AND lease_expires_at < ?)
+               OR run_id IN (SELECT run_id FROM runs WHERE status IN ({placeholders}))
+            """,
+            (now, *TERMINAL_RUN_STATUSES),
+        )
+        return cur.rowcount
+
     def release_ports_for_runs(self, run_ids: Iterable[str]) -> None:
-        run_ids_list = list(run_ids)
-        if not run_ids_list:
+        params = [(run_id,) for run_id in run_ids]
+        if not params:
+            return
+        with self.tx() as conn:
+            conn.executemany("DELETE FROM resources_ports WHERE run_id=?", params)
+
+    # ---------- agent records (index of agents/<id>/agent.json) ----------
+
+    def upsert_agent_record(
+        self,
+        agent_id: str,
+        name: str,
+        record_json: str,
+        project_path: str | None,
+        port: int | None,
+        status: str,
+        created_at_iso: str,
+        record_mtime_ns: int | None,
+    ) -> None:
+        with self.tx() as conn:
+            conn.execute(
+                """
+                INSERT INTO agents(agent_id, name, role, created_at, record_json, project_path, port, status, record_mtime_ns)
+                VALUES (?, ?, 'agent', ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(agent_id) DO UPDATE SET
+                  name=excluded.name,
+                  record_json=excluded.record_json,
+                  project_path=excluded.project_path,
+                  port=excluded.port,
+                  status=excluded.status,
+                  record_mtime_ns=excluded.record_mtime_ns
+                """,
+                (agent_id, name, created_at_iso, record_json, project_path, port, status, record_mtime_ns),
+            )
+
+    def clear_agent_records(self, agent_ids: Iterable[str]) -> None:
+        """Drop indexed records (agent rows stay for run history)."""
+        params = [(agent_id,) for agent_id in agent_ids]
+        if not params:
             return
-        placeholders = ",".join("?" for _ in run_ids_list)
         with self.tx() as conn:
-            conn.execute(f"DELETE FROM resources_ports WHERE run_id IN ({placeholders})", run_ids_list)
+            conn.executemany(
+                "UPDATE agents SET record_json=NULL, status=NULL, port=NULL, record_mtime_ns=NULL WHERE agent_id=?",
+                params,
+            )
+
+    def get_agent_record(self, agent_id: str) -> str | None:
+        with self.connect() as conn:
+            row = conn.execute(
+                "SELECT record_json FROM agents WHERE agent_id=? AND record_json IS NOT NULL", (agent_id,)
+            ).fetchone()
+            return row["record_json"] if row else None
+
+    def agent_record_mtimes(self) -> dict[str, int | None]:
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT agent_id, record_mtime_ns FROM agents WHERE record_json IS NOT NULL"
+            ).fetchall()
+            return {r["agent_id"]: r["record_mtime_ns"] for r in rows}
+
+    def query_agent_records(
+        self,
+        project_path: str | None = None,
+        status: str | None = None,
+        port: int | None = None,
+    ) -> list[str]:
+        """record_json of indexed agents matching all given filters, ordered by id."""
+        where = ["record_json IS NOT NULL"]
+        params: list = []
+        if project_path is not None:
+            where.append("project_path=?")
+            params.append(project_path)
+        if status is not None:
+            where.append("status=?")
+            params.append(status)
+        if port is not None:
+            where.append("port=?")
+            params.append(port)
+        with self.connect() as conn:
+            rows = conn.execute(
+                f"SELECT record_json FROM agents WHERE {' AND '.join(where)} ORDER BY agent_id", params
+            ).fetchall()
+            return [r["record_json"] for r in rows]
+
+    def get_agent_ports(self) -> set[int]:
+        with self.connect() as conn:
+            rows = conn.execute(
+                "SELECT port FROM agents WHERE record_json IS NOT NULL AND port IS NOT NULL"
+            ).fetchall()
+            return {int(r["port"]) for r in rows}
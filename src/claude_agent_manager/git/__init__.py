@@ -1,12 +1,17 @@
 """Git utilities module."""
 
-from .conflict_resolver import ConflictResolver, MergeResult, ConflictInfo
+from .conflict_resolver import ConflictResolver, MergeResult, ConflictInfo, ConflictReport
 from .changelog import ChangelogGenerator, ChangelogEntry
+from .merge_queue import MergeQueue, MergePlan, MergeQueueReport
 
 __all__ = [
     "ConflictResolver",
     "MergeResult",
     "ConflictInfo",
+    "ConflictReport",
     "ChangelogGenerator",
-    "ChangelogEntry"
+    "ChangelogEntry",
+    "MergeQueue",
+    "MergePlan",
+    "MergeQueueReport",
 ]
@@ -13,21 +13,32 @@ AI-powered Git Conflict Resolver.
         print(f"Resolved {len(result.conflicts_resolved)} conflicts")
     else:
         print(f"Need manual review: {result.conflicts_remaining}")
+
+    # Все файлы сразу: разбор и валидация в пуле потоков,
+    # AI-merge параллельно с ограничением
+    report = resolver.resolve_all_parallel(max_workers=8, ai_concurrency=4)
+    print(report.to_dict())
 """
 
 from __future__ import annotations
 
+import os
 import subprocess
 import re
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple
 from enum import Enum
 
 from rich.console import Console
 from rich.panel import Panel
 from rich.syntax import Syntax
 
+from ..worktree_manager import validate_merged_syntax
+
 console = Console()
 
 
@@ -60,6 +71,9 @@ class ConflictInfo:
     suggested_strategy: Optional[MergeStrategy] = None
     resolution: Optional[str] = None
     explanation: Optional[str] = None
+    # Позиция блока маркеров в исходном файле (для применения за один проход)
+    start_offset: Optional[int] = None
+    end_offset: Optional[int] = None
 
 
 @dataclass
@@ -71,6 +85,8 @@ class MergeResult:
     conflicts_resolved: List[ConflictInfo] = field(default_factory=list)
     conflicts_remaining: List[ConflictInfo] = field(default_factory=list)
     explanation: str = ""
+    duration_ms: float = 0.0
+    timings: Dict[str, float] = field(default_factory=dict)  # parse/resolve/validate, ms
 
     def to_dict(self) -> dict:
         return {
@@ -78,10 +94,56 @@ class MergeResult:
             "file_path": self.file_path,
             "conflicts_resolved": len(self.conflicts_resolved),
             "conflicts_remaining": len(self.conflicts_remaining),
-            "explanation": self.explanation
+            "explanation": self.explanation,
+            "duration_ms": round(self.duration_ms, 1),
+            "timings": {k: round(v, 1) for k, v in self.timings.items()},
+        }
+
+
+@dataclass
+class ConflictReport:
+    """Сводный отчёт resolve_all_parallel()."""
+    results: List[MergeResult] = field(default_factory=list)
+    duration_ms: float = 0.0
+    workers: int = 1
+    ai_concurrency: int = 1
+
+    @property
+    def success(self) -> bool:
+        return all(r.success for r in self.results)
+
+    @property
+    def resolved_files(self) -> List[str]:
+        return [r.file_path for r in self.results if r.success]
+
+    @property
+    def failed_files(self) -> List[str]:
+        return [r.file_path for r in self.results if not r.success]
+
+    def to_dict(self) -> dict:
+        return {
+            "success": self.success,
+            "files": len(self.results),
+            "resolved": len(self.resolved_files),
+            "failed": self.failed_files,
+            "duration_ms": round(self.duration_ms, 1),
+            "workers": self.workers,
+            "ai_concurrency": self.ai_concurrency,
+            "results": [r.to_dict() for r in self.results],
         }
 
 
+@dataclass
+class _FileWork:
+    """Промежуточное состояние файла в resolve_all_parallel()."""
+    file_path: Path
+    content: Optional[str] = None
+    conflicts: List[ConflictInfo] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    started: float = 0.0
+    error: Optional[str] = None
+
+
 class ConflictResolver:
     """
     AI-powered conflict resolver для git merge.
@@ -141,43 +203,43 @@ class ConflictResolver:
         if not file_path.exists():
             return []
 
-        content = file_path.read_text(encoding='utf-8')
+        return self._parse_content(file_path.read_text(encoding='utf-8'), self._rel_path(file_path))
+
+    def _rel_path(self, file_path: Path) -> str:
+        # Используем resolve() для обработки коротких путей Windows
+        try:
+            return str(file_path.resolve().relative_to(self.project_path.resolve()))
+        except ValueError:
+            # Если relative_to не работает, используем имя файла
+            return str(file_path.name)
+
+    def _parse_content(self, content: str, rel_path: str) -> List[ConflictInfo]:
+        """Разобрать маркеры конфликтов; номера строк - по индексу переводов строк."""
+        if '<<<<<<< ' not in content:
+            return []
+
+        # Позиции '\n' считаются один раз, номер строки - бинарным поиском
+        newlines = [m.start() for m in re.finditer('\n', content)]
         conflicts = []
 
-        for i, match in enumerate(self.CONFLICT_PATTERN.finditer(content)):
+        for match in self.CONFLICT_PATTERN.finditer(content):
             ours = match.group('ours').strip()
             theirs = match.group('theirs').strip()
             base = match.group('base')
             if base:
                 base = base.strip()
 
-            # Определяем severity
-            severity = self._assess_severity(ours, theirs)
-
-            # Предлагаем стратегию
-            strategy = self._suggest_strategy(ours, theirs, base)
-
-            # Вычисляем номера строк
-            start_pos = match.start()
-            start_line = content[:start_pos].count('\n') + 1
-            end_line = start_line + match.group(0).count('\n')
-
-            # Используем resolve() для обработки коротких путей Windows
-            try:
-                rel_path = str(file_path.resolve().relative_to(self.project_path.resolve()))
-            except ValueError:
-                # Если relative_to не работает, используем имя файла
-                rel_path = str(file_path.name)
-
             conflicts.append(ConflictInfo(
                 file_path=rel_path,
-                start_line=start_line,
-                end_line=end_line,
+                start_line=bisect_left(newlines, match.start()) + 1,
+                end_line=bisect_left(newlines, match.end()) + 1,
                 ours_content=ours,
                 theirs_content=theirs,
                 base_content=base,
-                severity=severity,
-                suggested_strategy=strategy
+                severity=self._assess_severity(ours, theirs),
+                suggested_strategy=self._suggest_strategy(ours, theirs, base),
+                start_offset=match.start(),
+                end_offset=match.end(),
             ))
 
         return conflicts
@@ -357,12 +419,13 @@ class ConflictResolver:
         else:
             return theirs
 
-    def resolve_file_conflicts(self, file_path: Path) -> MergeResult:
+    def resolve_file_conflicts(self, file_path: Path, validate: bool = False) -> MergeResult:
         """
         Разрешить все конфликты в файле.
 
         Args:
             file_path: Путь к файлу
+            validate: Проверить синтаксис результата (validate_merged_syntax)
 
         Returns:
             MergeResult с результатами
@@ -374,55 +437,118 @@ class ConflictResolver:
                 explanation=f"File not found: {file_path}"
             )
 
-        conflicts = self.parse_conflicts(file_path)
+        work = self._prepare_file(file_path)
+        for conflict in work.conflicts:
+            if self._needs_ai(conflict):
+                work.timings["ai"] = work.timings.get("ai", 0.0) + self._timed_resolve(conflict)
+        return self._finish_file(work, validate)
+
+    # =========================================================================
+    # PIPELINE (разбор -> AI merge -> сборка и валидация)
+    # =========================================================================
+
+    def _needs_ai(self, conflict: ConflictInfo) -> bool:
+        return conflict.suggested_strategy == MergeStrategy.AI_MERGE and self.enable_ai
+
+    def _timed_resolve(self, conflict: ConflictInfo) -> float:
+        """resolve_conflict() с замером времени (мс)."""
+        t = time.perf_counter()
+        self.resolve_conflict(conflict)
+        return (time.perf_counter() - t) * 1000
+
+    def _prepare_file(self, file_path: Path) -> _FileWork:
+        """Прочитать и разобрать файл, разрешить конфликты, не требующие AI."""
+        work = _FileWork(file_path=file_path, started=time.perf_counter())
+        try:
+            work.content = file_path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            work.error = f"Cannot read {file_path}: {e}"
+            return work
+
+        t = time.perf_counter()
+        work.conflicts = self._parse_content(work.content, self._rel_path(file_path))
+        work.timings["parse"] = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        for conflict in work.conflicts:
+            if not self._needs_ai(conflict):
+                self.resolve_conflict(conflict)
+        work.timings["resolve"] = (time.perf_counter() - t) * 1000
+        return work
+
+    def _finish_file(self, work: _FileWork, validate: bool) -> MergeResult:
+        """Собрать итоговый контент файла и (опционально) проверить синтаксис."""
+        result = self._build_result(work, validate)
+        result.duration_ms = (time.perf_counter() - work.started) * 1000
+        result.timings = work.timings
+        return result
+
+    def _build_result(self, work: _FileWork, validate: bool) -> MergeResult:
+        file_path = str(work.file_path)
+        if work.error:
+            return MergeResult(success=False, file_path=file_path, explanation=work.error)
 
-        if not conflicts:
+        if not work.conflicts:
             return MergeResult(
                 success=True,
-                file_path=str(file_path),
-                merged_content=file_path.read_text(encoding='utf-8'),
+                file_path=file_path,
+                merged_content=work.content,
                 explanation="No conflicts found"
             )
 
-        resolved = []
-        remaining = []
-
-        # Разрешаем конфликты
-        for conflict in conflicts:
-            resolved_conflict = self.resolve_conflict(conflict)
-
-            if resolved_conflict.resolution is not None:
-                resolved.append(resolved_conflict)
-            else:
-                remaining.append(resolved_conflict)
-
-        # Если все разрешены - применяем
-        if not remaining:
-            content = file_path.read_text(encoding='utf-8')
-            merged = self._apply_resolutions(content, resolved)
+        resolved = [c for c in work.conflicts if c.resolution is not None]
+        remaining = [c for c in work.conflicts if c.resolution is None]
 
-            return MergeResult(
-                success=True,
-                file_path=str(file_path),
-                merged_content=merged,
-                conflicts_resolved=resolved,
-                explanation=f"Resolved {len(resolved)} conflict(s)"
-            )
-        else:
+        if remaining:
             return MergeResult(
                 success=False,
-                file_path=str(file_path),
+                file_path=file_path,
                 conflicts_resolved=resolved,
                 conflicts_remaining=remaining,
                 explanation=f"Resolved {len(resolved)}, need review: {len(remaining)}"
             )
 
+        merged = self._apply_resolutions(work.content, resolved)
+
+        if validate:
+            t = time.perf_counter()
+            is_valid, error = validate_merged_syntax(file_path, merged)
+            work.timings["validate"] = (time.perf_counter() - t) * 1000
+            if not is_valid:
+                return MergeResult(
+                    success=False,
+                    file_path=file_path,
+                    conflicts_resolved=resolved,
+                    explanation=f"Merged result is not valid: {error}"
+                )
+
+        return MergeResult(
+            success=True,
+            file_path=file_path,
+            merged_content=merged,
+            conflicts_resolved=resolved,
+            explanation=f"Resolved {len(resolved)} conflict(s)"
+        )
+
     def _apply_resolutions(
         self,
         content: str,
         conflicts: List[ConflictInfo]
     ) -> str:
         """Применить разрешения к контенту."""
+        if conflicts and all(c.start_offset is not None for c in conflicts):
+            # Позиции известны из parse - собираем результат за один проход
+            parts = []
+            pos = 0
+            for conflict in sorted(conflicts, key=lambda c: c.start_offset):
+                if conflict.resolution is None:
+                    continue
+                parts.append(content[pos:conflict.start_offset])
+                parts.append(conflict.resolution + '\n')
+                pos = conflict.end_offset
+            parts.append(content[pos:])
+            return ''.join(parts)
+
         # Применяем в обратном порядке (чтобы не сбивать позиции)
         result = content
 
@@ -452,24 +578,71 @@ class ConflictResolver:
         Returns:
             Список результатов
         """
-        files = self.get_conflicted_files()
-        results = []
-
-        for file_path in files:
-            console.print(f"[cyan]Processing {file_path}...[/cyan]")
-
-            result = self.resolve_file_conflicts(file_path)
-            results.append(result)
+        report = self.resolve_all_parallel(auto_apply=auto_apply)
 
+        for result in report.results:
             if result.success and auto_apply and result.merged_content:
-                file_path.write_text(result.merged_content, encoding='utf-8')
-                console.print(f"[green]✓ Applied resolution to {file_path}[/green]")
+                console.print(f"[green]✓ Applied resolution to {result.file_path}[/green]")
             elif not result.success:
-                console.print(f"[yellow]! Need manual review: {file_path}[/yellow]")
+                console.print(f"[yellow]! Need manual review: {result.file_path}[/yellow]")
                 for conflict in result.conflicts_remaining:
                     console.print(f"  Line {conflict.start_line}: {conflict.explanation}")
+                if not result.conflicts_remaining:
+                    console.print(f"  {result.explanation}")
+
+        return report.results
+
+    def resolve_all_parallel(
+        self,
+        files: Optional[List[Path]] = None,
+        auto_apply: bool = False,
+        max_workers: Optional[int] = None,
+        ai_concurrency: int = 4,
+        validate: bool = True,
+    ) -> ConflictReport:
+        """
+        Разрешить конфликты во всех файлах параллельно.
+
+        Файлы читаются и разбираются в пуле потоков, AI-merge всех файлов
+        выполняется одновременно (не больше ai_concurrency запросов),
+        результаты собираются и проверяются validate_merged_syntax тоже
+        в пуле. Записываются только успешные и валидные файлы.
+
+        Args:
+            files: Файлы (по умолчанию - все конфликтные в репозитории)
+            auto_apply: Записать разрешённые файлы
+            max_workers: Размер пула для разбора и валидации
+            ai_concurrency: Максимум одновременных AI-merge
+            validate: Проверять синтаксис результата
 
-        return results
+        Returns:
+            ConflictReport с MergeResult и временем по каждому файлу
+        """
+        started = time.perf_counter()
+        files = self.get_conflicted_files() if files is None else [Path(f) for f in files]
+        workers = max(1, min(max_workers or (os.cpu_count() or 4), len(files) or 1))
+        report = ConflictReport(workers=workers, ai_concurrency=max(1, ai_concurrency))
+
+        if files:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                works = list(pool.map(self._prepare_file, files))
+
+                ai_jobs = [(w, c) for w in works for c in w.conflicts if self._needs_ai(c)]
+                if ai_jobs:
+                    with ThreadPoolExecutor(max_workers=report.ai_concurrency) as ai_pool:
+                        elapsed = list(ai_pool.map(lambda job: self._timed_resolve(job[1]), ai_jobs))
+                    for (work, _), ms in zip(ai_jobs, elapsed):
+                        work.timings["ai"] = work.timings.get("ai", 0.0) + ms
+
+                report.results = list(pool.map(lambda w: self._finish_file(w, validate), works))
+
+        if auto_apply:
+            for result in report.results:
+                if result.success and result.merged_content:
+                    Path(result.file_path).write_text(result.merged_content, encoding='utf-8')
+
+        report.duration_ms = (time.perf_counter() - started) * 1000
+        return report
 
 
 def print_conflict(conflict: ConflictInfo) -> None:
@@ -0,0 +1,355 @@
+"""
+Merge Queue - мерж веток агентов с предсказанием конфликтов.
+
+Вместо checkout + git merge по одной ветке:
+
+1. plan(): для всех веток сразу выполняется in-memory merge
+   (`git merge-tree --write-tree`) против целевой ветки - рабочее
+   дерево и индекс не трогаются, проверки идут параллельно.
+2. Чистые ветки с непересекающимися наборами файлов мержатся одним
+   проходом (один octopus-коммит или цепочка merge-коммитов), тоже
+   in-memory: merge-tree -> commit-tree -> update-ref / ff-only.
+3. Чистые, но пересекающиеся ветки мержатся по одной, каждая
+   перепроверяется против уже обновлённой цели.
+4. Только реальные конфликты идут через рабочее дерево и
+   ConflictResolver; неразрешённые - merge --abort и отчёт.
+
+Требуется git >= 2.38 (merge-tree --write-tree).
+
+Использование:
+    from claude_agent_manager.git.merge_queue import MergeQueue
+
+    queue = MergeQueue(project_path, target_branch="main", resolver=ConflictResolver(project_path))
+    plan = queue.plan(branches)          # только предсказание
+    report = queue.run(branches)
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+
+from rich.console import Console
+
+if TYPE_CHECKING:
+    from .conflict_resolver import ConflictResolver
+
+console = Console()
+
+MIN_GIT_VERSION = (2, 38)
+
+
+class MergeQueueError(Exception):
+    """Ошибка merge queue (git недоступен / слишком старый)."""
+    pass
+
+
+@dataclass
+class BranchPrediction:
+    """Предсказание мержа ветки в цель."""
+    branch: str
+    head: str
+    clean: bool
+    tree: Optional[str] = None                      # Результат in-memory merge (если clean)
+    conflicted_files: List[str] = field(default_factory=list)
+    changed_files: Set[str] = field(default_factory=set)
+    commits_ahead: int = 0
+
+
+@dataclass
+class MergePlan:
+    """Порядок мержа, рассчитанный без изменения рабочего дерева."""
+    target: str
+    target_sha: str
+    batch: List[str] = field(default_factory=list)        # Чистые и попарно непересекающиеся
+    sequential: List[str] = field(default_factory=list)   # Чистые, но пересекаются с другими
+    conflicts: List[str] = field(default_factory=list)    # Конфликтуют уже с целью
+    up_to_date: List[str] = field(default_factory=list)   # Нечего мержить
+    failed: Dict[str, str] = field(default_factory=dict)  # Не удалось предсказать: branch -> причина
+    predictions: Dict[str, BranchPrediction] = field(default_factory=dict)
+
+
+@dataclass
+class MergeQueueReport:
+    """Итог run()."""
+    merged: List[str] = field(default_factory=list)
+    resolved: List[str] = field(default_factory=list)      # Смёржены после ConflictResolver
+    failed: Dict[str, str] = field(default_factory=dict)   # branch -> причина
+    up_to_date: List[str] = field(default_factory=list)
+    head: Optional[str] = None                             # Итоговый sha цели
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+
+class MergeQueue:
+    """Очередь мержа веток в целевую ветку."""
+
+    def __init__(
+        self,
+        project_path: Path,
+        target_branch: Optional[str] = None,
+        resolver: Optional["ConflictResolver"] = None,
+        octopus: bool = True,
+        max_workers: int = 8,
+    ):
+        self.project_path = Path(project_path).resolve()
+        self.resolver = resolver
+        self.octopus = octopus
+        self.max_workers = max_workers
+        self.target_branch = target_branch or self._current_branch()
+        self._check_git_version()
+
+    # =========================================================================
+    # GIT
+    # =========================================================================
+
+    def _git(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ["git", *args],
+            cwd=self.project_path,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+
+    def _git_checked(self, *args: str) -> str:
+        result = self._git(*args)
+        if result.returncode != 0:
+            raise MergeQueueError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+        return result.stdout.strip()
+
+    def _check_git_version(self) -> None:
+        match = re.search(r"(\d+)\.(\d+)", self._git_checked("version"))
+        if not match or (int(match.group(1)), int(match.group(2))) < MIN_GIT_VERSION:
+            raise MergeQueueError(
+                f"git >= {'.'.join(map(str, MIN_GIT_VERSION))} is required for merge-tree --write-tree"
+            )
+
+    def _current_branch(self) -> str:
+        return self._git_checked("rev-parse", "--abbrev-ref", "HEAD")
+
+    def _rev(self, ref: str) -> str:
+        return self._git_checked("rev-parse", "--verify", f"{ref}^{{commit}}")
+
+    def _merge_tree(self, base: str, branch: str) -> Tuple[bool, Optional[str], List[str]]:
+        """In-memory merge: (clean, tree, conflicted_files)."""
+        result = self._git("merge-tree", "--write-tree", "--name-only", "--no-messages", base, branch)
+        if result.returncode not in (0, 1):
+            raise MergeQueueError(f"git merge-tree {base} {branch} failed: {result.stderr.strip()}")
+        lines = result.stdout.split("\n")
+        tree = lines[0].strip() or None
+        if result.returncode == 0:
+            return True, tree, []
+        files: List[str] = []
+        for line in lines[1:]:
+            if not line.strip():
+                break
+            if line not in files:
+                files.append(line)
+        return False, tree, files
+
+    def _commit_tree(self, tree: str, parents: Sequence[str], message: str) -> str:
+        args = ["commit-tree", tree]
+        for parent in parents:
+            args += ["-p", parent]
+        return self._git_checked(*args, "-m", message)
+
+    # =========================================================================
+    # PLAN
+    # =========================================================================
+
+    def predict(self, branch: str, base_sha: Optional[str] = None) -> BranchPrediction:
+        """Предсказать мерж одной ветки в base_sha (по умолчанию - в цель)."""
+        base_sha = base_sha or self._rev(self.target_branch)
+        head = self._rev(branch)
+        ahead = int(self._git_checked("rev-list", "--count", f"{base_sha}..{head}") or 0)
+        if ahead == 0:
+            return BranchPrediction(branch=branch, head=head, clean=True, commits_ahead=0)
+
+        clean, tree, conflicted = self._merge_tree(base_sha, head)
+        changed = {
+            line for line in self._git_checked("diff", "--name-only", f"{base_sha}...{head}").split("\n") if line
+        }
+        return BranchPrediction(
+            branch=branch,
+            head=head,
+            clean=clean,
+            tree=tree if clean else None,
+            conflicted_files=conflicted,
+            changed_files=changed,
+            commits_ahead=ahead,
+        )
+
+    def plan(self, branches: Sequence[str], order: Optional[Sequence[str]] = None) -> MergePlan:
+        """
+        Предсказать конфликты для всех веток и рассчитать порядок.
+
+        order - приоритет (например, топологический порядок задач);
+        при прочих равных ветки мержатся в этом порядке.
+        """
+        branches = list(dict.fromkeys(branches))
+        target_sha = self._rev(self.target_branch)
+        plan = MergePlan(target=self.target_branch, target_sha=target_sha)
+        if not branches:
+            return plan
+
+        def predict(branch: str) -> Optional[BranchPrediction]:
+            # Ветка, которую нельзя разрешить (удалена, опечатка), не валит весь план
+            try:
+                return self.predict(branch, target_sha)
+            except MergeQueueError as e:
+                plan.failed[branch] = str(e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(branches)))) as pool:
+            predictions = [p for p in pool.map(predict, branches) if p is not None]
+        plan.predictions = {p.branch: p for p in predictions}
+
+        priority = {b: i for i, b in enumerate(order or [])}
+        rank = {b: priority.get(b, len(priority) + i) for i, b in enumerate(branches)}
+
+        clean: List[BranchPrediction] = []
+        for p in predictions:
+            if p.commits_ahead == 0:
+                plan.up_to_date.append(p.branch)
+            elif p.clean:
+                clean.append(p)
+            else:
+                plan.conflicts.append(p.branch)
+
+        # Меньше пересечений с другими ветками - раньше в очереди
+        overlaps = {
+            p.branch: sum(1 for q in clean if q is not p and p.changed_files & q.changed_files)
+            for p in clean
+        }
+        clean.sort(key=lambda p: (overlaps[p.branch], rank[p.branch]))
+
+        touched: Set[str] = set()
+        for p in clean:
+            if p.changed_files & touched:
+                plan.sequential.append(p.branch)
+            else:
+                plan.batch.append(p.branch)
+                touched |= p.changed_files
+
+        plan.conflicts.sort(key=lambda b: (len(plan.predictions[b].conflicted_files), rank[b]))
+        return plan
+
+    # =========================================================================
+    # RUN
+    # =========================================================================
+
+    def _publish(self, old_sha: str, new_sha: str) -> None:
+        """Передвинуть цель на new_sha (ff-only, если цель сейчас в checkout)."""
+        if old_sha == new_sha:
+            return
+        if self._current_branch() == self.target_branch:
+            self._git_checked("merge", "--ff-only", "--quiet", new_sha)
+        else:
+            self._git_checked("update-ref", f"refs/heads/{self.target_branch}", new_sha, old_sha)
+
+    def _merge_in_memory(self, report: MergeQueueReport, plan: MergePlan) -> str:
+        """Batch + sequential без рабочего дерева. Возвращает новый sha цели."""
+        tip = plan.target_sha
+        batch_parents: List[str] = []
+        batch_tree: Optional[str] = None
+
+        for branch in plan.batch:
+            p = plan.predictions[branch]
+            clean, tree, _ = self._merge_tree(tip, p.head)
+            if not clean:
+                # Пересечение, не видимое по именам файлов (rename и т.п.)
+                plan.sequential.insert(0, branch)
+                continue
+            tip = self._commit_tree(tree, [tip, p.head], f"Merge branch '{branch}' into {self.target_branch}")
+            batch_parents.append(p.head)
+            batch_tree = tree
+            report.merged.append(branch)
+
+        if self.octopus and len(batch_parents) > 1:
+            names = ", ".join(f"'{b}'" for b in report.merged)
+            tip = self._commit_tree(
+                batch_tree, [plan.target_sha, *batch_parents], f"Merge branches {names} into {self.target_branch}"
+            )
+
+        for branch in plan.sequential:
+            p = plan.predictions[branch]
+            clean, tree, conflicted = self._merge_tree(tip, p.head)
+            if clean:
+                tip = self._commit_tree(tree, [tip, p.head], f"Merge branch '{branch}' into {self.target_branch}")
+                report.merged.append(branch)
+            else:
+                p.conflicted_files = conflicted
+                plan.conflicts.append(branch)
+
+        return tip
+
+    def _merge_with_resolver(self, branch: str) -> Tuple[bool, str]:
+        """Реальный мерж в рабочем дереве + ConflictResolver."""
+        result = self._git("merge", "--no-ff", "-m", f"Merge branch '{branch}' into {self.target_branch}", branch)
+        if result.returncode == 0:
+            return True, ""
+
+        files = [f for f in self._git_checked("diff", "--name-only", "--diff-filter=U").split("\n") if f]
+        results = self.resolver.resolve_all(auto_apply=True) if self.resolver else []
+        unresolved = [r.file_path for r in results if not r.success]
+        if files and results and not unresolved:
+            self._git_checked("add", "--", *files)
+            if not [f for f in self._git_checked("diff", "--name-only", "--diff-filter=U").split("\n") if f]:
+                self._git_checked("commit", "--no-edit")
+                return True, ""
+
+        self._git("merge", "--abort")
+        return False, f"conflicts: {', '.join(unresolved or files)}"
+
+    def run(self, branches: Sequence[str], order: Optional[Sequence[str]] = None) -> MergeQueueReport:
+        """Смержить ветки в цель по плану. Возвращает отчёт."""
+        plan = self.plan(branches, order)
+        report = MergeQueueReport(up_to_date=list(plan.up_to_date), failed=dict(plan.failed))
+
+        tip = self._merge_in_memory(report, plan)
+        self._publish(plan.target_sha, tip)
+        report.head = tip
+        if report.merged:
+            console.print(f"[green]Merged {len(report.merged)} branch(es) into {self.target_branch} without conflicts[/green]")
+
+        if not plan.conflicts:
+            return report
+
+        if self.resolver is None:
+            for branch in plan.conflicts:
+                files = plan.predictions[branch].conflicted_files
+                report.failed[branch] = f"conflicts: {', '.join(files)}"
+            return report
+
+        # Реальные конфликты - через рабочее дерево
+        dirty = self._git_checked("status", "--porcelain", "--untracked-files=no")
+        if dirty:
+            for branch in plan.conflicts:
+                report.failed[branch] = "working tree has local changes"
+            return report
+
+        original = self._current_branch()
+        if original != self.target_branch:
+            self._git_checked("checkout", "--quiet", self.target_branch)
+        try:
+            for branch in plan.conflicts:
+                console.print(f"[yellow]Resolving conflicts in {branch}...[/yellow]")
+                ok, reason = self._merge_with_resolver(branch)
+                if ok:
+                    report.resolved.append(branch)
+                else:
+                    report.failed[branch] = reason
+        finally:
+            report.head = self._rev(self.target_branch)
+            if original != self.target_branch:
+                self._git("checkout", "--quiet", original)
+
+        return report
@@ -0,0 +1,224 @@
+"""
+LLM Response Cache
+==================
+
+Content-addressed on-disk кэш ответов LLM для UnifiedLLMClient.
+
+Ключ - sha256 от (provider, model, base_url, messages, params), поэтому
+повторный запуск того же планирования/reasoning с теми же промптами
+отдаётся с диска без обращения к провайдеру.
+
+- TTL на запись
+- Ограничение по числу записей и размеру (вытеснение LRU по mtime)
+- Кэшируются только детерминированные вызовы (temperature == 0),
+  если явно не запрошено иное
+- Статистика hit/miss/bypass
+
+Использование:
+    cache = ResponseCache(ttl_seconds=24 * 3600, max_entries=1000)
+    client = UnifiedLLMClient(cache=cache)
+    ...
+    print(cache.get_stats())
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".claude-agent-manager" / "llm_cache"
+
+
+@dataclass
+class CacheStats:
+    """Статистика кэша."""
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    writes: int = 0
+    evictions: int = 0
+    expired: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = round(self.hit_rate, 4)
+        return data
+
+
+def is_deterministic(params: Dict[str, Any]) -> bool:
+    """Детерминированный ли вызов (greedy sampling)."""
+    temperature = params.get("temperature")
+    if temperature is None or temperature > 0:
+        return False
+    top_p = params.get("top_p")
+    return top_p is None or top_p >= 1.0
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    messages: List[Tuple[str, str]],
+    params: Dict[str, Any],
+    base_url: Optional[str] = None
+) -> str:
+    """
+    Content-addressed ключ запроса.
+
+    api_key намеренно не входит в ключ - ответ модели от него не зависит.
+    """
+    payload = {
+        "provider": provider,
+        "model": model,
+        "base_url": base_url,
+        "messages": [list(m) for m in messages],
+        "params": params,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk кэш ответов: один JSON файл на ключ.
+
+    Индекс (key -> mtime, size) строится одним scandir при первом
+    обращении и дальше поддерживается в памяти; при промахе по индексу
+    проверяется файл (записи других процессов).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        max_entries: int = 2000,
+        max_bytes: int = 200 * 1024 * 1024
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._index: Optional[Dict[str, Tuple[float, int]]] = None
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> Dict[str, Tuple[float, int]]:
+        if self._index is None:
+            self._index = {}
+            if self.cache_dir.exists():
+                with os.scandir(self.cache_dir) as it:
+                    for entry in it:
+                        if entry.name.endswith(".json") and entry.is_file():
+                            st = entry.stat()
+                            self._index[entry.name[:-5]] = (st.st_mtime, st.st_size)
+        return self._index
+
+    def _drop(self, key: str) -> None:
+        self._load_index().pop(key, None)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Получить ответ по ключу или None (miss / истёк TTL)."""
+        index = self._load_index()
+        if key not in index:
+            # Запись могла появиться от другого процесса после построения индекса
+            try:
+                st = self._path(key).stat()
+            except OSError:
+                self.stats.misses += 1
+                return None
+            index[key] = (st.st_mtime, st.st_size)
+
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            self._drop(key)
+            self.stats.misses += 1
+            return None
+
+        if self.ttl_seconds is not None and time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self._drop(key)
+            self.stats.expired += 1
+            self.stats.misses += 1
+            return None
+
+        # LRU: обновляем mtime при попадании
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        index[key] = (now, index[key][1])
+
+        self.stats.hits += 1
+        return entry.get("response")
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """Сохранить ответ (атомарно) и вытеснить старые записи при переполнении."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(
+            {"created_at": time.time(), "response": response},
+            ensure_ascii=False
+        )
+
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=str(self.cache_dir), delete=False, suffix=".tmp"
+        ) as f:
+            f.write(data)
+            tmp_name = f.name
+        path = self._path(key)
+        os.replace(tmp_name, path)
+
+        st = path.stat()
+        self._load_index()[key] = (st.st_mtime, st.st_size)
+        self.stats.writes += 1
+        self._evict()
+
+    def _evict(self) -> None:
+        index = self._load_index()
+        total = sum(size for _, size in index.values())
+        if len(index) <= self.max_entries and total <= self.max_bytes:
+            return
+
+        for key, (_, size) in sorted(index.items(), key=lambda kv: kv[1][0]):
+            if len(index) <= self.max_entries and total <= self.max_bytes:
+                break
+            total -= size
+            self._drop(key)
+            self.stats.evictions += 1
+
+    def record_bypass(self) -> None:
+        """Учесть вызов, прошедший мимо кэша (недетерминированный sampling)."""
+        self.stats.bypassed += 1
+
+    def clear(self) -> int:
+        """Удалить все записи. Возвращает количество удалённых."""
+        keys = list(self._load_index())
+        for key in keys:
+            self._drop(key)
+        return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Статистика кэша (hit rate, размер)."""
+        index = self._load_index()
+        data = self.stats.to_dict()
+        data["entries"] = len(index)
+        data["bytes"] = sum(size for _, size in index.values())
+        return data
@@ -14,7 +14,9 @@ from typing import Dict, List, Any, Optional, AsyncIterator
 from abc import ABC, abstractmethod
 import httpx
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+
+from .llm_cache import ResponseCache, make_cache_key, is_deterministic
 
 
 @dataclass
@@ -572,10 +574,14 @@ class UnifiedLLMClient:
             provider="local",
             base_url="http://localhost:11434"
         )
+        
+        # Opt-in кэш ответов (только temperature == 0, либо cache=True)
+        client = UnifiedLLMClient(cache=ResponseCache())
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ResponseCache] = None):
         self.providers: Dict[str, BaseLLMProvider] = {}
+        self.cache = cache
     
     def _get_provider(
         self,
@@ -608,12 +614,39 @@ class UnifiedLLMClient:
         provider: str = "anthropic",
         api_key: str = None,
         base_url: str = None,
+        cache: Optional[bool] = None,
         **kwargs
     ) -> LLMResponse:
-        """Get completion from any provider."""
+        """
+        Get completion from any provider.
+        
+        cache: None - кэшировать только детерминированные вызовы
+        (temperature == 0), True - кэшировать всегда, False - не кэшировать.
+        """
         
         llm = self._get_provider(provider, api_key, base_url)
-        return await llm.complete(messages, model, **kwargs)
+        
+        if self.cache is None or cache is False:
+            return await llm.complete(messages, model, **kwargs)
+        
+        if cache is None and not is_deterministic(kwargs):
+            self.cache.record_bypass()
+            return await llm.complete(messages, model, **kwargs)
+        
+        key = make_cache_key(
+            provider,
+            model,
+            [(m.role, m.content) for m in messages],
+            kwargs,
+            base_url=base_url
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            return LLMResponse(**cached)
+        
+        response = await llm.complete(messages, model, **kwargs)
+        self.cache.put(key, asdict(response))
+        return response
     
     async def stream(
         self,
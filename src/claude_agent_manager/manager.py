@@ -12,10 +12,15 @@ import os
 import random
 import shutil
 import sqlite3
-from dataclasses import dataclass
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List
+from typing import Iterable, Iterator, Optional, List
 
 from .config import AppConfig, load_config
 from .processes import (
@@ -28,18 +33,20 @@ from .processes import (
     spawn_cmd_window,
     which,
 )
-from .core import WorkspacePaths, atomic_write_json, create_workspace_paths, ensure_dir
+from .core import WorkspacePaths, atomic_write_json, create_workspace_paths, ensure_dir, write_latest_run
 from .core.locks import FileLock
 from .core.models import AgentSpec, RunSpec
-from .core.registry import Registry
+from .core.registry import PENDING_PORT_LEASE_SEC, Registry
 from .core.runner_env import RunnerEnv, build_run_sandbox_env
 from .registry import (
     AgentConfigOptions,
     AgentRecord,
     ProxyConfig,
+    forget_agent,
     iter_agents,
     load_agent,
     save_agent,
+    sync_agent_index,
     update_agent_autopilot,
 )
 from .agent_config import (
@@ -51,10 +58,16 @@ from .agent_config import (
     write_agent_local_claude_md,
     write_agent_local_mcp_json,
 )
-from .worker import pick_port, start_worker
+from .worker import is_port_free, start_worker
+from .run_gc import RunCollector
+from .worker_pool import PoolSlot, WorkerPool
 
 logger = logging.getLogger(__name__)
 
+# Serializes the global critical section between threads of this process;
+# the manager FileLock then only contends with other processes.
+_ALLOC_LOCK = threading.Lock()
+
 
 @dataclass
 class AgentStatus:
@@ -72,6 +85,19 @@ class AgentStatus:
     autopilot_enabled: bool = False  # Full autonomy mode
 
 
+@dataclass
+class StartResult:
+    """Result of starting one agent via start_agents()."""
+    agent_id: str
+    record: Optional[AgentRecord] = None
+    error: Optional[str] = None
+    timings_ms: dict[str, float] = field(default_factory=dict)  # phase -> ms
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 def get_agent_root(cfg: Optional[AppConfig] = None) -> Path:
     """Get the agents directory within the workspace, creating if needed."""
     return get_workspace_paths(cfg).agents_dir
@@ -188,6 +214,12 @@ def _record_pids(run_dir: Path, pids: dict[str, int]) -> None:
     atomic_write_json(run_dir / "pids.json", pids)
 
 
+# A positive check is trusted for this long, so back-to-back starts
+# don't each pay for a `pm2 describe`.
+_CLAUDE_MEM_CHECK_TTL_SEC = 60.0
+_claude_mem_ok_until = 0.0
+
+
 def ensure_claude_mem_worker() -> bool:
     """
     Ensure claude-mem worker is running for memory UI access.
@@ -198,10 +230,16 @@ def ensure_claude_mem_worker() -> bool:
     Returns:
         True if worker is running (or was started), False if failed
     """
+    global _claude_mem_ok_until
+
+    if time.monotonic() < _claude_mem_ok_until:
+        return True
+
     try:
         # Check if already running
         if pm2_exists("claude-mem-worker"):
             logger.debug("[CLAUDE-MEM] worker already running")
+            _claude_mem_ok_until = time.monotonic() + _CLAUDE_MEM_CHECK_TTL_SEC
             return True
 
         # Find the worker script
@@ -231,6 +269,7 @@ def ensure_claude_mem_worker() -> bool:
 
         if result.returncode == 0:
             logger.info(f"[CLAUDE-MEM] worker started | script={worker_script}")
+            _claude_mem_ok_until = time.monotonic() + _CLAUDE_MEM_CHECK_TTL_SEC
             return True
         else:
             logger.error(f"[CLAUDE-MEM] failed to start worker | error={result.stderr}")
@@ -284,17 +323,75 @@ def create_agent(
     paths = get_workspace_paths(cfg)
     registry = _registry(cfg)
 
+    # Warm pool: take a pre-started worker (its agent id, port and data dir)
+    slot = None
+    if agent_id is None and port is None and cfg.worker_pool_size > 0:
+        pool = WorkerPool(cfg, paths=paths, registry=registry)
+        slot = pool.claim()
+        pool.fill_async()
+
+    claimed_port: Optional[str] = None
+    if slot is None and port is None:
+        # Ports of agents created by other tools must be in the index before claiming
+        sync_agent_index(paths.agents_dir)
+        claimed_port = f"pending:{uuid.uuid4().hex}:port"
+        port = registry.claim_port(
+            claimed_port,
+            cfg.port_min,
+            cfg.port_max,
+            allocated_at_iso=datetime.now(timezone.utc).isoformat(),
+            lease_sec=PENDING_PORT_LEASE_SEC,
+            verify=is_port_free,
+        )
+
+    try:
+        agent_id = _create_agent_locked(
+            purpose, project_path, agent_id, port, use_browser, proxy, config, cfg, paths, registry, slot, claimed_port
+        )
+    except Exception:
+        if slot is not None:
+            # Claimed slot was not turned into an agent - don't leak its worker/port
+            pm2_delete(slot.pm2_name)
+            try:
+                registry.release_port(f"agent:{slot.agent_id}:port")
+            except Exception:
+                pass
+        if claimed_port is not None:
+            try:
+                registry.release_port(claimed_port)
+            except Exception:
+                pass
+        raise
+
+    # Start initial run outside the manager lock to avoid holding it during process startup
+    return start_agent(agent_id, cfg=cfg, skip_cmd=False)
+
+
+def _create_agent_locked(
+    purpose: str,
+    project_path: str,
+    agent_id: Optional[str],
+    port: Optional[int],
+    use_browser: bool,
+    proxy: Optional[ProxyConfig],
+    config: Optional[AgentConfigOptions],
+    cfg: AppConfig,
+    paths: WorkspacePaths,
+    registry: Registry,
+    slot: Optional[PoolSlot],
+    claimed_port: Optional[str] = None,
+) -> str:
+    """
+    Create the agent record under the manager lock. Returns the agent id.
+
+    claimed_port - имя строки resources_ports, уже захваченной claim_port()
+    под временным именем; переименовывается в agent:<id>:port.
+    """
     with FileLock(paths.manager_app_lock, stale_ttl_sec=30, timeout_sec=0.5):
         agent_root = paths.agents_dir
-        used_ports = {a.port for a in iter_agents(agent_root)}
-        try:
-            used_ports |= registry.get_allocated_ports()
-        except Exception:
-            # Fallback if registry fetch fails
-            pass
 
-        if port is None:
-            port = pick_port(cfg, used_ports)
+        if slot is not None:
+            agent_id, port = slot.agent_id, slot.port
 
         if agent_id is None:
             agent_id = f"{random.randint(1000, 9999)}-{port}"
@@ -303,7 +400,7 @@ def create_agent(
         ensure_dir(agent_dir)
 
         pm2_name = f"agent-{agent_id}"
-        if pm2_exists(pm2_name):
+        if slot is None and pm2_exists(pm2_name):
             raise RuntimeError(f"Agent already exists in pm2: {pm2_name}")
 
         project = Path(project_path).resolve()
@@ -321,15 +418,25 @@ def create_agent(
         logger.info(f"[AGENT] create_agent | id={agent_id} port={port} purpose={purpose} proxy={proxy.enabled}")
 
         with FileLock(paths.agent_lock_path(agent_id), stale_ttl_sec=60, timeout_sec=2):
-            try:
-                registry.allocate_port(
-                    name=f"agent:{agent_id}:port",
-                    port=port,
-                    run_id=None,
-                    allocated_at_iso=datetime.now(timezone.utc).isoformat(),
-                )
-            except sqlite3.IntegrityError as exc:
-                raise RuntimeError(f"Port {port} already allocated") from exc
+            # A pool slot's port row was already renamed to this agent by claim()
+            if claimed_port is not None:
+                try:
+                    registry.rename_port(claimed_port, f"agent:{agent_id}:port")
+                except sqlite3.IntegrityError as exc:
+                    raise RuntimeError(f"Port row for agent {agent_id} already exists") from exc
+            elif slot is None:
+                # Порт остановленного агента не в resources_ports, но закреплён за его записью
+                if port in registry.get_agent_ports():
+                    raise RuntimeError(f"Port {port} already allocated")
+                try:
+                    registry.allocate_port(
+                        name=f"agent:{agent_id}:port",
+                        port=port,
+                        run_id=None,
+                        allocated_at_iso=datetime.now(timezone.utc).isoformat(),
+                    )
+                except sqlite3.IntegrityError as exc:
+                    raise RuntimeError(f"Port {port} already allocated") from exc
 
             registry.upsert_agent(AgentSpec(agent_id=agent_id, name=purpose, role="agent"))
 
@@ -363,8 +470,159 @@ def create_agent(
             save_agent(agent_root, rec)
 
         logger.info(f"[AGENT] created | id={agent_id} port={port}")
-    # Start initial run outside the manager lock to avoid holding it during process startup
-    return start_agent(agent_id, cfg=cfg, skip_cmd=False)
+    return agent_id
+
+
+@contextmanager
+def _timed(timings: dict[str, float], phase: str) -> Iterator[None]:
+    """Record wall time of a start phase in milliseconds."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def _allocate_run(paths: WorkspacePaths, registry: Registry, agent: AgentRecord) -> str:
+    """
+    Global critical section of a start: reserve a unique run id in the registry.
+
+    Only this step runs under the manager lock, so it stays in the
+    millisecond range even when many agents start at once.
+    """
+    with _ALLOC_LOCK, FileLock(paths.manager_app_lock, stale_ttl_sec=30, timeout_sec=5):
+        for _ in range(10):
+            run_id = _new_run_id()
+            try:
+                registry.create_run(RunSpec(
+                    run_id=run_id,
+                    agent_id=agent.id,
+                    status="starting",
+                    run_dir=paths.run_dir(agent.id, run_id),
+                    worktree_dir=Path(agent.project_path),
+                ))
+                return run_id
+            except sqlite3.IntegrityError:
+                continue  # run id collision within the same second
+    raise RuntimeError(f"Unable to allocate run id for agent {agent.id}")
+
+
+def _start_agent_run(
+    agent_id: str,
+    cfg: AppConfig,
+    paths: WorkspacePaths,
+    registry: Registry,
+    skip_cmd: bool,
+    force_viewer: Optional[bool],
+    timings: dict[str, float],
+) -> AgentRecord:
+    """Start one agent: allocate run under the global lock, launch under per-agent locks."""
+    agent_root = paths.agents_dir
+    agent = load_agent(agent_root, agent_id)
+    agent_dir = paths.agent_dir(agent_id)
+
+    with _timed(timings, "allocate"):
+        run_id = _allocate_run(paths, registry, agent)
+
+    run_dir = paths.run_dir(agent_id, run_id)
+    new_pids: dict[str, int] = {}
+
+    try:
+        with ExitStack() as locks:
+            with _timed(timings, "lock_wait"):
+                locks.enter_context(FileLock(paths.agent_lock_path(agent_id), stale_ttl_sec=60, timeout_sec=2))
+                locks.enter_context(FileLock(paths.run_lock_path(agent_id, run_id), stale_ttl_sec=60, timeout_sec=2))
+
+            with _timed(timings, "prepare"):
+                run_state_dir = paths.run_state_dir(agent_id, run_id)
+                ensure_dir(run_dir)
+                ensure_dir(run_state_dir)
+                ensure_dir(paths.run_logs_dir(agent_id, run_id))
+                ensure_dir(paths.run_artifacts_dir(agent_id, run_id))
+                ensure_dir(paths.run_worktree_dir(agent_id, run_id))
+                write_latest_run(paths.agent_runs_dir(agent_id), run_id)
+
+                runner_env = build_run_sandbox_env(run_dir)
+                atomic_write_json(
+                    run_state_dir / "heartbeat.json",
+                    {"agent_id": agent_id, "run_id": run_id, "ts": datetime.now(timezone.utc).isoformat()},
+                )
+
+                project_path = Path(agent.project_path)
+                synced = sync_agent_config_to_project(agent_dir, project_path)
+                if synced:
+                    logger.info(f"[AGENT] start_agent | synced config files: {list(synced.keys())}")
+
+            with _timed(timings, "worker"):
+                if not pm2_exists(agent.pm2_name):
+                    start_worker(cfg, pm2_name=agent.pm2_name, port=agent.port, data_dir=agent_dir, base_env=runner_env.env)
+
+            with _timed(timings, "viewer"):
+                viewer_pid = agent.viewer_pid
+                open_viewer = agent.use_browser if force_viewer is None else force_viewer
+                if open_viewer and not is_pid_running(viewer_pid):
+                    url = f"http://localhost:{agent.port}"
+                    viewer_pid = spawn_browser(
+                        url,
+                        cfg.browser,
+                        agent_id=agent.id,
+                        headless=True,
+                        profiles_root=paths.agent_dir(agent_id) / "browser-profiles",
+                    )
+                    if viewer_pid:
+                        new_pids["viewer"] = viewer_pid
+
+            with _timed(timings, "cmd"):
+                cmd_pid = agent.cmd_pid
+                if not skip_cmd and not is_pid_running(cmd_pid):
+                    title = f"{agent.purpose} | :{agent.port}"
+                    run_cmd = _write_run_cmd(
+                        agent_dir,
+                        title=title,
+                        port=agent.port,
+                        data_dir=agent_dir,
+                        project_path=project_path,
+                        proxy=agent.proxy,
+                        config=agent.config,
+                        runner_env=runner_env,
+                        workdir=project_path,
+                        autopilot=agent.autopilot_enabled,
+                    )
+                    cmd_pid = spawn_cmd_window(run_cmd, workdir=str(project_path), env=runner_env.env)
+                    if cmd_pid:
+                        new_pids["cmd"] = cmd_pid
+
+            with _timed(timings, "finalize"):
+                updated = agent.model_copy()
+                updated.cmd_pid = cmd_pid
+                updated.viewer_pid = viewer_pid
+                updated.active_run_id = run_id
+                save_agent(agent_root, updated)
+
+                _record_pids(run_dir, {"cmd": cmd_pid or 0, "viewer": viewer_pid or 0})
+                # Порт агента принадлежит run'у: освобождается при stop или
+                # когда RunCollector помечает упавший run как failed
+                if agent.port:
+                    try:
+                        registry.bind_port(
+                            f"agent:{agent_id}:port", agent.port, run_id, datetime.now(timezone.utc).isoformat()
+                        )
+                    except sqlite3.IntegrityError:
+                        logger.warning(f"[AGENT] start_agent | port {agent.port} is held by another row | id={agent_id}")
+                # Pids and status land in one commit
+                with registry.batch():
+                    registry.attach_pids(run_id, new_pids)
+                    registry.set_run_status(run_id, "running")
+    except Exception:
+        try:
+            with registry.batch():
+                registry.attach_pids(run_id, new_pids)
+                registry.set_run_status(run_id, "failed")
+        except Exception:
+            pass
+        raise
+
+    return updated
 
 
 def start_agent(agent_id: str, cfg: Optional[AppConfig] = None, skip_cmd: bool = False, force_viewer: Optional[bool] = None) -> AgentRecord:
@@ -384,96 +642,75 @@ def start_agent(agent_id: str, cfg: Optional[AppConfig] = None, skip_cmd: bool =
 
     paths = get_workspace_paths(cfg)
     registry = _registry(cfg)
-    agent_root = paths.agents_dir
-    agent = load_agent(agent_root, agent_id)
-    agent_dir = paths.agent_dir(agent_id)
 
     logger.info(f"[AGENT] start_agent | id={agent_id} skip_cmd={skip_cmd}")
 
     ensure_claude_mem_worker()
 
-    with FileLock(paths.manager_app_lock, stale_ttl_sec=30, timeout_sec=0.5):
-        run_id = _new_run_id()
-        run_dir = paths.run_dir(agent_id, run_id)
-        run_state_dir = paths.run_state_dir(agent_id, run_id)
-        run_logs_dir = paths.run_logs_dir(agent_id, run_id)
-        run_artifacts_dir = paths.run_artifacts_dir(agent_id, run_id)
-        run_worktree_dir = paths.run_worktree_dir(agent_id, run_id)
-        ensure_dir(run_dir)
-        ensure_dir(run_state_dir)
-        ensure_dir(run_logs_dir)
-        ensure_dir(run_artifacts_dir)
-        ensure_dir(run_worktree_dir)
-
-        runner_env = build_run_sandbox_env(run_dir)
-        heartbeat_path = run_state_dir / "heartbeat.json"
-        atomic_write_json(
-            heartbeat_path,
-            {"agent_id": agent_id, "run_id": run_id, "ts": datetime.now(timezone.utc).isoformat()},
-        )
+    timings: dict[str, float] = {}
+    updated = _start_agent_run(agent_id, cfg, paths, registry, skip_cmd, force_viewer, timings)
+    logger.debug(f"[AGENT] start_agent | id={agent_id} timings_ms={timings}")
+    RunCollector(cfg, paths=paths, registry=registry).collect_async()
+    return updated
 
-        run_spec = RunSpec(
-            run_id=run_id,
-            agent_id=agent_id,
-            status="starting",
-            run_dir=run_dir,
-            worktree_dir=Path(agent.project_path),
-        )
-        registry.create_run(run_spec)
 
-        with FileLock(paths.agent_lock_path(agent_id), stale_ttl_sec=60, timeout_sec=2), FileLock(
-            paths.run_lock_path(agent_id, run_id), stale_ttl_sec=60, timeout_sec=2
-        ):
-            project_path = Path(agent.project_path)
-            synced = sync_agent_config_to_project(agent_dir, project_path)
-            if synced:
-                logger.info(f"[AGENT] start_agent | synced config files: {list(synced.keys())}")
-
-            if not pm2_exists(agent.pm2_name):
-                start_worker(cfg, pm2_name=agent.pm2_name, port=agent.port, data_dir=agent_dir, base_env=runner_env.env)
-
-            viewer_pid = agent.viewer_pid
-            open_viewer = agent.use_browser if force_viewer is None else force_viewer
-            if open_viewer and not is_pid_running(viewer_pid):
-                url = f"http://localhost:{agent.port}"
-                viewer_pid = spawn_browser(
-                    url,
-                    cfg.browser,
-                    agent_id=agent.id,
-                    headless=True,
-                    profiles_root=paths.agent_dir(agent_id) / "browser-profiles",
-                )
-                if viewer_pid:
-                    registry.attach_pid(run_id, "viewer", viewer_pid)
-
-            cmd_pid = agent.cmd_pid
-            if not skip_cmd and not is_pid_running(cmd_pid):
-                title = f"{agent.purpose} | :{agent.port}"
-                run_cmd = _write_run_cmd(
-                    agent_dir,
-                    title=title,
-                    port=agent.port,
-                    data_dir=agent_dir,
-                    project_path=project_path,
-                    proxy=agent.proxy,
-                    config=agent.config,
-                    runner_env=runner_env,
-                    workdir=project_path,
-                    autopilot=agent.autopilot_enabled,
-                )
-                cmd_pid = spawn_cmd_window(run_cmd, workdir=str(project_path), env=runner_env.env)
-                registry.attach_pid(run_id, "cmd", cmd_pid)
+def start_agents(
+    agent_ids: Iterable[str],
+    cfg: Optional[AppConfig] = None,
+    skip_cmd: bool = False,
+    force_viewer: Optional[bool] = None,
+    max_concurrency: int = 4,
+) -> List[StartResult]:
+    """
+    Start many agents concurrently.
 
-        updated = agent.model_copy()
-        updated.cmd_pid = cmd_pid
-        updated.viewer_pid = viewer_pid
-        updated.active_run_id = run_id
-        save_agent(agent_root, updated)
+    The global section (run id allocation in the registry) is serialized and
+    short; process launches run in parallel under per-agent locks only.
+    A failure of one agent does not stop the others.
 
-        _record_pids(run_dir, {"cmd": cmd_pid or 0, "viewer": viewer_pid or 0})
-        registry.set_run_status(run_id, "running")
+    Args:
+        agent_ids: Agents to start
+        cfg: Optional config
+        skip_cmd: If True, don't spawn cmd windows
+        force_viewer: Override use_browser for all agents
+        max_concurrency: Max agents launching at the same time
 
-    return updated
+    Returns:
+        StartResult per agent (same order as agent_ids) with per-phase timings
+    """
+    if cfg is None:
+        cfg = load_config()
+
+    ids = [*dict.fromkeys(agent_ids)]
+    if not ids:
+        return []
+
+    paths = get_workspace_paths(cfg)
+    registry = _registry(cfg)
+
+    logger.info(f"[AGENT] start_agents | count={len(ids)} concurrency={max_concurrency}")
+
+    # Shared claude-mem worker is checked once for the whole batch
+    ensure_claude_mem_worker()
+
+    def start_one(agent_id: str) -> StartResult:
+        result = StartResult(agent_id=agent_id)
+        started = time.perf_counter()
+        try:
+            result.record = _start_agent_run(
+                agent_id, cfg, paths, registry, skip_cmd, force_viewer, result.timings_ms
+            )
+        except Exception as e:
+            result.error = str(e)
+            logger.error(f"[AGENT] start_agents failed for {agent_id}: {e}")
+        result.timings_ms["total"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(ids)))) as pool:
+        results = [r for r in pool.map(start_one, ids)]
+
+    RunCollector(cfg, paths=paths, registry=registry).collect_async()
+    return results
 
 
 def stop_agent(agent_id: str, purge: bool = False, cfg: Optional[AppConfig] = None) -> None:
@@ -495,7 +732,8 @@ def stop_agent(agent_id: str, purge: bool = False, cfg: Optional[AppConfig] = No
 
     logger.info(f"[AGENT] stop_agent | id={agent_id} purge={purge}")
 
-    with FileLock(paths.manager_app_lock, stale_ttl_sec=30, timeout_sec=0.5):
+    # Shared: concurrent stops don't serialize, but still exclude create/allocate
+    with FileLock(paths.manager_app_lock, shared=True, stale_ttl_sec=30, timeout_sec=0.5):
         with FileLock(paths.agent_lock_path(agent_id), stale_ttl_sec=60, timeout_sec=2):
             pm2_delete(agent.pm2_name)
 
@@ -507,6 +745,7 @@ def stop_agent(agent_id: str, purge: bool = False, cfg: Optional[AppConfig] = No
 
             if agent.active_run_id:
                 registry.set_run_status(agent.active_run_id, "stopped")
+                registry.release_ports_for_runs([agent.active_run_id])
 
             updated = agent.model_copy()
             updated.active_run_id = None
@@ -514,6 +753,7 @@ def stop_agent(agent_id: str, purge: bool = False, cfg: Optional[AppConfig] = No
 
             if purge:
                 shutil.rmtree(agent_root / agent_id, ignore_errors=True)
+                forget_agent(agent_root, agent_id)
                 try:
                     registry.release_port(f"agent:{agent_id}:port")
                 except Exception:
@@ -484,6 +484,7 @@ class ClaudeMemBridge:
         include_claude_mem: bool = True,
         include_graph_memory: bool = True,
         limit: int = 10,
+        token_budget: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Get unified context from both claude-mem and GraphMemory.
@@ -493,6 +494,8 @@ class ClaudeMemBridge:
             include_claude_mem: Search in claude-mem
             include_graph_memory: Search in GraphMemory
             limit: Maximum results per source
+            token_budget: If set, rank results from both sources together,
+                drop duplicates and keep only what fits into the budget
 
         Returns:
             Dict with results from both sources
@@ -564,8 +567,36 @@ class ClaudeMemBridge:
                 finally:
                     conn.close()
 
+        if token_budget is not None:
+            context = self._pack_unified_context(context, query, token_budget)
+
         return context
 
+    def _pack_unified_context(
+        self,
+        context: Dict[str, Any],
+        query: str,
+        token_budget: int,
+    ) -> Dict[str, Any]:
+        """Keep the most relevant, non-duplicate results that fit the token budget."""
+        from ..context.packer import ContextPacker
+
+        packer = ContextPacker(token_budget=token_budget)
+        for item in context["graph_memory"]:
+            packer.add("graph_memory", item["type"], item["content"], item.get("importance", 0.5), payload=item)
+        for item in context["claude_mem"]:
+            text = "\n".join(filter(None, [item.get("title"), item.get("subtitle"), item.get("narrative")]))
+            packer.add("claude_mem", item.get("type") or "observation", text, 0.5, payload=item)
+
+        packed = packer.pack(query, truncate=False)
+        kept = {id(s.payload) for s in packed.snippets}
+        return {
+            **context,
+            "graph_memory": [i for i in context["graph_memory"] if id(i) in kept],
+            "claude_mem": [i for i in context["claude_mem"] if id(i) in kept],
+            "tokens_used": packed.tokens_used,
+        }
+
     def get_stats(self) -> Dict[str, Any]:
         """Get bridge statistics."""
         stats = {
@@ -8,11 +8,19 @@ Handles session memory storage for agents using dual-layer approach:
 
 This is used to persist learnings between agent sessions.
 
+File storage is a single append-only JSONL log (session_insights/sessions.jsonl).
+It is loaded once and then read incrementally from the last offset, so the
+aggregated views (recommendations, patterns, gotchas, files) cost one stat()
+per call instead of globbing and parsing every session file. Legacy
+session_NNN.json files are imported on first load.
+
 Integrated from Auto-Claude memory_manager.
 """
 
 import json
 import logging
+import os
+import threading
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from pathlib import Path
@@ -86,6 +94,7 @@ class SessionMemory:
     """
 
     MEMORY_DIR_NAME = "session_insights"
+    LOG_FILE_NAME = "sessions.jsonl"
 
     def __init__(
         self,
@@ -106,6 +115,13 @@ class SessionMemory:
         self.use_graph_memory = use_graph_memory
         self._graph_memory = None
 
+        # In-memory index of the JSONL log: session_number -> insights,
+        # ordered oldest -> newest (re-saved sessions move to the end)
+        self._sessions: Dict[int, SessionInsights] = {}
+        self._log_offset = 0
+        self._log_inode: Optional[int] = None
+        self._index_lock = threading.Lock()
+
         # Ensure memory directory exists
         self.memory_dir.mkdir(parents=True, exist_ok=True)
 
@@ -114,6 +130,11 @@ class SessionMemory:
         """Path to memory directory."""
         return self.base_dir / self.MEMORY_DIR_NAME
 
+    @property
+    def log_path(self) -> Path:
+        """Path to the append-only session log."""
+        return self.memory_dir / self.LOG_FILE_NAME
+
     def save_session(self, insights: SessionInsights) -> Tuple[bool, str]:
         """
         Save session insights.
@@ -147,14 +168,90 @@ class SessionMemory:
             return False, "none"
 
     def _save_to_file(self, insights: SessionInsights) -> None:
-        """Save insights to file."""
-        filename = f"session_{insights.session_number:03d}.json"
-        filepath = self.memory_dir / filename
+        """Append insights to the session log."""
+        # Pick up legacy files / other writers before appending
+        self._load_index()
+
+        line = json.dumps(insights.to_dict(), ensure_ascii=False) + "\n"
+        with self._index_lock:
+            # Single write() on an O_APPEND descriptor - lines from
+            # concurrent writers do not interleave
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+
+        logger.info(f"Saved session {insights.session_number} insights to {self.log_path}")
+
+    def _load_index(self) -> List[SessionInsights]:
+        """
+        Bring the in-memory index up to date with the log.
 
-        with open(filepath, "w") as f:
-            json.dump(insights.to_dict(), f, indent=2)
+        Only bytes appended since the previous call are parsed; if the log
+        was replaced or truncated it is re-read from the start.
+
+        Returns:
+            All sessions, most recent first
+        """
+        with self._index_lock:
+            try:
+                st = os.stat(self.log_path)
+            except FileNotFoundError:
+                if self._import_legacy_files():
+                    st = os.stat(self.log_path)
+                else:
+                    self._sessions.clear()
+                    self._log_offset = 0
+                    self._log_inode = None
+                    return []
+
+            if st.st_ino != self._log_inode or st.st_size < self._log_offset:
+                self._sessions.clear()
+                self._log_offset = 0
+                self._log_inode = st.st_ino
+
+            if st.st_size > self._log_offset:
+                with open(self.log_path, "rb") as f:
+                    f.seek(self._log_offset)
+                    chunk = f.read(st.st_size - self._log_offset)
+                # A partially written last line is picked up next time
+                end = chunk.rfind(b"\n") + 1
+                for raw in chunk[:end].splitlines():
+                    if not raw.strip():
+                        continue
+                    try:
+                        insights = SessionInsights.from_dict(json.loads(raw))
+                    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                        logger.warning(f"Skipping corrupt entry in {self.log_path}: {e}")
+                        continue
+                    self._sessions.pop(insights.session_number, None)
+                    self._sessions[insights.session_number] = insights
+                self._log_offset += end
+
+            return list(reversed(self._sessions.values()))
+
+    def _import_legacy_files(self) -> bool:
+        """Convert session_NNN.json files into the JSONL log (oldest first)."""
+        legacy_files = sorted(
+            self.memory_dir.glob("session_*.json"),
+            key=lambda p: p.stat().st_mtime,
+        )
+        lines = []
+        for filepath in legacy_files:
+            try:
+                with open(filepath) as f:
+                    lines.append(json.dumps(json.load(f), ensure_ascii=False) + "\n")
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Failed to load {filepath}: {e}")
+        if not lines:
+            return False
 
-        logger.info(f"Saved session {insights.session_number} insights to {filepath}")
+        tmp_path = self.log_path.with_suffix(".jsonl.tmp")
+        tmp_path.write_text("".join(lines), encoding="utf-8")
+        os.replace(tmp_path, self.log_path)
+        logger.info(f"Imported {len(lines)} legacy session files into {self.log_path}")
+        return True
 
     def _save_to_graph(self, insights: SessionInsights) -> bool:
         """Save insights to graph memory."""
@@ -235,24 +332,7 @@ class SessionMemory:
         Returns:
             List of SessionInsights, most recent first
         """
-        insights = []
-
-        # Load from files
-        session_files = sorted(
-            self.memory_dir.glob("session_*.json"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True,
-        )
-
-        for filepath in session_files[:limit]:
-            try:
-                with open(filepath) as f:
-                    data = json.load(f)
-                insights.append(SessionInsights.from_dict(data))
-            except (OSError, json.JSONDecodeError) as e:
-                logger.warning(f"Failed to load {filepath}: {e}")
-
-        return insights
+        return self._load_index()[:limit]
 
     def get_recommendations(self) -> List[str]:
         """
@@ -324,16 +404,31 @@ class SessionMemory:
 
         return files
 
-    def get_context_for_subtask(self, subtask_description: str) -> str:
+    def get_context_for_subtask(
+        self,
+        subtask_description: str,
+        token_budget: Optional[int] = None,
+    ) -> str:
         """
         Get relevant context for a subtask.
 
         Args:
             subtask_description: Description of the subtask
+            token_budget: If set, rank insights by relevance to the subtask
+                and pack them into this many tokens instead of taking the
+                first five of each kind
 
         Returns:
             Formatted context string
         """
+        if token_budget is not None:
+            from ..context.packer import ContextPacker
+
+            packer = ContextPacker(token_budget=token_budget)
+            packer.add_session_memory(self)
+            packed = packer.render(subtask_description)
+            return f"## Session Memory Context\n\n{packed}\n" if packed else ""
+
         sections = ["## Session Memory Context\n"]
 
         # Get recommendations
@@ -367,14 +462,11 @@ class SessionMemory:
 
     def get_total_sessions(self) -> int:
         """Get total number of saved sessions."""
-        return len(list(self.memory_dir.glob("session_*.json")))
+        return len(self._load_index())
 
     def get_total_subtasks_completed(self) -> int:
         """Get total subtasks completed across all sessions."""
-        total = 0
-        for insight in self.get_recent_insights(limit=100):
-            total += len(insight.subtasks_completed)
-        return total
+        return sum(len(insight.subtasks_completed) for insight in self._load_index())
 
     def close(self) -> None:
         """Close memory connections and release resources."""
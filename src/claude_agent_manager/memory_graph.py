@@ -5,11 +5,18 @@ Memory Graph - Координация между агентами через г
 - MCP memory server для персистентной памяти
 - Graph структуру для связей между агентами
 - Shared context для real-time обмена
+
+Хранение:
+- memory_graph.json - снимок графа (с номером последней операции seq)
+- memory_graph.journal.jsonl - журнал изменений после снимка (только дозапись);
+  при compact() журнал сворачивается в новый снимок
 """
 
 import json
 import asyncio
-from typing import Dict, List, Any, Optional
+import os
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from pathlib import Path
@@ -83,15 +90,37 @@ class MemoryGraph:
     - Персистентность через MCP
     """
     
-    def __init__(self, project_path: str):
+    GRAPH_FILE = "memory_graph.json"
+    JOURNAL_FILE = "memory_graph.journal.jsonl"
+    
+    def __init__(self, project_path: str, compact_every: int = 500):
         self.project_path = Path(project_path)
         self.nodes: Dict[str, GraphNode] = {}
         self.edges: List[GraphEdge] = []
         self.mcp_available = False
         
+        # Индексы: узлы по типу, связи по узлу и типу (в обе стороны)
+        self._nodes_by_type: Dict[NodeType, Dict[str, GraphNode]] = defaultdict(dict)
+        self._edges_by_type: Dict[EdgeType, List[GraphEdge]] = defaultdict(list)
+        self._out: Dict[str, List[GraphEdge]] = defaultdict(list)
+        self._in: Dict[str, List[GraphEdge]] = defaultdict(list)
+        self._out_by_type: Dict[Tuple[str, EdgeType], List[GraphEdge]] = defaultdict(list)
+        self._in_by_type: Dict[Tuple[str, EdgeType], List[GraphEdge]] = defaultdict(list)
+        
+        # Агенты в статусе pending без активных блокеров
+        self._ready: Set[str] = set()
+        self._order: Dict[str, int] = {}
+        
+        # Журнал изменений
+        self.compact_every = compact_every
+        self._seq = 0
+        self._journal_entries = 0
+        
         # Папка для хранения графа
         self.graph_dir = self.project_path / ".claude-team" / "graph"
         self.graph_dir.mkdir(parents=True, exist_ok=True)
+        self.graph_file = self.graph_dir / self.GRAPH_FILE
+        self.journal_file = self.graph_dir / self.JOURNAL_FILE
         
         # Загрузить существующий граф
         self.load()
@@ -113,8 +142,8 @@ class MemoryGraph:
             data=data
         )
         
-        self.nodes[node_id] = node
-        await self.save()
+        self._put_node(node)
+        self._append({"op": "node", "node": node.to_dict()})
         
         # Сохранить в MCP memory если доступно
         if self.mcp_available:
@@ -134,8 +163,14 @@ class MemoryGraph:
         node = self.nodes[node_id]
         node.data.update(updates)
         node.updated_at = datetime.now()
+        self._node_changed(node)
         
-        await self.save()
+        self._append({
+            "op": "update",
+            "id": node_id,
+            "data": updates,
+            "updated_at": node.updated_at.isoformat()
+        })
         
         if self.mcp_available:
             await self._save_to_mcp(node_id, node.to_dict())
@@ -148,7 +183,24 @@ class MemoryGraph:
     
     def get_nodes_by_type(self, node_type: NodeType) -> List[GraphNode]:
         """Получить все узлы определенного типа."""
-        return [n for n in self.nodes.values() if n.type == node_type]
+        return list(self._nodes_by_type[node_type].values())
+    
+    def _put_node(self, node: GraphNode):
+        """Добавить/заменить узел и обновить индексы."""
+        old = self.nodes.get(node.id)
+        if old is not None:
+            self._nodes_by_type[old.type].pop(node.id, None)
+        
+        self.nodes[node.id] = node
+        self._nodes_by_type[node.type][node.id] = node
+        self._order.setdefault(node.id, len(self._order))
+        self._node_changed(node)
+    
+    def _node_changed(self, node: GraphNode):
+        """Пересчитать готовность агентов, затронутых изменением узла."""
+        self._refresh_ready(node.id)
+        for edge in self._out_by_type.get((node.id, EdgeType.BLOCKS), ()):
+            self._refresh_ready(edge.to_node)
     
     # ========================================================================
     # СВЯЗИ (Edges)
@@ -171,30 +223,42 @@ class MemoryGraph:
             metadata=metadata or {}
         )
         
-        self.edges.append(edge)
-        await self.save()
+        self._put_edge(edge)
+        self._append({"op": "edge", "edge": edge.to_dict()})
         
         return edge
     
+    def _put_edge(self, edge: GraphEdge):
+        """Добавить связь и обновить индексы."""
+        self.edges.append(edge)
+        self._edges_by_type[edge.type].append(edge)
+        self._out[edge.from_node].append(edge)
+        self._in[edge.to_node].append(edge)
+        self._out_by_type[(edge.from_node, edge.type)].append(edge)
+        self._in_by_type[(edge.to_node, edge.type)].append(edge)
+        
+        if edge.type == EdgeType.BLOCKS:
+            self._refresh_ready(edge.to_node)
+    
     def get_edges(
         self,
         from_node: Optional[str] = None,
         to_node: Optional[str] = None,
         edge_type: Optional[EdgeType] = None
     ) -> List[GraphEdge]:
-        """Получить связи с фильтрацией."""
-        edges = self.edges
-        
+        """Получить связи с фильтрацией (через индексы, без полного перебора)."""
         if from_node:
-            edges = [e for e in edges if e.from_node == from_node]
-        
-        if to_node:
-            edges = [e for e in edges if e.to_node == to_node]
-        
-        if edge_type:
-            edges = [e for e in edges if e.type == edge_type]
-        
-        return edges
+            edges = self._out_by_type.get((from_node, edge_type), []) if edge_type else self._out.get(from_node, [])
+            if to_node:
+                edges = [e for e in edges if e.to_node == to_node]
+        elif to_node:
+            edges = self._in_by_type.get((to_node, edge_type), []) if edge_type else self._in.get(to_node, [])
+        elif edge_type:
+            edges = self._edges_by_type.get(edge_type, [])
+        else:
+            edges = self.edges
+        
+        return list(edges)
     
     def get_dependencies(self, node_id: str) -> List[str]:
         """Получить зависимости узла."""
@@ -338,25 +402,29 @@ class MemoryGraph:
         if node:
             await self.update_node(blocker_id, {"active": False})
     
-    async def get_ready_agents(self) -> List[str]:
-        """Получить агентов готовых к запуску (нет активных блокеров)."""
-        ready = []
+    def _refresh_ready(self, node_id: str):
+        """Пересчитать готовность одного агента (по его входящим BLOCKS)."""
+        node = self.nodes.get(node_id)
+        if node is None or node.type != NodeType.AGENT or node.data.get("status") != "pending":
+            self._ready.discard(node_id)
+            return
         
-        for node in self.get_nodes_by_type(NodeType.AGENT):
-            if node.data.get("status") != "pending":
-                continue
-            
-            # Проверить блокеры
-            blockers = self.get_blockers(node.id)
-            active_blockers = [
-                b for b in blockers
-                if self.get_node(b).data.get("active", False)
-            ]
-            
-            if not active_blockers:
-                ready.append(node.id)
+        for edge in self._in_by_type.get((node_id, EdgeType.BLOCKS), ()):
+            blocker = self.nodes.get(edge.from_node)
+            if blocker is not None and blocker.data.get("active", False):
+                self._ready.discard(node_id)
+                return
         
-        return ready
+        self._ready.add(node_id)
+    
+    async def get_ready_agents(self) -> List[str]:
+        """
+        Получить агентов готовых к запуску (нет активных блокеров).
+        
+        Множество готовых поддерживается инкрементально при изменении
+        узлов и связей через методы графа.
+        """
+        return sorted(self._ready, key=self._order.__getitem__)
     
     # ========================================================================
     # MCP INTEGRATION
@@ -384,11 +452,57 @@ class MemoryGraph:
     # PERSISTENCE
     # ========================================================================
     
-    def save(self):
-        """Сохранить граф на диск."""
-        graph_file = self.graph_dir / "memory_graph.json"
-        
+    def _append(self, entry: Dict[str, Any]):
+        """Дописать операцию в журнал (и свернуть его, если он разросся)."""
+        self._seq += 1
+        entry["seq"] = self._seq
+        
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        
+        self._journal_entries += 1
+        if self.compact_every and self._journal_entries >= self.compact_every:
+            self.compact()
+    
+    def _apply(self, entry: Dict[str, Any]):
+        """Применить операцию журнала к графу в памяти."""
+        op = entry.get("op")
+        
+        if op == "node":
+            self._put_node(self._node_from_dict(entry["node"]))
+        elif op == "update":
+            node = self.nodes.get(entry["id"])
+            if node is not None:
+                node.data.update(entry["data"])
+                node.updated_at = datetime.fromisoformat(entry["updated_at"])
+                self._node_changed(node)
+        elif op == "edge":
+            self._put_edge(self._edge_from_dict(entry["edge"]))
+    
+    @staticmethod
+    def _node_from_dict(node_data: Dict[str, Any]) -> GraphNode:
+        return GraphNode(
+            id=node_data["id"],
+            type=NodeType(node_data["type"]),
+            data=node_data["data"],
+            created_at=datetime.fromisoformat(node_data["created_at"]),
+            updated_at=datetime.fromisoformat(node_data["updated_at"])
+        )
+    
+    @staticmethod
+    def _edge_from_dict(edge_data: Dict[str, Any]) -> GraphEdge:
+        return GraphEdge(
+            from_node=edge_data["from"],
+            to_node=edge_data["to"],
+            type=EdgeType(edge_data["type"]),
+            weight=edge_data.get("weight", 1.0),
+            metadata=edge_data.get("metadata", {})
+        )
+    
+    def compact(self):
+        """Записать снимок графа и очистить журнал."""
         data = {
+            "seq": self._seq,
             "nodes": {
                 node_id: node.to_dict()
                 for node_id, node in self.nodes.items()
@@ -396,40 +510,66 @@ class MemoryGraph:
             "edges": [edge.to_dict() for edge in self.edges]
         }
         
-        graph_file.write_text(json.dumps(data, indent=2))
+        # Атомарная замена снимка; записи журнала с seq <= снимка при загрузке пропускаются
+        tmp_file = self.graph_file.with_suffix(".json.tmp")
+        tmp_file.write_text(json.dumps(data, indent=2))
+        os.replace(tmp_file, self.graph_file)
+        
+        self.journal_file.write_text("")
+        self._journal_entries = 0
+    
+    def save(self):
+        """Сохранить граф на диск (полный снимок, см. compact())."""
+        self.compact()
     
     def load(self):
-        """Загрузить граф с диска."""
-        graph_file = self.graph_dir / "memory_graph.json"
+        """Загрузить граф с диска: снимок + журнал после него."""
+        snapshot_seq = 0
+        
+        if self.graph_file.exists():
+            try:
+                data = json.loads(self.graph_file.read_text())
+                snapshot_seq = data.get("seq", 0)
+                
+                # Загрузить узлы
+                for node_data in data.get("nodes", {}).values():
+                    self._put_node(self._node_from_dict(node_data))
+                
+                # Загрузить связи
+                for edge_data in data.get("edges", []):
+                    self._put_edge(self._edge_from_dict(edge_data))
+            
+            except Exception as e:
+                print(f"Failed to load graph: {e}")
+        
+        self._seq = snapshot_seq
         
-        if not graph_file.exists():
+        if not self.journal_file.exists():
             return
         
-        try:
-            data = json.loads(graph_file.read_text())
+        torn = False
+        for line in self.journal_file.read_text(encoding="utf-8").splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Оборванная последняя запись (падение во время дозаписи)
+                torn = True
+                break
             
-            # Загрузить узлы
-            for node_id, node_data in data.get("nodes", {}).items():
-                self.nodes[node_id] = GraphNode(
-                    id=node_data["id"],
-                    type=NodeType(node_data["type"]),
-                    data=node_data["data"],
-                    created_at=datetime.fromisoformat(node_data["created_at"]),
-                    updated_at=datetime.fromisoformat(node_data["updated_at"])
-                )
+            if entry.get("seq", 0) <= snapshot_seq:
+                continue
             
-            # Загрузить связи
-            for edge_data in data.get("edges", []):
-                self.edges.append(GraphEdge(
-                    from_node=edge_data["from"],
-                    to_node=edge_data["to"],
-                    type=EdgeType(edge_data["type"]),
-                    weight=edge_data.get("weight", 1.0),
-                    metadata=edge_data.get("metadata", {})
-                ))
+            try:
+                self._apply(entry)
+            except Exception as e:
+                print(f"Failed to replay graph journal entry {entry.get('seq')}: {e}")
+            
+            self._seq = max(self._seq, entry.get("seq", 0))
+            self._journal_entries += 1
         
-        except Exception as e:
-            print(f"Failed to load graph: {e}")
+        if torn:
+            # Новые записи не должны дописываться после обрывка
+            self.compact()
     
     def to_dict(self) -> Dict[str, Any]:
         """Конвертировать граф в словарь."""
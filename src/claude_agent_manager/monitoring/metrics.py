@@ -26,7 +26,7 @@ import statistics
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Callable
 from enum import Enum
 from contextlib import contextmanager
 
@@ -135,6 +135,7 @@ class MetricsCollector:
         self._init_db()
         self._active_tasks: Dict[str, datetime] = {}
         self._active_tools: Dict[str, datetime] = {}
+        self._listeners: List[Callable[[str, MetricType], None]] = []
 
     def _init_db(self) -> None:
         """Инициализация базы данных."""
@@ -200,6 +201,33 @@ class MetricsCollector:
         """Текущее время в ISO формате."""
         return datetime.now().isoformat()
 
+    def add_listener(self, callback: Callable[[str, MetricType], None]) -> None:
+        """
+        Подписаться на новые метрики.
+
+        callback(agent_id, metric_type) вызывается после каждой записи,
+        в потоке, который записал метрику, - он должен быть быстрым.
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, MetricType], None]) -> None:
+        """Отписаться от новых метрик."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def last_metric_id(self) -> int:
+        """
+        ID последней записанной метрики (0, если метрик нет).
+
+        Дешёвый запрос по первичному ключу. Растёт при записи из любого
+        процесса, в отличие от add_listener, который видит только record()
+        этого экземпляра.
+        """
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT MAX(id) FROM metrics").fetchone()
+            return row[0] or 0
+
     def record(
         self,
         agent_id: str,
@@ -234,6 +262,12 @@ class MetricsCollector:
                 )
             )
 
+        for callback in list(self._listeners):
+            try:
+                callback(agent_id, metric_type)
+            except Exception:
+                pass
+
     def record_task_start(
         self,
         agent_id: str,
@@ -370,15 +404,21 @@ class MetricsCollector:
         agent_id: str,
         input_tokens: int,
         output_tokens: int,
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0
     ) -> None:
-        """Записать использование токенов."""
+        """Записать использование токенов (включая prompt cache read/write)."""
         total = input_tokens + output_tokens
+        metadata = {"input": input_tokens, "output": output_tokens}
+        if cache_read_tokens or cache_write_tokens:
+            metadata["cache_read"] = cache_read_tokens
+            metadata["cache_write"] = cache_write_tokens
         self.record(
             agent_id,
             MetricType.TOKEN_USAGE,
             value=total,
-            metadata={"input": input_tokens, "output": output_tokens},
+            metadata=metadata,
             session_id=session_id
         )
 
@@ -9,12 +9,15 @@ Agent Planning & Reasoning System
 - Иерархия моделей по сложности
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
 from enum import Enum
 from dataclasses import dataclass, field
 from datetime import datetime
 import json
 
+if TYPE_CHECKING:
+    from .llm_client import UnifiedLLMClient
+
 
 class TaskComplexity(Enum):
     """Сложность задачи."""
@@ -195,6 +198,34 @@ class AgentPlan:
         }
 
 
+async def complete_with_config(
+    llm_client: "UnifiedLLMClient",
+    model_config: ModelConfig,
+    prompt: str,
+    cache: Optional[bool] = None
+) -> str:
+    """
+    Вызов UnifiedLLMClient с параметрами из ModelConfig.
+
+    cache передаётся в complete(): None - кэшируются только вызовы с
+    temperature == 0, True - кэшировать независимо от temperature
+    (у PREDEFINED_MODELS она > 0), False - не кэшировать.
+    """
+    from .llm_client import LLMMessage
+
+    response = await llm_client.complete(
+        messages=[LLMMessage(role="user", content=prompt)],
+        model=model_config.model_name,
+        provider=model_config.api_provider,
+        api_key=model_config.api_key,
+        base_url=model_config.base_url,
+        max_tokens=model_config.max_tokens,
+        temperature=model_config.temperature,
+        cache=cache
+    )
+    return response.content
+
+
 class TaskPlanner:
     """
     Планировщик задач для агента.
@@ -205,8 +236,17 @@ class TaskPlanner:
     - Оценки времени
     """
     
-    def __init__(self, model_config: ModelConfig = None):
+    def __init__(
+        self,
+        model_config: ModelConfig = None,
+        llm_client: Optional["UnifiedLLMClient"] = None,
+        cache: Optional[bool] = None
+    ):
         self.model_config = model_config or PREDEFINED_MODELS["claude-sonnet-4"]
+        self.llm_client = llm_client
+        # None - как решит клиент (только temperature == 0); True - переиспользовать
+        # прошлый план той же задачи, даже если он был сэмплирован с temperature > 0
+        self.cache = cache
     
     async def create_plan(
         self,
@@ -234,7 +274,7 @@ Global Task:
 {global_task}
 
 Context from other agents:
-{json.dumps(context or {}, indent=2)}
+{json.dumps(context or {}, indent=2, sort_keys=True)}
 
 Create a detailed plan by breaking down the task into subtasks.
 For each subtask, provide:
@@ -299,8 +339,10 @@ Generate the plan:
     
     async def _call_llm(self, prompt: str) -> str:
         """Call LLM для генерации плана."""
-        # TODO: Реальный вызов LLM через Anthropic SDK
-        # Пока заглушка
+        if self.llm_client:
+            return await complete_with_config(self.llm_client, self.model_config, prompt, cache=self.cache)
+
+        # Без клиента - заглушка
         return """
 {
   "subtasks": [
@@ -443,8 +485,16 @@ class ReasoningEngine:
     4. Проверить результат
     """
     
-    def __init__(self, model_config: ModelConfig):
+    def __init__(
+        self,
+        model_config: ModelConfig,
+        llm_client: Optional["UnifiedLLMClient"] = None,
+        cache: Optional[bool] = None
+    ):
         self.model_config = model_config
+        self.llm_client = llm_client
+        # None - как решит клиент (только temperature == 0)
+        self.cache = cache
     
     async def execute_with_reasoning(
         self,
@@ -463,7 +513,7 @@ class ReasoningEngine:
 Task: {subtask.description}
 
 Context:
-{json.dumps(context, indent=2)}
+{json.dumps(context, indent=2, sort_keys=True)}
 
 Think step by step:
 
@@ -514,7 +564,10 @@ Provide your response in JSON format:
     
     async def _call_llm(self, prompt: str) -> str:
         """Call LLM."""
-        # TODO: Реальный вызов
+        if self.llm_client:
+            return await complete_with_config(self.llm_client, self.model_config, prompt, cache=self.cache)
+
+        # Без клиента - заглушка
         return """
 {
   "understanding": "Need to implement /pay endpoint that integrates with CryptoBot API",
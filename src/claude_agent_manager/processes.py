@@ -192,6 +192,26 @@ def pm2_status(name: str) -> Optional[dict]:
     return None
 
 
+def pm2_statuses() -> dict[str, str]:
+    """Statuses of all pm2 processes (name -> status) from a single `pm2 jlist`."""
+    import json
+    res = run_pm2(["jlist"])
+    if res.returncode != 0:
+        return {}
+    json_start = res.stdout.find('[')
+    if json_start == -1:
+        return {}
+    try:
+        processes = json.loads(res.stdout[json_start:])
+    except json.JSONDecodeError:
+        return {}
+    return {
+        proc.get("name"): proc.get("pm2_env", {}).get("status", "unknown")
+        for proc in processes
+        if proc.get("name")
+    }
+
+
 def spawn_cmd(project_path: str, port: int) -> Optional[int]:
     """Spawn a command window with claude for the project."""
     claude = which("claude")
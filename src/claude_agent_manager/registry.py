@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 import json
+import logging
+import os
+import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Literal
 
 from pydantic import BaseModel, Field
 
+from .core.paths import read_latest_run
+from .core.registry import Registry
+
+logger = logging.getLogger(__name__)
+
 
 # Permission preset types
 PermissionPreset = Literal["default", "strict", "permissive", "autopilot", "custom"]
@@ -253,20 +262,151 @@ def agent_json_path(agent_root: Path, agent_id: str) -> Path:
     return agent_dir(agent_root, agent_id) / "agent.json"
 
 
+# ---------- agent index ----------
+#
+# Источник истины для записей агентов - таблица agents в
+# manager/registry.sqlite рядом с agents/ (индексы по project_path, status,
+# port). agents/<id>/agent.json остаётся write-through экспортом: его пишет
+# save_agent, а каталоги, созданные/удалённые в обход API (импорт, rmtree),
+# подхватываются синхронизацией при изменении mtime каталога agents/.
+# Ручная правка существующего agent.json видна после reindex_agents().
+
+_INDEX_LOCK = threading.Lock()
+_indexes: dict[Path, Registry] = {}
+_synced_mtime: dict[Path, int] = {}
+
+
+def agent_index_path(agent_root: Path) -> Path:
+    return agent_root.parent / "manager" / "registry.sqlite"
+
+
+def _agent_status(rec: AgentRecord) -> str:
+    return "running" if rec.active_run_id else "stopped"
+
+
+def _agent_index(agent_root: Path) -> Registry:
+    key = Path(os.path.abspath(agent_root))
+    with _INDEX_LOCK:
+        reg = _indexes.get(key)
+        if reg is None:
+            reg = Registry(agent_index_path(key))
+            reg.init()
+            _indexes[key] = reg
+        return reg
+
+
+def _index_record(reg: Registry, rec: AgentRecord, mtime_ns: Optional[int]) -> None:
+    reg.upsert_agent_record(
+        agent_id=rec.id,
+        name=rec.get_display_name(),
+        record_json=rec.model_dump_json(),
+        project_path=rec.project_path or None,
+        port=rec.port,
+        status=_agent_status(rec),
+        created_at_iso=rec.created_at,
+        record_mtime_ns=mtime_ns,
+    )
+
+
+def _read_agent_file(p: Path) -> AgentRecord:
+    return AgentRecord(**json.loads(p.read_text(encoding="utf-8")))
+
+
+def _sync_agent_index(agent_root: Path, reg: Registry, force: bool = False) -> None:
+    """Привести индекс в соответствие с agents/*/agent.json (stat без парсинга)."""
+    key = Path(os.path.abspath(agent_root))
+    try:
+        dir_mtime = agent_root.stat().st_mtime_ns
+    except FileNotFoundError:
+        dir_mtime = None
+    if not force and dir_mtime is not None and _synced_mtime.get(key) == dir_mtime:
+        return
+
+    on_disk: dict[str, int] = {}
+    if dir_mtime is not None:
+        with os.scandir(agent_root) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                try:
+                    on_disk[entry.name] = os.stat(os.path.join(entry.path, "agent.json")).st_mtime_ns
+                except OSError:
+                    continue
+
+    indexed = reg.agent_record_mtimes()
+    for agent_id, mtime_ns in on_disk.items():
+        if indexed.get(agent_id, -1) == mtime_ns:
+            continue
+        try:
+            rec = _read_agent_file(agent_json_path(agent_root, agent_id))
+        except Exception:
+            continue
+        _index_record(reg, rec, mtime_ns)
+    reg.clear_agent_records(a for a in indexed if a not in on_disk)
+
+    if dir_mtime is not None:
+        _synced_mtime[key] = dir_mtime
+
+
+def _indexed(agent_root: Path, force: bool = False) -> Optional[Registry]:
+    """Синхронизированный индекс или None, если SQLite недоступен."""
+    try:
+        reg = _agent_index(agent_root)
+        _sync_agent_index(agent_root, reg, force=force)
+        return reg
+    except sqlite3.Error as e:
+        logger.warning(f"[REGISTRY] agent index unavailable, scanning files: {e}")
+        return None
+
+
+def sync_agent_index(agent_root: Path) -> None:
+    """Подхватить каталоги агентов, созданные/удалённые в обход save_agent."""
+    _indexed(agent_root)
+
+
+def reindex_agents(agent_root: Path) -> int:
+    """Полностью пересканировать agent.json. Возвращает число агентов в индексе."""
+    reg = _indexed(agent_root, force=True)
+    return len(reg.agent_record_mtimes()) if reg else len(_scan_agent_files(agent_root))
+
+
 def load_agent(agent_root: Path, agent_id: str) -> AgentRecord:
+    try:
+        reg = _agent_index(agent_root)
+        raw = reg.get_agent_record(agent_id)
+        if raw is None:
+            _sync_agent_index(agent_root, reg)
+            raw = reg.get_agent_record(agent_id)
+        if raw is not None:
+            return AgentRecord.model_validate_json(raw)
+    except sqlite3.Error as e:
+        logger.warning(f"[REGISTRY] agent index unavailable, reading file: {e}")
     p = agent_json_path(agent_root, agent_id)
     if not p.exists():
         raise FileNotFoundError(f"Agent not found: {agent_id}")
-    return AgentRecord(**json.loads(p.read_text(encoding="utf-8")))
+    return _read_agent_file(p)
 
 
 def save_agent(agent_root: Path, rec: AgentRecord) -> None:
     d = agent_dir(agent_root, rec.id)
     d.mkdir(parents=True, exist_ok=True)
-    agent_json_path(agent_root, rec.id).write_text(rec.model_dump_json(indent=2), encoding="utf-8")
+    p = agent_json_path(agent_root, rec.id)
+    p.write_text(rec.model_dump_json(indent=2), encoding="utf-8")
+    try:
+        _index_record(_agent_index(agent_root), rec, p.stat().st_mtime_ns)
+    except sqlite3.Error as e:
+        logger.warning(f"[REGISTRY] failed to index agent {rec.id}: {e}")
 
 
-def iter_agents(agent_root: Path) -> list[AgentRecord]:
+def forget_agent(agent_root: Path, agent_id: str) -> None:
+    """Убрать агента из индекса (после удаления его каталога)."""
+    try:
+        _agent_index(agent_root).clear_agent_records([agent_id])
+    except sqlite3.Error as e:
+        logger.warning(f"[REGISTRY] failed to drop agent {agent_id} from index: {e}")
+
+
+def _scan_agent_files(agent_root: Path) -> list[AgentRecord]:
     if not agent_root.exists():
         return []
     agents: list[AgentRecord] = []
@@ -277,12 +417,43 @@ def iter_agents(agent_root: Path) -> list[AgentRecord]:
         if not p.exists():
             continue
         try:
-            agents.append(AgentRecord(**json.loads(p.read_text(encoding="utf-8"))))
+            agents.append(_read_agent_file(p))
         except Exception:
             continue
     return agents
 
 
+def find_agents(
+    agent_root: Path,
+    project_path: Optional[str] = None,
+    status: Optional[str] = None,
+    port: Optional[int] = None,
+) -> list[AgentRecord]:
+    """Агенты по project_path / status ("running" | "stopped") / port, отсортированы по id."""
+    reg = _indexed(agent_root)
+    if reg is None:
+        return [
+            a for a in _scan_agent_files(agent_root)
+            if (project_path is None or a.project_path == project_path)
+            and (status is None or _agent_status(a) == status)
+            and (port is None or a.port == port)
+        ]
+    records = reg.query_agent_records(project_path=project_path, status=status, port=port)
+    return [AgentRecord.model_validate_json(raw) for raw in records]
+
+
+def iter_agents(agent_root: Path) -> list[AgentRecord]:
+    return find_agents(agent_root)
+
+
+def used_agent_ports(agent_root: Path) -> set[int]:
+    """Порты, записанные в agent.json агентов."""
+    reg = _indexed(agent_root)
+    if reg is None:
+        return {a.port for a in _scan_agent_files(agent_root) if a.port}
+    return reg.get_agent_ports()
+
+
 def write_claude_settings(project_path: Path, agent: AgentRecord) -> Path:
     """
     Write .claude/settings.json to project directory with agent permissions.
@@ -379,9 +550,14 @@ def update_agent_autopilot(agent_root: Path, agent_id: str, enabled: bool) -> Ag
     agent_dir = agent_root / agent_id
     runs_dir = agent_dir / "runs"
     if runs_dir.exists():
-        # Find latest run directory
-        run_dirs = sorted(runs_dir.iterdir(), key=lambda x: x.stat().st_mtime, reverse=True)
-        for run_dir in run_dirs[:1]:  # Only latest run
+        # Latest run: active run or runs/LATEST pointer; mtime scan only for runs started before the pointer
+        latest = agent.active_run_id or read_latest_run(runs_dir)
+        if latest and (runs_dir / latest).is_dir():
+            run_dirs = [runs_dir / latest]
+        else:
+            legacy = [d for d in runs_dir.iterdir() if d.is_dir()]
+            run_dirs = [max(legacy, key=lambda x: x.stat().st_mtime)] if legacy else []
+        for run_dir in run_dirs:
             perms = agent.get_effective_permissions()
             settings = {"permissions": {"allow": perms["allow"], "deny": perms["deny"]}}
             # Write to .config/.claude/ (APPDATA)
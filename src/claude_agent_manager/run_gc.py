@@ -0,0 +1,285 @@
+"""
+Run GC - хранение и очистка run-каталогов агентов.
+
+Каждый start_agent создаёт agents/<id>/runs/<run_id>/ и строку в таблице
+runs core-registry; без очистки долгоживущие агенты копят тысячи
+каталогов, и любой обход runs/ замедляется.
+
+Политика (RunRetention, значения из AppConfig):
+- последние keep_last run'ов агента хранятся всегда;
+- остальные удаляются, если старше keep_days (failed - keep_failed_days);
+- активный run (active_run_id / runs/LATEST) и run'ы в статусах
+  created/starting/running/stopping не удаляются никогда;
+- runs/warm (sandbox worker'а из WorkerPool) - не run, GC его не трогает.
+
+Упавшие run'ы (статус running, но ни pm2 worker агента, ни процессы run'а
+не живы) помечаются failed; их порты освобождаются по lease, а сами run'ы
+дальше хранятся по правилам failed.
+
+Удаляются каталоги и строки runs/run_pids/resources_ports. Каталоги без
+строки в registry (запуски до появления registry) оцениваются по mtime;
+строки удалённых (purge) агентов просто вычищаются.
+
+Использование:
+    report = RunCollector(cfg).collect()    # один проход
+    RunCollector(cfg).collect_async()       # фоновый, не чаще run_gc_interval_sec
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import threading
+import time
+from shutil import which
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .config import AppConfig
+from .core import WorkspacePaths, read_latest_run
+from .core.paths import LATEST_RUN_FILE, WARM_RUN_DIR
+from .core.registry import Registry
+from .processes import is_pid_running, pm2_statuses
+from .registry import iter_agents
+
+logger = logging.getLogger(__name__)
+
+# Статусы run'ов, которые GC не трогает
+ACTIVE_RUN_STATUSES = ("created", "starting", "running", "stopping")
+
+STAMP_FILE = "run_gc.stamp"
+
+# Run, застрявший в starting дольше этого, считается упавшим при старте
+STARTING_TIMEOUT = timedelta(minutes=10)
+
+_collect_lock = threading.Lock()
+
+
+@dataclass
+class RunRetention:
+    """Политика хранения run'ов одного агента."""
+    keep_last: int = 20
+    keep_days: float = 14
+    keep_failed_days: float = 30
+
+    @classmethod
+    def from_config(cls, cfg: AppConfig) -> "RunRetention":
+        return cls(
+            keep_last=cfg.run_retention_keep_last,
+            keep_days=cfg.run_retention_days,
+            keep_failed_days=cfg.run_retention_failed_days,
+        )
+
+
+@dataclass
+class RunInfo:
+    """Run агента для отбора: из registry и/или с диска."""
+    run_id: str
+    created: datetime
+    status: Optional[str] = None   # None - только каталог, строки в registry нет
+    has_row: bool = False
+
+
+@dataclass
+class GcReport:
+    """Итог прохода GC."""
+    agents_scanned: int = 0
+    dirs_deleted: int = 0
+    rows_deleted: int = 0
+    kept: int = 0
+    runs_reaped: int = 0
+
+
+def select_expired_runs(
+    runs: Iterable[RunInfo],
+    retention: RunRetention,
+    now: datetime,
+    protected: Iterable[str] = (),
+) -> list[RunInfo]:
+    """Run'ы агента, подлежащие удалению по политике retention."""
+    protected_ids = set(protected)
+    newest_first = sorted(runs, key=lambda r: r.created, reverse=True)
+    expired: list[RunInfo] = []
+    for run in newest_first[max(0, retention.keep_last):]:
+        if run.run_id in protected_ids or run.status in ACTIVE_RUN_STATUSES:
+            continue
+        keep_days = retention.keep_failed_days if run.status == "failed" else retention.keep_days
+        if now - run.created > timedelta(days=keep_days):
+            expired.append(run)
+    return expired
+
+
+def _parse_created(value: str) -> datetime:
+    try:
+        created = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.now(timezone.utc)
+    return created if created.tzinfo else created.replace(tzinfo=timezone.utc)
+
+
+def _worker_statuses() -> Optional[dict[str, str]]:
+    """
+    pm2 statuses; None, если их не узнать (pm2 не установлен - GC не
+    ставит его сам - или pm2 jlist упал).
+    """
+    if not which("pm2"):
+        return None
+    try:
+        return pm2_statuses()
+    except Exception:
+        return None
+
+
+class RunCollector:
+    """Применяет RunRetention ко всем агентам workspace."""
+
+    def __init__(
+        self,
+        cfg: AppConfig,
+        paths: Optional[WorkspacePaths] = None,
+        registry: Optional[Registry] = None,
+        retention: Optional[RunRetention] = None,
+    ):
+        from .manager import _registry, get_workspace_paths
+
+        self.cfg = cfg
+        self.paths = paths or get_workspace_paths(cfg)
+        self.registry = registry or _registry(cfg)
+        self.retention = retention or RunRetention.from_config(cfg)
+
+    @property
+    def stamp_path(self) -> Path:
+        return self.paths.manager_dir / STAMP_FILE
+
+    def _runs_on_disk(self, agent_id: str) -> dict[str, float]:
+        runs_dir = self.paths.agent_runs_dir(agent_id)
+        found: dict[str, float] = {}
+        try:
+            with os.scandir(runs_dir) as it:
+                for entry in it:
+                    # runs/warm - данные тёплого worker'а, которым пользуется агент
+                    if entry.name not in (LATEST_RUN_FILE, WARM_RUN_DIR) and entry.is_dir():
+                        found[entry.name] = entry.stat().st_mtime
+        except FileNotFoundError:
+            pass
+        return found
+
+    def _reap_crashed_runs(
+        self, rows_by_agent: dict[str, dict[str, RunInfo]], agents: dict, now: datetime
+    ) -> int:
+        """Пометить failed run'ы running/starting, у которых не осталось живых процессов."""
+        candidates = [
+            (agents[agent_id], run)
+            for agent_id, runs in rows_by_agent.items() if agent_id in agents
+            for run in runs.values()
+            if run.status == "running" or (run.status == "starting" and now - run.created > STARTING_TIMEOUT)
+        ]
+        if not candidates:
+            return 0
+
+        statuses = _worker_statuses()
+        if statuses is None:
+            # Без статусов воркеров живой run не отличить от упавшего
+            return 0
+        reaped = 0
+        for agent, run in candidates:
+            if statuses.get(agent.pm2_name) == "online":
+                continue
+            if any(is_pid_running(pid) for pid in self.registry.get_run_pids(run.run_id).values()):
+                continue
+            logger.info(f"[RUN_GC] run crashed, marking failed | agent={agent.id} run={run.run_id}")
+            self.registry.set_run_status(run.run_id, "failed")
+            run.status = "failed"
+            reaped += 1
+        return reaped
+
+    def collect(self, now: Optional[datetime] = None) -> GcReport:
+        """Один проход GC по всем агентам."""
+        now = now or datetime.now(timezone.utc)
+        report = GcReport()
+
+        rows_by_agent: dict[str, dict[str, RunInfo]] = {}
+        for row in self.registry.list_runs():
+            rows_by_agent.setdefault(row["agent_id"], {})[row["run_id"]] = RunInfo(
+                run_id=row["run_id"],
+                created=_parse_created(row["created_at"]),
+                status=row["status"],
+                has_row=True,
+            )
+
+        agents = {a.id: a for a in iter_agents(self.paths.agents_dir)}
+        stale_rows: list[str] = []
+        report.runs_reaped = self._reap_crashed_runs(rows_by_agent, agents, now)
+
+        for agent_id in set(agents) | set(rows_by_agent):
+            runs = rows_by_agent.get(agent_id, {})
+            agent = agents.get(agent_id)
+            if agent is None:
+                if not self.paths.agent_dir(agent_id).exists():
+                    # Агент удалён (purge) - его строки больше не нужны
+                    stale_rows.extend(runs)
+                continue
+
+            report.agents_scanned += 1
+            for run_id, mtime in self._runs_on_disk(agent_id).items():
+                if run_id not in runs:
+                    runs[run_id] = RunInfo(run_id=run_id, created=datetime.fromtimestamp(mtime, timezone.utc))
+
+            protected = {agent.active_run_id, read_latest_run(self.paths.agent_runs_dir(agent_id))}
+            expired = select_expired_runs(runs.values(), self.retention, now, protected)
+            report.kept += len(runs) - len(expired)
+
+            for run in expired:
+                run_dir = self.paths.run_dir(agent_id, run.run_id)
+                if run_dir.exists():
+                    shutil.rmtree(run_dir, ignore_errors=True)
+                    report.dirs_deleted += 1
+                if run.has_row:
+                    stale_rows.append(run.run_id)
+
+        report.rows_deleted = self.registry.delete_runs(stale_rows)
+        if report.runs_reaped:
+            self.registry.expire_port_leases()
+        logger.info(
+            f"[RUN_GC] agents={report.agents_scanned} dirs_deleted={report.dirs_deleted} "
+            f"rows_deleted={report.rows_deleted} kept={report.kept} reaped={report.runs_reaped}"
+        )
+        return report
+
+    def _due(self) -> bool:
+        interval = self.cfg.run_gc_interval_sec
+        if interval <= 0:
+            return False
+        try:
+            return time.time() - self.stamp_path.stat().st_mtime >= interval
+        except FileNotFoundError:
+            return True
+
+    def collect_async(self) -> Optional[threading.Thread]:
+        """
+        Запустить collect() в фоне, если с прошлого прохода (любого процесса)
+        прошло run_gc_interval_sec. Иначе None.
+        """
+        if not self._due() or not _collect_lock.acquire(blocking=False):
+            return None
+        try:
+            self.stamp_path.parent.mkdir(parents=True, exist_ok=True)
+            self.stamp_path.touch()
+        except OSError:
+            _collect_lock.release()
+            return None
+
+        def run() -> None:
+            try:
+                self.collect()
+            except Exception as e:
+                logger.warning(f"[RUN_GC] failed: {e}")
+            finally:
+                _collect_lock.release()
+
+        thread = threading.Thread(target=run, daemon=True, name="run-gc")
+        thread.start()
+        return thread
@@ -43,7 +43,7 @@ from .sharing import (
     peek_bundle,
     BUNDLE_EXT,
 )
-from .registry import load_agent, save_agent, iter_agents
+from .registry import load_agent, save_agent, used_agent_ports
 from .config import load_config
 
 console = Console()
@@ -185,23 +185,42 @@ def preset_use(
         import uuid
         agent_id = f"{name.lower().replace(' ', '-')}-{uuid.uuid4().hex[:6]}"
 
-    # Находим свободный порт если не указан
+    # Находим свободный порт если не указан: строка agent:<id>:port захватывается
+    # атомарно в core-registry, как в manager.create_agent
+    claimed_port: Optional[str] = None
     if not port:
-        from .worker import pick_port
-        used_ports = {a.port for a in iter_agents(agent_root)}
-        port = pick_port(cfg, used_ports)
-
-    # Создаём агента из пресета
-    agent = apply_preset(
-        preset=preset,
-        agent_id=agent_id,
-        project_path=project,
-        port=port,
-        purpose=purpose,
-    )
+        from datetime import datetime, timezone
+        from .registry import sync_agent_index
+        from .worker import is_port_free
+
+        port_registry = manager._registry(cfg)
+        sync_agent_index(manager.get_workspace_paths(cfg).agents_dir)
+        used_ports = used_agent_ports(agent_root)
+        claimed_port = f"agent:{agent_id}:port"
+        port = port_registry.claim_port(
+            claimed_port,
+            cfg.port_min,
+            cfg.port_max,
+            allocated_at_iso=datetime.now(timezone.utc).isoformat(),
+            verify=lambda p: p not in used_ports and is_port_free(p),
+        )
+
+    try:
+        # Создаём агента из пресета
+        agent = apply_preset(
+            preset=preset,
+            agent_id=agent_id,
+            project_path=project,
+            port=port,
+            purpose=purpose,
+        )
 
-    # Сохраняем
-    save_agent(agent_root, agent)
+        # Сохраняем
+        save_agent(agent_root, agent)
+    except Exception:
+        if claimed_port is not None:
+            port_registry.release_port(claimed_port)
+        raise
 
     console.print(f"[green]✓[/green] Создан агент: {agent.id}")
     console.print(f"  Project: {agent.project_path}")
@@ -4390,6 +4390,17 @@ class AgentDashboard:
         self._team_log(f"[TEAM] Task: {task[:60]}...")
 
         import threading
+        try:
+            from .streaming import StreamBus
+        except ImportError:
+            from claude_agent_manager.streaming import StreamBus
+
+        # Потоковый вывод агентов: worker-поток публикует, Tk опрашивает буфер
+        stream_bus = StreamBus()
+        stream_sub = stream_bus.subscribe()
+        run_finished = threading.Event()
+        self.root.after(50, lambda: self._pump_team_stream(stream_sub, run_finished))
+
         def run():
             try:
                 import asyncio
@@ -4402,7 +4413,11 @@ class AgentDashboard:
 
                 self.root.after(0, lambda: self._team_log("[TEAM] Initializing orchestrator..."))
 
-                orchestrator = TeamOrchestrator(Path(project).resolve(), model=selected_model)
+                orchestrator = TeamOrchestrator(
+                    Path(project).resolve(),
+                    model=selected_model,
+                    stream_bus=stream_bus
+                )
 
                 # Add selected agents with per-agent config
                 for role in selected_roles:
@@ -4440,9 +4455,38 @@ class AgentDashboard:
                 tb = traceback.format_exc()
                 self.root.after(0, lambda m=err_msg: self._team_log(f"[ERROR] {m}"))
                 self.root.after(0, lambda t=tb: self._team_log(t))
+            finally:
+                run_finished.set()
 
         threading.Thread(target=run, daemon=True).start()
 
+    def _pump_team_stream(self, sub, finished):
+        """Перенести накопленный потоковый вывод агентов в team log (каждые 50 мс)."""
+        # Флаг читается до drain: события, опубликованные перед set() (END/ERROR),
+        # уже в подписке и будут прочитаны на этой или следующей итерации
+        done = finished.is_set()
+        events = sub.drain()
+        for event in events:
+            if event.type == "token":
+                self.team_output.insert(tk.END, event.text)
+            elif event.type == "start":
+                self._team_log(f"\n[{event.agent_id.upper()}] {event.text[:60]}")
+            elif event.type == "tool":
+                self._team_log(f"\n  {event.text}")
+            elif event.type == "end":
+                self._team_log(f"\n[{event.agent_id.upper()}] done")
+            elif event.type == "error":
+                self._team_log(f"\n[{event.agent_id.upper()}] ERROR: {event.text}")
+        if sub.dropped:
+            self._team_log(f"[STREAM] {sub.dropped} events dropped (UI too slow)")
+            sub.dropped = 0
+        if events:
+            self.team_output.see(tk.END)
+
+        if done and not events:
+            return
+        self.root.after(50, lambda: self._pump_team_stream(sub, finished))
+
     def _team_plan(self):
         task = self.team_task_text.get("1.0", tk.END).strip()
         project = self.team_path_entry.get().strip() or "."
@@ -0,0 +1,254 @@
+"""
+Streaming Pipeline - потоковый вывод агентов.
+
+Путь токенов:
+    provider stream -> BaseAgent (token events) -> StreamBus
+        -> listeners (TaskLogger через TaskLogStreamWriter)
+        -> subscribers (WebSocket /ws/stream, Tk team log)
+
+Backpressure: у каждого подписчика ограниченный буфер. Подряд идущие
+token-события одного агента/задачи склеиваются в одно (без потерь),
+поэтому медленный потребитель получает те же данные более крупными
+кусками. Если буфер всё равно переполнен - вытесняются самые старые
+события, счётчик dropped растёт.
+
+Использование:
+    bus = StreamBus()
+    sub = bus.subscribe()
+
+    orchestrator = TeamOrchestrator(project, stream_bus=bus)
+    ...
+    for event in sub.drain():          # Tk: опрос через after()
+        print(event.text, end="")
+
+    event = await sub.get()            # asyncio потребитель
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Deque, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .task_logger import TaskLogger
+
+
+class StreamEventType:
+    """Типы событий потока."""
+    START = "start"
+    TOKEN = "token"
+    TOOL = "tool"
+    END = "end"
+    ERROR = "error"
+
+
+@dataclass
+class StreamEvent:
+    """Событие потока агента."""
+    type: str
+    agent_id: str
+    task_id: Optional[str] = None
+    text: str = ""
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def can_merge(self, other: "StreamEvent") -> bool:
+        """Можно ли склеить other в это событие."""
+        return (
+            self.type == StreamEventType.TOKEN
+            and other.type == StreamEventType.TOKEN
+            and self.agent_id == other.agent_id
+            and self.task_id == other.task_id
+        )
+
+
+class StreamSubscriber:
+    """
+    Ограниченный буфер событий одного потребителя.
+
+    Потокобезопасен: publish может идти из worker-потока SDK,
+    потребление - из Tk-потока или event loop.
+    """
+
+    def __init__(self, maxsize: int = 256, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.closed = False
+        self._buffer: Deque[StreamEvent] = deque()
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._ready = asyncio.Event() if loop else None
+
+    def push(self, event: StreamEvent) -> None:
+        """Добавить событие (с coalescing token-событий)."""
+        with self._lock:
+            if self.closed:
+                return
+            if self._buffer and self._buffer[-1].can_merge(event):
+                last = self._buffer[-1]
+                self._buffer[-1] = StreamEvent(
+                    type=last.type,
+                    agent_id=last.agent_id,
+                    task_id=last.task_id,
+                    text=last.text + event.text,
+                    timestamp=last.timestamp
+                )
+            else:
+                self._buffer.append(event)
+                while len(self._buffer) > self.maxsize:
+                    self._buffer.popleft()
+                    self.dropped += 1
+        self._notify()
+
+    def _notify(self) -> None:
+        if self._loop is None or self._ready is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # loop closed
+
+    def drain(self, max_items: Optional[int] = None) -> List[StreamEvent]:
+        """Забрать накопленные события без ожидания."""
+        with self._lock:
+            if max_items is None or max_items >= len(self._buffer):
+                events = list(self._buffer)
+                self._buffer.clear()
+            else:
+                events = [self._buffer.popleft() for _ in range(max_items)]
+        return events
+
+    async def get(self) -> Optional[StreamEvent]:
+        """Дождаться следующего события (None - подписка закрыта)."""
+        if self._ready is None:
+            raise RuntimeError("Subscriber was created without an event loop")
+        while True:
+            with self._lock:
+                if self._buffer:
+                    return self._buffer.popleft()
+                if self.closed:
+                    return None
+                self._ready.clear()
+            await self._ready.wait()
+
+    async def __aiter__(self) -> AsyncIterator[StreamEvent]:
+        while True:
+            event = await self.get()
+            if event is None:
+                return
+            yield event
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+        self._notify()
+
+
+class StreamBus:
+    """
+    Шина потоковых событий агентов.
+
+    listeners - синхронные callbacks в потоке публикатора (должны быть
+    быстрыми: запись в лог, счётчики). subscribers - буферизованные
+    потребители с backpressure.
+    """
+
+    def __init__(self, subscriber_maxsize: int = 256):
+        self.subscriber_maxsize = subscriber_maxsize
+        self._subscribers: List[StreamSubscriber] = []
+        self._listeners: List[Callable[[StreamEvent], None]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        maxsize: Optional[int] = None
+    ) -> StreamSubscriber:
+        """Создать подписчика. loop нужен для await sub.get()."""
+        sub = StreamSubscriber(maxsize or self.subscriber_maxsize, loop=loop)
+        with self._lock:
+            self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: StreamSubscriber) -> None:
+        with self._lock:
+            if sub in self._subscribers:
+                self._subscribers.remove(sub)
+        sub.close()
+
+    def add_listener(self, listener: Callable[[StreamEvent], None]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[StreamEvent], None]) -> None:
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def publish(self, event: StreamEvent) -> None:
+        """Опубликовать событие всем listeners и subscribers."""
+        with self._lock:
+            listeners = list(self._listeners)
+            subscribers = list(self._subscribers)
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:
+                pass  # Потребитель не должен ломать агента
+
+        for sub in subscribers:
+            sub.push(event)
+
+    def emit(self, type: str, agent_id: str, task_id: Optional[str] = None, text: str = "") -> None:
+        """Короткая форма publish."""
+        self.publish(StreamEvent(type=type, agent_id=agent_id, task_id=task_id, text=text))
+
+
+class TaskLogStreamWriter:
+    """
+    Listener, превращающий token-события задачи в записи TaskLogger.
+
+    Токены копятся до конца строки (или max_chars) и пишутся одной
+    записью - лог растёт построчно, а не по токену.
+    """
+
+    def __init__(self, logger: "TaskLogger", task_id: Optional[str] = None, max_chars: int = 2000):
+        self.logger = logger
+        self.task_id = task_id
+        self.max_chars = max_chars
+        self._pending = ""
+        self._lock = threading.Lock()
+
+    def __call__(self, event: StreamEvent) -> None:
+        if self.task_id is not None and event.task_id != self.task_id:
+            return
+        if event.type == StreamEventType.TOKEN:
+            self._feed(event.text)
+        elif event.type in (StreamEventType.END, StreamEventType.ERROR):
+            self.flush()
+
+    def _feed(self, text: str) -> None:
+        with self._lock:
+            self._pending += text
+            *lines, self._pending = self._pending.split("\n")
+            if len(self._pending) >= self.max_chars:
+                lines.append(self._pending)
+                self._pending = ""
+        for line in lines:
+            if line.strip():
+                self.logger.stream_text(line)
+
+    def flush(self) -> None:
+        with self._lock:
+            rest, self._pending = self._pending, ""
+        if rest.strip():
+            self.logger.stream_text(rest)
+        # Конец потока - сбрасываем буфер TaskLogger на диск
+        self.logger.flush()
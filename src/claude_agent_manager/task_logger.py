@@ -12,16 +12,31 @@ Task Logger - система логирования задач агентов.
     logger.tool_start("Read", "config.py")
     logger.tool_end("Read", success=True)
     logger.end_phase(LogPhase.PLANNING, success=True)
+
+Хранение:
+    task_entries.jsonl - источник истины (append-only, буферизованная запись;
+                         буфер сбрасывается фоновым таймером и при выходе)
+    task_log.json      - снапшот агрегатов + offset в JSONL, пишется только
+                         на переходах фаз, ошибках, complete() и по таймеру
+
+При загрузке снапшот дополняется replay записей после его offset, поэтому
+стоимость записи одной строки лога - O(1), а не перезапись всего лога.
 """
 
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import threading
+import time
+import weakref
+from collections import deque
 from dataclasses import dataclass, asdict, field
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 
 from rich.console import Console
 from rich.panel import Panel
@@ -51,6 +66,7 @@ class LogEntryType(str, Enum):
     SUCCESS = "success"
     INFO = "info"
     WARNING = "warning"
+    STREAM = "stream"          # Потоковый вывод агента (построчно)
 
 
 @dataclass
@@ -64,6 +80,7 @@ class LogEntry:
     tool_input: Optional[str] = None
     detail: Optional[str] = None
     duration_ms: Optional[int] = None
+    success: Optional[bool] = None  # Для phase_end
 
     def to_dict(self) -> dict:
         """Конвертировать в словарь."""
@@ -80,7 +97,8 @@ class PhaseStats:
     tool_calls: int = 0
     errors: int = 0
     warnings: int = 0
-    entries: List[Dict] = field(default_factory=list)
+    entries: List[Dict] = field(default_factory=list)  # Последние записи (в памяти)
+    entries_count: int = 0  # Всего записей фазы (включая вытесненные из памяти)
 
     def to_dict(self) -> dict:
         return {
@@ -91,7 +109,7 @@ class PhaseStats:
             "tool_calls": self.tool_calls,
             "errors": self.errors,
             "warnings": self.warnings,
-            "entries_count": len(self.entries)
+            "entries_count": max(self.entries_count, len(self.entries))
         }
 
 
@@ -122,6 +140,21 @@ class TaskLog:
         }
 
 
+# Живые логгеры: их буферы сбрасываются при выходе процесса
+_open_loggers: "weakref.WeakSet[TaskLogger]" = weakref.WeakSet()
+
+
+def _flush_open_loggers() -> None:
+    for task_logger in list(_open_loggers):
+        try:
+            task_logger.flush()
+        except Exception:
+            pass
+
+
+atexit.register(_flush_open_loggers)
+
+
 class TaskLogger:
     """
     Logger для задач агента.
@@ -138,11 +171,26 @@ class TaskLogger:
         agent_id: str,
         task_name: str,
         log_dir: Optional[Path] = None,
-        emit_to_console: bool = True
+        emit_to_console: bool = True,
+        flush_every: int = 32,
+        flush_interval: float = 1.0,
+        snapshot_interval: float = 30.0,
+        max_memory_entries: int = 500
     ):
+        """
+        Args:
+            flush_every: Сбрасывать буфер JSONL каждые N записей
+            flush_interval: ... и не позже чем через столько секунд (фоновый таймер)
+            snapshot_interval: Период снапшота task_log.json (секунды)
+            max_memory_entries: Сколько последних записей фазы держать в памяти
+        """
         self.agent_id = agent_id
         self.task_name = task_name
         self.emit_to_console = emit_to_console
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.snapshot_interval = snapshot_interval
+        self.max_memory_entries = max_memory_entries
 
         # Директория для логов
         if log_dir is None:
@@ -153,79 +201,211 @@ class TaskLogger:
         self.log_file = self.log_dir / self.LOG_FILE
         self.entries_file = self.log_dir / self.ENTRIES_FILE
 
-        # Загружаем или создаём лог
+        self._lock = threading.RLock()
+        self._pending: List[str] = []
+        self._entries_offset = 0  # Байт JSONL, уже записанных на диск
+        self._last_flush = time.monotonic()
+        self._last_snapshot = time.monotonic()
+        self._flush_timer: Optional[threading.Timer] = None
+
+        # Загружаем (снапшот + replay) или создаём лог
         self.data = self._load_or_create()
         self._tool_start_times: Dict[str, datetime] = {}
+        _open_loggers.add(self)
 
     def _timestamp(self) -> str:
         """Текущий timestamp в ISO формате."""
         return datetime.now(timezone.utc).isoformat()
 
+    def _new_phase(self, phase: str) -> PhaseStats:
+        return PhaseStats(phase=phase, entries=deque(maxlen=self.max_memory_entries))
+
     def _load_or_create(self) -> TaskLog:
-        """Загрузить существующий лог или создать новый."""
-        if self.log_file.exists():
-            try:
-                with open(self.log_file, encoding="utf-8") as f:
-                    data = json.load(f)
-
-                # Восстанавливаем PhaseStats
-                phases = {}
-                for phase_name, phase_data in data.get("phases", {}).items():
-                    phases[phase_name] = PhaseStats(
-                        phase=phase_data["phase"],
-                        status=phase_data.get("status", "pending"),
-                        started_at=phase_data.get("started_at"),
-                        completed_at=phase_data.get("completed_at"),
-                        tool_calls=phase_data.get("tool_calls", 0),
-                        errors=phase_data.get("errors", 0),
-                        warnings=phase_data.get("warnings", 0),
-                        entries=[]
-                    )
-
-                return TaskLog(
-                    agent_id=data["agent_id"],
-                    task_name=data["task_name"],
-                    created_at=data["created_at"],
-                    updated_at=data["updated_at"],
-                    current_phase=data.get("current_phase"),
-                    phases=phases,
-                    total_tool_calls=data.get("total_tool_calls", 0),
-                    total_errors=data.get("total_errors", 0),
-                    status=data.get("status", "running")
+        """Загрузить снапшот и доиграть записи JSONL после него (или создать новый лог)."""
+        data = self._load_snapshot()
+        entries_size = self.entries_file.stat().st_size if self.entries_file.exists() else 0
+
+        if data is None or self._entries_offset > entries_size:
+            # Нет снапшота (или JSONL пересоздан) - строим всё из JSONL
+            now = self._timestamp()
+            data = TaskLog(
+                agent_id=self.agent_id,
+                task_name=self.task_name,
+                created_at=now,
+                updated_at=now,
+                phases={phase.value: self._new_phase(phase.value) for phase in LogPhase}
+            )
+            self._entries_offset = 0
+
+        self.data = data
+        if entries_size > self._entries_offset:
+            self._replay(self._entries_offset, entries_size)
+        return data
+
+    def _load_snapshot(self) -> Optional[TaskLog]:
+        if not self.log_file.exists():
+            return None
+        try:
+            with open(self.log_file, encoding="utf-8") as f:
+                data = json.load(f)
+
+            # Восстанавливаем PhaseStats
+            phases = {}
+            for phase_name, phase_data in data.get("phases", {}).items():
+                phases[phase_name] = PhaseStats(
+                    phase=phase_data["phase"],
+                    status=phase_data.get("status", "pending"),
+                    started_at=phase_data.get("started_at"),
+                    completed_at=phase_data.get("completed_at"),
+                    tool_calls=phase_data.get("tool_calls", 0),
+                    errors=phase_data.get("errors", 0),
+                    warnings=phase_data.get("warnings", 0),
+                    entries=deque(maxlen=self.max_memory_entries),
+                    entries_count=phase_data.get("entries_count", 0)
                 )
-            except (json.JSONDecodeError, KeyError):
-                pass
-
-        # Создаём новый лог
-        now = self._timestamp()
-        phases = {phase.value: PhaseStats(phase=phase.value) for phase in LogPhase}
-
-        return TaskLog(
-            agent_id=self.agent_id,
-            task_name=self.task_name,
-            created_at=now,
-            updated_at=now,
-            phases=phases
-        )
+
+            self._entries_offset = data.get("entries_offset", 0)
+            return TaskLog(
+                agent_id=data["agent_id"],
+                task_name=data["task_name"],
+                created_at=data["created_at"],
+                updated_at=data["updated_at"],
+                current_phase=data.get("current_phase"),
+                phases=phases,
+                total_tool_calls=data.get("total_tool_calls", 0),
+                total_errors=data.get("total_errors", 0),
+                status=data.get("status", "running")
+            )
+        except (json.JSONDecodeError, KeyError):
+            self._entries_offset = 0
+            return None
+
+    def _replay(self, start: int, end: int) -> None:
+        """Применить записи JSONL из диапазона байт [start, end)."""
+        with open(self.entries_file, "rb") as f:
+            f.seek(start)
+            chunk = f.read(end - start)
+
+        # Недописанная последняя строка (падение процесса) игнорируется
+        complete = chunk.rfind(b"\n") + 1
+        for raw in chunk[:complete].splitlines():
+            try:
+                entry = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            self._apply(entry)
+            self.data.updated_at = entry.get("timestamp", self.data.updated_at)
+        self._entries_offset = start + complete
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        """Обновить агрегаты по записи (общий путь для live-логирования и replay)."""
+        phase_key = entry.get("phase")
+        phase = self.data.phases.get(phase_key)
+        entry_type = entry.get("type")
+
+        if phase is not None:
+            phase.entries.append(entry)
+            phase.entries_count += 1
+
+        if entry_type == LogEntryType.PHASE_START.value:
+            self.data.current_phase = phase_key
+            if phase is not None:
+                phase.status = "active"
+                phase.started_at = entry.get("timestamp")
+        elif entry_type == LogEntryType.PHASE_END.value:
+            if phase is not None:
+                phase.status = "failed" if entry.get("success") is False else "completed"
+                phase.completed_at = entry.get("timestamp")
+            if self.data.current_phase == phase_key:
+                self.data.current_phase = None
+        elif entry_type == LogEntryType.ERROR.value:
+            self.data.total_errors += 1
+            if phase is not None:
+                phase.errors += 1
+        elif entry_type == LogEntryType.TOOL_END.value:
+            self.data.total_tool_calls += 1
+            if phase is not None:
+                phase.tool_calls += 1
 
     def _save(self) -> None:
-        """Сохранить лог."""
-        self.data.updated_at = self._timestamp()
-        with open(self.log_file, "w", encoding="utf-8") as f:
-            json.dump(self.data.to_dict(), f, indent=2, ensure_ascii=False)
-
-    def _add_entry(self, entry: LogEntry) -> None:
-        """Добавить запись в лог."""
-        # Добавляем в фазу
-        phase_key = entry.phase
-        if phase_key in self.data.phases:
-            self.data.phases[phase_key].entries.append(entry.to_dict())
-
-        # Записываем в JSONL файл (append)
-        with open(self.entries_file, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry.to_dict(), ensure_ascii=False) + "\n")
+        """Сохранить снапшот агрегатов (атомарно)."""
+        with self._lock:
+            self._flush_pending()
+            self.data.updated_at = self._timestamp()
+            snapshot = self.data.to_dict()
+            snapshot["entries_offset"] = self._entries_offset
+
+            tmp_file = self.log_file.with_suffix(".json.tmp")
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_file, self.log_file)
+            self._last_snapshot = time.monotonic()
+
+    def _flush_pending(self) -> None:
+        if not self._pending:
+            return
+        data = "".join(self._pending).encode("utf-8")
+        self._pending.clear()
+        with open(self.entries_file, "ab") as f:
+            f.write(data)
+        self._entries_offset += len(data)
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        """Сбросить буфер записей в JSONL (без снапшота)."""
+        with self._lock:
+            self._flush_pending()
+
+    def _arm_flush_timer(self) -> None:
+        """Сбросить буфер через flush_interval, даже если новых записей не будет."""
+        if self._flush_timer is not None:
+            return
+        self._flush_timer = threading.Timer(self.flush_interval, self._on_flush_timer)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _on_flush_timer(self) -> None:
+        with self._lock:
+            self._flush_timer = None
+            if time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+                self._save()
+            else:
+                self._flush_pending()
+
+    def _add_entry(self, entry: LogEntry, snapshot: bool = False) -> None:
+        """
+        Добавить запись в лог.
 
-        self._save()
+        Запись буферизуется; снапшот пишется при snapshot=True
+        (переход фазы, ошибка) или по таймеру.
+        """
+        data = entry.to_dict()
+        with self._lock:
+            self._apply(data)
+            self._pending.append(json.dumps(data, ensure_ascii=False) + "\n")
+
+            now = time.monotonic()
+            if snapshot or now - self._last_snapshot >= self.snapshot_interval:
+                self._save()
+            elif len(self._pending) >= self.flush_every or now - self._last_flush >= self.flush_interval:
+                self._flush_pending()
+
+            if self._pending:
+                self._arm_flush_timer()
+
+    def iter_entries(self, phase: Optional[LogPhase] = None) -> Iterator[Dict[str, Any]]:
+        """Все записи лога из JSONL (включая вытесненные из памяти)."""
+        self.flush()
+        if not self.entries_file.exists():
+            return
+        with open(self.entries_file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if phase is None or entry.get("phase") == phase.value:
+                    yield entry
 
     def start_phase(self, phase: LogPhase, message: Optional[str] = None) -> None:
         """
@@ -236,14 +416,8 @@ class TaskLogger:
             message: Опциональное сообщение
         """
         phase_key = phase.value
-        self.data.current_phase = phase_key
 
-        # Обновляем статус фазы
-        if phase_key in self.data.phases:
-            self.data.phases[phase_key].status = "active"
-            self.data.phases[phase_key].started_at = self._timestamp()
-
-        # Добавляем запись
+        # Статус фазы и current_phase обновляются в _apply
         msg = message or f"Starting {phase_key} phase"
         entry = LogEntry(
             timestamp=self._timestamp(),
@@ -251,7 +425,7 @@ class TaskLogger:
             content=msg,
             phase=phase_key
         )
-        self._add_entry(entry)
+        self._add_entry(entry, snapshot=True)
 
         if self.emit_to_console:
             console.print(f"\n[bold cyan]>>> {msg}[/bold cyan]")
@@ -267,24 +441,16 @@ class TaskLogger:
         """
         phase_key = phase.value
 
-        # Обновляем статус
-        if phase_key in self.data.phases:
-            self.data.phases[phase_key].status = "completed" if success else "failed"
-            self.data.phases[phase_key].completed_at = self._timestamp()
-
-        # Добавляем запись
         status_text = "Completed" if success else "Failed"
         msg = message or f"{status_text} {phase_key} phase"
         entry = LogEntry(
             timestamp=self._timestamp(),
             type=LogEntryType.PHASE_END.value,
             content=msg,
-            phase=phase_key
+            phase=phase_key,
+            success=success
         )
-        self._add_entry(entry)
-
-        if phase == self.data.current_phase:
-            self.data.current_phase = None
+        self._add_entry(entry, snapshot=True)
 
         if self.emit_to_console:
             color = "green" if success else "red"
@@ -312,13 +478,8 @@ class TaskLogger:
             content=content,
             phase=phase_key
         )
-        self._add_entry(entry)
-
-        # Обновляем счётчики
-        if entry_type == LogEntryType.ERROR:
-            self.data.total_errors += 1
-            if phase_key in self.data.phases:
-                self.data.phases[phase_key].errors += 1
+        # Ошибки сразу попадают в снапшот
+        self._add_entry(entry, snapshot=entry_type == LogEntryType.ERROR)
 
         if self.emit_to_console:
             style = {
@@ -345,6 +506,26 @@ class TaskLogger:
         """Логировать предупреждение."""
         self.log(content, LogEntryType.WARNING)
 
+    def stream_text(self, content: str, phase: Optional[LogPhase] = None) -> None:
+        """
+        Записать кусок потокового вывода агента.
+
+        Вызывается TaskLogStreamWriter построчно, пока агент ещё генерирует
+        ответ; не влияет на счётчики ошибок/tool calls.
+        """
+        phase_key = (phase.value if phase else self.data.current_phase) or LogPhase.CODING.value
+
+        entry = LogEntry(
+            timestamp=self._timestamp(),
+            type=LogEntryType.STREAM.value,
+            content=content,
+            phase=phase_key
+        )
+        self._add_entry(entry)
+
+        if self.emit_to_console:
+            console.print(content, style="dim", markup=False)
+
     def tool_start(self, tool_name: str, tool_input: Optional[str] = None) -> None:
         """
         Логировать начало tool call.
@@ -400,11 +581,6 @@ class TaskLogger:
             start = self._tool_start_times.pop(tool_name)
             duration_ms = int((datetime.now(timezone.utc) - start).total_seconds() * 1000)
 
-        # Обновляем счётчики
-        self.data.total_tool_calls += 1
-        if phase_key in self.data.phases:
-            self.data.phases[phase_key].tool_calls += 1
-
         # Truncate result
         display_result = result
         if display_result and len(display_result) > 100:
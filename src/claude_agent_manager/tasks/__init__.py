@@ -2,11 +2,14 @@
 
 from .models import Task, TaskStatus, TaskPriority
 from .kanban import KanbanBoard, print_board
+from .store import TaskStore, TaskConflictError
 
 __all__ = [
     "Task",
     "TaskStatus",
     "TaskPriority",
     "KanbanBoard",
+    "TaskStore",
+    "TaskConflictError",
     "print_board"
 ]
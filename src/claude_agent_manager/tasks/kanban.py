@@ -21,10 +21,10 @@ Kanban Board для управления задачами агентов.
 
 from __future__ import annotations
 
-import json
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Optional, List, Dict
-from datetime import datetime
+from typing import Iterator, Optional, List, Dict, Tuple
+from datetime import datetime, timedelta
 
 from rich.console import Console
 from rich.table import Table
@@ -33,10 +33,39 @@ from rich.columns import Columns
 from rich.text import Text
 
 from .models import Task, TaskStatus, TaskPriority, TaskType
+from .store import TaskStore, TaskConflictError
 
 console = Console()
 
 
+class _TaskView(Mapping):
+    """Read-only dict-like view of the board (every read goes to TaskStore)."""
+
+    def __init__(self, store: TaskStore):
+        self._store = store
+
+    def __getitem__(self, task_id: str) -> Task:
+        task = self._store.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        return task
+
+    def __contains__(self, task_id: object) -> bool:
+        return isinstance(task_id, str) and self._store.exists(task_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.ids())
+
+    def __len__(self) -> int:
+        return self._store.count()
+
+    def values(self) -> List[Task]:
+        return self._store.all()
+
+    def items(self) -> List[Tuple[str, Task]]:
+        return [(t.id, t) for t in self._store.all()]
+
+
 class KanbanBoard:
     """
     Kanban доска для управления задачами.
@@ -46,10 +75,15 @@ class KanbanBoard:
     - Перемещение между статусами
     - Назначение агентов
     - Фильтрация и поиск
-    - Персистентность в JSON
+    - Персистентность в SQLite (.clod/kanban.sqlite, одна строка на задачу)
+
+    Изменения задач (move/start/complete/assign) - read-modify-write с
+    проверкой version: конкурирующие агенты не теряют обновления друг друга.
+    Старый kanban.json импортируется один раз при первом открытии.
     """
 
     BOARD_FILE = "kanban.json"
+    DB_FILE = "kanban.sqlite"
 
     def __init__(self, project_path: Path):
         self.project_path = project_path.resolve()
@@ -57,34 +91,17 @@ class KanbanBoard:
         self.board_dir.mkdir(parents=True, exist_ok=True)
         self.board_file = self.board_dir / self.BOARD_FILE
 
-        self.tasks: Dict[str, Task] = {}
-        self._load()
-
-    def _load(self) -> None:
-        """Загрузить доску из файла."""
-        if not self.board_file.exists():
-            return
-
-        try:
-            with open(self.board_file, encoding='utf-8') as f:
-                data = json.load(f)
-
-            for task_data in data.get('tasks', []):
-                task = Task.from_dict(task_data)
-                self.tasks[task.id] = task
-        except (json.JSONDecodeError, KeyError):
-            pass
-
-    def _save(self) -> None:
-        """Сохранить доску в файл."""
-        data = {
-            'version': '1.0',
-            'updated_at': datetime.now().isoformat(),
-            'tasks': [task.to_dict() for task in self.tasks.values()]
-        }
+        self.store = TaskStore(self.board_dir / self.DB_FILE)
+        self.store.import_json(self.board_file)
 
-        with open(self.board_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+    @property
+    def tasks(self) -> Mapping[str, Task]:
+        """Все задачи доски (id -> Task), читаются из хранилища."""
+        return _TaskView(self.store)
+
+    def close(self) -> None:
+        """Закрыть соединение с хранилищем."""
+        self.store.close()
 
     def create_task(
         self,
@@ -108,27 +125,35 @@ class KanbanBoard:
             Созданная Task
         """
         task = Task.create(title, description, priority, task_type, labels)
-        self.tasks[task.id] = task
-        self._save()
+        self.store.insert(task)
 
         console.print(f"[green]Created task: {task}[/green]")
         return task
 
     def get_task(self, task_id: str) -> Optional[Task]:
         """Получить задачу по ID."""
-        return self.tasks.get(task_id)
+        return self.store.get(task_id)
 
     def update_task(self, task: Task) -> None:
-        """Обновить задачу."""
+        """
+        Обновить задачу.
+
+        Raises:
+            TaskConflictError: задачу изменили после того, как она была прочитана
+        """
         task.updated_at = datetime.now().isoformat()
-        self.tasks[task.id] = task
-        self._save()
+        if task.version:
+            self.store.update(task)
+        elif self.store.exists(task.id):
+            # Задача получена не из хранилища - перезаписываем текущую версию
+            task.version = self.store.get(task.id).version
+            self.store.update(task)
+        else:
+            self.store.insert(task)
 
     def delete_task(self, task_id: str) -> bool:
         """Удалить задачу."""
-        if task_id in self.tasks:
-            del self.tasks[task_id]
-            self._save()
+        if self.store.delete(task_id):
             console.print(f"[red]Deleted task: {task_id}[/red]")
             return True
         return False
@@ -144,16 +169,18 @@ class KanbanBoard:
         Returns:
             Обновлённая Task или None
         """
-        task = self.get_task(task_id)
+        old_statuses = []
+
+        def change(task: Task) -> None:
+            old_statuses.append(task.status)
+            task.move_to(status)
+
+        task = self.store.mutate(task_id, change)
         if not task:
             console.print(f"[red]Task not found: {task_id}[/red]")
             return None
 
-        old_status = task.status
-        task.move_to(status)
-        self._save()
-
-        console.print(f"[cyan]Moved {task_id}: {old_status.value} → {status.value}[/cyan]")
+        console.print(f"[cyan]Moved {task_id}: {old_statuses[-1].value} → {status.value}[/cyan]")
         return task
 
     def start_task(self, task_id: str, agent_id: Optional[str] = None) -> Optional[Task]:
@@ -167,14 +194,11 @@ class KanbanBoard:
         Returns:
             Task или None
         """
-        task = self.get_task(task_id)
+        task = self.store.mutate(task_id, lambda t: t.start(agent_id))
         if not task:
             console.print(f"[red]Task not found: {task_id}[/red]")
             return None
 
-        task.start(agent_id)
-        self._save()
-
         agent_str = f" by {agent_id}" if agent_id else ""
         console.print(f"[green]Started task: {task}{agent_str}[/green]")
         return task
@@ -189,14 +213,11 @@ class KanbanBoard:
         Returns:
             Task или None
         """
-        task = self.get_task(task_id)
+        task = self.store.mutate(task_id, lambda t: t.complete())
         if not task:
             console.print(f"[red]Task not found: {task_id}[/red]")
             return None
 
-        task.complete()
-        self._save()
-
         duration = ""
         if task.actual_hours:
             duration = f" ({task.actual_hours:.1f}h)"
@@ -215,51 +236,44 @@ class KanbanBoard:
         Returns:
             Task или None
         """
-        task = self.get_task(task_id)
+        task = self.store.mutate(task_id, lambda t: t.assign(agent_id))
         if not task:
             console.print(f"[red]Task not found: {task_id}[/red]")
             return None
 
-        task.assign(agent_id)
-        self._save()
-
         console.print(f"[cyan]Assigned {task_id} to {agent_id}[/cyan]")
         return task
 
     def get_tasks_by_status(self, status: TaskStatus) -> List[Task]:
         """Получить задачи по статусу."""
-        return [t for t in self.tasks.values() if t.status == status]
+        return self.store.by_status(status)
 
     def get_tasks_by_agent(self, agent_id: str) -> List[Task]:
         """Получить задачи агента."""
-        return [t for t in self.tasks.values() if t.assigned_agent == agent_id]
+        return self.store.by_agent(agent_id)
 
     def get_tasks_by_priority(self, priority: TaskPriority) -> List[Task]:
         """Получить задачи по приоритету."""
-        return [t for t in self.tasks.values() if t.priority == priority]
+        return self.store.by_priority(priority)
 
     def search_tasks(self, query: str) -> List[Task]:
         """Поиск задач по тексту."""
-        query_lower = query.lower()
-        return [
-            t for t in self.tasks.values()
-            if query_lower in t.title.lower() or query_lower in t.description.lower()
-        ]
+        return self.store.search(query)
 
     def get_column_counts(self) -> Dict[TaskStatus, int]:
         """Получить количество задач по колонкам."""
         counts = {status: 0 for status in TaskStatus}
-        for task in self.tasks.values():
-            counts[task.status] += 1
+        for status, count in self.store.status_counts().items():
+            counts[TaskStatus(status)] = count
         return counts
 
     def get_stale_tasks(self) -> List[Task]:
         """Получить устаревшие задачи."""
-        return [t for t in self.tasks.values() if t.is_stale]
+        return self.store.stale()
 
     def get_blocked_tasks(self) -> List[Task]:
         """Получить заблокированные задачи."""
-        return [t for t in self.tasks.values() if t.is_blocked]
+        return self.store.blocked()
 
     def archive_completed(self, older_than_days: int = 30) -> int:
         """
@@ -271,20 +285,24 @@ class KanbanBoard:
         Returns:
             Количество архивированных
         """
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+
+        def archive(task: Task) -> None:
+            if task.status == TaskStatus.DONE:
+                task.status = TaskStatus.ARCHIVED
+
         count = 0
-        for task in self.tasks.values():
-            if task.status == TaskStatus.DONE and task.completed_at:
-                try:
-                    completed = datetime.fromisoformat(task.completed_at)
-                    days = (datetime.now() - completed).days
-                    if days > older_than_days:
-                        task.status = TaskStatus.ARCHIVED
-                        count += 1
-                except:
-                    pass
+        for task in self.store.done_before(cutoff):
+            try:
+                completed = datetime.fromisoformat(task.completed_at)
+            except (TypeError, ValueError):
+                continue
+            if (datetime.now() - completed).days > older_than_days:
+                updated = self.store.mutate(task.id, archive)
+                if updated and updated.status == TaskStatus.ARCHIVED:
+                    count += 1
 
         if count > 0:
-            self._save()
             console.print(f"[yellow]Archived {count} tasks[/yellow]")
 
         return count
@@ -292,13 +310,12 @@ class KanbanBoard:
     def get_summary(self) -> Dict:
         """Получить сводку по доске."""
         counts = self.get_column_counts()
-        total = len(self.tasks)
+        total = sum(counts.values())
         done = counts.get(TaskStatus.DONE, 0)
         in_progress = counts.get(TaskStatus.IN_PROGRESS, 0)
 
         # Средняя длительность завершённых задач
-        completed_tasks = [t for t in self.tasks.values() if t.actual_hours]
-        avg_hours = sum(t.actual_hours for t in completed_tasks) / len(completed_tasks) if completed_tasks else 0
+        avg_hours = self.store.avg_actual_hours()
 
         return {
             "total_tasks": total,
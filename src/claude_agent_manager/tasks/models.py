@@ -62,6 +62,7 @@ class Task:
     completed_at: Optional[str] = None
     estimated_hours: Optional[float] = None
     actual_hours: Optional[float] = None
+    version: int = 0  # Версия строки в хранилище (оптимистичная блокировка)
 
     def to_dict(self) -> dict:
         result = asdict(self)
@@ -90,7 +91,8 @@ class Task:
             started_at=data.get('started_at'),
             completed_at=data.get('completed_at'),
             estimated_hours=data.get('estimated_hours'),
-            actual_hours=data.get('actual_hours')
+            actual_hours=data.get('actual_hours'),
+            version=data.get('version', 0)
         )
 
     @classmethod
@@ -0,0 +1,344 @@
+"""
+SQLite-хранилище задач Kanban.
+
+Каждая задача - отдельная строка (обновление не переписывает доску),
+индексы по статусу/агенту/приоритету, полнотекстовый поиск (FTS5 trigram)
+и оптимистичная блокировка по столбцу version: UPDATE проходит только
+если строку никто не изменил после чтения.
+
+Использование:
+    from claude_agent_manager.tasks.store import TaskStore
+
+    store = TaskStore(project_path / ".clod" / "kanban.sqlite")
+    store.import_json(project_path / ".clod" / "kanban.json")   # один раз
+    store.mutate(task_id, lambda t: t.move_to(TaskStatus.DONE))
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import fields
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .models import Task, TaskStatus, TaskPriority
+
+
+SCHEMA = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+
+CREATE TABLE IF NOT EXISTS tasks (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  description TEXT NOT NULL DEFAULT '',
+  status TEXT NOT NULL,
+  priority TEXT NOT NULL,
+  priority_rank INTEGER NOT NULL,
+  task_type TEXT NOT NULL,
+  assigned_agent TEXT,
+  labels TEXT NOT NULL DEFAULT '[]',
+  affected_files TEXT NOT NULL DEFAULT '[]',
+  subtasks TEXT NOT NULL DEFAULT '[]',
+  parent_id TEXT,
+  worktree_path TEXT,
+  created_at TEXT,
+  updated_at TEXT,
+  started_at TEXT,
+  completed_at TEXT,
+  estimated_hours REAL,
+  actual_hours REAL,
+  version INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, priority_rank);
+CREATE INDEX IF NOT EXISTS idx_tasks_agent ON tasks(assigned_agent);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority_rank);
+CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks(updated_at);
+
+CREATE TABLE IF NOT EXISTS meta (
+  key TEXT PRIMARY KEY,
+  value TEXT
+);
+"""
+
+# Внешний FTS-индекс по title/description, синхронизируется триггерами
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+  title, description, content='tasks', content_rowid='rowid', tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+  INSERT INTO tasks_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+  INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN
+  INSERT INTO tasks_fts(tasks_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+  INSERT INTO tasks_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+"""
+
+# Меньший rank - выше приоритет
+PRIORITY_RANK = {
+    TaskPriority.URGENT: 0,
+    TaskPriority.HIGH: 1,
+    TaskPriority.MEDIUM: 2,
+    TaskPriority.LOW: 3,
+}
+
+LIST_COLUMNS = ("labels", "affected_files", "subtasks")
+TASK_COLUMNS = tuple(f.name for f in fields(Task))
+
+# Trigram-индекс ищет подстроки от 3 символов
+FTS_MIN_QUERY = 3
+
+
+class TaskConflictError(Exception):
+    """Задачу изменили с момента чтения (не совпала version)."""
+    pass
+
+
+class TaskStore:
+    """Хранилище задач в SQLite (WAL, одна строка на задачу)."""
+
+    def __init__(self, db_path: Path, timeout: float = 10.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite без FTS5 / trigram - поиск полным перебором
+            self.has_fts = False
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        """Транзакция на запись (BEGIN IMMEDIATE - блокировка сразу, без deadlock на upgrade)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # =========================================================================
+    # МАППИНГ
+    # =========================================================================
+
+    @staticmethod
+    def _to_row(task: Task) -> Dict:
+        row = task.to_dict()
+        for name in LIST_COLUMNS:
+            row[name] = json.dumps(row[name], ensure_ascii=False)
+        row["priority_rank"] = PRIORITY_RANK.get(task.priority, len(PRIORITY_RANK))
+        return row
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Task:
+        data = {name: row[name] for name in TASK_COLUMNS}
+        for name in LIST_COLUMNS:
+            data[name] = json.loads(data[name] or "[]")
+        return Task.from_dict(data)
+
+    def _select(self, where: str = "", params=(), order: str = "rowid") -> List[Task]:
+        sql = "SELECT * FROM tasks"
+        if where:
+            sql += f" WHERE {where}"
+        return [self._from_row(r) for r in self._query(f"{sql} ORDER BY {order}", params)]
+
+    # =========================================================================
+    # CRUD
+    # =========================================================================
+
+    def insert(self, task: Task) -> Task:
+        """Добавить задачу (version = 1)."""
+        task.version = 1
+        row = self._to_row(task)
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{name}" for name in row)
+        with self._tx() as conn:
+            conn.execute(f"INSERT INTO tasks ({columns}) VALUES ({placeholders})", row)
+        return task
+
+    def get(self, task_id: str) -> Optional[Task]:
+        rows = self._query("SELECT * FROM tasks WHERE id = ?", (task_id,))
+        return self._from_row(rows[0]) if rows else None
+
+    def exists(self, task_id: str) -> bool:
+        return bool(self._query("SELECT 1 FROM tasks WHERE id = ?", (task_id,)))
+
+    def ids(self) -> List[str]:
+        return [r[0] for r in self._query("SELECT id FROM tasks ORDER BY rowid")]
+
+    def count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM tasks")[0][0]
+
+    def all(self) -> List[Task]:
+        return self._select()
+
+    def update(self, task: Task) -> Task:
+        """
+        Записать задачу, если её version не изменилась с момента чтения.
+
+        Raises:
+            TaskConflictError: строку уже обновил кто-то другой
+            KeyError: задачи нет
+        """
+        row = self._to_row(task)
+        expected = row.pop("version")
+        row.pop("id")
+        assignments = ", ".join(f"{name} = :{name}" for name in row)
+        with self._tx() as conn:
+            cur = conn.execute(
+                f"UPDATE tasks SET {assignments}, version = version + 1 "
+                f"WHERE id = :id AND version = :expected",
+                {**row, "id": task.id, "expected": expected},
+            )
+            if cur.rowcount == 0:
+                if conn.execute("SELECT 1 FROM tasks WHERE id = ?", (task.id,)).fetchone():
+                    raise TaskConflictError(f"Task {task.id} was modified concurrently")
+                raise KeyError(task.id)
+        task.version = expected + 1
+        return task
+
+    def mutate(self, task_id: str, change: Callable[[Task], None], retries: int = 5) -> Optional[Task]:
+        """
+        Прочитать задачу, применить change и записать (повтор при конфликте).
+
+        Returns:
+            Обновлённая Task или None, если задачи нет
+        """
+        for attempt in range(retries + 1):
+            task = self.get(task_id)
+            if task is None:
+                return None
+            change(task)
+            try:
+                return self.update(task)
+            except TaskConflictError:
+                if attempt == retries:
+                    raise
+            except KeyError:
+                return None
+        return None
+
+    def delete(self, task_id: str) -> bool:
+        with self._tx() as conn:
+            return conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount > 0
+
+    # =========================================================================
+    # ЗАПРОСЫ (по индексам)
+    # =========================================================================
+
+    def by_status(self, status: TaskStatus) -> List[Task]:
+        return self._select("status = ?", (status.value,))
+
+    def by_agent(self, agent_id: str) -> List[Task]:
+        return self._select("assigned_agent = ?", (agent_id,))
+
+    def by_priority(self, priority: TaskPriority) -> List[Task]:
+        return self._select("priority_rank = ?", (PRIORITY_RANK[priority],))
+
+    def status_counts(self) -> Dict[str, int]:
+        return {r[0]: r[1] for r in self._query("SELECT status, COUNT(*) FROM tasks GROUP BY status")}
+
+    def search(self, query: str) -> List[Task]:
+        """Поиск подстроки в title/description без учёта регистра."""
+        query_lower = query.lower()
+        if self.has_fts and len(query) >= FTS_MIN_QUERY:
+            phrase = '"' + query.replace('"', '""') + '"'
+            candidates = self._select(
+                "rowid IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)", (phrase,)
+            )
+        else:
+            candidates = self.all()
+        # FTS - предфильтр; точная семантика - как у прежнего поиска по подстроке
+        return [
+            t for t in candidates
+            if query_lower in t.title.lower() or query_lower in t.description.lower()
+        ]
+
+    def blocked(self) -> List[Task]:
+        return [t for t in self._select("labels LIKE ?", ('%"blocked"%',)) if t.is_blocked]
+
+    def stale(self) -> List[Task]:
+        cutoff = (datetime.now() - timedelta(days=7)).isoformat()
+        candidates = self._select(
+            "updated_at < ? AND status NOT IN (?, ?)",
+            (cutoff, TaskStatus.DONE.value, TaskStatus.ARCHIVED.value),
+        )
+        return [t for t in candidates if t.is_stale]
+
+    def done_before(self, cutoff: str) -> List[Task]:
+        return self._select("status = ? AND completed_at < ?", (TaskStatus.DONE.value, cutoff))
+
+    def avg_actual_hours(self) -> float:
+        value = self._query("SELECT AVG(actual_hours) FROM tasks WHERE actual_hours > 0")[0][0]
+        return value or 0
+
+    # =========================================================================
+    # ИМПОРТ
+    # =========================================================================
+
+    def import_json(self, json_path: Path) -> int:
+        """
+        Однократно импортировать задачи из старого kanban.json.
+
+        Повторный вызов ничего не делает (отметка в таблице meta);
+        задачи с уже существующим id пропускаются. Файл не удаляется.
+
+        Returns:
+            Количество импортированных задач
+        """
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+
+        with self._tx() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'imported_json'").fetchone():
+                return 0
+
+            try:
+                data = json.loads(json_path.read_text(encoding="utf-8"))
+                tasks = [Task.from_dict(t) for t in data.get("tasks", [])]
+            except (json.JSONDecodeError, KeyError, ValueError):
+                tasks = []
+
+            imported = 0
+            for task in tasks:
+                task.version = 1
+                row = self._to_row(task)
+                columns = ", ".join(row)
+                placeholders = ", ".join(f":{name}" for name in row)
+                cur = conn.execute(f"INSERT OR IGNORE INTO tasks ({columns}) VALUES ({placeholders})", row)
+                imported += cur.rowcount
+
+            conn.execute(
+                "INSERT INTO meta(key, value) VALUES ('imported_json', ?)",
+                (json.dumps({"path": str(json_path), "tasks": imported, "at": datetime.now().isoformat()}),),
+            )
+        return imported
@@ -14,15 +14,23 @@ from __future__ import annotations
 
 import asyncio
 import json
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union, TYPE_CHECKING
 from enum import Enum
 
 from anthropic import Anthropic
 
+from ..streaming import StreamEventType
+from ..context.packer import pack_task_context
+
+if TYPE_CHECKING:
+    from ..streaming import StreamBus
+    from ..monitoring.metrics import MetricsCollector
+
 
 class MessageRole(Enum):
     """Роли сообщений (как в AutoGen)."""
@@ -66,6 +74,11 @@ class AgentConfig:
     can_execute_code: bool = True
     max_consecutive_replies: int = 10
     mcp_tools: List[str] = None  # List of enabled MCP tools
+    max_turns: int = 8  # Max LLM round-trips per reply (tool loop)
+    max_total_tokens: Optional[int] = None  # Token budget per reply (input + output)
+    tool_timeout: float = 60.0  # Per-tool timeout in seconds
+    prompt_cache: bool = True  # Mark stable prompt prefix with cache_control
+    context_token_budget: Optional[int] = 4000  # None = dump full context as JSON
 
     # Model name mapping (short -> full API name)
     MODEL_MAPPING = {
@@ -202,6 +215,11 @@ MCP_TOOL_SCHEMAS = {
 }
 
 
+# Tools that mutate the worktree or external state. They act as barriers:
+# read-only calls around them run concurrently, these run one at a time.
+SERIAL_TOOLS = {"write_file", "execute_code", "github_operation", "slack_message"}
+
+
 def get_tools_for_agent(mcp_tools: List[str]) -> List[dict]:
     """Get tool schemas for the agent's enabled MCP tools."""
     tools = []
@@ -216,6 +234,33 @@ def get_tools_for_agent(mcp_tools: List[str]) -> List[dict]:
     return tools
 
 
+@dataclass
+class TurnStats:
+    """Статистика одного хода агентного цикла (LLM call + tools)."""
+    turn: int
+    latency_ms: int
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tool_calls: int = 0
+    tool_latency_ms: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    stop_reason: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "turn": self.turn,
+            "latency_ms": self.latency_ms,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_creation_input_tokens": self.cache_creation_input_tokens,
+            "cache_read_input_tokens": self.cache_read_input_tokens,
+            "tool_calls": self.tool_calls,
+            "tool_latency_ms": self.tool_latency_ms,
+            "stop_reason": self.stop_reason,
+        }
+
+
 class ReplyTrigger:
     """
     Триггер для кастомных ответов (из AutoGen register_reply pattern).
@@ -257,7 +302,7 @@ class BaseAgent(ABC):
     - Работает в изолированном worktree
     """
 
-    def __init__(self, config: AgentConfig):
+    def __init__(self, config: AgentConfig, metrics: Optional['MetricsCollector'] = None):
         self.config = config
         self.name = config.name
         self.role = config.role
@@ -280,6 +325,22 @@ class BaseAgent(ABC):
         # Артефакты (выходные данные)
         self.artifacts: Dict[str, Any] = {}
 
+        # Метрики (опционально) и статистика использования
+        self.metrics = metrics
+        self.usage: Dict[str, int] = {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "turns": 0,
+            "tool_calls": 0,
+        }
+        self.last_turns: List[TurnStats] = []
+
+        # Потоковый вывод (опционально): token-события в StreamBus
+        self.stream_bus: Optional['StreamBus'] = None
+        self.stream_id: Optional[str] = None
+
     def register_reply(
         self,
         trigger: Union[str, Callable[[Message], bool]],
@@ -341,14 +402,8 @@ class BaseAgent(ABC):
         context: Optional[Dict[str, Any]] = None
     ) -> str:
         """Вызов Claude API с поддержкой MCP tools."""
-        # Формируем system prompt с контекстом
-        system = self.system_prompt
-
-        if context:
-            system += f"\n\nAdditional context:\n{json.dumps(context, indent=2)}"
-
-        if self.worktree_path:
-            system += f"\n\nYour working directory: {self.worktree_path}"
+        query = messages[-1].content if messages else ""
+        system = self._build_system_blocks(context, query)
 
         # Конвертируем сообщения
         api_messages = [m.to_api_format() for m in messages]
@@ -365,20 +420,125 @@ class BaseAgent(ABC):
                 "model": api_model,
                 "max_tokens": self.config.max_tokens,
                 "system": system,
-                "messages": api_messages,
                 "temperature": self.config.temperature
             }
 
             # Add tools if available
             if tools:
-                api_params["tools"] = tools
+                api_params["tools"] = self._mark_cacheable_tools(tools)
 
-            response = self.client.messages.create(**api_params)
+            return await self._run_tool_loop(api_params, api_messages)
 
-            # Handle response - might be text or tool_use
-            result_parts = []
-            tool_calls = []
+        except Exception as e:
+            return f"ERROR: Failed to generate reply: {str(e)}"
 
+    # =========================================================================
+    # PROMPT CACHING
+    # =========================================================================
+
+    def _build_system_blocks(
+        self,
+        context: Optional[Dict[str, Any]] = None,
+        query: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        System prompt в виде блоков в стабильном порядке.
+
+        Роль и рабочая директория не меняются между вызовами агента и
+        образуют кэшируемый префикс; контекст задачи идёт после него.
+        С context_token_budget контекст упаковывается ContextPacker'ом
+        (ранжирование по релевантности query), иначе - JSON с sort_keys.
+        """
+        stable = self.system_prompt or ""
+        if self.worktree_path:
+            stable += f"\n\nYour working directory: {self.worktree_path}"
+
+        blocks: List[Dict[str, Any]] = [{"type": "text", "text": stable}]
+        if self.config.prompt_cache:
+            blocks[0]["cache_control"] = {"type": "ephemeral"}
+
+        if context:
+            if self.config.context_token_budget:
+                packed = pack_task_context(context, query, self.config.context_token_budget)
+            else:
+                packed = json.dumps(context, indent=2, sort_keys=True, default=str)
+            if packed:
+                blocks.append({"type": "text", "text": f"Additional context:\n{packed}"})
+
+        return blocks
+
+    def _mark_cacheable_tools(self, tools: List[dict]) -> List[dict]:
+        """Пометить последний tool cache_control (tools идут в префиксе до system)."""
+        if not self.config.prompt_cache or not tools:
+            return tools
+        marked = list(tools)
+        marked[-1] = {**marked[-1], "cache_control": {"type": "ephemeral"}}
+        return marked
+
+    def _mark_cacheable_history(self, api_messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Копия сообщений с cache_control на последнем блоке.
+
+        В цикле tool_use каждый ход пересылает всю историю, поэтому
+        точка кэша сдвигается на конец - старые маркеры не накапливаются
+        (API допускает не больше 4 breakpoints).
+        """
+        if not self.config.prompt_cache or not api_messages:
+            return api_messages
+
+        last = api_messages[-1]
+        content = last["content"]
+        if isinstance(content, str):
+            blocks = [{"type": "text", "text": content}]
+        else:
+            blocks = list(content)
+        if not blocks or not isinstance(blocks[-1], dict):
+            return api_messages
+
+        blocks[-1] = {**blocks[-1], "cache_control": {"type": "ephemeral"}}
+        return api_messages[:-1] + [{**last, "content": blocks}]
+
+    async def _run_tool_loop(
+        self,
+        api_params: Dict[str, Any],
+        api_messages: List[Dict[str, Any]]
+    ) -> str:
+        """
+        Агентный цикл: LLM -> tool_use -> tool_result -> LLM ...
+
+        Останавливается когда модель не запрашивает инструменты,
+        исчерпан max_turns или бюджет токенов max_total_tokens.
+        """
+        result_parts = []
+        tokens_used = 0
+        self.last_turns = []
+
+        for turn in range(1, self.config.max_turns + 1):
+            budget = self.config.max_total_tokens
+            if budget is not None and tokens_used >= budget:
+                break
+
+            started = time.perf_counter()
+            # SDK client is synchronous - keep the event loop free for other agents
+            response = await asyncio.to_thread(
+                self._create_message,
+                {**api_params, "messages": self._mark_cacheable_history(api_messages)}
+            )
+            stats = TurnStats(
+                turn=turn,
+                latency_ms=int((time.perf_counter() - started) * 1000),
+                stop_reason=getattr(response, "stop_reason", None)
+            )
+
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                stats.input_tokens = getattr(usage, "input_tokens", 0) or 0
+                stats.output_tokens = getattr(usage, "output_tokens", 0) or 0
+                stats.cache_creation_input_tokens = getattr(usage, "cache_creation_input_tokens", 0) or 0
+                stats.cache_read_input_tokens = getattr(usage, "cache_read_input_tokens", 0) or 0
+            tokens_used += stats.input_tokens + stats.output_tokens
+
+            tool_calls = []
             for block in response.content:
                 if block.type == "text":
                     result_parts.append(block.text)
@@ -389,11 +549,16 @@ class BaseAgent(ABC):
                         "input": block.input
                     })
 
-            # If there are tool calls, execute them and continue
-            if tool_calls:
+            # Tools are only worth running if another turn can consume the results
+            has_next_turn = turn < self.config.max_turns and (
+                budget is None or tokens_used < budget
+            )
+            if tool_calls and has_next_turn:
+                tools_started = time.perf_counter()
                 tool_results = await self._execute_tool_calls(tool_calls)
+                stats.tool_calls = len(tool_calls)
+                stats.tool_latency_ms = int((time.perf_counter() - tools_started) * 1000)
 
-                # Add assistant message with tool use and tool results
                 api_messages.append({
                     "role": "assistant",
                     "content": response.content
@@ -403,47 +568,140 @@ class BaseAgent(ABC):
                     "content": tool_results
                 })
 
-                # Make another API call with tool results
-                continuation = self.client.messages.create(**{
-                    **api_params,
-                    "messages": api_messages
-                })
+            await self._record_turn(stats)
 
-                for block in continuation.content:
-                    if block.type == "text":
-                        result_parts.append(block.text)
+            if not stats.tool_calls:
+                break
 
-            return "\n".join(result_parts) if result_parts else ""
+        return "\n".join(result_parts) if result_parts else ""
 
-        except Exception as e:
-            return f"ERROR: Failed to generate reply: {str(e)}"
+    def _create_message(self, params: Dict[str, Any]) -> Any:
+        """
+        Один запрос к Messages API (выполняется в worker-потоке).
+
+        С подключённым stream_bus ответ стримится: текстовые дельты сразу
+        публикуются как token-события, а возвращается то же итоговое
+        сообщение, что и без стриминга.
+        """
+        if not self.stream_bus:
+            return self.client.messages.create(**params)
+
+        with self.client.messages.stream(**params) as stream:
+            for text in stream.text_stream:
+                self.stream_bus.emit(StreamEventType.TOKEN, self.name, self.stream_id, text)
+            return stream.get_final_message()
+
+    async def _record_turn(self, stats: TurnStats):
+        """Учёт хода в usage и MetricsCollector (если подключён)."""
+        self.last_turns.append(stats)
+        self.usage["input_tokens"] += stats.input_tokens
+        self.usage["output_tokens"] += stats.output_tokens
+        self.usage["cache_creation_input_tokens"] += stats.cache_creation_input_tokens
+        self.usage["cache_read_input_tokens"] += stats.cache_read_input_tokens
+        self.usage["turns"] += 1
+        self.usage["tool_calls"] += stats.tool_calls
+
+        if not self.metrics:
+            return
+
+        # MetricsCollector пишет в SQLite синхронно - не блокируем event loop
+        try:
+            await asyncio.to_thread(self._write_turn_metrics, stats)
+        except Exception:
+            pass  # Metrics must never break the agent
+
+    def _write_turn_metrics(self, stats: TurnStats):
+        from ..monitoring.metrics import MetricType
+
+        self.metrics.record(
+            self.name,
+            MetricType.LATENCY,
+            value=stats.latency_ms,
+            metadata=stats.to_dict()
+        )
+        self.metrics.record_token_usage(
+            self.name,
+            stats.input_tokens,
+            stats.output_tokens,
+            cache_read_tokens=stats.cache_read_input_tokens,
+            cache_write_tokens=stats.cache_creation_input_tokens
+        )
 
     async def _execute_tool_calls(self, tool_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Execute MCP tool calls and return results."""
-        results = []
+        """
+        Execute MCP tool calls and return results in the original order.
+
+        Consecutive read-only calls run concurrently via asyncio.gather;
+        SERIAL_TOOLS act as barriers and run on their own.
+        """
+        results: List[Dict[str, Any]] = []
+        batch: List[Dict[str, Any]] = []
 
         for call in tool_calls:
-            tool_name = call["name"]
-            tool_input = call["input"]
-            tool_id = call["id"]
+            if call["name"] in SERIAL_TOOLS:
+                if batch:
+                    results.extend(await asyncio.gather(*(self._run_tool_call(c) for c in batch)))
+                    batch = []
+                results.append(await self._run_tool_call(call))
+            else:
+                batch.append(call)
 
-            try:
-                result = await self._execute_single_tool(tool_name, tool_input)
-                results.append({
-                    "type": "tool_result",
-                    "tool_use_id": tool_id,
-                    "content": json.dumps(result) if isinstance(result, dict) else str(result)
-                })
-            except Exception as e:
-                results.append({
-                    "type": "tool_result",
-                    "tool_use_id": tool_id,
-                    "content": f"Error executing {tool_name}: {str(e)}",
-                    "is_error": True
-                })
+        if batch:
+            results.extend(await asyncio.gather(*(self._run_tool_call(c) for c in batch)))
 
         return results
 
+    async def _run_tool_call(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one tool call with timeout and convert it to a tool_result block."""
+        tool_name = call["name"]
+        tool_id = call["id"]
+        started = time.perf_counter()
+        success = True
+
+        if self.stream_bus:
+            self.stream_bus.emit(StreamEventType.TOOL, self.name, self.stream_id, f"[{tool_name}]")
+
+        try:
+            result = await asyncio.wait_for(
+                self._execute_single_tool(tool_name, call["input"]),
+                timeout=self.config.tool_timeout
+            )
+            block = {
+                "type": "tool_result",
+                "tool_use_id": tool_id,
+                "content": json.dumps(result) if isinstance(result, dict) else str(result)
+            }
+        except asyncio.TimeoutError:
+            success = False
+            block = {
+                "type": "tool_result",
+                "tool_use_id": tool_id,
+                "content": f"Error executing {tool_name}: timed out after {self.config.tool_timeout}s",
+                "is_error": True
+            }
+        except Exception as e:
+            success = False
+            block = {
+                "type": "tool_result",
+                "tool_use_id": tool_id,
+                "content": f"Error executing {tool_name}: {str(e)}",
+                "is_error": True
+            }
+
+        if self.metrics:
+            try:
+                await asyncio.to_thread(
+                    self.metrics.record_tool_call,
+                    self.name,
+                    tool_name,
+                    duration_ms=int((time.perf_counter() - started) * 1000),
+                    success=success
+                )
+            except Exception:
+                pass
+
+        return block
+
     async def _execute_single_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> Any:
         """Execute a single MCP tool."""
         # Memory tools
@@ -531,7 +789,7 @@ class BaseAgent(ABC):
         try:
             file_path = base_path / path if not Path(path).is_absolute() else Path(path)
             if file_path.exists():
-                content = file_path.read_text(encoding='utf-8')
+                content = await asyncio.to_thread(file_path.read_text, encoding='utf-8')
                 return {"path": str(file_path), "content": content}
             return {"error": f"File not found: {path}"}
         except Exception as e:
@@ -546,7 +804,7 @@ class BaseAgent(ABC):
         try:
             file_path = base_path / path if not Path(path).is_absolute() else Path(path)
             file_path.parent.mkdir(parents=True, exist_ok=True)
-            file_path.write_text(content, encoding='utf-8')
+            await asyncio.to_thread(file_path.write_text, content, encoding='utf-8')
             return {"status": "written", "path": str(file_path), "bytes": len(content)}
         except Exception as e:
             return {"error": str(e)}
@@ -561,9 +819,11 @@ class BaseAgent(ABC):
         code = input.get("code")
         timeout = input.get("timeout", 30)
 
+        import subprocess
+
         try:
-            import subprocess
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 ["python", "-c", code],
                 capture_output=True,
                 text=True,
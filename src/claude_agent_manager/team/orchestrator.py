@@ -24,7 +24,7 @@ import json
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING
 from enum import Enum
 
 from rich.console import Console
@@ -41,10 +41,20 @@ from .shared_context import SharedContext, AgentUpdate, SharedInterface
 from .task import Task, TaskStatus, TaskOutput, TaskBuilder, topological_sort, get_parallel_groups
 from .base_agent import BaseAgent, AgentConfig
 from .roles import create_agent, get_role_dependencies, get_available_roles
-from .git_operations import GitOperations, MergeResult
+from .git_operations import GitOperations
+from ..git.conflict_resolver import ConflictResolver
+from ..git.merge_queue import MergeQueue, MergeQueueError
+from ..worktree_manager import WorktreeManager
 from .quality_gates import QualityGates, QualityGateEnforcer, QualityStatus
 from .prompts import get_prompt_for_role, CLARIFICATION_PROMPT
 
+from ..streaming import StreamEventType, TaskLogStreamWriter
+from ..task_logger import TaskLogger, LogPhase
+
+if TYPE_CHECKING:
+    from ..monitoring.metrics import MetricsCollector
+    from ..streaming import StreamBus
+
 console = Console()
 
 
@@ -106,7 +116,9 @@ class TeamOrchestrator:
         max_parallel: int = 3,
         auto_merge: bool = True,
         quality_gates: bool = True,
-        model: str = "auto"
+        model: str = "auto",
+        metrics: Optional['MetricsCollector'] = None,
+        stream_bus: Optional['StreamBus'] = None
     ):
         self.project_path = Path(project_path).resolve()
         self.max_parallel = max_parallel
@@ -123,9 +135,11 @@ class TeamOrchestrator:
         if self.is_git_repo:
             self.git = GitOperations(self.project_path)
             self.base_branch = self.git.get_base_branch()
+            self.worktree_manager = WorktreeManager(self.project_path)
         else:
             self.git = None
             self.base_branch = None
+            self.worktree_manager = None
             console.print("[yellow]Note: Not a git repository. Working in local mode (no worktrees/branches).[/yellow]")
 
         # Shared context
@@ -144,6 +158,12 @@ class TeamOrchestrator:
         # Claude client
         self.client = Anthropic()
 
+        # Метрики агентов (per-turn latency/tokens, tool calls)
+        self.metrics = metrics
+
+        # Потоковый вывод агентов (токены -> TaskLogger / WebSocket / Tk)
+        self.stream_bus = stream_bus
+
         # Состояние
         self.plan: Optional[TeamPlan] = None
         self.agents: Dict[str, BaseAgent] = {}
@@ -368,44 +388,46 @@ Output ONLY valid JSON, no explanations."""
     # =========================================================================
 
     def setup_worktree(self, task: Task) -> Path:
-        """Создать worktree для задачи (или работать локально если не git repo)."""
+        """
+        Создать worktree для задачи (или работать локально если не git repo).
+
+        Если у задачи задан scope - sparse checkout только этих путей;
+        освобождённые worktrees прошлых задач переиспользуются.
+        """
         # Если не git репозиторий - работаем прямо в project_path
-        if not self.is_git_repo or not self.git:
+        if not self.is_git_repo or not self.worktree_manager:
             task.worktree_path = self.project_path
             task.branch = None
             return self.project_path
 
-        worktree_dir = self.project_path / ".worktrees"
-        worktree_dir.mkdir(exist_ok=True)
-
-        worktree_path = worktree_dir / task.id
-        branch_name = f"agent/{task.role}/{task.id}"
+        worktree_path = self.worktree_manager.get_worktree_path(task.role, task.id)
 
         if worktree_path.exists():
             # Уже существует
             return worktree_path
 
         try:
-            self.git.create_worktree(worktree_path, branch_name, self.base_branch)
-            self.worktrees[task.id] = worktree_path
-            task.worktree_path = worktree_path
-            task.branch = branch_name
-            console.print(f"[green]Created worktree: {worktree_path}[/green]")
-            return worktree_path
+            worktree = self.worktree_manager.create_task_worktree(
+                task.role, task.id, self.base_branch, scope=task.scope or None
+            )
+            self.worktrees[task.id] = worktree.path
+            task.worktree_path = worktree.path
+            task.branch = worktree.branch_name
+            return worktree.path
         except Exception as e:
             console.print(f"[red]Failed to create worktree: {e}[/red]")
             # Fallback - работаем в основном репозитории
             return self.project_path
 
     def cleanup_worktrees(self):
-        """Очистить worktrees."""
-        if not self.is_git_repo or not self.git:
+        """Очистить worktrees (в пул для переиспользования, ветки остаются)."""
+        if not self.is_git_repo or not self.worktree_manager:
             return  # Нечего чистить в локальном режиме
 
         for task_id, path in self.worktrees.items():
             try:
-                self.git.remove_worktree(path)
-                console.print(f"[dim]Removed worktree: {path}[/dim]")
+                self.worktree_manager.recycle_worktree(path, delete_branch=False)
+                console.print(f"[dim]Released worktree: {path}[/dim]")
             except Exception:
                 pass
         self.worktrees.clear()
@@ -426,6 +448,13 @@ Output ONLY valid JSON, no explanations."""
             shared_context=self.shared_context
         )
 
+        if self.metrics and getattr(agent, "metrics", None) is None:
+            agent.metrics = self.metrics
+
+        if self.stream_bus:
+            agent.stream_bus = self.stream_bus
+            agent.stream_id = task.id
+
         task.agent = agent
         self.agents[task.id] = agent
 
@@ -460,6 +489,8 @@ Output ONLY valid JSON, no explanations."""
 
         console.print(f"[cyan]{task.role}[/cyan] started: {task.description[:60]}...")
 
+        stream_writer = self._start_task_stream(task)
+
         try:
             # Получаем контекст от зависимостей (CrewAI pattern)
             context = task.get_context_output()
@@ -506,8 +537,6 @@ Output ONLY valid JSON, no explanations."""
 
             console.print(f"[green]?[/green] {task.role} completed: {task.id}")
 
-            return output
-
         except Exception as e:
             task.status = TaskStatus.FAILED
             task.error = str(e)
@@ -521,8 +550,67 @@ Output ONLY valid JSON, no explanations."""
             ))
 
             console.print(f"[red]?[/red] {task.role} failed: {str(e)}")
+
+            self._end_task_stream(task, stream_writer, success=False, error=str(e))
             raise
 
+        # Вне try: сбой записи лога не превращает выполненную задачу в FAILED
+        try:
+            self._end_task_stream(task, stream_writer, success=True)
+        except Exception as e:
+            console.print(f"[yellow]Warning: stream log of {task.id} not closed: {e}[/yellow]")
+
+        return output
+
+    def _start_task_stream(self, task: Task) -> Optional[TaskLogStreamWriter]:
+        """
+        Подключить потоковый лог задачи.
+
+        Токены агента пишутся построчно в TaskLogger
+        (.claude-team/logs/<task_id>) пока задача ещё выполняется.
+        """
+        if not self.stream_bus:
+            return None
+
+        logger = TaskLogger(
+            agent_id=task.id,
+            task_name=task.role,
+            log_dir=self.project_path / ".claude-team" / "logs" / task.id,
+            emit_to_console=False
+        )
+        logger.start_phase(LogPhase.CODING, f"{task.role}: {task.description[:80]}")
+
+        writer = TaskLogStreamWriter(logger, task_id=task.id)
+        self.stream_bus.add_listener(writer)
+        self.stream_bus.emit(StreamEventType.START, self._stream_agent_id(task), task.id, task.description)
+        return writer
+
+    @staticmethod
+    def _stream_agent_id(task: Task) -> str:
+        """agent_id потоковых событий задачи - тот же, что у TOKEN/TOOL от BaseAgent."""
+        return task.agent.name if task.agent is not None else task.role
+
+    def _end_task_stream(
+        self,
+        task: Task,
+        writer: Optional[TaskLogStreamWriter],
+        success: bool,
+        error: Optional[str] = None
+    ):
+        """Закрыть потоковый лог задачи."""
+        if not self.stream_bus or writer is None:
+            return
+
+        event_type = StreamEventType.END if success else StreamEventType.ERROR
+        self.stream_bus.emit(event_type, self._stream_agent_id(task), task.id, error or "")
+        self.stream_bus.remove_listener(writer)
+
+        writer.flush()
+        if error:
+            writer.logger.log_error(error)
+        writer.logger.end_phase(LogPhase.CODING, success=success)
+        writer.logger.complete(success)
+
     # =========================================================================
     # EXECUTION (CrewAI + AutoGen patterns)
     # =========================================================================
@@ -546,6 +634,10 @@ Output ONLY valid JSON, no explanations."""
 
         results = {}
 
+        # Один fetch базовой ветки на весь прогон, а не на каждый worktree
+        if self.worktree_manager:
+            await asyncio.to_thread(self.worktree_manager.fetch_base, self.base_branch, True)
+
         if self.plan.execution_mode == ExecutionMode.SEQUENTIAL:
             # Последовательное выполнение
             for task in self.plan.tasks:
@@ -642,59 +734,84 @@ Output ONLY valid JSON, no explanations."""
     # MERGE (Aider pattern + наше)
     # =========================================================================
 
-    async def merge_all_branches(self):
-        """Мержинг всех веток агентов."""
+    async def merge_all_branches(self) -> Dict[str, Any]:
+        """
+        Мержинг всех веток агентов.
+
+        Ветки мержатся по уровням топологического порядка: уровень идёт в
+        очередь только после того, как предыдущий попал в цель. Задача, чья
+        зависимость из плана не смержена (провалилась, конфликт, не выполнена),
+        пропускается.
+
+        Returns:
+            {"merged": [...], "failed": {branch: причина}, "skipped": [...]}
+        """
+        summary: Dict[str, Any] = {"merged": [], "failed": {}, "skipped": []}
         if not self.plan:
-            return
+            return summary
 
         # В локальном режиме нечего мержить
         if not self.is_git_repo or not self.git:
             console.print("[yellow]Local mode: No branches to merge[/yellow]")
-            return
+            return summary
 
         console.print("\n[cyan]Merging agent branches...[/cyan]")
 
-        # Переключаемся на base branch
-        self.git.checkout(self.base_branch)
-
-        # Сортируем по зависимостям
         sorted_tasks = topological_sort(self.plan.tasks)
-        merged = set()
-
+        plan_ids = {t.id for t in self.plan.tasks}
+        levels: Dict[str, int] = {}
         for task in sorted_tasks:
-            if task.status != TaskStatus.DONE:
-                continue
+            deps = [d for d in task.depends_on if d in plan_ids]
+            levels[task.id] = max((levels[d] for d in deps), default=-1) + 1
 
-            if not task.branch:
-                continue
-
-            # Проверяем зависимости
-            deps_merged = all(
-                dep_id in merged or dep_id not in [t.id for t in self.plan.tasks]
-                for dep_id in task.depends_on
+        # Конфликты предсказываются in-memory для всех веток уровня сразу, чистые
+        # мержатся без checkout; через ConflictResolver идут только реальные
+        try:
+            queue = MergeQueue(
+                self.project_path,
+                target_branch=self.base_branch,
+                resolver=ConflictResolver(self.project_path),
             )
-
-            if not deps_merged:
-                console.print(f"[yellow]Skipping {task.branch}: dependencies not merged[/yellow]")
+        except MergeQueueError as e:
+            console.print(f"[red]Merge skipped: {e}[/red]")
+            return summary
+
+        merged_ids: Set[str] = set()
+        for level in range(max(levels.values(), default=-1) + 1):
+            batch: List[Task] = []
+            for task in sorted_tasks:
+                if levels[task.id] != level or task.status != TaskStatus.DONE or not task.branch:
+                    continue
+                missing = [d for d in task.depends_on if d in plan_ids and d not in merged_ids]
+                if missing:
+                    console.print(f"[yellow]Skipping {task.branch}: dependencies not merged ({', '.join(missing)})[/yellow]")
+                    summary["skipped"].append(task.branch)
+                else:
+                    batch.append(task)
+            if not batch:
                 continue
 
-            console.print(f"Merging {task.branch}...")
-            result = self.git.merge(
-                task.branch,
-                message=f"Merge {task.role}: {task.description[:50]}"
-            )
-
-            if result == MergeResult.SUCCESS:
-                merged.add(task.id)
-                console.print(f"[green]?[/green] Merged {task.branch}")
-            elif result == MergeResult.CONFLICT:
-                console.print(f"[yellow]Conflict in {task.branch}[/yellow]")
-                # TODO: AI conflict resolution
-                self.git.abort_merge()
-            else:
-                console.print(f"[red]Failed to merge {task.branch}[/red]")
+            branches = [t.branch for t in batch]
+            try:
+                report = await asyncio.to_thread(queue.run, branches, branches)
+            except MergeQueueError as e:
+                # Например, ff-only в грязный checkout цели - уровень не смержен
+                console.print(f"[red]Merge failed: {e}[/red]")
+                for branch in branches:
+                    summary["failed"][branch] = str(e)
+                continue
 
-        console.print(f"\n[green]Merged {len(merged)}/{len(self.plan.tasks)} branches[/green]")
+            for task in batch:
+                if task.branch in report.merged or task.branch in report.resolved or task.branch in report.up_to_date:
+                    console.print(f"[green]?[/green] Merged {task.branch}")
+                    merged_ids.add(task.id)
+                    summary["merged"].append(task.branch)
+                elif task.branch in report.failed:
+                    console.print(f"[yellow]Conflict in {task.branch}: {report.failed[task.branch]}[/yellow]")
+                    summary["failed"][task.branch] = report.failed[task.branch]
+
+        console.print(f"\n[green]Merged {len(summary['merged'])}/{len(self.plan.tasks)} branches[/green]")
+        return summary
 
     # =========================================================================
     # STATUS & MONITORING
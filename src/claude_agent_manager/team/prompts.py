@@ -756,7 +756,8 @@ def build_agent_prompt(
     task: str,
     worktree_path: str,
     context: Dict[str, Any] = None,
-    team_status: Dict[str, Any] = None
+    team_status: Dict[str, Any] = None,
+    include_role_prompt: bool = True
 ) -> str:
     """
     Собрать полный промпт для агента.
@@ -767,10 +768,12 @@ def build_agent_prompt(
         worktree_path: Путь к worktree
         context: Контекст от других агентов (CrewAI pattern)
         team_status: Статус команды из SharedContext
+        include_role_prompt: Добавлять промпт роли. Агенты, у которых он уже
+            в (кэшируемом) system prompt, передают False
     """
-    base_prompt = get_prompt_for_role(role, worktree_path)
-
-    full_prompt = f"{base_prompt}\n\n"
+    full_prompt = ""
+    if include_role_prompt:
+        full_prompt += f"{get_prompt_for_role(role, worktree_path)}\n\n"
     full_prompt += f"CURRENT TASK:\n{task}\n\n"
 
     if context:
@@ -119,7 +119,8 @@ class ArchitectAgent(BaseAgent):
             role="architect",
             task=task_description,
             worktree_path=str(self.worktree_path or "."),
-            context=context
+            context=context,
+            include_role_prompt=False
         )
 
         # Получаем архитектуру
@@ -258,7 +259,8 @@ class BackendAgent(BaseAgent):
             role="backend",
             task=task_description,
             worktree_path=str(self.worktree_path or "."),
-            context=context
+            context=context,
+            include_role_prompt=False
         )
 
         response = await self.receive(prompt)
@@ -381,7 +383,8 @@ class FrontendAgent(BaseAgent):
             role="frontend",
             task=task_description,
             worktree_path=str(self.worktree_path or "."),
-            context=context
+            context=context,
+            include_role_prompt=False
         )
 
         response = await self.receive(prompt)
@@ -459,7 +462,8 @@ class QAAgent(BaseAgent):
             role="qa",
             task=task_description,
             worktree_path=str(self.worktree_path or "."),
-            context=context
+            context=context,
+            include_role_prompt=False
         )
 
         response = await self.receive(prompt)
@@ -551,7 +555,8 @@ class ReviewerAgent(BaseAgent):
             role="reviewer",
             task=task_description,
             worktree_path=str(self.worktree_path or "."),
-            context=context
+            context=context,
+            include_role_prompt=False
         )
 
         response = await self.receive(prompt)
@@ -638,7 +643,8 @@ class RefactoringAgent(BaseAgent):
             role="refactoring",
             task=task_description,
             worktree_path=str(self.worktree_path or "."),
-            context=context
+            context=context,
+            include_role_prompt=False
         )
 
         response = await self.receive(prompt)
@@ -5,5 +5,6 @@ Supports Windows (ConPTY via pywinpty) and Unix (pty module).
 """
 
 from .widget import TerminalWidget
+from .scrollback import ScrollbackBuffer, PendingOutput
 
-__all__ = ["TerminalWidget"]
+__all__ = ["TerminalWidget", "ScrollbackBuffer", "PendingOutput"]
@@ -7,6 +7,9 @@ from __future__ import annotations
 
 import os
 import sys
+import time
+import codecs
+import select
 import signal
 import logging
 from abc import ABC, abstractmethod
@@ -14,6 +17,10 @@ from typing import Optional, Tuple, Callable
 
 logger = logging.getLogger(__name__)
 
+# Adaptive read buffer bounds for read_chunk()
+MIN_READ_SIZE = 4096
+MAX_READ_SIZE = 256 * 1024
+
 
 class PTYBackend(ABC):
     """Abstract PTY backend."""
@@ -28,6 +35,18 @@ class PTYBackend(ABC):
         """Read from PTY (non-blocking if possible)."""
         pass
 
+    def read_chunk(self, timeout: float = 0.05) -> str:
+        """
+        Wait up to timeout for output and read what is available.
+
+        Default implementation polls read(); backends that can block on
+        the PTY (UnixPTY) override it.
+        """
+        data = self.read(MIN_READ_SIZE)
+        if not data:
+            time.sleep(min(timeout, 0.01))
+        return data
+
     @abstractmethod
     def write(self, data: str) -> None:
         """Write to PTY."""
@@ -122,6 +141,10 @@ class UnixPTY(PTYBackend):
         self.master_fd: Optional[int] = None
         self.slave_fd: Optional[int] = None
         self.pid: Optional[int] = None
+        # Grows while reads fill the buffer, shrinks when output calms down
+        self.read_size = MIN_READ_SIZE
+        # Multi-byte UTF-8 characters may be split across reads
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
 
     def spawn(self, cmd: list[str], cwd: str, size: Tuple[int, int] = (24, 80)) -> None:
         import pty
@@ -175,12 +198,37 @@ class UnixPTY(PTYBackend):
             return ""
         try:
             data = os.read(self.master_fd, size)
-            return data.decode('utf-8', errors='replace')
+            return self._decoder.decode(data)
         except BlockingIOError:
             return ""
         except OSError:
             return ""
 
+    def read_chunk(self, timeout: float = 0.05) -> str:
+        """Block in select() until output arrives, then read with an adaptive buffer."""
+        fd = self.master_fd
+        if fd is None:
+            return ""
+        try:
+            ready, _, _ = select.select([fd], [], [], timeout)
+        except (OSError, ValueError):
+            return ""
+        if not ready:
+            return ""
+
+        try:
+            data = os.read(fd, self.read_size)
+        except BlockingIOError:
+            return ""
+        except OSError:
+            return ""
+
+        if len(data) >= self.read_size:
+            self.read_size = min(self.read_size * 2, MAX_READ_SIZE)
+        elif len(data) < self.read_size // 4:
+            self.read_size = max(self.read_size // 2, MIN_READ_SIZE)
+        return self._decoder.decode(data)
+
     def write(self, data: str) -> None:
         if self.master_fd is not None:
             os.write(self.master_fd, data.encode('utf-8'))
@@ -0,0 +1,227 @@
+"""
+Scrollback and output backpressure for embedded terminals.
+
+ScrollbackBuffer keeps the raw PTY output in a fixed-size byte ring
+(old output is overwritten) and supports text search.
+
+PendingOutput sits between the PTY reader thread and the render loop:
+it is bounded, and when the render loop falls behind, the oldest
+pending output is dropped (it stays in scrollback) instead of queuing
+without limit.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from typing import List, Optional, Tuple, Union
+
+# CSI (including private modes), OSC, and two-byte ESC sequences
+ESCAPE_PATTERN = re.compile(
+    r"\x1b\[[0-?]*[ -/]*[@-~]"
+    r"|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)"
+    r"|\x1b[()][A-Za-z0-9]"
+    r"|\x1b[@-Z\\-_=>]"
+)
+# Other control characters except \t and \n (\r is handled per line)
+CONTROL_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+
+def strip_escapes(text: str) -> str:
+    """Remove terminal escape sequences and control characters."""
+    return CONTROL_PATTERN.sub("", ESCAPE_PATTERN.sub("", text))
+
+
+def _visible_line(line: str) -> str:
+    """Text left on screen after carriage returns (progress bars)."""
+    line = line.rstrip("\r")
+    if "\r" in line:
+        line = line.rsplit("\r", 1)[1]
+    return line
+
+
+class ScrollbackBuffer:
+    """
+    Bounded byte ring buffer with raw terminal output.
+
+    Thread-safe: the PTY reader appends, the UI thread reads/searches.
+    """
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._buf = bytearray()
+        self._pos = 0  # Write position once the ring is full
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buf)
+
+    @property
+    def wrapped(self) -> bool:
+        """True if old output has been overwritten."""
+        return self.total_bytes > self.max_bytes
+
+    def append(self, data: Union[bytes, str]) -> None:
+        """Append output; the oldest bytes are overwritten when full."""
+        if isinstance(data, str):
+            data = data.encode("utf-8", errors="replace")
+        if not data:
+            return
+
+        cap = self.max_bytes
+        with self._lock:
+            self.total_bytes += len(data)
+
+            # Ring not full yet - plain append
+            if len(self._buf) < cap:
+                room = cap - len(self._buf)
+                self._buf += data[:room]
+                data = data[room:]
+                if not data:
+                    return
+                self._pos = 0
+
+            if len(data) >= cap:
+                self._buf[:] = data[-cap:]
+                self._pos = 0
+                return
+
+            end = self._pos + len(data)
+            if end <= cap:
+                self._buf[self._pos:end] = data
+            else:
+                first = cap - self._pos
+                self._buf[self._pos:] = data[:first]
+                self._buf[:end - cap] = data[first:]
+            self._pos = end % cap
+
+    def getvalue(self) -> bytes:
+        """Buffered output in chronological order."""
+        with self._lock:
+            if len(self._buf) < self.max_bytes or self._pos == 0:
+                return bytes(self._buf)
+            return bytes(self._buf[self._pos:]) + bytes(self._buf[:self._pos])
+
+    def text(self) -> str:
+        """Buffered output as plain text (escape sequences removed)."""
+        raw = self.getvalue().decode("utf-8", errors="replace")
+        if self.wrapped:
+            # The first line was cut by the ring - drop it
+            _, _, raw = raw.partition("\n")
+        return strip_escapes(raw)
+
+    def lines(self) -> List[str]:
+        """Plain-text lines as they would appear on screen."""
+        return [_visible_line(line) for line in self.text().split("\n")]
+
+    def search(
+        self,
+        pattern: str,
+        regex: bool = False,
+        ignore_case: bool = True,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, str]]:
+        """
+        Find lines matching pattern.
+
+        Returns:
+            List of (line_number, line), oldest first; with limit - the
+            most recent matches
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        matcher = re.compile(pattern if regex else re.escape(pattern), flags)
+        matches = [
+            (number, line)
+            for number, line in enumerate(self.lines())
+            if matcher.search(line)
+        ]
+        if limit is not None:
+            matches = matches[-limit:] if limit > 0 else []
+        return matches
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buf = bytearray()
+            self._pos = 0
+            self.total_bytes = 0
+
+
+class PendingOutput:
+    """
+    Bounded output buffer between the PTY reader and the render loop.
+
+    When more than max_chars are pending, the oldest output is dropped
+    down to keep_chars, cut at a line boundary. The render loop learns
+    about the drop from take() and resets the screen before feeding the
+    tail, so intermediate frames are skipped instead of replayed.
+    """
+
+    def __init__(self, max_chars: int = 2 * 1024 * 1024, keep_chars: Optional[int] = None):
+        self.max_chars = max_chars
+        self.keep_chars = keep_chars if keep_chars is not None else max_chars // 4
+        self.dropped_chars = 0
+        self.overflows = 0
+        self._chunks: List[str] = []
+        self._size = 0
+        self._overflowed = False
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def put(self, data: str) -> None:
+        """Add output (reader thread)."""
+        if not data:
+            return
+        with self._lock:
+            self._chunks.append(data)
+            self._size += len(data)
+            if self._size > self.max_chars:
+                self._drop_oldest()
+
+    def _drop_oldest(self) -> None:
+        pending = "".join(self._chunks)
+        tail = pending[-self.keep_chars:] if self.keep_chars > 0 else ""
+        # Start the tail at a line boundary so we don't begin mid-escape sequence
+        newline = tail.find("\n")
+        if newline != -1:
+            tail = tail[newline + 1:]
+        self.dropped_chars += len(pending) - len(tail)
+        self.overflows += 1
+        self._chunks = [tail] if tail else []
+        self._size = len(tail)
+        self._overflowed = True
+
+    def take(self, max_chars: Optional[int] = None) -> Tuple[str, bool]:
+        """
+        Take pending output (render thread).
+
+        Returns:
+            (data, overflowed) - overflowed is True if output was dropped
+            since the previous take()
+        """
+        with self._lock:
+            overflowed, self._overflowed = self._overflowed, False
+            if not self._chunks:
+                return "", overflowed
+
+            if max_chars is None or self._size <= max_chars:
+                data = "".join(self._chunks)
+                self._chunks = []
+                self._size = 0
+                return data, overflowed
+
+            taken: List[str] = []
+            size = 0
+            while self._chunks and size < max_chars:
+                chunk = self._chunks.pop(0)
+                room = max_chars - size
+                if len(chunk) > room:
+                    self._chunks.insert(0, chunk[room:])
+                    chunk = chunk[:room]
+                taken.append(chunk)
+                size += len(chunk)
+            self._size -= size
+            return "".join(taken), overflowed
@@ -12,11 +12,114 @@ import queue
 import time
 import signal
 import sys
-from typing import Dict, Optional, Callable, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Callable, Tuple
 
 import pyte
 
 from .pty_backend import create_pty_backend, PTYBackend
+from .scrollback import ScrollbackBuffer, PendingOutput
+
+
+# Render loop period (~30 FPS)
+FRAME_INTERVAL_MS = 33
+# Max characters of PTY output fed to pyte per frame; the rest waits for the next frame
+MAX_FEED_PER_FRAME = 256 * 1024
+# Pending output above this is dropped (oldest first) - see PendingOutput
+MAX_PENDING_OUTPUT = 2 * 1024 * 1024
+# Scrollback ring size per configured scrollback line
+SCROLLBACK_BYTES_PER_LINE = 256
+# How long the reader blocks waiting for PTY output
+READ_TIMEOUT = 0.05
+
+# Style of a pyte cell: (fg, bg, bold, italics, underscore)
+StyleKey = Tuple[object, object, bool, bool, bool]
+
+
+def style_key(char) -> StyleKey:
+    """Style key of a pyte Char (the attributes rendered as Tk tags)."""
+    return (char.fg, char.bg, char.bold, char.italics, char.underscore)
+
+
+def line_segments(line, columns: int) -> List[Tuple[str, StyleKey]]:
+    """Split a pyte screen line into runs of characters with the same style."""
+    segments: List[Tuple[str, StyleKey]] = []
+    run: List[str] = []
+    key = None
+    for x in range(columns):
+        char = line[x]
+        k = (char.fg, char.bg, char.bold, char.italics, char.underscore)
+        if k != key:
+            if run:
+                segments.append(("".join(run), key))
+                run = []
+            key = k
+        run.append(char.data or " ")
+    if run:
+        segments.append(("".join(run), key))
+    return segments
+
+
+@dataclass
+class RenderStats:
+    """Render loop counters (frames drawn, idle ticks, frame time, FPS)."""
+    frames: int = 0
+    skipped: int = 0
+    full_redraws: int = 0
+    lines_drawn: int = 0
+    feeds: int = 0
+    last_frame_ms: float = 0.0
+    max_frame_ms: float = 0.0
+    total_frame_ms: float = 0.0
+    fps: float = 0.0
+    _window_start: Optional[float] = field(default=None, repr=False)
+    _window_frames: int = field(default=0, repr=False)
+
+    def record_frame(self, duration_ms: float, lines: int, full: bool, now: Optional[float] = None) -> None:
+        self.frames += 1
+        self.lines_drawn += lines
+        if full:
+            self.full_redraws += 1
+        self.last_frame_ms = duration_ms
+        self.total_frame_ms += duration_ms
+        self.max_frame_ms = max(self.max_frame_ms, duration_ms)
+        self._tick(now, drawn=True)
+
+    def record_idle(self, now: Optional[float] = None) -> None:
+        self.skipped += 1
+        self._tick(now, drawn=False)
+
+    def _tick(self, now: Optional[float], drawn: bool) -> None:
+        """FPS over a ~1 second window of drawn frames."""
+        now = time.monotonic() if now is None else now
+        if self._window_start is None:
+            if drawn:
+                self._window_start = now
+            return
+        if drawn:
+            self._window_frames += 1
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.fps = self._window_frames / elapsed
+            self._window_start = now
+            self._window_frames = 0
+
+    @property
+    def avg_frame_ms(self) -> float:
+        return self.total_frame_ms / self.frames if self.frames else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "full_redraws": self.full_redraws,
+            "lines_drawn": self.lines_drawn,
+            "feeds": self.feeds,
+            "fps": round(self.fps, 1),
+            "last_frame_ms": round(self.last_frame_ms, 3),
+            "avg_frame_ms": round(self.avg_frame_ms, 3),
+            "max_frame_ms": round(self.max_frame_ms, 3),
+        }
 
 
 class TerminalWidget(tk.Frame):
@@ -62,13 +165,23 @@ class TerminalWidget(tk.Frame):
         # State
         self.pty: Optional[PTYBackend] = None
         self.running = False
+        # Control messages (exit/error) from the reader thread
         self.output_queue: queue.Queue = queue.Queue()
+        # PTY output: bounded pending buffer + scrollback ring
+        self.pending_output = PendingOutput(MAX_PENDING_OUTPUT)
+        self.scrollback_buffer = ScrollbackBuffer(max(1, scrollback) * SCROLLBACK_BYTES_PER_LINE)
         self.read_thread: Optional[threading.Thread] = None
 
         # pyte screen and stream for VT100 emulation
         self.screen = pyte.Screen(self.cols, self.rows)
         self.stream = pyte.Stream(self.screen)
 
+        # Damage tracking: only lines in screen.dirty are redrawn
+        self.render_stats = RenderStats()
+        self._needs_full_redraw = True
+        self._rendered_lines = 0
+        self._last_cursor: Optional[Tuple[int, int]] = None
+
         # Build UI
         self._build_ui()
         self._setup_bindings()
@@ -129,6 +242,8 @@ class TerminalWidget(tk.Frame):
         ]
         # Cache for dynamically created tags
         self._color_tags = set()
+        # Style key -> tag name
+        self._style_tags: Dict[StyleKey, str] = {}
 
     def _get_color_hex(self, color) -> str:
         """Convert pyte color to hex."""
@@ -177,11 +292,17 @@ class TerminalWidget(tk.Frame):
 
     def _get_tag_for_char(self, char) -> str:
         """Get or create tag for character style."""
-        fg = self._get_color_hex(char.fg) or self.theme["fg"]
-        bg = self._get_color_hex(char.bg)
-        bold = char.bold
-        italic = char.italics
-        underline = char.underscore
+        return self._tag_for_style(style_key(char))
+
+    def _tag_for_style(self, key: StyleKey) -> str:
+        """Get or create tag for a style key (cached)."""
+        tag = self._style_tags.get(key)
+        if tag is not None:
+            return tag
+
+        fg_color, bg_color, bold, italic, underline = key
+        fg = self._get_color_hex(fg_color) or self.theme["fg"]
+        bg = self._get_color_hex(bg_color)
 
         # Build tag name
         parts = [f"c{fg.replace('#', '')}"]
@@ -213,6 +334,7 @@ class TerminalWidget(tk.Frame):
             self.text.tag_configure(tag_name, **config)
             self._color_tags.add(tag_name)
 
+        self._style_tags[key] = tag_name
         return tag_name
 
     def _setup_bindings(self) -> None:
@@ -266,6 +388,9 @@ class TerminalWidget(tk.Frame):
         # Reset pyte screen
         self.screen.reset()
         self.screen.resize(self.rows, self.cols)
+        self._needs_full_redraw = True
+        self.pending_output.take()
+        self.scrollback_buffer.clear()
 
         # Create PTY backend
         self.pty = create_pty_backend()
@@ -301,7 +426,7 @@ class TerminalWidget(tk.Frame):
     def clear(self) -> None:
         """Clear terminal screen."""
         self.screen.reset()
-        self._render_screen()
+        self._render_screen(full=True)
 
     def _calculate_size(self) -> None:
         """Calculate terminal size in characters."""
@@ -322,13 +447,17 @@ class TerminalWidget(tk.Frame):
         """Background thread: read PTY output."""
         while self.running and self.pty:
             try:
-                data = self.pty.read(4096)
+                data = self.pty.read_chunk(READ_TIMEOUT)
                 if data:
-                    self.output_queue.put(("output", data))
-                else:
-                    time.sleep(0.01)
+                    self._on_output(data)
 
                 if not self.pty.is_alive():
+                    # Drain what the process wrote before exiting
+                    while self.pty:
+                        data = self.pty.read_chunk(0)
+                        if not data:
+                            break
+                        self._on_output(data)
                     self.output_queue.put(("exit", 0))
                     break
 
@@ -336,74 +465,126 @@ class TerminalWidget(tk.Frame):
                 self.output_queue.put(("error", str(e)))
                 break
 
+    def _on_output(self, data: str) -> None:
+        """Reader thread: store output in scrollback and hand it to the render loop."""
+        self.scrollback_buffer.append(data)
+        self.pending_output.put(data)
+
     def _render_loop(self) -> None:
         """Process queued output and render (runs in main thread)."""
-        try:
-            while True:
-                msg_type, data = self.output_queue.get_nowait()
-
-                if msg_type == "output":
-                    # Feed to pyte stream
-                    self.stream.feed(data)
-                elif msg_type == "exit":
-                    self._on_process_exit(data)
-                elif msg_type == "error":
-                    self._render_error(data)
-
-        except queue.Empty:
-            pass
+        # All output received since the last frame is fed to pyte at once
+        data, overflowed = self.pending_output.take(MAX_FEED_PER_FRAME)
+        if overflowed:
+            # Intermediate output was dropped: start from a clean screen
+            self.screen.reset()
+            self._needs_full_redraw = True
+        self._feed(data)
+
+        # Exit/error only after all output before them has been fed
+        if not len(self.pending_output):
+            try:
+                while True:
+                    msg_type, msg = self.output_queue.get_nowait()
+                    if msg_type == "exit":
+                        self._on_process_exit(msg)
+                    elif msg_type == "error":
+                        self._render_error(msg)
+            except queue.Empty:
+                pass
 
-        # Render screen state
-        self._render_screen()
+        # Render only if something changed since the last frame
+        cursor = (self.screen.cursor.y, self.screen.cursor.x)
+        if self.screen.dirty or self._needs_full_redraw or cursor != self._last_cursor:
+            self._render_screen()
+        else:
+            self.render_stats.record_idle()
 
         # Schedule next render
         if self.winfo_exists():
-            self.after(33, self._render_loop)  # ~30 FPS
+            self.after(FRAME_INTERVAL_MS, self._render_loop)
+
+    def _feed(self, data: str) -> None:
+        """Feed coalesced PTY output to pyte."""
+        if data:
+            self.stream.feed(data)
+            self.render_stats.feeds += 1
+
+    def _insert_args(self, y: int) -> List[str]:
+        """Tk insert arguments (text, tag, text, tag, ...) for screen line y."""
+        args: List[str] = []
+        for segment, key in line_segments(self.screen.buffer[y], self.screen.columns):
+            args.append(segment)
+            args.append(self._tag_for_style(key))
+        return args
+
+    def _render_screen(self, full: bool = False) -> None:
+        """
+        Render pyte screen to text widget with colors.
+
+        Only lines marked in screen.dirty are replaced; the whole widget is
+        rebuilt on start/clear/resize or when the line count changed.
+        """
+        started = time.perf_counter()
+        lines = self.screen.lines
+        full = full or self._needs_full_redraw or self._rendered_lines != lines
 
-    def _render_screen(self) -> None:
-        """Render pyte screen to text widget with colors."""
         self.text.configure(state="normal")
-        self.text.delete("1.0", "end")
-
-        for y in range(self.screen.lines):
-            line = self.screen.buffer[y]
-
-            # Build line with color segments
-            x = 0
-            while x < self.screen.columns:
-                char = line[x]
-                char_data = char.data if char.data else " "
-
-                # Find consecutive chars with same style
-                segment = char_data
-                tag = self._get_tag_for_char(char)
-                x += 1
+        if full:
+            self.text.delete("1.0", "end")
+            args: List[str] = []
+            for y in range(lines):
+                args.extend(self._insert_args(y))
+                if y < lines - 1:
+                    args.extend(("\n", ""))
+            if args:
+                self.text.insert("end", *args)
+            drawn = lines
+            self._rendered_lines = lines
+            self._needs_full_redraw = False
+        else:
+            drawn = 0
+            for y in sorted(self.screen.dirty):
+                if y >= lines:
+                    continue
+                row = y + 1
+                self.text.delete(f"{row}.0", f"{row}.end")
+                self.text.insert(f"{row}.0", *self._insert_args(y))
+                drawn += 1
+        self.screen.dirty.clear()
 
-                while x < self.screen.columns:
-                    next_char = line[x]
-                    next_tag = self._get_tag_for_char(next_char)
-                    if next_tag != tag:
-                        break
-                    segment += next_char.data if next_char.data else " "
-                    x += 1
+        # Position cursor
+        cursor = (self.screen.cursor.y, self.screen.cursor.x)
+        if full or drawn or cursor != self._last_cursor:
+            try:
+                self.text.mark_set("insert", f"{cursor[0] + 1}.{cursor[1]}")
+            except tk.TclError:
+                pass
+            self.text.see("insert")
+            self._last_cursor = cursor
 
-                # Insert segment with tag
-                self.text.insert("end", segment, tag)
+        self.render_stats.record_frame((time.perf_counter() - started) * 1000, drawn, full)
 
-            # Add newline except for last line
-            if y < self.screen.lines - 1:
-                self.text.insert("end", "\n")
+    def get_render_stats(self) -> dict:
+        """Render loop statistics (FPS, frame time, lines drawn, dropped output)."""
+        stats = self.render_stats.to_dict()
+        stats["dropped_chars"] = self.pending_output.dropped_chars
+        stats["overflows"] = self.pending_output.overflows
+        stats["scrollback_bytes"] = len(self.scrollback_buffer)
+        return stats
 
-        # Position cursor
-        cursor_y = self.screen.cursor.y + 1
-        cursor_x = self.screen.cursor.x
-        try:
-            self.text.mark_set("insert", f"{cursor_y}.{cursor_x}")
-        except:
-            pass
-
-        self.text.configure(state="normal")
-        self.text.see("insert")
+    def search_scrollback(
+        self,
+        pattern: str,
+        regex: bool = False,
+        ignore_case: bool = True,
+        limit: Optional[int] = 100,
+    ) -> List[Tuple[int, str]]:
+        """Search terminal output history; returns (line_number, line) pairs."""
+        return self.scrollback_buffer.search(pattern, regex=regex, ignore_case=ignore_case, limit=limit)
+
+    def get_scrollback_text(self) -> str:
+        """Terminal output history as plain text."""
+        return "\n".join(self.scrollback_buffer.lines())
 
     def _render_error(self, error: str) -> None:
         """Render error message."""
@@ -555,6 +736,7 @@ class TerminalWidget(tk.Frame):
         # Resize pyte screen
         if self.screen.lines != self.rows or self.screen.columns != self.cols:
             self.screen.resize(self.rows, self.cols)
+            self._needs_full_redraw = True
 
         # Notify PTY
         if self.pty and self.running:
@@ -569,3 +751,6 @@ class TerminalWidget(tk.Frame):
             insertbackground=theme.get("cursor", "#ffffff"),
             selectbackground=theme.get("selection", "#264f78"),
         )
+        # Default foreground is baked into tags - rebuild them
+        self._style_tags.clear()
+        self._needs_full_redraw = True
@@ -8,10 +8,14 @@ from .app import (
     create_app,
     WebDashboard,
     run_server,
+    SnapshotBroadcaster,
+    ResponseCache,
 )
 
 __all__ = [
     "create_app",
     "WebDashboard",
     "run_server",
+    "SnapshotBroadcaster",
+    "ResponseCache",
 ]
@@ -15,15 +15,20 @@ Web-интерфейс для мониторинга и управления а
 from __future__ import annotations
 
 import json
+import time
 import asyncio
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Tuple
 from dataclasses import dataclass
 
 try:
-    from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
-    from fastapi.responses import HTMLResponse, JSONResponse
+    from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request
+    from fastapi.responses import HTMLResponse, JSONResponse, Response
+    from fastapi.middleware.gzip import GZipMiddleware
     from fastapi.staticfiles import StaticFiles
     from fastapi.middleware.cors import CORSMiddleware
     import uvicorn
@@ -32,6 +37,10 @@ except ImportError:
     HAS_FASTAPI = False
 
 from ..monitoring.metrics import MetricsCollector, TimeRange
+from ..streaming import StreamBus
+
+# Верхняя граница ?limit= для /api/metrics/activity (ключ кэша и размер выборки)
+MAX_ACTIVITY_LIMIT = 200
 
 
 @dataclass
@@ -42,6 +51,10 @@ class WebDashboardConfig:
     port: int = 8080
     debug: bool = False
     cors_origins: List[str] = None
+    cache_ttl: float = 2.0          # TTL кэша ответов /api/metrics/*, сек
+    cache_max_entries: int = 256    # Максимум ключей в кэше ответов (LRU)
+    db_workers: int = 4             # Потоки для запросов к SQLite
+    gzip_min_size: int = 1024       # Ответы меньше не сжимаются
 
     def __post_init__(self):
         if self.cors_origins is None:
@@ -63,13 +76,322 @@ class ConnectionManager:
             self.active_connections.remove(websocket)
 
     async def broadcast(self, message: dict):
-        """Отправить сообщение всем подключённым клиентам."""
-        for connection in self.active_connections:
+        """
+        Отправить сообщение всем подключённым клиентам.
+
+        Отправки идут параллельно, чтобы медленный клиент не задерживал
+        остальных; клиенты, на которых отправка упала, отключаются.
+        """
+        connections = list(self.active_connections)
+        if not connections:
+            return
+        results = await asyncio.gather(
+            *(connection.send_json(message) for connection in connections),
+            return_exceptions=True
+        )
+        for connection, result in zip(connections, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection)
+
+
+class SnapshotBroadcaster:
+    """
+    Общий снимок метрик для всех клиентов /ws.
+
+    Один фоновый таск считает снимок (SQLite-запросы - в executor, не в
+    event loop) раз в interval секунд или сразу после новой метрики и
+    рассылает через ConnectionManager.broadcast только изменившиеся части.
+    Новый клиент получает полный снимок при подключении.
+
+    Метрики этого процесса будят таск через add_listener. Агенты пишут
+    метрики из своих процессов, поэтому раз в watch_interval секунд
+    таск сверяет MetricsCollector.last_metric_id и пересчитывает снимок,
+    если id вырос.
+
+    Таск живёт, пока есть подключённые клиенты.
+    """
+
+    SECTIONS = ("overview", "trends", "activity")
+
+    def __init__(
+        self,
+        collector: MetricsCollector,
+        manager: ConnectionManager,
+        interval: float = 5.0,
+        debounce: float = 0.25,
+        activity_limit: int = 5,
+        executor: Optional[Executor] = None,
+        watch_interval: float = 1.0
+    ):
+        self.collector = collector
+        self.manager = manager
+        self.executor = executor
+        self.interval = interval
+        self.debounce = debounce
+        self.watch_interval = min(watch_interval, interval)
+        self.activity_limit = activity_limit
+
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.seq = 0
+        self.computed = 0
+        self._metric_id = 0
+
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._compute_lock: Optional[asyncio.Lock] = None
+
+    # =========================================================================
+    # СНИМОК
+    # =========================================================================
+
+    def compute(self) -> Dict[str, Any]:
+        """Посчитать снимок (синхронно, вызывается в executor)."""
+        self.computed += 1
+        # До запросов: метрика, записанная во время подсчёта, даст ещё один
+        self._metric_id = self.collector.last_metric_id()
+        return {
+            "overview": self.collector.get_performance_metrics(TimeRange.HOUR).to_dict(),
+            "trends": self.collector.get_trends(TimeRange.HOUR),
+            "activity": self.collector.get_recent_activity(self.activity_limit),
+        }
+
+    @staticmethod
+    def diff(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Разница между снимками.
+
+        overview сравнивается по полям, trends и activity - целиком.
+        """
+        if old is None:
+            return dict(new)
+        delta: Dict[str, Any] = {}
+        for section, value in new.items():
+            previous = old.get(section)
+            if value == previous:
+                continue
+            if isinstance(value, dict) and isinstance(previous, dict):
+                delta[section] = {k: v for k, v in value.items() if previous.get(k) != v}
+            else:
+                delta[section] = value
+        return delta
+
+    def full_message(self) -> Dict[str, Any]:
+        """Полный снимок для только что подключившегося клиента."""
+        return {
+            "type": "update",
+            "seq": self.seq,
+            "timestamp": datetime.now().isoformat(),
+            **(self.snapshot or {}),
+        }
+
+    async def _recompute(self) -> Dict[str, Any]:
+        """Пересчитать снимок; вернуть разницу с предыдущим."""
+        if self._compute_lock is None:
+            self._compute_lock = asyncio.Lock()
+        async with self._compute_lock:
+            loop = asyncio.get_running_loop()
+            snapshot = await loop.run_in_executor(self.executor, self.compute)
+            delta = self.diff(self.snapshot, snapshot)
+            self.snapshot = snapshot
+            if delta:
+                self.seq += 1
+            return delta
+
+    async def refresh(self) -> Optional[Dict[str, Any]]:
+        """
+        Пересчитать снимок и разослать дельту.
+
+        Returns:
+            Отправленное сообщение или None, если ничего не изменилось
+        """
+        delta = await self._recompute()
+        if not delta:
+            return None
+        message = {
+            "type": "delta",
+            "seq": self.seq,
+            "timestamp": datetime.now().isoformat(),
+            **delta,
+        }
+        await self.manager.broadcast(message)
+        return message
+
+    async def ensure_snapshot(self) -> Dict[str, Any]:
+        """
+        Полный снимок для нового клиента.
+
+        Пока фоновый таск работает, снимок актуален и не пересчитывается.
+        """
+        if self.snapshot is None or not self.running:
+            await self._recompute()
+        return self.full_message()
+
+    # =========================================================================
+    # ФОНОВЫЙ ТАСК
+    # =========================================================================
+
+    def notify(self, agent_id: str = "", metric_type: Any = None) -> None:
+        """Новая метрика - разбудить фоновый таск (из любого потока)."""
+        loop = self._loop
+        if loop is None or self._wakeup is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass
+
+    def start(self) -> None:
+        """Запустить фоновый таск, если он не запущен."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.collector.add_listener(self.notify)
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановить фоновый таск."""
+        self.collector.remove_listener(self.notify)
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
             try:
-                await connection.send_json(message)
-            except Exception:
+                await task
+            except asyncio.CancelledError:
                 pass
 
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _has_new_metrics(self) -> bool:
+        """Появились ли метрики после последнего снимка (в т.ч. из других процессов)."""
+        return self.collector.last_metric_id() != self._metric_id
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_refresh = loop.time() + self.interval
+        try:
+            while self.manager.active_connections:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.watch_interval)
+                    # Пачка метрик подряд - один пересчёт
+                    await asyncio.sleep(self.debounce)
+                except asyncio.TimeoutError:
+                    if loop.time() < next_refresh:
+                        try:
+                            changed = await loop.run_in_executor(self.executor, self._has_new_metrics)
+                        except Exception:
+                            changed = False
+                        if not changed:
+                            continue
+                self._wakeup.clear()
+                next_refresh = loop.time() + self.interval
+
+                if not self.manager.active_connections:
+                    break
+                try:
+                    await self.refresh()
+                except Exception:
+                    # Ошибка одного пересчёта не должна останавливать рассылку
+                    continue
+        finally:
+            self.collector.remove_listener(self.notify)
+
+
+class ResponseCache:
+    """
+    Кэш JSON-ответов с коротким TTL.
+
+    Ключ - (endpoint, параметры). Значение - сериализованное тело и ETag.
+    Одновременные промахи по одному ключу ждут одно вычисление, так что
+    N зрителей дашборда дают один запрос к SQLite за TTL.
+
+    Параметры ключа приходят от клиента, поэтому кэш ограничен: при записи
+    устаревшие записи удаляются, а сверх max_entries вытесняются давно
+    не использованные (LRU).
+    """
+
+    def __init__(self, ttl: float = 2.0, executor: Optional[Executor] = None, max_entries: int = 256):
+        self.ttl = ttl
+        self.executor = executor
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Tuple, Tuple[float, bytes, str]] = OrderedDict()
+        self._pending: Dict[Tuple, asyncio.Future] = {}
+
+    @staticmethod
+    def encode(data: Any) -> Tuple[bytes, str]:
+        """Сериализовать ответ и посчитать ETag."""
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        return body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+    async def get(self, key: Tuple, compute: Callable[[], Any]) -> Tuple[bytes, str]:
+        """
+        Получить (body, etag) из кэша или посчитать compute() в executor.
+
+        compute - синхронная функция (запросы к SQLite).
+        """
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[key] = future
+        try:
+            body, etag = await loop.run_in_executor(
+                self.executor, lambda: self.encode(compute())
+            )
+        except BaseException as e:
+            future.set_exception(e)
+            # Исключение уже передано ожидающим; не оставляем его "непрочитанным"
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(key, None)
+
+        self._store(key, body, etag)
+        future.set_result((body, etag))
+        return body, etag
+
+    def _store(self, key: Tuple, body: bytes, etag: str) -> None:
+        """Записать ответ, удалив устаревшие записи и лишние по LRU."""
+        now = time.monotonic()
+        for stale in [k for k, entry in self._entries.items() if now - entry[0] >= self.ttl]:
+            del self._entries[stale]
+        self._entries[key] = (now, body, etag)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Сбросить кэш."""
+        self._entries.clear()
+
+    @staticmethod
+    def not_modified(if_none_match: Optional[str], etag: str) -> bool:
+        """Совпадает ли If-None-Match с ETag (включая список и W/)."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        candidates = [c.strip() for c in if_none_match.split(",")]
+        return any(c == etag or c == "W/" + etag for c in candidates)
+
 
 class WebDashboard:
     """
@@ -81,7 +403,8 @@ class WebDashboard:
     def __init__(
         self,
         collector: Optional[MetricsCollector] = None,
-        config: Optional[WebDashboardConfig] = None
+        config: Optional[WebDashboardConfig] = None,
+        stream_bus: Optional[StreamBus] = None
     ):
         if not HAS_FASTAPI:
             raise ImportError(
@@ -92,6 +415,13 @@ class WebDashboard:
         self.collector = collector or MetricsCollector()
         self.config = config or WebDashboardConfig()
         self.manager = ConnectionManager()
+        # SQLite-запросы не выполняются в event loop
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config.db_workers, thread_name_prefix="cam-metrics"
+        )
+        self.cache = ResponseCache(self.config.cache_ttl, self.executor, self.config.cache_max_entries)
+        self.broadcaster = SnapshotBroadcaster(self.collector, self.manager, executor=self.executor)
+        self.stream_bus = stream_bus
         self.app = self._create_app()
 
     def _create_app(self) -> FastAPI:
@@ -111,6 +441,8 @@ class WebDashboard:
             allow_headers=["*"],
         )
 
+        app.add_middleware(GZipMiddleware, minimum_size=self.config.gzip_min_size)
+
         # Routes
         self._setup_routes(app)
 
@@ -129,79 +461,112 @@ class WebDashboard:
             """Health check."""
             return {"status": "ok", "timestamp": datetime.now().isoformat()}
 
-        @app.get("/api/metrics/overview")
-        async def get_overview(time_range: str = "day"):
-            """Получить обзор метрик."""
+        def parse_range(time_range: str) -> TimeRange:
             try:
-                tr = TimeRange(time_range)
+                return TimeRange(time_range)
             except ValueError:
-                tr = TimeRange.DAY
+                return TimeRange.DAY
+
+        async def cached(request: Request, key: Tuple, compute: Callable[[], Any]) -> Response:
+            """Ответ из кэша с ETag; 304, если клиент уже имеет эту версию."""
+            body, etag = await self.cache.get(key, compute)
+            headers = {
+                "ETag": etag,
+                "Cache-Control": f"private, max-age={int(self.config.cache_ttl)}",
+            }
+            if ResponseCache.not_modified(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type="application/json", headers=headers)
 
-            perf = self.collector.get_performance_metrics(tr)
-            return perf.to_dict()
+        @app.get("/api/metrics/overview")
+        async def get_overview(request: Request, time_range: str = "day"):
+            """Получить обзор метрик."""
+            tr = parse_range(time_range)
+            return await cached(
+                request, ("overview", tr.value),
+                lambda: self.collector.get_performance_metrics(tr).to_dict()
+            )
 
         @app.get("/api/metrics/agents")
-        async def get_agents():
+        async def get_agents(request: Request):
             """Получить список агентов."""
-            agents = self.collector.get_all_agents()
-            return {"agents": agents}
+            return await cached(
+                request, ("agents",),
+                lambda: {"agents": self.collector.get_all_agents()}
+            )
 
         @app.get("/api/metrics/agent/{agent_id}")
-        async def get_agent_metrics(agent_id: str, time_range: str = "day"):
+        async def get_agent_metrics(request: Request, agent_id: str, time_range: str = "day"):
             """Получить метрики агента."""
-            try:
-                tr = TimeRange(time_range)
-            except ValueError:
-                tr = TimeRange.DAY
-
-            stats = self.collector.get_agent_stats(agent_id, tr)
-            return stats.to_dict()
+            tr = parse_range(time_range)
+            return await cached(
+                request, ("agent", agent_id, tr.value),
+                lambda: self.collector.get_agent_stats(agent_id, tr).to_dict()
+            )
 
         @app.get("/api/metrics/trends")
-        async def get_trends(time_range: str = "day"):
+        async def get_trends(request: Request, time_range: str = "day"):
             """Получить тренды."""
-            try:
-                tr = TimeRange(time_range)
-            except ValueError:
-                tr = TimeRange.DAY
-
-            trends = self.collector.get_trends(tr)
-            return {"trends": trends}
+            tr = parse_range(time_range)
+            return await cached(
+                request, ("trends", tr.value),
+                lambda: {"trends": self.collector.get_trends(tr)}
+            )
 
         @app.get("/api/metrics/activity")
-        async def get_activity(limit: int = 20):
+        async def get_activity(request: Request, limit: int = 20):
             """Получить последнюю активность."""
-            activity = self.collector.get_recent_activity(limit)
-            return {"activity": activity}
+            limit = max(1, min(limit, MAX_ACTIVITY_LIMIT))
+            return await cached(
+                request, ("activity", limit),
+                lambda: {"activity": self.collector.get_recent_activity(limit)}
+            )
 
         @app.websocket("/ws")
         async def websocket_endpoint(websocket: WebSocket):
-            """WebSocket для real-time обновлений."""
+            """WebSocket для real-time обновлений (общий снимок, дельты)."""
             await self.manager.connect(websocket)
             try:
+                await websocket.send_json(await self.broadcaster.ensure_snapshot())
+                self.broadcaster.start()
+                # Держим соединение, пока клиент не отключится
                 while True:
-                    # Отправляем обновления каждые 5 секунд
-                    await asyncio.sleep(5)
+                    await websocket.receive_text()
+            except WebSocketDisconnect:
+                pass
+            finally:
+                self.manager.disconnect(websocket)
 
-                    perf = self.collector.get_performance_metrics(TimeRange.HOUR)
-                    trends = self.collector.get_trends(TimeRange.HOUR)
-                    activity = self.collector.get_recent_activity(5)
+        @app.websocket("/ws/stream")
+        async def stream_endpoint(websocket: WebSocket):
+            """
+            WebSocket с потоковым выводом агентов (StreamBus).
 
-                    await websocket.send_json({
-                        "type": "update",
-                        "timestamp": datetime.now().isoformat(),
-                        "overview": perf.to_dict(),
-                        "trends": trends,
-                        "activity": activity
-                    })
+            Каждый клиент получает свой ограниченный буфер: если клиент
+            не успевает читать, токены склеиваются в более крупные куски.
+            """
+            await websocket.accept()
+            if self.stream_bus is None:
+                await websocket.close()
+                return
 
+            sub = self.stream_bus.subscribe(loop=asyncio.get_running_loop())
+            try:
+                async for event in sub:
+                    await websocket.send_json({"type": "stream", **event.to_dict()})
             except WebSocketDisconnect:
-                self.manager.disconnect(websocket)
+                pass
+            finally:
+                self.stream_bus.unsubscribe(sub)
 
         @app.post("/api/metrics/cleanup")
         async def cleanup_metrics(days: int = 90):
             """Очистить старые метрики."""
-            deleted = self.collector.cleanup_old_metrics(days)
+            loop = asyncio.get_running_loop()
+            deleted = await loop.run_in_executor(
+                self.executor, self.collector.cleanup_old_metrics, days
+            )
+            self.cache.clear()
             return {"deleted": deleted}
 
     def _render_dashboard_html(self) -> str:
@@ -551,6 +916,7 @@ class WebDashboard:
     <script>
         let currentTimeRange = 'hour';
         let ws = null;
+        let liveState = {{}};
 
         // Initialize
         document.addEventListener('DOMContentLoaded', () => {{
@@ -589,7 +955,19 @@ class WebDashboard:
             ws.onmessage = (event) => {{
                 const data = JSON.parse(event.data);
                 if (data.type === 'update') {{
+                    liveState = data;
                     updateDashboard(data);
+                }} else if (data.type === 'delta') {{
+                    if (data.overview) {{
+                        liveState.overview = Object.assign({{}}, liveState.overview, data.overview);
+                    }}
+                    if (data.trends) liveState.trends = data.trends;
+                    if (data.activity) liveState.activity = data.activity;
+                    updateDashboard({{
+                        overview: data.overview && liveState.overview,
+                        trends: data.trends,
+                        activity: data.activity
+                    }});
                 }}
             }};
         }}
@@ -725,7 +1103,8 @@ class WebDashboard:
 
 def create_app(
     collector: Optional[MetricsCollector] = None,
-    config: Optional[WebDashboardConfig] = None
+    config: Optional[WebDashboardConfig] = None,
+    stream_bus: Optional[StreamBus] = None
 ) -> FastAPI:
     """
     Создать FastAPI приложение.
@@ -733,11 +1112,12 @@ def create_app(
     Args:
         collector: MetricsCollector (опционально)
         config: Конфигурация (опционально)
+        stream_bus: StreamBus для /ws/stream (опционально)
 
     Returns:
         FastAPI приложение
     """
-    dashboard = WebDashboard(collector, config)
+    dashboard = WebDashboard(collector, config, stream_bus)
     return dashboard.app
 
 
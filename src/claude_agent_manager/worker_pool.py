@@ -0,0 +1,215 @@
+"""
+Warm Worker Pool - заранее запущенные claude-mem workers.
+
+Холодный старт Node worker'а занимает секунды, поэтому create_agent
+(и subagent_mcp.tool_create_subagent поверх него) может взять готовый
+слот из пула: слоту заранее выданы agent_id и порт, worker уже поднят в
+pm2 под именем agent-<agent_id> с CLAUDE_MEM_DATA_DIR = каталог агента.
+При claim слот просто становится агентом - start_agent видит живой
+worker и переходит сразу к запуску Claude CLI.
+
+Слоты учитываются в таблице resources_ports core-registry под именем
+pool:<agent_id>:port; при claim запись атомарно переименовывается в
+agent:<agent_id>:port.
+
+Использование:
+    pool = WorkerPool(cfg)       # размер/таймаут из AppConfig
+    pool.fill()                  # догнать пул до worker_pool_size
+    slot = pool.claim()          # None если пул пуст
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import shutil
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from .config import AppConfig
+from .core import WorkspacePaths, ensure_dir
+from .core.registry import PENDING_PORT_LEASE_SEC, Registry
+from .core.runner_env import build_run_sandbox_env
+from .processes import pm2_delete, pm2_statuses
+from .registry import sync_agent_index
+from .worker import is_port_free, start_worker
+
+logger = logging.getLogger(__name__)
+
+POOL_PREFIX = "pool:"
+
+_fill_lock = threading.Lock()
+
+
+@dataclass
+class PoolSlot:
+    """Idle pre-started worker."""
+    agent_id: str
+    port: int
+    allocated_at: str
+
+    @property
+    def pm2_name(self) -> str:
+        return f"agent-{self.agent_id}"
+
+    @property
+    def resource_name(self) -> str:
+        return f"{POOL_PREFIX}{self.agent_id}:port"
+
+    def idle_seconds(self) -> float:
+        try:
+            started = datetime.fromisoformat(self.allocated_at)
+        except ValueError:
+            return 0.0
+        return (datetime.now(timezone.utc) - started).total_seconds()
+
+
+class WorkerPool:
+    """Pool of idle claude-mem workers on pre-allocated ports."""
+
+    def __init__(
+        self,
+        cfg: AppConfig,
+        paths: Optional[WorkspacePaths] = None,
+        registry: Optional[Registry] = None,
+        size: Optional[int] = None,
+        idle_timeout_sec: Optional[int] = None,
+    ):
+        from .manager import _registry, get_workspace_paths
+
+        self.cfg = cfg
+        self.paths = paths or get_workspace_paths(cfg)
+        self.registry = registry or _registry(cfg)
+        self.size = cfg.worker_pool_size if size is None else size
+        self.idle_timeout_sec = cfg.worker_pool_idle_timeout_sec if idle_timeout_sec is None else idle_timeout_sec
+
+    # ---------- bookkeeping ----------
+
+    def slots(self) -> list[PoolSlot]:
+        """Idle slots, oldest first."""
+        with self.registry.connect() as conn:
+            rows = conn.execute(
+                "SELECT name, port, allocated_at FROM resources_ports WHERE name LIKE ? ORDER BY allocated_at",
+                (f"{POOL_PREFIX}%",),
+            ).fetchall()
+        return [
+            PoolSlot(agent_id=r["name"][len(POOL_PREFIX):].rsplit(":", 1)[0], port=int(r["port"]), allocated_at=r["allocated_at"] or "")
+            for r in rows
+        ]
+
+    def _discard(self, slot: PoolSlot) -> bool:
+        """
+        Stop a slot's worker and forget it.
+
+        The pool row is deleted in the same transaction that decides the
+        slot's fate, so a concurrent claim() either got the slot first
+        (nothing is stopped) or finds it gone. Returns True if discarded.
+        """
+        with self.registry.tx() as conn:
+            cur = conn.execute("DELETE FROM resources_ports WHERE name=?", (slot.resource_name,))
+        if cur.rowcount != 1:
+            return False
+        pm2_delete(slot.pm2_name)
+        agent_dir = self.paths.agent_dir(slot.agent_id)
+        if not (agent_dir / "agent.json").exists():
+            shutil.rmtree(agent_dir, ignore_errors=True)
+        return True
+
+    # ---------- lifecycle ----------
+
+    def _start_slot(self) -> PoolSlot:
+        now = datetime.now(timezone.utc).isoformat()
+        sync_agent_index(self.paths.agents_dir)
+        pending = f"pending:{uuid.uuid4().hex}:port"
+        port = self.registry.claim_port(
+            pending,
+            self.cfg.port_min,
+            self.cfg.port_max,
+            allocated_at_iso=now,
+            lease_sec=PENDING_PORT_LEASE_SEC,
+            verify=is_port_free,
+        )
+        agent_id = f"{random.randint(1000, 9999)}-{port}"
+        slot = PoolSlot(agent_id=agent_id, port=port, allocated_at=now)
+        try:
+            self.registry.rename_port(pending, slot.resource_name)
+        except Exception:
+            self.registry.release_port(pending)
+            raise
+
+        try:
+            agent_dir = ensure_dir(self.paths.agent_dir(agent_id))
+            runner_env = build_run_sandbox_env(self.paths.agent_warm_dir(agent_id))
+            start_worker(self.cfg, pm2_name=slot.pm2_name, port=port, data_dir=agent_dir, base_env=runner_env.env)
+        except Exception:
+            self._discard(slot)
+            raise
+
+        logger.info(f"[POOL] started warm worker | id={agent_id} port={port}")
+        return slot
+
+    def health_check(self) -> int:
+        """Drop slots whose worker is not online or idle for too long. Returns dropped count."""
+        statuses = pm2_statuses()
+        dropped = 0
+        for slot in self.slots():
+            expired = self.idle_timeout_sec and slot.idle_seconds() > self.idle_timeout_sec
+            if expired or statuses.get(slot.pm2_name) != "online":
+                if self._discard(slot):
+                    logger.info(f"[POOL] dropped slot | id={slot.agent_id} expired={bool(expired)}")
+                    dropped += 1
+        return dropped
+
+    def fill(self) -> int:
+        """Health-check the pool and start workers up to `size`. Returns started count."""
+        if self.size <= 0:
+            return 0
+        with _fill_lock:
+            self.health_check()
+            missing = self.size - len(self.slots())
+            started = 0
+            for _ in range(max(0, missing)):
+                try:
+                    self._start_slot()
+                    started += 1
+                except Exception as e:
+                    logger.warning(f"[POOL] failed to start warm worker: {e}")
+                    break
+            return started
+
+    def fill_async(self) -> threading.Thread:
+        """Refill in a background thread (after a claim)."""
+        thread = threading.Thread(target=self.fill, daemon=True, name="worker-pool-fill")
+        thread.start()
+        return thread
+
+    def claim(self) -> Optional[PoolSlot]:
+        """
+        Take a healthy idle slot, or None if the pool is empty.
+
+        The registry row is renamed to agent:<id>:port inside one
+        transaction, so two callers can never get the same slot.
+        """
+        if self.size <= 0:
+            return None
+        statuses = pm2_statuses()
+        for slot in self.slots():
+            if statuses.get(slot.pm2_name) != "online":
+                self._discard(slot)
+                continue
+            with self.registry.tx() as conn:
+                cur = conn.execute(
+                    "UPDATE resources_ports SET name=?, allocated_at=? WHERE name=?",
+                    (f"agent:{slot.agent_id}:port", datetime.now(timezone.utc).isoformat(), slot.resource_name),
+                )
+            if cur.rowcount == 1:
+                logger.info(f"[POOL] claimed warm worker | id={slot.agent_id} port={slot.port}")
+                return slot
+        return None
+
+    def drain(self) -> int:
+        """Stop all idle workers. Returns stopped count."""
+        return sum(1 for slot in self.slots() if self._discard(slot))
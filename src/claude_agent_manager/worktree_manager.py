@@ -23,14 +23,21 @@ import os
 import re
 import shutil
 import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, TYPE_CHECKING
 from datetime import datetime
 
 from rich.console import Console
 from rich.panel import Panel
 
+if TYPE_CHECKING:
+    from .git.merge_queue import MergeQueueReport
+
 console = Console()
 
 
@@ -47,6 +54,10 @@ LOCK_FILES = {
     "Gemfile.lock", "composer.lock", "go.sum",
 }
 
+# Recycled worktrees (detached, clean) waiting for reuse
+POOL_DIR_NAME = ".pool"
+SPARSE_GLOB_CHARS = re.compile(r"[*?\[]")
+
 BINARY_EXTENSIONS = {
     ".png", ".jpg", ".jpeg", ".gif", ".ico", ".webp", ".bmp", ".svg",
     ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
@@ -78,6 +89,239 @@ class Worktree:
     # Change details
     changed_files: List[Tuple[str, str]] = field(default_factory=list)  # (status, path)
 
+    @property
+    def is_agent_branch(self) -> bool:
+        """True if the worktree is on a real agent/<id>/<task> branch (not detached)."""
+        return self.branch_name.startswith("agent/")
+
+
+def _empty_stats() -> Dict:
+    return {
+        "commit_count": 0,
+        "files_changed": 0,
+        "additions": 0,
+        "deletions": 0,
+        "uncommitted_files": 0,
+        "last_commit": "",
+        "changed_files": [],
+    }
+
+
+class WorktreeStatsCollector:
+    """
+    Batched statistics for many worktrees at once.
+
+    Per refresh, regardless of the number of worktrees:
+    - 1 x for-each-ref: head sha + last commit subject of every branch
+    - 1 x rev-list: commits ahead of base for all branches together
+    - diff --raw --numstat per branch only when (base sha, head sha) changed;
+      results are immutable for a given pair and cached
+    - status --porcelain per worktree in a thread pool, cached until the
+      worktree's HEAD/index mtime changes or status_ttl expires (untracked
+      files do not touch the index)
+    """
+
+    def __init__(self, project_path: Path, max_workers: int = 8, status_ttl: float = 2.0):
+        self.project_path = project_path
+        self.max_workers = max_workers
+        self.status_ttl = status_ttl
+        self._diff_cache: Dict[Tuple[str, str], Dict] = {}
+        self._status_cache: Dict[Path, Tuple[Tuple, float, int]] = {}
+        self._gitdirs: Dict[Path, Optional[Path]] = {}
+        self._lock = threading.Lock()
+
+    def _git(self, *args, cwd: Optional[Path] = None) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ["git"] + list(args),
+            cwd=cwd or self.project_path,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+
+    # ---------- batched ref data ----------
+
+    def _branch_heads(self) -> Dict[str, Tuple[str, str]]:
+        """branch -> (sha, subject) for all local branches, one process."""
+        result = self._git(
+            "for-each-ref", "--format=%(refname:short)%00%(objectname)%00%(subject)", "refs/heads/"
+        )
+        heads = {}
+        if result.returncode == 0:
+            for line in result.stdout.splitlines():
+                parts = line.split("\0")
+                if len(parts) == 3:
+                    heads[parts[0]] = (parts[1], parts[2])
+        return heads
+
+    def _commits_ahead(self, base_sha: str, head_shas: List[str]) -> Dict[str, int]:
+        """
+        Commits ahead of base for every head, from a single rev-list.
+
+        rev-list lists the union of commits not reachable from base with
+        their parents; per-head counts are walks over that subgraph.
+        """
+        if not head_shas:
+            return {}
+        result = self._git("rev-list", "--parents", f"^{base_sha}", *head_shas)
+        if result.returncode != 0:
+            return {}
+
+        parents: Dict[str, List[str]] = {}
+        for line in result.stdout.splitlines():
+            shas = line.split()
+            if shas:
+                parents[shas[0]] = shas[1:]
+
+        counts = {}
+        for head in head_shas:
+            seen = set()
+            stack = [head] if head in parents else []
+            while stack:
+                sha = stack.pop()
+                if sha in seen:
+                    continue
+                seen.add(sha)
+                stack.extend(p for p in parents[sha] if p in parents and p not in seen)
+            counts[head] = len(seen)
+        return counts
+
+    def _diff_stats(self, base_sha: str, head_sha: str) -> Dict:
+        """files_changed / additions / deletions / changed_files for base...head."""
+        key = (base_sha, head_sha)
+        with self._lock:
+            cached = self._diff_cache.get(key)
+        if cached is not None:
+            return cached
+
+        stats = {"files_changed": 0, "additions": 0, "deletions": 0, "changed_files": []}
+        if base_sha != head_sha:
+            result = self._git("diff", "--raw", "--numstat", f"{base_sha}...{head_sha}")
+            if result.returncode != 0:
+                return stats
+            for line in result.stdout.splitlines():
+                if line.startswith(":"):
+                    # :100644 100644 <sha> <sha> M\tpath
+                    meta, _, paths = line.partition("\t")
+                    stats["changed_files"].append((meta.split()[-1], paths))
+                elif line:
+                    added, deleted, _ = line.split("\t", 2)
+                    stats["files_changed"] += 1
+                    if added != "-":
+                        stats["additions"] += int(added)
+                        stats["deletions"] += int(deleted)
+
+        with self._lock:
+            self._diff_cache[key] = stats
+        return stats
+
+    # ---------- per-worktree status ----------
+
+    def _gitdir(self, worktree_path: Path) -> Optional[Path]:
+        """Private git dir of a linked worktree (where its HEAD and index live)."""
+        if worktree_path not in self._gitdirs:
+            gitdir = None
+            dot_git = worktree_path / ".git"
+            try:
+                if dot_git.is_file():
+                    content = dot_git.read_text(encoding="utf-8").strip()
+                    if content.startswith("gitdir:"):
+                        gitdir = (worktree_path / content[len("gitdir:"):].strip()).resolve()
+                elif dot_git.is_dir():
+                    gitdir = dot_git
+            except OSError:
+                pass
+            self._gitdirs[worktree_path] = gitdir
+        return self._gitdirs[worktree_path]
+
+    def _status_key(self, worktree_path: Path) -> Tuple:
+        gitdir = self._gitdir(worktree_path)
+        key = []
+        for name in ("HEAD", "index"):
+            try:
+                key.append(os.stat(gitdir / name).st_mtime_ns if gitdir else None)
+            except OSError:
+                key.append(None)
+        return tuple(key)
+
+    def _uncommitted_files(self, worktree_path: Path) -> int:
+        key = self._status_key(worktree_path)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._status_cache.get(worktree_path)
+        if cached and cached[0] == key and now - cached[1] < self.status_ttl:
+            return cached[2]
+
+        result = self._git("status", "--porcelain", cwd=worktree_path)
+        count = 0
+        if result.returncode == 0:
+            count = len([l for l in result.stdout.split("\n") if l.strip()])
+        with self._lock:
+            self._status_cache[worktree_path] = (key, now, count)
+        return count
+
+    # ---------- public ----------
+
+    def collect(
+        self,
+        worktrees: List[Tuple[Path, Optional[str]]],
+        base_branch: str
+    ) -> Dict[Path, Dict]:
+        """
+        Statistics for (path, branch_name) pairs.
+
+        Returns:
+            path -> stats dict in the same format as
+            WorktreeManager._get_worktree_stats
+        """
+        result: Dict[Path, Dict] = {path: _empty_stats() for path, _ in worktrees}
+        existing = [(path, branch) for path, branch in worktrees if path.exists()]
+        if not existing:
+            return result
+
+        heads = self._branch_heads()
+        base = heads.get(base_branch)
+        if base is None:
+            rev = self._git("rev-parse", "--verify", base_branch)
+            base_sha = rev.stdout.strip() if rev.returncode == 0 else None
+        else:
+            base_sha = base[0]
+
+        branch_shas = {
+            branch: heads[branch][0] for _, branch in existing if branch in heads
+        }
+        ahead = self._commits_ahead(base_sha, sorted(set(branch_shas.values()))) if base_sha else {}
+
+        def fill(item: Tuple[Path, Optional[str]]) -> None:
+            path, branch = item
+            stats = result[path]
+            stats["uncommitted_files"] = self._uncommitted_files(path)
+            if branch not in branch_shas:
+                return
+            head_sha = branch_shas[branch]
+            stats["last_commit"] = heads[branch][1][:80]
+            stats["commit_count"] = ahead.get(head_sha, 0)
+            if base_sha:
+                diff = self._diff_stats(base_sha, head_sha)
+                stats.update({k: v for k, v in diff.items() if k != "changed_files"})
+                stats["changed_files"] = list(diff["changed_files"])
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(existing)))) as pool:
+            list(pool.map(fill, existing))
+
+        # Drop cache entries of removed worktrees / superseded commits
+        live_pairs = {(base_sha, sha) for sha in branch_shas.values()}
+        live_paths = {path for path, _ in existing}
+        with self._lock:
+            for key in [k for k in self._diff_cache if k not in live_pairs]:
+                del self._diff_cache[key]
+            for path in [p for p in self._status_cache if p not in live_paths]:
+                del self._status_cache[path]
+                self._gitdirs.pop(path, None)
+
+        return result
+
 
 class WorktreeManager:
     """
@@ -87,7 +331,15 @@ class WorktreeManager:
     with a corresponding branch agent/{agent_id}/{task_name}.
     """
 
-    def __init__(self, project_path: Path, worktrees_base_dir: Optional[Path] = None):
+    # Повторный fetch базовой ветки не чаще раза в N секунд
+    fetch_ttl_sec: float = 300.0
+
+    def __init__(
+        self,
+        project_path: Path,
+        worktrees_base_dir: Optional[Path] = None,
+        max_recycled: int = 4,
+    ):
         self.project_path = project_path.resolve()
 
         if not self._is_git_repo():
@@ -102,7 +354,12 @@ class WorktreeManager:
             self.worktrees_base_dir = worktrees_base_dir
 
         self.worktrees_base_dir.mkdir(exist_ok=True)
+        self.pool_dir = self.worktrees_base_dir / POOL_DIR_NAME
+        self.max_recycled = max_recycled
         self._merge_lock = asyncio.Lock()
+        self._pool_lock = threading.Lock()
+        self._fetched: Dict[str, float] = {}
+        self._stats_collector = WorktreeStatsCollector(self.project_path)
 
     def _is_git_repo(self) -> bool:
         """Check if directory is a git repository."""
@@ -195,15 +452,7 @@ class WorktreeManager:
 
     def _get_worktree_stats(self, worktree_path: Path) -> Dict:
         """Get diff statistics for a worktree."""
-        stats = {
-            "commit_count": 0,
-            "files_changed": 0,
-            "additions": 0,
-            "deletions": 0,
-            "uncommitted_files": 0,
-            "last_commit": "",
-            "changed_files": [],
-        }
+        stats = _empty_stats()
 
         if not worktree_path.exists():
             return stats
@@ -276,13 +525,181 @@ class WorktreeManager:
 
         return None
 
+    # ==================== Base Branch Fetch ====================
+
+    def fetch_base(self, base_branch: Optional[str] = None, force: bool = False) -> bool:
+        """
+        Fetch the base branch from origin once and fast-forward the local branch.
+
+        Repeated calls within fetch_ttl_sec are no-ops, so a team run does a
+        single fetch for all of its worktrees. The main checkout is never
+        switched: a checked-out base is fast-forwarded only if that is
+        possible, otherwise the ref is moved with update-ref.
+
+        Returns:
+            True if a fetch was performed
+        """
+        base = base_branch or self.base_branch
+        if not force and time.monotonic() - self._fetched.get(base, float("-inf")) < self.fetch_ttl_sec:
+            return False
+        if "origin" not in self._run_git("remote").stdout.split():
+            self._fetched[base] = time.monotonic()
+            return False
+
+        result = self._run_git("fetch", "--quiet", "origin", base)
+        self._fetched[base] = time.monotonic()
+        if result.returncode != 0:
+            console.print(f"[yellow]Warning: Could not fetch {base}: {result.stderr.strip()}[/yellow]")
+            return False
+
+        local = self._run_git("rev-parse", "--verify", "--quiet", f"refs/heads/{base}").stdout.strip()
+        remote = self._run_git("rev-parse", "--verify", "--quiet", "FETCH_HEAD").stdout.strip()
+        if not local or not remote or local == remote:
+            return True
+        if self._run_git("merge-base", "--is-ancestor", local, remote).returncode != 0:
+            console.print(f"[yellow]Warning: {base} has diverged from origin/{base}, using local {base}[/yellow]")
+            return True
+
+        if self._get_current_branch() == base:
+            result = self._run_git("merge", "--ff-only", "--quiet", remote)
+        else:
+            result = self._run_git("update-ref", f"refs/heads/{base}", remote, local)
+        if result.returncode != 0:
+            console.print(f"[yellow]Warning: Could not update {base}: {result.stderr.strip()}[/yellow]")
+        return True
+
+    # ==================== Sparse Checkout ====================
+
+    def _sparse_dirs(self, scope: List[str], start_point: str) -> List[str]:
+        """
+        Map task scope (files, directories, globs) to cone-mode directories.
+
+        Files and globs are widened to their parent directory; top-level
+        files are always present in cone mode.
+        """
+        candidates = []
+        for entry in scope:
+            path = entry.replace("\\", "/").strip()
+            while path.startswith("./"):
+                path = path[2:]
+            path = path.strip("/")
+            glob = SPARSE_GLOB_CHARS.search(path)
+            if glob:
+                path = path[:glob.start()].rsplit("/", 1)[0] if "/" in path[:glob.start()] else ""
+            if path:
+                candidates.append(path)
+        if not candidates:
+            return []
+
+        trees = set(self._run_git(
+            "ls-tree", "-d", "--name-only", start_point, "--", *candidates
+        ).stdout.splitlines())
+
+        dirs: List[str] = []
+        for path in candidates:
+            if path not in trees:
+                path = path.rsplit("/", 1)[0] if "/" in path else ""
+            if path and path not in dirs:
+                dirs.append(path)
+
+        # Вложенные директории уже покрыты родительскими
+        return sorted(d for d in dirs if not any(d.startswith(p + "/") for p in dirs if p != d))
+
+    def _apply_sparse(self, worktree_path: Path, sparse_dirs: Optional[List[str]]) -> None:
+        """Enable cone-mode sparse checkout (None - full checkout)."""
+        if sparse_dirs is None:
+            self._run_git("sparse-checkout", "disable", cwd=worktree_path)
+        else:
+            self._run_git_checked("sparse-checkout", "set", "--cone", *sparse_dirs, cwd=worktree_path)
+
+    # ==================== Recycled Worktrees ====================
+
+    def _recycled_paths(self) -> List[Path]:
+        if not self.pool_dir.exists():
+            return []
+        return sorted(p for p in self.pool_dir.iterdir() if (p / ".git").exists())
+
+    def _reuse_recycled(
+        self,
+        worktree_path: Path,
+        branch_name: str,
+        start_point: str,
+        sparse_dirs: Optional[List[str]],
+    ) -> bool:
+        """Move a recycled worktree to worktree_path and reset it to start_point."""
+        with self._pool_lock:
+            for slot in self._recycled_paths():
+                if self._run_git("worktree", "move", str(slot), str(worktree_path)).returncode == 0:
+                    break
+            else:
+                return False
+
+        try:
+            self._apply_sparse(worktree_path, sparse_dirs)
+            self._run_git_checked("checkout", "--quiet", "--force", "-B", branch_name, start_point, cwd=worktree_path)
+            self._run_git_checked("clean", "-fdq", cwd=worktree_path)
+        except WorktreeError:
+            self._run_git("worktree", "remove", "--force", str(worktree_path))
+            shutil.rmtree(worktree_path, ignore_errors=True)
+            return False
+        return True
+
+    def recycle_worktree(self, worktree: Worktree | Path, delete_branch: bool = True) -> bool:
+        """
+        Return a worktree to the reuse pool instead of deleting it.
+
+        The worktree is detached, reset and cleaned (ignored files such as
+        installed dependencies are kept), and its branch is deleted unless
+        delete_branch=False. When the pool is full the worktree is removed
+        as usual.
+
+        Returns:
+            True if the worktree was pooled
+        """
+        if isinstance(worktree, Worktree):
+            path, branch_name = worktree.path, worktree.branch_name
+        else:
+            path, branch_name = worktree, None
+            for wt in self.list_worktrees() if delete_branch else []:
+                if wt.path == path:
+                    branch_name = wt.branch_name
+                    break
+
+        pooled = False
+        with self._pool_lock:
+            if path.exists() and len(self._recycled_paths()) < self.max_recycled:
+                steps = (
+                    ("checkout", "--quiet", "--force", "--detach"),
+                    ("reset", "--quiet", "--hard"),
+                    ("clean", "-fdq"),
+                )
+                if all(self._run_git(*step, cwd=path).returncode == 0 for step in steps):
+                    self.pool_dir.mkdir(exist_ok=True)
+                    slot = self.pool_dir / f"slot-{uuid.uuid4().hex[:8]}"
+                    pooled = self._run_git("worktree", "move", str(path), str(slot)).returncode == 0
+
+        if not pooled:
+            if delete_branch:
+                self.discard_worktree(path, force=True)
+            else:
+                self._run_git("worktree", "remove", "--force", str(path))
+                shutil.rmtree(path, ignore_errors=True)
+                self._run_git("worktree", "prune")
+        if delete_branch and branch_name and branch_name != "unknown":
+            self._run_git("branch", "-D", branch_name)
+        if pooled:
+            console.print(f"[green]Recycled worktree: {path}[/green]")
+        return pooled
+
     # ==================== Create Worktree ====================
 
     def create_task_worktree(
         self,
         agent_id: str,
         task_name: str,
-        base_branch: Optional[str] = None
+        base_branch: Optional[str] = None,
+        scope: Optional[List[str]] = None,
+        reuse: bool = True,
     ) -> Worktree:
         """
         Create an isolated worktree for an agent task.
@@ -291,6 +708,9 @@ class WorktreeManager:
             agent_id: ID of the agent
             task_name: Name of the task (used in branch name)
             base_branch: Base branch to create from (default: auto-detected)
+            scope: Task paths; if given, only they (plus top-level files)
+                are checked out (sparse checkout)
+            reuse: Take a recycled worktree from the pool if available
 
         Returns:
             Worktree object with information about the created worktree
@@ -320,32 +740,39 @@ class WorktreeManager:
         # Delete branch if it exists (from previous attempt)
         self._run_git("branch", "-D", branch_name)
 
-        # Update base branch if remote exists
-        has_remote = "origin" in self._run_git("remote").stdout
-        if has_remote:
-            try:
-                self._run_git("fetch", "origin", self.base_branch)
-                self._run_git("checkout", self.base_branch)
-                self._run_git("pull", "origin", self.base_branch)
-            except Exception as e:
-                console.print(f"[yellow]Warning: Could not update {self.base_branch}: {e}[/yellow]")
+        # Update base branch if remote exists (once per fetch_ttl_sec)
+        self.fetch_base(self.base_branch)
 
-        # Create worktree with new branch from base
-        result = self._run_git(
-            "worktree", "add", "-b", branch_name,
-            str(worktree_path), self.base_branch
-        )
+        start_point = self._run_git("rev-parse", "--verify", f"{self.base_branch}^{{commit}}").stdout.strip()
+        if not start_point:
+            raise WorktreeError(f"Base branch '{self.base_branch}' not found")
+        sparse_dirs = self._sparse_dirs(scope, start_point) if scope else None
 
-        if result.returncode != 0:
-            raise WorktreeError(f"Failed to create worktree: {result.stderr}")
+        reused = reuse and self._reuse_recycled(worktree_path, branch_name, start_point, sparse_dirs)
+        if not reused:
+            if sparse_dirs is None:
+                args = ["worktree", "add", "-b", branch_name, str(worktree_path), start_point]
+            else:
+                args = ["worktree", "add", "--no-checkout", "-b", branch_name, str(worktree_path), start_point]
+            result = self._run_git(*args)
+            if result.returncode != 0:
+                raise WorktreeError(f"Failed to create worktree: {result.stderr}")
 
-        # Get commit hash
-        commit_hash = self._run_git("rev-parse", "HEAD", cwd=worktree_path).stdout.strip()
+            if sparse_dirs is not None:
+                try:
+                    self._apply_sparse(worktree_path, sparse_dirs)
+                    self._run_git_checked("read-tree", "-mu", "HEAD", cwd=worktree_path)
+                except WorktreeError:
+                    self.discard_worktree(Worktree(
+                        path=worktree_path, branch_name=branch_name, commit_hash=start_point,
+                        created_at=datetime.now(), agent_id=agent_id, task_name=task_name,
+                    ), force=True)
+                    raise
 
         worktree = Worktree(
             path=worktree_path,
             branch_name=branch_name,
-            commit_hash=commit_hash,
+            commit_hash=start_point,
             created_at=datetime.now(),
             agent_id=agent_id,
             task_name=task_name,
@@ -353,12 +780,17 @@ class WorktreeManager:
             is_active=True,
         )
 
+        details = ""
+        if sparse_dirs is not None:
+            details += f"\nSparse: {', '.join(sparse_dirs) or '(top-level files)'}"
+        if reused:
+            details += "\nReused recycled worktree"
         console.print(Panel(
             f"Created worktree for agent {agent_id}\n"
             f"Path: {worktree_path}\n"
             f"Branch: {branch_name}\n"
             f"Base: {self.base_branch}\n"
-            f"Commit: {commit_hash[:8]}",
+            f"Commit: {start_point[:8]}{details}",
             title="Worktree Created",
             border_style="green"
         ))
@@ -377,10 +809,15 @@ class WorktreeManager:
     # ==================== List Worktrees ====================
 
     def list_worktrees(self) -> List[Worktree]:
-        """List all active worktrees with full statistics."""
+        """
+        List all active worktrees with full statistics.
+
+        Statistics are gathered for all worktrees in one batch
+        (see WorktreeStatsCollector), not with several git calls each.
+        """
         output = self._run_git("worktree", "list", "--porcelain")
 
-        worktrees = []
+        entries = []
         lines = output.stdout.split('\n')
 
         i = 0
@@ -389,8 +826,8 @@ class WorktreeManager:
                 path_str = lines[i].split(' ', 1)[1]
                 path = Path(path_str)
 
-                # Skip main worktree
-                if path == self.project_path:
+                # Skip main worktree and recycled ones
+                if path == self.project_path or path.parent == self.pool_dir:
                     i += 1
                     while i < len(lines) and not lines[i].startswith('worktree '):
                         i += 1
@@ -408,43 +845,52 @@ class WorktreeManager:
                         branch_name = lines[i].split(' ', 1)[1].replace('refs/heads/', '')
                     i += 1
 
-                # Extract agent_id and task_name from branch name
-                agent_id = "unknown"
-                task_name = "unknown"
+                entries.append((path, branch_name, commit_hash))
+            else:
+                i += 1
+
+        all_stats = self._stats_collector.collect(
+            [(path, branch_name) for path, branch_name, _ in entries],
+            self.base_branch
+        )
 
-                if branch_name and branch_name.startswith('agent/'):
-                    parts = branch_name.split('/')
-                    if len(parts) >= 3:
-                        agent_id = parts[1]
-                        task_name = '/'.join(parts[2:])
+        worktrees = []
+        for path, branch_name, commit_hash in entries:
+            # Extract agent_id and task_name from branch name
+            agent_id = "unknown"
+            task_name = "unknown"
 
-                # Get statistics
-                stats = self._get_worktree_stats(path)
+            if branch_name and branch_name.startswith('agent/'):
+                parts = branch_name.split('/')
+                if len(parts) >= 3:
+                    agent_id = parts[1]
+                    task_name = '/'.join(parts[2:])
 
-                try:
-                    created_at = datetime.fromtimestamp(path.stat().st_ctime)
-                except:
-                    created_at = datetime.now()
-
-                worktrees.append(Worktree(
-                    path=path,
-                    branch_name=branch_name or "unknown",
-                    commit_hash=commit_hash or "unknown",
-                    created_at=created_at,
-                    agent_id=agent_id,
-                    task_name=task_name,
-                    base_branch=self.base_branch,
-                    is_active=True,
-                    commit_count=stats["commit_count"],
-                    files_changed=stats["files_changed"],
-                    additions=stats["additions"],
-                    deletions=stats["deletions"],
-                    uncommitted_files=stats["uncommitted_files"],
-                    last_commit=stats["last_commit"],
-                    changed_files=stats["changed_files"],
-                ))
-            else:
-                i += 1
+            # Detached HEAD - no branch to batch on, fall back to per-worktree stats
+            stats = all_stats[path] if branch_name else self._get_worktree_stats(path)
+
+            try:
+                created_at = datetime.fromtimestamp(path.stat().st_ctime)
+            except:
+                created_at = datetime.now()
+
+            worktrees.append(Worktree(
+                path=path,
+                branch_name=branch_name or "unknown",
+                commit_hash=commit_hash or "unknown",
+                created_at=created_at,
+                agent_id=agent_id,
+                task_name=task_name,
+                base_branch=self.base_branch,
+                is_active=True,
+                commit_count=stats["commit_count"],
+                files_changed=stats["files_changed"],
+                additions=stats["additions"],
+                deletions=stats["deletions"],
+                uncommitted_files=stats["uncommitted_files"],
+                last_commit=stats["last_commit"],
+                changed_files=stats["changed_files"],
+            ))
 
         return worktrees
 
@@ -582,20 +1028,84 @@ class WorktreeManager:
 
         # Cleanup
         if delete_after and not no_commit:
-            self.discard_worktree(worktree.path, force=True)
+            self.discard_worktree(worktree, force=True, recycle=True)
 
         return True
 
+    def merge_worktrees(
+        self,
+        worktrees: Optional[List[Worktree]] = None,
+        target_branch: Optional[str] = None,
+        delete_after: bool = True,
+        resolve_conflicts: bool = False,
+    ) -> "MergeQueueReport":
+        """
+        Merge many agent worktrees through MergeQueue.
+
+        Conflicts are predicted in memory for all branches first; clean
+        branches are merged without touching the working tree, only real
+        conflicts go through ConflictResolver (resolve_conflicts=True).
+
+        Args:
+            worktrees: Worktrees to merge (default: all agent worktrees)
+            target_branch: Target branch for merge (default: base_branch)
+            delete_after: Delete merged worktrees
+            resolve_conflicts: Try ConflictResolver on conflicting branches
+
+        Returns:
+            MergeQueueReport
+        """
+        from .git.conflict_resolver import ConflictResolver
+        from .git.merge_queue import MergeQueue
+
+        if worktrees is None:
+            worktrees = self.list_worktrees()
+        target_branch = target_branch or self.base_branch
+
+        # Detached worktrees have no branch to merge
+        for wt in worktrees:
+            if not wt.is_agent_branch:
+                console.print(f"[yellow]Skipping {wt.path.name}: not on an agent branch ({wt.branch_name})[/yellow]")
+        worktrees = [wt for wt in worktrees if wt.is_agent_branch]
+
+        for wt in worktrees:
+            if wt.uncommitted_files > 0:
+                console.print(f"[yellow]Warning: {wt.uncommitted_files} uncommitted files in {wt.branch_name}[/yellow]")
+
+        resolver = ConflictResolver(self.project_path) if resolve_conflicts else None
+        queue = MergeQueue(self.project_path, target_branch=target_branch, resolver=resolver)
+        report = queue.run([wt.branch_name for wt in worktrees])
+
+        done = set(report.merged) | set(report.resolved)
+        if done and "origin" in self._run_git("remote").stdout:
+            result = self._run_git("push", "origin", target_branch)
+            if result.returncode != 0:
+                console.print(f"[yellow]Warning: Could not push to origin: {result.stderr.strip()}[/yellow]")
+
+        if delete_after:
+            for wt in worktrees:
+                if wt.branch_name in done:
+                    self.discard_worktree(wt, force=True, recycle=True)
+
+        for branch, reason in report.failed.items():
+            console.print(f"[red]Not merged {branch}: {reason}[/red]")
+        return report
+
     # ==================== Discard Worktree ====================
 
-    def discard_worktree(self, worktree: Worktree | Path, force: bool = False) -> None:
+    def discard_worktree(self, worktree: Worktree | Path, force: bool = False, recycle: bool = False) -> None:
         """
         Remove worktree and its branch.
 
         Args:
             worktree: Worktree object or Path to worktree
             force: Force removal even with uncommitted changes
+            recycle: Keep the checkout in the reuse pool (see recycle_worktree)
         """
+        if recycle and self.max_recycled > 0:
+            self.recycle_worktree(worktree)
+            return
+
         if isinstance(worktree, Worktree):
             path = worktree.path
             branch_name = worktree.branch_name
@@ -673,8 +1183,11 @@ class WorktreeManager:
 
         # Remove unregistered directories
         removed = 0
-        for item in self.worktrees_base_dir.iterdir():
-            if item.is_dir() and item not in registered_paths:
+        items = list(self.worktrees_base_dir.iterdir())
+        if self.pool_dir.exists():
+            items += list(self.pool_dir.iterdir())
+        for item in items:
+            if item.is_dir() and item != self.pool_dir and item not in registered_paths:
                 console.print(f"[yellow]Removing stale worktree: {item.name}[/yellow]")
                 shutil.rmtree(item, ignore_errors=True)
                 removed += 1
@@ -690,6 +1203,10 @@ class WorktreeManager:
         """Remove all worktrees and their branches."""
         for worktree in self.list_worktrees():
             self.discard_worktree(worktree, force=True)
+        for slot in self._recycled_paths():
+            self._run_git("worktree", "remove", "--force", str(slot))
+            shutil.rmtree(slot, ignore_errors=True)
+        self._run_git("worktree", "prune")
         console.print("[green]All worktrees cleaned up[/green]")
 
     # ==================== Status ====================
@@ -20,6 +20,8 @@ import subprocess
 import threading
 import os
 
+from .worktree_manager import WorktreeStatsCollector
+
 
 @dataclass
 class WorktreeInfo:
@@ -297,6 +299,7 @@ class WorktreePanel(tk.Frame):
         self.on_discard = on_discard
         self.on_create = on_create
         self.refresh_interval = refresh_interval
+        self._stats_collector: Optional[WorktreeStatsCollector] = None
 
         self._expanded = True
         self._active = True
@@ -443,6 +446,7 @@ class WorktreePanel(tk.Frame):
                 return worktrees
 
             lines = result.stdout.strip().split('\n')
+            parsed = []
             i = 0
 
             while i < len(lines):
@@ -475,100 +479,37 @@ class WorktreePanel(tk.Frame):
                             agent_id = parts[1]
                             task_name = '/'.join(parts[2:])
 
-                    # Get status
-                    status = self._get_worktree_status(path)
-
-                    worktrees.append(WorktreeInfo(
-                        path=path,
-                        branch_name=branch_name,
-                        agent_id=agent_id,
-                        task_name=task_name,
-                        commits_ahead=status.get("commits_ahead", 0),
-                        uncommitted_files=status.get("uncommitted_files", 0),
-                        last_commit=status.get("last_commit", ""),
-                        files_changed=status.get("files_changed", 0),
-                        additions=status.get("additions", 0),
-                        deletions=status.get("deletions", 0),
-                    ))
+                    parsed.append((path, branch_name, agent_id, task_name))
                 else:
                     i += 1
 
-        except Exception:
-            pass
-
-        return worktrees
-
-    def _get_worktree_status(self, path: Path) -> Dict:
-        """Get status for a specific worktree."""
-        import re
-
-        status = {
-            "commits_ahead": 0,
-            "uncommitted_files": 0,
-            "last_commit": "",
-            "files_changed": 0,
-            "additions": 0,
-            "deletions": 0,
-        }
-
-        try:
-            # Uncommitted files
-            result = subprocess.run(
-                ["git", "status", "--porcelain"],
-                cwd=path,
-                capture_output=True,
-                text=True,
-                timeout=3
+            # One batch for all worktrees instead of several git calls per card
+            if self._stats_collector is None:
+                self._stats_collector = WorktreeStatsCollector(self.project_path)
+            all_stats = self._stats_collector.collect(
+                [(path, branch_name or None) for path, branch_name, _, _ in parsed],
+                "main"
             )
-            if result.returncode == 0:
-                status["uncommitted_files"] = len([l for l in result.stdout.split('\n') if l.strip()])
 
-            # Commits ahead
-            result = subprocess.run(
-                ["git", "rev-list", "--count", "main..HEAD"],
-                cwd=path,
-                capture_output=True,
-                text=True,
-                timeout=3
-            )
-            if result.returncode == 0:
-                status["commits_ahead"] = int(result.stdout.strip() or 0)
-
-            # Last commit
-            result = subprocess.run(
-                ["git", "log", "-1", "--pretty=%s"],
-                cwd=path,
-                capture_output=True,
-                text=True,
-                timeout=3
-            )
-            if result.returncode == 0:
-                status["last_commit"] = result.stdout.strip()[:50]
-
-            # Diff stats (additions/deletions/files)
-            result = subprocess.run(
-                ["git", "diff", "--shortstat", "main...HEAD"],
-                cwd=path,
-                capture_output=True,
-                text=True,
-                timeout=3
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                # Parse: "3 files changed, 50 insertions(+), 10 deletions(-)"
-                match = re.search(r"(\d+) files? changed", result.stdout)
-                if match:
-                    status["files_changed"] = int(match.group(1))
-                match = re.search(r"(\d+) insertions?", result.stdout)
-                if match:
-                    status["additions"] = int(match.group(1))
-                match = re.search(r"(\d+) deletions?", result.stdout)
-                if match:
-                    status["deletions"] = int(match.group(1))
+            for path, branch_name, agent_id, task_name in parsed:
+                status = all_stats[path]
+                worktrees.append(WorktreeInfo(
+                    path=path,
+                    branch_name=branch_name,
+                    agent_id=agent_id,
+                    task_name=task_name,
+                    commits_ahead=status["commit_count"],
+                    uncommitted_files=status["uncommitted_files"],
+                    last_commit=status["last_commit"][:50],
+                    files_changed=status["files_changed"],
+                    additions=status["additions"],
+                    deletions=status["deletions"],
+                ))
 
         except Exception:
             pass
 
-        return status
+        return worktrees
 
     def _update_ui(self, worktrees: List[WorktreeInfo]):
         """Update UI with worktree list."""
@@ -619,6 +560,7 @@ class WorktreePanel(tk.Frame):
     def set_project_path(self, path: Path):
         """Update project path and refresh."""
         self.project_path = path
+        self._stats_collector = None
         self._refresh_worktrees()
 
     def update_theme(self, theme: Dict):
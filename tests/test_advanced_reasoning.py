@@ -0,0 +1,193 @@
+"""
+Tests for advanced_reasoning.py - parallel fan-out with early stopping.
+"""
+
+import asyncio
+import json
+import re
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.advanced_reasoning import (
+    run_branches,
+    TreeOfThoughtsReasoning,
+    SelfConsistencyReasoning,
+    ReflectionReasoning,
+)
+
+
+def _cot(answer, confidence=0.8):
+    return json.dumps({
+        "understanding": "u",
+        "analysis": "a",
+        "plan": ["p"],
+        "execution": {"step1": "e"},
+        "verification": "v",
+        "final_answer": answer,
+        "confidence": confidence,
+    })
+
+
+class FakeLLM:
+    """Async llm_call that tracks concurrency, started and cancelled calls."""
+
+    def __init__(self, reply, delays=None):
+        self.reply = reply
+        self.delays = delays or (lambda n, prompt: 0.02)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = 0
+        self.finished = 0
+        self.cancelled = 0
+
+    async def __call__(self, prompt):
+        n = self.started
+        self.started += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays(n, prompt))
+            self.finished += 1
+            return self.reply(n, prompt)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+
+class TestRunBranches:
+    """Tests for run_branches."""
+
+    def test_semaphore_bound_and_order(self):
+        llm = FakeLLM(lambda n, p: p, delays=lambda n, p: 0.05 - int(p) * 0.004)
+
+        results = asyncio.run(run_branches(
+            [lambda i=i: llm(str(i)) for i in range(8)],
+            max_concurrency=3,
+        ))
+
+        assert llm.max_in_flight == 3
+        assert [r.index for r in results] == list(range(8))
+        assert [r.value for r in results] == [str(i) for i in range(8)]
+        assert all(r.latency_ms > 0 for r in results)
+
+    def test_should_stop_cancels_pending(self):
+        llm = FakeLLM(lambda n, p: p, delays=lambda n, p: 0.01 if p == "fast" else 5)
+
+        results = asyncio.run(run_branches(
+            [lambda: llm("slow"), lambda: llm("fast"), lambda: llm("slow")],
+            max_concurrency=3,
+            should_stop=lambda done: any(r.value == "fast" for r in done),
+        ))
+
+        assert [r.value for r in results] == ["fast"]
+        assert llm.cancelled == 2
+
+
+class TestSelfConsistency:
+    """Tests for concurrent sampling with majority early stop."""
+
+    def test_stops_at_majority(self):
+        # Samples 0 and 1 agree quickly; the rest are slow and get cancelled
+        llm = FakeLLM(
+            lambda n, p: _cot("42"),
+            delays=lambda n, p: 0.01 if n < 2 else 5,
+        )
+
+        trace = asyncio.run(SelfConsistencyReasoning.execute(
+            "task", llm, num_samples=3, max_concurrency=3
+        ))
+
+        assert trace.final_answer == "42"
+        assert llm.cancelled == 1
+        assert sorted(trace.branch_latencies_ms) == ["sample_1", "sample_2"]
+        assert all(v > 0 for v in trace.branch_latencies_ms.values())
+
+    def test_no_early_stop_runs_all(self):
+        answers = ["a", "b", "a", "b", "a"]
+        llm = FakeLLM(lambda n, p: _cot(answers[n]))
+
+        trace = asyncio.run(SelfConsistencyReasoning.execute(
+            "task", llm, num_samples=5, max_concurrency=2, early_stop=False
+        ))
+
+        assert llm.max_in_flight == 2
+        assert llm.finished == 5
+        assert trace.final_answer == "a"
+        assert len(trace.branch_latencies_ms) == 5
+
+
+class TestTreeOfThoughts:
+    """Tests for concurrent approach evaluation."""
+
+    def _reply(self, scores):
+        def reply(n, prompt):
+            if "different approaches" in prompt:
+                return json.dumps({"approaches": [{"id": i, "idea": f"idea-{i}"} for i in range(len(scores))]})
+            if "Evaluate this approach" in prompt:
+                idx = int(re.search(r"Approach: idea-(\d+)", prompt).group(1))
+                return json.dumps({"overall_score": scores[idx]})
+            return _cot("done", confidence=1.0)
+        return reply
+
+    def test_score_threshold_stops_evaluation(self):
+        scores = [0.3, 0.95, 0.4, 0.5]
+
+        def delays(n, prompt):
+            if "Approach: idea-1" in prompt:
+                return 0.01
+            if "Evaluate this approach" in prompt:
+                return 5
+            return 0
+
+        llm = FakeLLM(self._reply(scores), delays=delays)
+        trace = asyncio.run(TreeOfThoughtsReasoning.execute(
+            "task", llm, num_thoughts=4, max_concurrency=4, score_threshold=0.9
+        ))
+
+        assert trace.thoughts[1].content == "Best approach: idea-1"
+        assert llm.cancelled == 3
+        assert list(trace.branch_latencies_ms) == ["evaluate_2"]
+
+    def test_all_evaluated_without_threshold(self):
+        llm = FakeLLM(self._reply([0.3, 0.8, 0.6]))
+
+        trace = asyncio.run(TreeOfThoughtsReasoning.execute(
+            "task", llm, num_thoughts=3, max_concurrency=2
+        ))
+
+        assert llm.max_in_flight == 2
+        assert trace.thoughts[1].content == "Best approach: idea-1"
+        assert sorted(trace.branch_latencies_ms) == ["evaluate_1", "evaluate_2", "evaluate_3"]
+
+
+class TestReflection:
+    """Tests for concurrent candidate generation per iteration."""
+
+    def test_candidates_concurrent_best_kept(self):
+        critique = json.dumps({"is_correct": False, "overall_quality": 0.2, "mistakes": [], "improvements": []})
+        confidences = iter([0.5, 0.6, 0.9, 0.7])
+
+        def reply(n, prompt):
+            if "Critique this solution" in prompt:
+                return critique
+            confidence = next(confidences)
+            return _cot(f"answer-{confidence}", confidence=confidence)
+
+        llm = FakeLLM(reply)
+        trace = asyncio.run(ReflectionReasoning.execute(
+            "task", llm, max_iterations=1, num_candidates=3, max_concurrency=3
+        ))
+
+        assert llm.max_in_flight == 3
+        assert trace.final_answer == "answer-0.9"
+        assert set(trace.branch_latencies_ms) == {
+            "initial",
+            "iteration_1_candidate_1",
+            "iteration_1_candidate_2",
+            "iteration_1_candidate_3",
+        }
@@ -0,0 +1,105 @@
+"""
+Tests for registry.py - SQLite index of agent records.
+"""
+
+import shutil
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.registry import (
+    AgentRecord,
+    agent_index_path,
+    agent_json_path,
+    find_agents,
+    forget_agent,
+    iter_agents,
+    load_agent,
+    reindex_agents,
+    save_agent,
+    used_agent_ports,
+)
+
+
+@pytest.fixture
+def agent_root(temp_dir):
+    root = temp_dir / "agents"
+    root.mkdir()
+    return root
+
+
+def _agent(agent_id, **kwargs):
+    kwargs.setdefault("port", 37700)
+    return AgentRecord(id=agent_id, **kwargs)
+
+
+class TestAgentIndex:
+    """Tests for the indexed agent store."""
+
+    def test_save_writes_json_and_index(self, agent_root):
+        save_agent(agent_root, _agent("a1", purpose="api"))
+
+        assert agent_json_path(agent_root, "a1").exists()
+        assert agent_index_path(agent_root).exists()
+        assert load_agent(agent_root, "a1").purpose == "api"
+
+    def test_iter_sorted_by_id(self, agent_root):
+        for agent_id in ("b", "c", "a"):
+            save_agent(agent_root, _agent(agent_id))
+
+        assert [a.id for a in iter_agents(agent_root)] == ["a", "b", "c"]
+
+    def test_queries(self, agent_root):
+        save_agent(agent_root, _agent("a1", project_path="/p1", port=37701))
+        save_agent(agent_root, _agent("a2", project_path="/p2", port=37702, active_run_id="run-1"))
+        save_agent(agent_root, _agent("a3", project_path="/p1", port=37703))
+
+        assert [a.id for a in find_agents(agent_root, project_path="/p1")] == ["a1", "a3"]
+        assert [a.id for a in find_agents(agent_root, status="running")] == ["a2"]
+        assert [a.id for a in find_agents(agent_root, port=37703)] == ["a3"]
+        assert used_agent_ports(agent_root) == {37701, 37702, 37703}
+
+    def test_update_changes_status(self, agent_root):
+        save_agent(agent_root, _agent("a1", active_run_id="run-1"))
+        rec = load_agent(agent_root, "a1").model_copy(update={"active_run_id": None})
+        save_agent(agent_root, rec)
+
+        assert find_agents(agent_root, status="running") == []
+        assert [a.id for a in find_agents(agent_root, status="stopped")] == ["a1"]
+
+    def test_removed_directory_dropped(self, agent_root):
+        save_agent(agent_root, _agent("a1"))
+        save_agent(agent_root, _agent("a2"))
+        shutil.rmtree(agent_root / "a1")
+
+        assert [a.id for a in iter_agents(agent_root)] == ["a2"]
+        with pytest.raises(FileNotFoundError):
+            load_agent(agent_root, "a1")
+
+    def test_forget_agent(self, agent_root):
+        save_agent(agent_root, _agent("a1"))
+        shutil.rmtree(agent_root / "a1")
+        forget_agent(agent_root, "a1")
+
+        assert find_agents(agent_root, port=37700) == []
+
+    def test_external_directory_imported(self, agent_root):
+        """agent.json, written bypassing save_agent (e.g. legacy tree), gets indexed."""
+        d = agent_root / "legacy"
+        d.mkdir()
+        (d / "agent.json").write_text(_agent("legacy", purpose="old").model_dump_json(), encoding="utf-8")
+        (agent_root / "broken").mkdir()
+        (agent_root / "broken" / "agent.json").write_text("{not json", encoding="utf-8")
+
+        assert [a.id for a in iter_agents(agent_root)] == ["legacy"]
+        assert load_agent(agent_root, "legacy").purpose == "old"
+
+    def test_reindex_picks_up_in_place_edit(self, agent_root):
+        save_agent(agent_root, _agent("a1", purpose="before"))
+        p = agent_json_path(agent_root, "a1")
+        p.write_text(_agent("a1", purpose="after").model_dump_json(), encoding="utf-8")
+
+        assert reindex_agents(agent_root) == 1
+        assert load_agent(agent_root, "a1").purpose == "after"
@@ -0,0 +1,304 @@
+"""
+Tests for team/base_agent.py - agentic tool loop, tool execution, prompt caching and metrics.
+
+The Anthropic client is never called: _create_message is replaced with a
+scripted fake. Without the anthropic SDK a minimal stub module is used.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import types
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    import anthropic  # noqa: F401
+except ImportError:
+    _stub = types.ModuleType("anthropic")
+    _stub.Anthropic = lambda *args, **kwargs: SimpleNamespace()
+    sys.modules["anthropic"] = _stub
+
+from claude_agent_manager.team.base_agent import AgentConfig, SimpleAgent, SERIAL_TOOLS
+from claude_agent_manager.monitoring.metrics import MetricsCollector, MetricType
+
+
+def _text(text):
+    return SimpleNamespace(type="text", text=text)
+
+
+def _tool(tool_id, name, tool_input=None):
+    return SimpleNamespace(type="tool_use", id=tool_id, name=name, input=tool_input or {})
+
+
+def _response(*blocks, input_tokens=100, output_tokens=50, cache_read=0, cache_write=0):
+    return SimpleNamespace(
+        content=list(blocks),
+        stop_reason="tool_use" if any(b.type == "tool_use" for b in blocks) else "end_turn",
+        usage=SimpleNamespace(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_read_input_tokens=cache_read,
+            cache_creation_input_tokens=cache_write,
+        ),
+    )
+
+
+def _agent(monkeypatch, responses, metrics=None, **config):
+    """SimpleAgent whose LLM calls return the scripted responses in order."""
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    config.setdefault("mcp_tools", ["filesystem"])
+    agent = SimpleAgent(
+        AgentConfig(name="dev-1", role="backend", system_prompt="You are a backend dev.", **config),
+        metrics=metrics,
+    )
+    agent.requests = []
+    script = iter(responses)
+
+    def fake_create_message(params):
+        agent.requests.append(params)
+        return next(script)
+
+    agent._create_message = fake_create_message
+    return agent
+
+
+def _loop(agent, prompt="do it"):
+    params = {"model": "m", "max_tokens": 100, "system": agent._build_system_blocks()}
+    return asyncio.run(agent._run_tool_loop(params, [{"role": "user", "content": prompt}]))
+
+
+class TestToolLoopLimits:
+    """Tests for max_turns and the token budget."""
+
+    def test_stops_at_max_turns(self, monkeypatch):
+        responses = [_response(_tool(f"t{i}", "read_file")) for i in range(10)]
+        agent = _agent(monkeypatch, responses, max_turns=3)
+        executed = []
+
+        async def fake_tool(name, tool_input):
+            executed.append(name)
+            return "ok"
+
+        agent._execute_single_tool = fake_tool
+        _loop(agent)
+
+        assert len(agent.requests) == 3
+        # Tools of the last turn are not run: no turn left to consume them
+        assert len(executed) == 2
+        assert agent.usage["turns"] == 3
+
+    def test_stops_when_token_budget_exhausted(self, monkeypatch):
+        responses = [_response(_tool(f"t{i}", "read_file")) for i in range(10)]
+        agent = _agent(monkeypatch, responses, max_turns=10, max_total_tokens=250)
+        executed = []
+
+        async def fake_tool(name, tool_input):
+            executed.append(name)
+            return "ok"
+
+        agent._execute_single_tool = fake_tool
+        _loop(agent)
+
+        # 150 tokens per turn: 300 >= 250 after the second turn
+        assert len(agent.requests) == 2
+        assert len(executed) == 1
+
+    def test_text_only_reply_ends_loop(self, monkeypatch):
+        agent = _agent(monkeypatch, [_response(_text("done"))])
+
+        assert _loop(agent) == "done"
+        assert len(agent.requests) == 1
+
+
+class TestToolExecution:
+    """Tests for concurrent/serial tool execution and timeouts."""
+
+    def test_independent_tools_concurrent_serial_in_order(self, monkeypatch):
+        assert "write_file" in SERIAL_TOOLS and "read_file" not in SERIAL_TOOLS
+        agent = _agent(monkeypatch, [])
+        log = []
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_tool(name, tool_input):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            log.append(("start", tool_input["id"]))
+            await asyncio.sleep(0.05)
+            log.append(("end", tool_input["id"]))
+            in_flight -= 1
+            return tool_input["id"]
+
+        agent._execute_single_tool = fake_tool
+        calls = [
+            {"id": "a", "name": "read_file", "input": {"id": "a"}},
+            {"id": "b", "name": "read_file", "input": {"id": "b"}},
+            {"id": "w", "name": "write_file", "input": {"id": "w"}},
+            {"id": "c", "name": "read_file", "input": {"id": "c"}},
+        ]
+
+        started = time.perf_counter()
+        results = asyncio.run(agent._execute_tool_calls(calls))
+        elapsed = time.perf_counter() - started
+
+        assert [r["tool_use_id"] for r in results] == ["a", "b", "w", "c"]
+        assert [r["content"] for r in results] == ["a", "b", "w", "c"]
+        assert max_in_flight == 2
+        # The write starts only after both reads finished and ends before c starts
+        w_start = log.index(("start", "w"))
+        assert {("end", "a"), ("end", "b")} <= set(log[:w_start])
+        assert log.index(("end", "w")) < log.index(("start", "c"))
+        assert elapsed < 0.05 * 4
+
+    def test_slow_tool_times_out(self, monkeypatch):
+        agent = _agent(monkeypatch, [], tool_timeout=0.05)
+
+        async def slow_tool(name, tool_input):
+            await asyncio.sleep(5)
+
+        agent._execute_single_tool = slow_tool
+
+        started = time.perf_counter()
+        results = asyncio.run(agent._execute_tool_calls([{"id": "s", "name": "read_file", "input": {}}]))
+
+        assert time.perf_counter() - started < 1
+        assert results[0]["tool_use_id"] == "s"
+        assert results[0]["is_error"] is True
+        assert "timed out" in results[0]["content"]
+
+
+class TestTurnMetrics:
+    """Tests for per-turn recording in MetricsCollector."""
+
+    def test_latency_and_tokens_recorded_off_loop(self, monkeypatch, temp_dir):
+        collector = MetricsCollector(db_path=temp_dir / "metrics.db")
+        writer_threads = set()
+        original_record = collector.record
+
+        def tracking_record(*args, **kwargs):
+            writer_threads.add(threading.current_thread().name)
+            return original_record(*args, **kwargs)
+
+        collector.record = tracking_record
+        responses = [
+            _response(_tool("t1", "read_file"), input_tokens=120, output_tokens=30),
+            _response(_text("done"), input_tokens=200, output_tokens=10),
+        ]
+        agent = _agent(monkeypatch, responses, metrics=collector)
+
+        async def fake_tool(name, tool_input):
+            return "ok"
+
+        agent._execute_single_tool = fake_tool
+        _loop(agent)
+
+        activity = collector.get_recent_activity(20)
+        latency = [a for a in activity if a["type"] == MetricType.LATENCY.value]
+        tokens = sorted(a["value"] for a in activity if a["type"] == MetricType.TOKEN_USAGE.value)
+        tool_calls = [a for a in activity if a["type"] == MetricType.TOOL_CALL.value]
+
+        assert len(latency) == 2
+        assert sorted(a["metadata"]["turn"] for a in latency) == [1, 2]
+        assert tokens == [150, 210]
+        assert len(tool_calls) == 1
+        assert threading.main_thread().name not in writer_threads
+
+
+def _breakpoints(request):
+    """All blocks carrying cache_control in a Messages API request."""
+    marked = [("system", i) for i, b in enumerate(request["system"]) if "cache_control" in b]
+    marked += [("tools", i) for i, t in enumerate(request.get("tools", [])) if "cache_control" in t]
+    for m, message in enumerate(request["messages"]):
+        content = message["content"]
+        if isinstance(content, list):
+            marked += [
+                ("messages", m, i) for i, b in enumerate(content)
+                if isinstance(b, dict) and "cache_control" in b
+            ]
+    return marked
+
+
+class TestPromptCache:
+    """Tests for cache_control placement and cache token accounting."""
+
+    def test_system_blocks_stable_order(self, monkeypatch, temp_dir):
+        agent = _agent(monkeypatch, [], worktree_path=temp_dir, context_token_budget=None)
+
+        first = agent._build_system_blocks({"project": "shop", "api": {"b": 2, "a": 1}}, "q1")
+        second = agent._build_system_blocks({"api": {"a": 1, "b": 2}, "project": "shop"}, "q2")
+
+        assert first == second
+        assert len(first) == 2
+        assert first[0]["text"].startswith("You are a backend dev.")
+        assert f"Your working directory: {temp_dir}" in first[0]["text"]
+        assert first[0]["cache_control"] == {"type": "ephemeral"}
+        assert first[1]["text"].startswith("Additional context:")
+        assert "cache_control" not in first[1]
+
+    def test_breakpoints_on_prefix_tools_and_last_turn(self, monkeypatch):
+        responses = [
+            _response(_tool("t1", "read_file")),
+            _response(_tool("t2", "read_file")),
+            _response(_text("done")),
+        ]
+        agent = _agent(monkeypatch, responses)
+
+        async def fake_tool(name, tool_input):
+            return "ok"
+
+        agent._execute_single_tool = fake_tool
+        tools = agent._mark_cacheable_tools(
+            [{"name": "read_file", "input_schema": {}}, {"name": "write_file", "input_schema": {}}]
+        )
+        params = {"model": "m", "max_tokens": 100, "system": agent._build_system_blocks({"k": "v"}), "tools": tools}
+        asyncio.run(agent._run_tool_loop(params, [{"role": "user", "content": "go"}]))
+
+        for request in agent.requests:
+            marks = _breakpoints(request)
+            last = len(request["messages"]) - 1
+            last_block = len(request["messages"][last]["content"]) - 1
+            assert len(marks) <= 4
+            assert marks == [("system", 0), ("tools", 1), ("messages", last, last_block)]
+        # The caller's history is not mutated with markers
+        assert all(
+            not isinstance(m["content"], list)
+            or all("cache_control" not in b for b in m["content"] if isinstance(b, dict))
+            for m in agent.requests[-1]["messages"][:-1]
+        )
+
+    def test_prompt_cache_disabled(self, monkeypatch):
+        agent = _agent(monkeypatch, [_response(_text("ok"))], prompt_cache=False)
+        _loop(agent)
+
+        assert _breakpoints(agent.requests[0]) == []
+
+    def test_cache_tokens_reach_stats_and_metrics(self, monkeypatch, temp_dir):
+        collector = MetricsCollector(db_path=temp_dir / "metrics.db")
+        responses = [
+            _response(_tool("t1", "read_file"), cache_write=900),
+            _response(_text("done"), cache_read=900),
+        ]
+        agent = _agent(monkeypatch, responses, metrics=collector)
+
+        async def fake_tool(name, tool_input):
+            return "ok"
+
+        agent._execute_single_tool = fake_tool
+        _loop(agent)
+
+        assert agent.usage["cache_creation_input_tokens"] == 900
+        assert agent.usage["cache_read_input_tokens"] == 900
+        assert [t.cache_read_input_tokens for t in agent.last_turns] == [0, 900]
+
+        usage = [
+            a["metadata"] for a in collector.get_recent_activity(20)
+            if a["type"] == MetricType.TOKEN_USAGE.value
+        ]
+        assert {"input": 100, "output": 50, "cache_read": 0, "cache_write": 900} in usage
+        assert {"input": 100, "output": 50, "cache_read": 900, "cache_write": 0} in usage
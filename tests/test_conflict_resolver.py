@@ -4,6 +4,8 @@ Tests for git/conflict_resolver.py - AI-powered Git Conflict Resolver.
 Phase 2: Conflict Resolution
 """
 
+import threading
+import time
 import pytest
 from pathlib import Path
 
@@ -13,6 +15,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from claude_agent_manager.git.conflict_resolver import (
     ConflictResolver,
     ConflictInfo,
+    ConflictReport,
     MergeResult,
     ConflictSeverity,
     MergeStrategy,
@@ -572,3 +575,87 @@ class TestPrintConflict:
 
         captured = capsys.readouterr()
         assert "resolved content" in captured.out.lower() or "Resolution" in captured.out
+
+
+def _conflict(ours, theirs, label="feature"):
+    return f"<<<<<<< HEAD\n{ours}\n=======\n{theirs}\n>>>>>>> {label}\n"
+
+
+class TestParallelResolver:
+    """Tests for resolve_all_parallel()."""
+
+    def test_line_numbers_and_offsets(self, temp_dir):
+        resolver = ConflictResolver(temp_dir)
+        path = temp_dir / "big.py"
+        content = "x = 1\n" * 1000 + _conflict("a = 1", "") + "y = 2\n" * 500 + _conflict("", "b = 2")
+        path.write_text(content)
+
+        conflicts = resolver.parse_conflicts(path)
+
+        assert [(c.start_line, c.end_line) for c in conflicts] == [(1001, 1006), (1506, 1511)]
+        assert content[conflicts[1].start_offset:].startswith("<<<<<<< HEAD")
+        merged = resolver.resolve_file_conflicts(path).merged_content
+        assert merged == "x = 1\n" * 1000 + "a = 1\n" + "y = 2\n" * 500 + "b = 2\n"
+
+    def test_resolves_files_and_reports_timings(self, temp_dir):
+        resolver = ConflictResolver(temp_dir)
+        files = []
+        for i in range(5):
+            path = temp_dir / f"m{i}.py"
+            path.write_text(f"import os\n" + _conflict("", f"value_{i} = {i}"))
+            files.append(path)
+        manual = temp_dir / "manual.py"
+        manual.write_text(_conflict("def a(): pass", "class B: pass"))
+        files.append(manual)
+
+        resolver.enable_ai = False
+        report = resolver.resolve_all_parallel(files, auto_apply=True, max_workers=3)
+
+        assert isinstance(report, ConflictReport)
+        assert report.failed_files == [str(manual)]
+        assert len(report.resolved_files) == 5
+        assert (temp_dir / "m3.py").read_text() == "import os\nvalue_3 = 3\n"
+        assert "<<<<<<<" in manual.read_text()
+        assert all("parse" in r.timings and r.duration_ms >= 0 for r in report.results)
+        assert report.to_dict()["resolved"] == 5
+
+    def test_invalid_merge_not_applied(self, temp_dir):
+        resolver = ConflictResolver(temp_dir)
+        path = temp_dir / "broken.py"
+        original = "def f():\n" + _conflict("", "return (")
+        path.write_text(original)
+
+        report = resolver.resolve_all_parallel([path], auto_apply=True)
+
+        assert not report.success
+        assert "not valid" in report.results[0].explanation
+        assert "validate" in report.results[0].timings
+        assert path.read_text() == original
+
+    def test_ai_merges_run_concurrently_with_limit(self, temp_dir, monkeypatch):
+        resolver = ConflictResolver(temp_dir)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_ai_merge(ours, theirs, base):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            return theirs
+
+        monkeypatch.setattr(resolver, "_ai_merge", slow_ai_merge)
+        files = []
+        for i in range(8):
+            path = temp_dir / f"f{i}.txt"
+            path.write_text(_conflict(f"alpha {i}", f"omega {i}"))
+            files.append(path)
+
+        report = resolver.resolve_all_parallel(files, ai_concurrency=4)
+
+        assert report.success
+        assert max(peak) == 4
+        assert all(r.timings["ai"] >= 40 for r in report.results)
@@ -0,0 +1,141 @@
+"""
+Tests for context/packer.py - token-budget context packing.
+"""
+
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.context.packer import (
+    ContextPacker,
+    estimate_tokens,
+    pack_task_context,
+)
+from claude_agent_manager.memory.session import SessionMemory, SessionInsights
+
+
+class TestEstimateTokens:
+    """Tests for estimate_tokens."""
+
+    def test_empty(self):
+        assert estimate_tokens("") == 0
+
+    def test_rounds_up(self):
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("abcde") == 2
+
+
+class TestContextPacker:
+    """Tests for ContextPacker ranking and budgeting."""
+
+    def test_relevance_ranking(self):
+        """Snippets matching the query come first at equal importance."""
+        packer = ContextPacker(token_budget=1000)
+        packer.add("memory", "a", "Database migrations use alembic")
+        packer.add("memory", "b", "Frontend uses React hooks")
+
+        packed = packer.pack("add a React component")
+
+        assert packed.snippets[0].key == "b"
+
+    def test_importance_breaks_ties(self):
+        packer = ContextPacker(token_budget=1000)
+        packer.add("memory", "low", "fact one", importance=0.1)
+        packer.add("memory", "high", "fact two", importance=0.9)
+
+        assert packer.pack().snippets[0].key == "high"
+
+    def test_budget_respected(self):
+        """Packed output never exceeds the token budget."""
+        packer = ContextPacker(token_budget=100)
+        for i in range(20):
+            packer.add("memory", f"m{i}", f"snippet number {i} " * 10)
+
+        packed = packer.pack()
+
+        assert packed.tokens_used <= 100
+        assert packed.dropped > 0
+
+    def test_truncates_last_snippet(self):
+        packer = ContextPacker(token_budget=200)
+        packer.add("dependency", "big", "x" * 4000)
+
+        packed = packer.pack()
+
+        assert packed.truncated == 1
+        assert packed.snippets[0].content.endswith("...")
+        assert packed.tokens_used <= 200
+
+    def test_no_truncate_skips(self):
+        packer = ContextPacker(token_budget=200)
+        packer.add("dependency", "big", "x" * 4000)
+
+        packed = packer.pack(truncate=False)
+
+        assert packed.snippets == []
+        assert packed.dropped == 1
+
+    def test_deduplicates(self):
+        packer = ContextPacker(token_budget=1000)
+        packer.add("memory", "a", "Use  UTC timestamps", importance=0.9)
+        packer.add("session", "b", "use utc timestamps", importance=0.5)
+
+        packed = packer.pack()
+
+        assert len(packed.snippets) == 1
+        assert packed.duplicates == 1
+
+    def test_memory_nodes_from_dicts(self):
+        packer = ContextPacker()
+        packer.add_memory_nodes([{"content": "cache is redis", "importance": 0.8, "type": "fact"}])
+
+        assert packer.candidates[0].key == "memory: fact"
+        assert packer.candidates[0].importance == 0.8
+
+
+class TestPackTaskContext:
+    """Tests for packing Task.get_context_output()."""
+
+    def test_dependency_summary_preferred_over_output(self):
+        context = {
+            "task-1": {
+                "role": "architect",
+                "description": "Design API",
+                "output": "very long raw output " * 200,
+                "summary": "REST API with /users endpoint",
+                "artifacts": {"architecture": "..."},
+                "interfaces": ["UserAPI"],
+            },
+            "_team_status": "architect: done",
+        }
+
+        text = pack_task_context(context, "implement users endpoint", token_budget=150)
+
+        assert "REST API with /users endpoint" in text
+        assert estimate_tokens(text) <= 160
+
+
+class TestSessionMemoryPacking:
+    """Tests for SessionMemory.get_context_for_subtask with a budget."""
+
+    def test_budgeted_context(self, temp_dir):
+        memory = SessionMemory(temp_dir, "agent-1")
+        memory.save_session(SessionInsights(
+            session_number=1,
+            agent_id="agent-1",
+            recommendations_for_next_session=["Run migrations before tests"],
+            gotchas_encountered=["Redis must be running"],
+            patterns_found=["Repositories wrap SQLAlchemy sessions"],
+        ))
+
+        text = memory.get_context_for_subtask("write migrations", token_budget=500)
+
+        assert text.startswith("## Session Memory Context")
+        assert "Run migrations before tests" in text
+
+    def test_empty_memory(self, temp_dir):
+        memory = SessionMemory(temp_dir, "agent-1")
+
+        assert memory.get_context_for_subtask("x", token_budget=500) == ""
@@ -344,6 +344,69 @@ class TestKanbanBoard:
         assert list(board2.tasks.values())[0].title == "Persistent task"
 
 
+class TestKanbanStore:
+    """Tests for the SQLite-backed task store."""
+
+    def test_legacy_json_imported_once(self, temp_dir):
+        """Old kanban.json is imported on first open only."""
+        legacy = Task.create("Legacy task", priority=TaskPriority.HIGH)
+        board_dir = temp_dir / ".clod"
+        board_dir.mkdir()
+        (board_dir / "kanban.json").write_text(json.dumps({"tasks": [legacy.to_dict()]}))
+
+        board = KanbanBoard(temp_dir)
+        assert board.get_task(legacy.id).title == "Legacy task"
+        board.delete_task(legacy.id)
+
+        # Повторное открытие не воскрешает удалённую задачу
+        board2 = KanbanBoard(temp_dir)
+        assert legacy.id not in board2.tasks
+        assert (board_dir / "kanban.json").exists()
+
+    def test_concurrent_update_conflict(self, temp_dir):
+        """Stale writes raise instead of silently overwriting."""
+        from claude_agent_manager.tasks.store import TaskConflictError
+
+        board1 = KanbanBoard(temp_dir)
+        board2 = KanbanBoard(temp_dir)
+        task = board1.create_task("Shared")
+
+        copy1 = board1.get_task(task.id)
+        copy2 = board2.get_task(task.id)
+        copy1.title = "From agent 1"
+        board1.update_task(copy1)
+
+        copy2.title = "From agent 2"
+        with pytest.raises(TaskConflictError):
+            board2.update_task(copy2)
+
+        assert board2.get_task(task.id).title == "From agent 1"
+
+    def test_mutations_from_two_boards_not_lost(self, temp_dir):
+        """Read-modify-write operations from different boards all apply."""
+        board1 = KanbanBoard(temp_dir)
+        board2 = KanbanBoard(temp_dir)
+        task = board1.create_task("Shared")
+
+        board1.assign_task(task.id, "agent-1")
+        board2.move_task(task.id, TaskStatus.IN_REVIEW)
+
+        result = board1.get_task(task.id)
+        assert result.assigned_agent == "agent-1"
+        assert result.status == TaskStatus.IN_REVIEW
+        assert board2.get_tasks_by_agent("agent-1")[0].id == task.id
+
+    def test_search_description_and_short_query(self, temp_dir):
+        """Search matches descriptions; short queries still work."""
+        board = KanbanBoard(temp_dir)
+        board.create_task("Login", description="OAuth token refresh")
+        board.create_task("UI", description="frontend layout")
+
+        assert [t.title for t in board.search_tasks("TOKEN")] == ["Login"]
+        assert [t.title for t in board.search_tasks("ui")] == ["UI"]
+        assert [t.title for t in board.search_tasks("front")] == ["UI"]
+
+
 class TestKanbanBoardPrinting:
     """Tests for board printing functions."""
 
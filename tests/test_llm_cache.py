@@ -0,0 +1,202 @@
+"""
+Tests for llm_cache.py - LLM response cache.
+"""
+
+import pytest
+import json
+import os
+import time
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.llm_cache import (
+    ResponseCache,
+    CacheStats,
+    make_cache_key,
+    is_deterministic,
+)
+
+
+RESPONSE = {
+    "content": "plan",
+    "model": "claude-sonnet-4-20250514",
+    "usage": {"input_tokens": 10, "output_tokens": 5},
+    "finish_reason": "end_turn",
+    "thinking": None,
+}
+
+
+class TestCacheKey:
+    """Tests for make_cache_key."""
+
+    def test_same_request_same_key(self):
+        """Identical requests hash to the same key regardless of param order."""
+        k1 = make_cache_key("anthropic", "m", [("user", "hi")], {"temperature": 0, "max_tokens": 10})
+        k2 = make_cache_key("anthropic", "m", [("user", "hi")], {"max_tokens": 10, "temperature": 0})
+        assert k1 == k2
+
+    def test_different_inputs_different_keys(self):
+        """Provider, model, messages and params all affect the key."""
+        base = make_cache_key("anthropic", "m", [("user", "hi")], {"temperature": 0})
+        assert base != make_cache_key("openai", "m", [("user", "hi")], {"temperature": 0})
+        assert base != make_cache_key("anthropic", "m2", [("user", "hi")], {"temperature": 0})
+        assert base != make_cache_key("anthropic", "m", [("user", "hello")], {"temperature": 0})
+        assert base != make_cache_key("anthropic", "m", [("user", "hi")], {"temperature": 0, "max_tokens": 5})
+
+
+class TestDeterminism:
+    """Tests for is_deterministic."""
+
+    def test_zero_temperature(self):
+        assert is_deterministic({"temperature": 0})
+        assert is_deterministic({"temperature": 0.0, "top_p": 1.0})
+
+    def test_sampling_is_not_deterministic(self):
+        assert not is_deterministic({})
+        assert not is_deterministic({"temperature": 0.7})
+        assert not is_deterministic({"temperature": 0, "top_p": 0.9})
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    def test_miss_then_hit(self, temp_dir):
+        """A stored response is returned on the next lookup."""
+        cache = ResponseCache(cache_dir=temp_dir)
+
+        assert cache.get("abc") is None
+        cache.put("abc", RESPONSE)
+        assert cache.get("abc") == RESPONSE
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["entries"] == 1
+
+    def test_persists_across_instances(self, temp_dir):
+        """Entries survive re-creating the cache (on-disk index rebuild)."""
+        ResponseCache(cache_dir=temp_dir).put("abc", RESPONSE)
+
+        cache = ResponseCache(cache_dir=temp_dir)
+        assert cache.get("abc") == RESPONSE
+
+    def test_sees_entries_written_by_another_process(self, temp_dir):
+        """An index miss falls back to the entry file on disk."""
+        reader = ResponseCache(cache_dir=temp_dir)
+        assert reader.get("abc") is None  # index built, empty
+
+        ResponseCache(cache_dir=temp_dir).put("abc", RESPONSE)
+
+        assert reader.get("abc") == RESPONSE
+        assert reader.get_stats()["entries"] == 1
+
+    def test_ttl_expiry(self, temp_dir):
+        """Expired entries are dropped and counted as misses."""
+        cache = ResponseCache(cache_dir=temp_dir, ttl_seconds=60)
+        cache.put("abc", RESPONSE)
+
+        path = temp_dir / "abc.json"
+        entry = json.loads(path.read_text())
+        entry["created_at"] = time.time() - 120
+        path.write_text(json.dumps(entry))
+
+        assert cache.get("abc") is None
+        assert not path.exists()
+        assert cache.stats.expired == 1
+
+    def test_evicts_least_recently_used(self, temp_dir):
+        """Oldest entries are evicted when max_entries is exceeded."""
+        cache = ResponseCache(cache_dir=temp_dir, max_entries=2)
+        cache.put("a", RESPONSE)
+        cache.put("b", RESPONSE)
+
+        # Make "a" the oldest, then touch "b" via a hit
+        old = time.time() - 100
+        os.utime(temp_dir / "a.json", (old, old))
+        cache._index["a"] = (old, cache._index["a"][1])
+        cache.get("b")
+
+        cache.put("c", RESPONSE)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == RESPONSE
+        assert cache.get("c") == RESPONSE
+        assert cache.stats.evictions == 1
+
+    def test_size_bound(self, temp_dir):
+        """max_bytes bounds total cache size."""
+        cache = ResponseCache(cache_dir=temp_dir, max_bytes=1)
+        cache.put("a", RESPONSE)
+
+        assert cache.get_stats()["entries"] == 0
+
+    def test_corrupt_entry_is_miss(self, temp_dir):
+        """Unreadable files are removed instead of raising."""
+        cache = ResponseCache(cache_dir=temp_dir)
+        cache.put("abc", RESPONSE)
+        (temp_dir / "abc.json").write_text("{not json")
+
+        assert cache.get("abc") is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_clear(self, temp_dir):
+        cache = ResponseCache(cache_dir=temp_dir)
+        cache.put("a", RESPONSE)
+        cache.put("b", RESPONSE)
+
+        assert cache.clear() == 2
+        assert list(temp_dir.glob("*.json")) == []
+
+    def test_bypass_counter(self, temp_dir):
+        cache = ResponseCache(cache_dir=temp_dir)
+        cache.record_bypass()
+
+        stats = cache.get_stats()
+        assert stats["bypassed"] == 1
+        assert stats["hit_rate"] == 0.0
+
+
+class TestPlannerCache:
+    """Tests for cache pass-through in planning.py."""
+
+    def _client(self):
+        class FakeClient:
+            def __init__(self):
+                self.calls = []
+
+            async def complete(self, **kwargs):
+                self.calls.append(kwargs)
+                from types import SimpleNamespace
+                return SimpleNamespace(content="{}")
+
+        return FakeClient()
+
+    def test_planner_and_reasoning_pass_cache(self):
+        """Both follow the client's determinism rule unless cache is set explicitly."""
+        import asyncio
+        pytest.importorskip("httpx")
+        from claude_agent_manager.planning import TaskPlanner, ReasoningEngine, PREDEFINED_MODELS
+
+        client = self._client()
+        asyncio.run(TaskPlanner(llm_client=client)._call_llm("plan"))
+        asyncio.run(TaskPlanner(llm_client=client, cache=True)._call_llm("plan"))
+        model = PREDEFINED_MODELS["claude-sonnet-4"]
+        asyncio.run(ReasoningEngine(model, llm_client=client)._call_llm("step"))
+        asyncio.run(ReasoningEngine(model, llm_client=client, cache=True)._call_llm("step"))
+
+        assert [c["cache"] for c in client.calls] == [None, True, None, True]
+        assert client.calls[0]["temperature"] == model.temperature
+
+
+class TestCacheStats:
+    """Tests for CacheStats."""
+
+    def test_hit_rate_empty(self):
+        assert CacheStats().hit_rate == 0.0
+
+    def test_to_dict(self):
+        data = CacheStats(hits=3, misses=1).to_dict()
+        assert data["hit_rate"] == 0.75
@@ -0,0 +1,98 @@
+"""
+Tests for core/locks.py - FileLock modes, blocking waits and metrics.
+"""
+
+import threading
+import time
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.core.locks import FileLock, lock_stats, read_lock_holder, reset_lock_stats
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="shared mode is POSIX-only")
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    reset_lock_stats()
+    yield
+    reset_lock_stats()
+
+
+def _hold(lock_path, seconds, acquired, **kwargs):
+    def run():
+        with FileLock(lock_path, **kwargs):
+            acquired.set()
+            time.sleep(seconds)
+    thread = threading.Thread(target=run)
+    thread.start()
+    acquired.wait(2)
+    return thread
+
+
+class TestFileLock:
+    """Tests for FileLock."""
+
+    def test_uncontended(self, temp_dir):
+        path = temp_dir / "a.lock"
+        with FileLock(path) as lock:
+            assert not lock.contended
+            assert read_lock_holder(path)["mode"] == "exclusive"
+        assert not lock.meta_path.exists()
+
+        stats = lock_stats()[str(path)]
+        assert stats["acquisitions"] == 1
+        assert stats["contended"] == 0
+
+    def test_waits_without_polling(self, temp_dir):
+        path = temp_dir / "a.lock"
+        held = threading.Event()
+        thread = _hold(path, 0.2, held)
+
+        with FileLock(path, poll_interval_sec=10, timeout_sec=5) as lock:
+            # Woken by the kernel on release, not by the 10s poll interval
+            assert lock.contended
+            assert 100 < lock.wait_ms < 2000
+            assert lock.holder["mode"] == "exclusive"
+            assert lock.holder["alive"]
+        thread.join()
+
+        assert lock_stats()[str(path)]["contended"] == 1
+
+    def test_timeout(self, temp_dir):
+        path = temp_dir / "a.lock"
+        held = threading.Event()
+        thread = _hold(path, 0.5, held)
+
+        with pytest.raises(TimeoutError):
+            with FileLock(path, timeout_sec=0.05):
+                pass
+        thread.join()
+
+        assert lock_stats()[str(path)]["timeouts"] == 1
+        # Abandoned waiter must not keep the lock
+        with FileLock(path, timeout_sec=1) as lock:
+            assert lock is not None
+
+    def test_shared_readers_do_not_contend(self, temp_dir):
+        path = temp_dir / "a.lock"
+        held = threading.Event()
+        thread = _hold(path, 0.3, held, shared=True)
+
+        with FileLock(path, shared=True, timeout_sec=0) as lock:
+            assert not lock.contended
+        with pytest.raises(TimeoutError):
+            with FileLock(path, timeout_sec=0):
+                pass
+        thread.join()
+
+    def test_heartbeat_writes_meta_lazily(self, temp_dir):
+        path = temp_dir / "a.lock"
+        with FileLock(path) as lock:
+            assert not lock.meta_path.exists()
+            lock.heartbeat()
+            assert lock.meta_path.exists()
+        assert not lock.meta_path.exists()
@@ -0,0 +1,108 @@
+"""
+Tests for manager.start_agents - parallel bulk agent launch.
+"""
+
+import threading
+import time
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager import manager
+from claude_agent_manager.config import AppConfig
+from claude_agent_manager.registry import AgentRecord, save_agent, load_agent
+
+
+@pytest.fixture
+def workspace(temp_dir, monkeypatch):
+    """Workspace with three agents and all process launches stubbed out."""
+    cfg = AppConfig(agent_root=str(temp_dir / "agents-root"), claude_mem_root=str(temp_dir))
+    paths = manager.get_workspace_paths(cfg)
+    project = temp_dir / "project"
+    project.mkdir()
+
+    for i in range(3):
+        save_agent(paths.agents_dir, AgentRecord(
+            id=f"a{i}", purpose=f"agent {i}", project_path=str(project),
+            port=37700 + i, pm2_name=f"agent-a{i}",
+        ))
+
+    state = {"active": 0, "max_active": 0}
+    lock = threading.Lock()
+
+    def slow_worker(*args, **kwargs):
+        with lock:
+            state["active"] += 1
+            state["max_active"] = max(state["max_active"], state["active"])
+        time.sleep(0.1)
+        with lock:
+            state["active"] -= 1
+
+    monkeypatch.setattr(manager, "ensure_claude_mem_worker", lambda: True)
+    monkeypatch.setattr(manager, "pm2_exists", lambda name: False)
+    monkeypatch.setattr(manager, "start_worker", slow_worker)
+    monkeypatch.setattr(manager, "spawn_cmd_window", lambda *a, **kw: 4242)
+    monkeypatch.setattr(manager, "is_pid_running", lambda pid: False)
+    monkeypatch.setattr(manager, "sync_agent_config_to_project", lambda *a: {})
+
+    return cfg, paths, state
+
+
+class TestStartAgents:
+    """Tests for start_agents."""
+
+    def test_starts_all_concurrently(self, workspace):
+        cfg, paths, state = workspace
+
+        results = manager.start_agents(["a0", "a1", "a2"], cfg=cfg, max_concurrency=3)
+
+        assert [r.agent_id for r in results] == ["a0", "a1", "a2"]
+        assert all(r.ok for r in results)
+        assert state["max_active"] > 1
+        run_ids = {load_agent(paths.agents_dir, r.agent_id).active_run_id for r in results}
+        assert len(run_ids) == 3 and None not in run_ids
+
+    def test_concurrency_cap(self, workspace):
+        cfg, _, state = workspace
+
+        manager.start_agents(["a0", "a1", "a2"], cfg=cfg, max_concurrency=1)
+
+        assert state["max_active"] == 1
+
+    def test_phase_timings(self, workspace):
+        cfg, _, _ = workspace
+
+        result = manager.start_agents(["a0"], cfg=cfg)[0]
+
+        for phase in ("allocate", "lock_wait", "prepare", "worker", "cmd", "finalize", "total"):
+            assert phase in result.timings_ms
+        assert result.timings_ms["worker"] >= 90
+
+    def test_failure_isolated(self, workspace):
+        cfg, _, _ = workspace
+
+        results = manager.start_agents(["a0", "missing", "a2"], cfg=cfg)
+
+        assert results[0].ok and results[2].ok
+        assert not results[1].ok
+        assert results[1].record is None
+
+    def test_port_bound_to_run_and_released_on_stop(self, workspace, monkeypatch):
+        cfg, paths, _ = workspace
+        monkeypatch.setattr(manager, "pm2_delete", lambda name: None)
+        registry = manager._registry(cfg)
+
+        run_id = manager.start_agents(["a0"], cfg=cfg)[0].record.active_run_id
+
+        with registry.connect() as conn:
+            row = conn.execute("SELECT port, run_id FROM resources_ports WHERE name='agent:a0:port'").fetchone()
+        assert (row["port"], row["run_id"]) == (37700, run_id)
+
+        manager.stop_agent("a0", cfg=cfg)
+
+        assert 37700 not in registry.get_allocated_ports()
+        # The stopped agent still owns its port
+        with pytest.raises(RuntimeError, match="already allocated"):
+            manager.create_agent("other", str(paths.root), port=37700, cfg=cfg)
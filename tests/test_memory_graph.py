@@ -0,0 +1,121 @@
+"""
+Tests for memory_graph.py - team MemoryGraph indexes, ready-set and journal.
+"""
+
+import asyncio
+import json
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.memory_graph import MemoryGraph, NodeType, EdgeType
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _team(graph):
+    await graph.register_agent("architect", "architect", [])
+    await graph.register_agent("backend", "backend", [], depends_on=["architect"])
+    await graph.register_agent("frontend", "frontend", [], depends_on=["backend", "architect"])
+    await graph.register_interface("api", "architect", "contracts", {})
+    await graph.add_blocker("backend", "api", "Waiting for API")
+    await graph.add_blocker("frontend", "api", "Waiting for API")
+
+
+class TestIndexes:
+    """Tests for adjacency indexes."""
+
+    def test_edge_queries(self, temp_dir):
+        graph = MemoryGraph(str(temp_dir))
+        _run(_team(graph))
+
+        assert graph.get_dependencies("frontend") == ["backend", "architect"]
+        assert graph.get_dependents("architect") == ["backend", "frontend"]
+        assert graph.get_blockers("backend") == ["blocker_backend_api"]
+        assert [e.type for e in graph.get_edges(from_node="architect")] == [EdgeType.PRODUCES]
+        assert len(graph.get_edges(edge_type=EdgeType.BLOCKS)) == 2
+        assert graph.get_edges(from_node="frontend", to_node="backend")[0].type == EdgeType.DEPENDS_ON
+        assert graph.get_edges(from_node="missing") == []
+        assert len(graph.get_edges()) == len(graph.edges) == 6
+
+    def test_nodes_by_type(self, temp_dir):
+        graph = MemoryGraph(str(temp_dir))
+        _run(_team(graph))
+
+        assert [n.id for n in graph.get_nodes_by_type(NodeType.AGENT)] == ["architect", "backend", "frontend"]
+        assert len(graph.get_nodes_by_type(NodeType.BLOCKER)) == 2
+
+
+class TestReadySet:
+    """Tests for the incrementally maintained ready-set."""
+
+    def test_ready_follows_blockers_and_status(self, temp_dir):
+        graph = MemoryGraph(str(temp_dir))
+        _run(_team(graph))
+
+        assert _run(graph.get_ready_agents()) == ["architect"]
+
+        _run(graph.update_agent_status("architect", "in_progress"))
+        _run(graph.resolve_blocker("backend", "api"))
+        assert _run(graph.get_ready_agents()) == ["backend"]
+
+        _run(graph.resolve_blocker("frontend", "api"))
+        assert _run(graph.get_ready_agents()) == ["backend", "frontend"]
+
+        _run(graph.update_agent_status("backend", "done"))
+        assert _run(graph.get_ready_agents()) == ["frontend"]
+
+
+class TestJournal:
+    """Tests for append-only persistence."""
+
+    def test_changes_appended_not_rewritten(self, temp_dir):
+        graph = MemoryGraph(str(temp_dir))
+        _run(_team(graph))
+
+        assert not graph.graph_file.exists()
+        lines = graph.journal_file.read_text().splitlines()
+        assert [json.loads(line)["seq"] for line in lines] == list(range(1, len(lines) + 1))
+
+        reloaded = MemoryGraph(str(temp_dir))
+        assert reloaded.to_dict() == graph.to_dict()
+        assert _run(reloaded.get_ready_agents()) == ["architect"]
+
+    def test_compaction(self, temp_dir):
+        graph = MemoryGraph(str(temp_dir), compact_every=5)
+        _run(_team(graph))
+
+        assert graph.graph_file.exists()
+        assert len(graph.journal_file.read_text().splitlines()) < 5
+
+        _run(graph.resolve_blocker("backend", "api"))
+        reloaded = MemoryGraph(str(temp_dir))
+        assert reloaded.to_dict() == graph.to_dict()
+        assert _run(reloaded.get_ready_agents()) == ["architect", "backend"]
+
+    def test_stale_journal_entries_skipped(self, temp_dir):
+        graph = MemoryGraph(str(temp_dir))
+        _run(_team(graph))
+        stale = graph.journal_file.read_text()
+        graph.compact()
+        # Crash between snapshot replace and journal truncation
+        graph.journal_file.write_text(stale)
+
+        reloaded = MemoryGraph(str(temp_dir))
+        assert len(reloaded.edges) == len(graph.edges)
+
+    def test_torn_tail_ignored(self, temp_dir):
+        graph = MemoryGraph(str(temp_dir))
+        _run(_team(graph))
+        with open(graph.journal_file, "a") as f:
+            f.write('{"op": "node", "node": {"id": "x"')
+
+        reloaded = MemoryGraph(str(temp_dir))
+        assert "x" not in reloaded.nodes
+        _run(reloaded.register_agent("qa", "qa", []))
+
+        assert "qa" in MemoryGraph(str(temp_dir)).nodes
@@ -0,0 +1,111 @@
+"""
+Tests for git/merge_queue.py - in-memory merge queue with conflict prediction.
+"""
+
+import subprocess
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.git.merge_queue import MergeQueue
+
+
+def _git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True, check=True).stdout.strip()
+
+
+def _branch(repo, name, files, base="main"):
+    """Создать ветку от base с одним коммитом, не меняя checkout."""
+    _git(repo, "checkout", "-q", "-b", name, base)
+    for rel, content in files.items():
+        (repo / rel).write_text(content)
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", f"work on {name}")
+    _git(repo, "checkout", "-q", "main")
+
+
+class TestPlan:
+    """Tests for MergeQueue.plan()."""
+
+    def test_classification(self, git_repo):
+        _branch(git_repo, "a", {"a.txt": "a\n"})
+        _branch(git_repo, "b", {"b.txt": "b\n"})
+        _branch(git_repo, "c", {"a.txt": "c\n", "c.txt": "c\n"})
+        _branch(git_repo, "d", {"README.md": "# changed by d\n"})
+        (git_repo / "README.md").write_text("# changed on main\n")
+        _git(git_repo, "commit", "-qam", "main change")
+        _git(git_repo, "branch", "e", "main")
+
+        plan = MergeQueue(git_repo, "main").plan(["a", "b", "c", "d", "e"])
+
+        assert sorted(plan.batch + plan.sequential) == ["a", "b", "c"]
+        assert "c" in plan.sequential or "a" in plan.sequential
+        assert plan.conflicts == ["d"]
+        assert plan.predictions["d"].conflicted_files == ["README.md"]
+        assert plan.up_to_date == ["e"]
+
+    def test_plan_does_not_touch_worktree(self, git_repo):
+        _branch(git_repo, "a", {"README.md": "# a\n"})
+        MergeQueue(git_repo, "main").plan(["a"])
+        assert _git(git_repo, "status", "--porcelain") == ""
+        assert (git_repo / "README.md").read_text() == "# Test Project\n"
+
+    def test_unresolvable_branch_reported_not_raised(self, git_repo):
+        _branch(git_repo, "a", {"a.txt": "a\n"})
+
+        queue = MergeQueue(git_repo, "main")
+        plan = queue.plan(["unknown", "a"])
+        report = queue.run(["unknown", "a"])
+
+        assert plan.batch == ["a"]
+        assert "unknown" in plan.failed and "unknown" not in plan.predictions
+        assert report.merged == ["a"]
+        assert list(report.failed) == ["unknown"]
+
+
+class TestRun:
+    """Tests for MergeQueue.run()."""
+
+    def test_disjoint_branches_single_octopus(self, git_repo):
+        for name in ("a", "b", "c"):
+            _branch(git_repo, name, {f"{name}.txt": name})
+        _git(git_repo, "checkout", "-q", "-b", "elsewhere")
+
+        report = MergeQueue(git_repo, "main").run(["a", "b", "c"])
+
+        assert report.success
+        assert sorted(report.merged) == ["a", "b", "c"]
+        assert report.head == _git(git_repo, "rev-parse", "main")
+        parents = _git(git_repo, "log", "-1", "--format=%P", "main").split()
+        assert len(parents) == 4
+        assert _git(git_repo, "ls-tree", "--name-only", "main").split() == ["README.md", "a.txt", "b.txt", "c.txt"]
+        # Checkout untouched
+        assert _git(git_repo, "rev-parse", "--abbrev-ref", "HEAD") == "elsewhere"
+        assert not (git_repo / "a.txt").exists()
+
+    def test_overlapping_clean_branches_sequential(self, git_repo):
+        (git_repo / "shared.txt").write_text("1\n2\n3\n4\n5\n6\n7\n8\n")
+        _git(git_repo, "add", "shared.txt")
+        _git(git_repo, "commit", "-qm", "shared")
+        _branch(git_repo, "top", {"shared.txt": "one\n2\n3\n4\n5\n6\n7\n8\n"})
+        _branch(git_repo, "bottom", {"shared.txt": "1\n2\n3\n4\n5\n6\n7\neight\n"})
+
+        report = MergeQueue(git_repo, "main").run(["top", "bottom"])
+
+        assert report.merged == ["top", "bottom"]
+        assert (git_repo / "shared.txt").read_text() == "one\n2\n3\n4\n5\n6\n7\neight\n"
+        assert _git(git_repo, "status", "--porcelain") == ""
+
+    def test_conflict_without_resolver_reported(self, git_repo):
+        _branch(git_repo, "ok", {"ok.txt": "ok"})
+        _branch(git_repo, "x", {"README.md": "# x\n"})
+        _branch(git_repo, "y", {"README.md": "# y\n"})
+
+        report = MergeQueue(git_repo, "main").run(["x", "ok", "y"])
+
+        assert sorted(report.merged) == ["ok", "x"] or sorted(report.merged) == ["ok", "y"]
+        assert len(report.failed) == 1
+        assert "README.md" in next(iter(report.failed.values()))
+        assert _git(git_repo, "status", "--porcelain") == ""
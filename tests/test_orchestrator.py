@@ -0,0 +1,183 @@
+"""
+Tests for team/orchestrator.py - task streaming and the merge step.
+
+Without the anthropic SDK a minimal stub module is used; no LLM calls are made.
+"""
+
+import asyncio
+import subprocess
+import sys
+import types
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    import anthropic  # noqa: F401
+except ImportError:
+    _stub = types.ModuleType("anthropic")
+    _stub.Anthropic = lambda *args, **kwargs: SimpleNamespace()
+    sys.modules["anthropic"] = _stub
+
+from claude_agent_manager.team import orchestrator as orchestrator_module
+from claude_agent_manager.team.orchestrator import TeamOrchestrator, TeamPlan
+from claude_agent_manager.team.task import Task, TaskStatus
+from claude_agent_manager.git.merge_queue import MergeQueueError, MergeQueueReport
+from claude_agent_manager.streaming import StreamBus, StreamEventType
+
+
+class TestTaskStream:
+    """Tests for START/END events of a task."""
+
+    def test_lifecycle_events_use_agent_name(self, temp_dir):
+        bus = StreamBus()
+        orchestrator = TeamOrchestrator(temp_dir, quality_gates=False, stream_bus=bus)
+        task = Task(id="t1", description="build api", role="backend")
+        task.agent = SimpleNamespace(name="Backend")
+        sub = bus.subscribe()
+
+        writer = orchestrator._start_task_stream(task)
+        # BaseAgent publishes TOKEN/TOOL under its own name
+        bus.emit(StreamEventType.TOKEN, task.agent.name, task.id, "hi")
+        orchestrator._end_task_stream(task, writer, success=False, error="boom")
+
+        events = sub.drain()
+        assert [e.type for e in events] == [
+            StreamEventType.START, StreamEventType.TOKEN, StreamEventType.ERROR
+        ]
+        assert {e.agent_id for e in events} == {"Backend"}
+
+    def test_log_failure_keeps_completed_task_done(self, temp_dir, monkeypatch):
+        """A failing stream log after success emits END only and leaves the task DONE."""
+        bus = StreamBus()
+        orchestrator = TeamOrchestrator(temp_dir, quality_gates=False, stream_bus=bus)
+        task = Task(id="t1", description="build api", role="backend")
+
+        async def execute_task(description, context):
+            return {"response": "ok"}
+
+        task.agent = SimpleNamespace(name="Backend", execute_task=execute_task)
+        sub = bus.subscribe()
+
+        def broken_complete(self, success=True):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(orchestrator_module.TaskLogger, "complete", broken_complete)
+
+        output = asyncio.run(orchestrator.run_agent_task(task))
+
+        assert output.raw == "ok"
+        assert task.status == TaskStatus.DONE
+        assert [e.type for e in sub.drain()] == [StreamEventType.START, StreamEventType.END]
+
+
+def _git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True, check=True).stdout.strip()
+
+
+def _orchestrator(repo, tasks):
+    orchestrator = TeamOrchestrator(repo, quality_gates=False)
+    orchestrator.plan = TeamPlan(project_path=repo, main_task="build", tasks=tasks)
+    return orchestrator
+
+
+def _done(task_id, depends_on=()):
+    return Task(
+        id=task_id,
+        description=task_id,
+        role="backend",
+        depends_on=list(depends_on),
+        branch=f"agent/{task_id}",
+        status=TaskStatus.DONE,
+    )
+
+
+class FakeMergeQueue:
+    """Records run() calls; branches listed in `fail` end up in report.failed."""
+
+    calls = []
+    fail = set()
+    error = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def run(self, branches, order=None):
+        FakeMergeQueue.calls.append(list(branches))
+        if FakeMergeQueue.error:
+            raise MergeQueueError(FakeMergeQueue.error)
+        report = MergeQueueReport()
+        for branch in branches:
+            if branch in FakeMergeQueue.fail:
+                report.failed[branch] = "conflicts: x.py"
+            else:
+                report.merged.append(branch)
+        return report
+
+
+@pytest.fixture
+def fake_queue(monkeypatch):
+    FakeMergeQueue.calls = []
+    FakeMergeQueue.fail = set()
+    FakeMergeQueue.error = None
+    monkeypatch.setattr(orchestrator_module, "MergeQueue", FakeMergeQueue)
+    return FakeMergeQueue
+
+
+class TestMergeAllBranches:
+    """Tests for dependency-gated merging."""
+
+    def test_levels_merged_in_order(self, git_repo, fake_queue):
+        tasks = [_done("api", ["db"]), _done("db"), _done("ui"), _done("e2e", ["api", "ui"])]
+
+        summary = asyncio.run(_orchestrator(git_repo, tasks).merge_all_branches())
+
+        assert [sorted(c) for c in fake_queue.calls] == [
+            ["agent/db", "agent/ui"], ["agent/api"], ["agent/e2e"]
+        ]
+        assert sorted(summary["merged"]) == ["agent/api", "agent/db", "agent/e2e", "agent/ui"]
+
+    def test_dependents_of_failed_branch_skipped(self, git_repo, fake_queue):
+        fake_queue.fail = {"agent/db"}
+        tasks = [_done("db"), _done("ui"), _done("api", ["db"]), _done("e2e", ["api"])]
+
+        summary = asyncio.run(_orchestrator(git_repo, tasks).merge_all_branches())
+
+        assert fake_queue.calls == [["agent/db", "agent/ui"]]
+        assert summary["merged"] == ["agent/ui"]
+        assert list(summary["failed"]) == ["agent/db"]
+        assert summary["skipped"] == ["agent/api", "agent/e2e"]
+
+    def test_unfinished_dependency_blocks_dependent(self, git_repo, fake_queue):
+        db = _done("db")
+        db.status = TaskStatus.FAILED
+        tasks = [db, _done("api", ["db"])]
+
+        summary = asyncio.run(_orchestrator(git_repo, tasks).merge_all_branches())
+
+        assert fake_queue.calls == []
+        assert summary["skipped"] == ["agent/api"]
+
+    def test_merge_queue_error_does_not_abort(self, git_repo, fake_queue):
+        fake_queue.error = "git merge --ff-only failed: local changes"
+        tasks = [_done("db"), _done("api", ["db"])]
+
+        summary = asyncio.run(_orchestrator(git_repo, tasks).merge_all_branches())
+
+        assert summary["failed"] == {"agent/db": "git merge --ff-only failed: local changes"}
+        assert summary["skipped"] == ["agent/api"]
+
+    def test_dirty_target_checkout(self, git_repo):
+        """Real queue: ff-only onto a dirty checkout of the target is reported, not raised."""
+        _git(git_repo, "checkout", "-q", "-b", "agent/db")
+        (git_repo / "README.md").write_text("# db\n")
+        _git(git_repo, "commit", "-qam", "db")
+        _git(git_repo, "checkout", "-q", "main")
+        (git_repo / "README.md").write_text("# local edit\n")
+
+        summary = asyncio.run(_orchestrator(git_repo, [_done("db")]).merge_all_branches())
+
+        assert "agent/db" in summary["failed"]
+        assert summary["merged"] == []
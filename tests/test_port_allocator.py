@@ -0,0 +1,113 @@
+"""
+Tests for core/registry.py - registry-managed port allocation.
+"""
+
+import time
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.core.registry import Registry, PORT_QUARANTINE_PREFIX
+from claude_agent_manager.core.models import RunSpec
+
+
+@pytest.fixture
+def registry(temp_dir):
+    reg = Registry(temp_dir / "registry.sqlite")
+    reg.init()
+    return reg
+
+
+class TestClaimPort:
+    """Tests for Registry.claim_port."""
+
+    def test_claims_lowest_free_port(self, registry):
+        ports = [registry.claim_port(f"p{i}", 37700, 37799) for i in range(3)]
+
+        assert ports == [37700, 37701, 37702]
+
+    def test_fills_released_gap(self, registry):
+        for i in range(3):
+            registry.claim_port(f"p{i}", 37700, 37799)
+        registry.release_port("p1")
+
+        assert registry.claim_port("p3", 37700, 37799) == 37701
+
+    def test_skips_explicit_allocations(self, registry):
+        registry.allocate_port("manual", 37700, None, "now")
+
+        assert registry.claim_port("p", 37700, 37799) == 37701
+
+    def test_range_exhausted(self, registry):
+        registry.claim_port("a", 37700, 37701)
+        registry.claim_port("b", 37700, 37701)
+
+        with pytest.raises(RuntimeError):
+            registry.claim_port("c", 37700, 37701)
+
+    def test_failed_verify_quarantines_port(self, registry):
+        checked = []
+
+        def verify(port):
+            checked.append(port)
+            return port != 37700
+
+        assert registry.claim_port("a", 37700, 37799, verify=verify) == 37701
+        # Quarantined port is skipped without another bind test
+        assert registry.claim_port("b", 37700, 37799, verify=verify) == 37702
+        assert checked == [37700, 37701, 37702]
+        assert 37700 in registry.get_allocated_ports()
+
+        with registry.connect() as conn:
+            names = {r["name"] for r in conn.execute("SELECT name FROM resources_ports").fetchall()}
+        assert f"{PORT_QUARANTINE_PREFIX}37700" in names
+
+
+class TestPortLeases:
+    """Tests for lease expiry and renaming."""
+
+    def test_expired_lease_reclaimed(self, registry):
+        registry.claim_port("leased", 37700, 37799, lease_sec=0.01)
+        time.sleep(0.02)
+
+        assert registry.claim_port("next", 37700, 37799) == 37700
+
+    def test_bound_port_released_with_run(self, registry, temp_dir):
+        registry.create_run(RunSpec(run_id="r1", agent_id="a1", status="running", run_dir=temp_dir))
+        registry.claim_port("agent:a1:port", 37700, 37799)
+        registry.bind_port("agent:a1:port", 37700, "r1", "now")
+        assert registry.expire_port_leases() == 0
+
+        registry.set_run_status("r1", "failed")
+
+        assert registry.expire_port_leases() == 1
+        assert registry.get_allocated_ports() == set()
+
+    def test_finished_run_releases_port(self, registry, temp_dir):
+        registry.create_run(RunSpec(run_id="r1", agent_id="a1", status="running", run_dir=temp_dir))
+        registry.claim_port("run-port", 37700, 37799, run_id="r1")
+        registry.set_run_status("r1", "failed")
+
+        assert registry.expire_port_leases() == 1
+        assert registry.get_allocated_ports() == set()
+
+    def test_rename(self, registry):
+        registry.claim_port("pending", 37700, 37799)
+        registry.rename_port("pending", "agent:a1:port")
+
+        with pytest.raises(KeyError):
+            registry.rename_port("pending", "other")
+        registry.release_port("agent:a1:port")
+        assert registry.get_allocated_ports() == set()
+
+    def test_rename_clears_lease(self, registry):
+        """A pending claim expires on its own, but not once renamed."""
+        registry.claim_port("pending:a", 37700, 37799, lease_sec=0.01)
+        registry.claim_port("pending:b", 37700, 37799, lease_sec=0.01)
+        registry.rename_port("pending:b", "agent:a1:port")
+        time.sleep(0.02)
+
+        assert registry.expire_port_leases() == 1
+        assert registry.get_allocated_ports() == {37701}
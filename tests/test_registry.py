@@ -0,0 +1,87 @@
+"""
+Tests for core/registry.py - connections and batch transactions.
+"""
+
+import threading
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.core.models import RunSpec
+from claude_agent_manager.core.registry import Registry
+
+
+@pytest.fixture
+def registry(temp_dir):
+    reg = Registry(temp_dir / "registry.sqlite")
+    reg.init()
+    yield reg
+    reg.close()
+
+
+def _run_statuses(registry):
+    with registry.connect() as conn:
+        return {r["run_id"]: r["status"] for r in conn.execute("SELECT run_id, status FROM runs").fetchall()}
+
+
+class TestConnections:
+    """Tests for per-thread persistent connections."""
+
+    def test_connection_reused_per_thread(self, registry, temp_dir):
+        assert registry.connect() is registry.connect()
+        # Another instance for the same file shares it too
+        assert Registry(temp_dir / "." / "registry.sqlite").connect() is registry.connect()
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(registry.connect()))
+        thread.start()
+        thread.join()
+        assert other[0] is not registry.connect()
+
+    def test_with_connect_does_not_close(self, registry):
+        with registry.connect() as conn:
+            conn.execute("SELECT 1")
+        assert registry.connect().execute("SELECT 1").fetchone()[0] == 1
+
+
+class TestBatch:
+    """Tests for batch() / nested tx()."""
+
+    def test_batch_commits_once(self, registry):
+        with registry.batch():
+            registry.create_run(RunSpec(run_id="r1", agent_id="a1", status="starting"))
+            registry.attach_pids("r1", {"cmd": 10, "viewer": 11})
+            registry.set_run_status("r1", "running")
+            # Not visible to other connections until the outer commit
+            outside = []
+            thread = threading.Thread(target=lambda: outside.append(_run_statuses(registry)))
+            thread.start()
+            thread.join()
+            assert outside == [{}]
+
+        assert _run_statuses(registry) == {"r1": "running"}
+        with registry.connect() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM run_pids").fetchone()[0] == 2
+
+    def test_batch_rolls_back(self, registry):
+        with pytest.raises(RuntimeError):
+            with registry.batch():
+                registry.create_run(RunSpec(run_id="r1", agent_id="a1"))
+                raise RuntimeError("boom")
+
+        assert _run_statuses(registry) == {}
+        # Connection is usable after rollback
+        registry.create_run(RunSpec(run_id="r2", agent_id="a1"))
+        assert _run_statuses(registry) == {"r2": "created"}
+
+    def test_bulk_release(self, registry):
+        for i in range(3):
+            registry.create_run(RunSpec(run_id=f"r{i}", agent_id="a1"))
+            registry.claim_port(f"p{i}", 37700, 37799, run_id=f"r{i}")
+
+        registry.release_ports_for_runs(["r0", "r2"])
+
+        assert registry.get_allocated_ports() == {37701}
+        assert registry.delete_runs(["r0", "r1", "missing"]) == 2
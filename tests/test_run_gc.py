@@ -0,0 +1,182 @@
+"""
+Tests for run_gc.py - run retention and garbage collection.
+"""
+
+import os
+import pytest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.config import AppConfig
+from claude_agent_manager.core import create_workspace_paths, read_latest_run, write_latest_run
+from claude_agent_manager.core.models import RunSpec
+from claude_agent_manager.core.registry import Registry
+from claude_agent_manager.registry import AgentRecord, save_agent
+from claude_agent_manager import run_gc
+from claude_agent_manager.run_gc import RunCollector, RunInfo, RunRetention, select_expired_runs
+
+NOW = datetime(2026, 1, 31, tzinfo=timezone.utc)
+
+
+def _run(run_id, days_ago, status="stopped"):
+    return RunInfo(run_id=run_id, created=NOW - timedelta(days=days_ago), status=status, has_row=True)
+
+
+class TestSelectExpiredRuns:
+    """Tests for the retention policy."""
+
+    def test_keeps_last_n(self):
+        runs = [_run(f"r{i}", days_ago=100 + i) for i in range(5)]
+
+        expired = select_expired_runs(runs, RunRetention(keep_last=2, keep_days=1), NOW)
+
+        assert {r.run_id for r in expired} == {"r2", "r3", "r4"}
+
+    def test_keeps_recent_days(self):
+        runs = [_run("old", 20), _run("new", 3)]
+
+        expired = select_expired_runs(runs, RunRetention(keep_last=0, keep_days=7), NOW)
+
+        assert [r.run_id for r in expired] == ["old"]
+
+    def test_failed_kept_longer(self):
+        runs = [_run("ok", 20), _run("bad", 20, status="failed")]
+
+        expired = select_expired_runs(runs, RunRetention(keep_last=0, keep_days=7, keep_failed_days=30), NOW)
+
+        assert [r.run_id for r in expired] == ["ok"]
+
+    def test_active_and_protected_never_deleted(self):
+        runs = [_run("running", 50, status="running"), _run("latest", 50), _run("old", 50)]
+
+        expired = select_expired_runs(runs, RunRetention(keep_last=0, keep_days=1), NOW, protected={"latest"})
+
+        assert [r.run_id for r in expired] == ["old"]
+
+
+class TestRunCollector:
+    """Tests for RunCollector over a real workspace."""
+
+    @pytest.fixture
+    def workspace(self, temp_dir):
+        cfg = AppConfig(agent_root=str(temp_dir / "ws"), claude_mem_root=str(temp_dir))
+        paths = create_workspace_paths(cfg.agent_root)
+        registry = Registry(paths.registry_path)
+        registry.init()
+        save_agent(paths.agents_dir, AgentRecord(id="a1", port=37700))
+        return cfg, paths, registry
+
+    def _make_run(self, paths, registry, run_id, days_ago, status="stopped"):
+        run_dir = paths.run_dir("a1", run_id)
+        (run_dir / "logs").mkdir(parents=True)
+        registry.create_run(RunSpec(
+            run_id=run_id, agent_id="a1", status=status,
+            created_at=NOW - timedelta(days=days_ago), run_dir=run_dir,
+        ))
+        registry.attach_pid(run_id, "cmd", 1)
+
+    def test_collect_deletes_dirs_and_rows(self, workspace):
+        cfg, paths, registry = workspace
+        for i in range(4):
+            self._make_run(paths, registry, f"run-{i}", days_ago=30 + i)
+        write_latest_run(paths.agent_runs_dir("a1"), "run-3")
+
+        retention = RunRetention(keep_last=1, keep_days=7)
+        report = RunCollector(cfg, paths, registry, retention).collect(now=NOW)
+
+        remaining = {r["run_id"] for r in registry.list_runs("a1")}
+        assert remaining == {"run-0", "run-3"}
+        assert report.dirs_deleted == 2
+        assert report.rows_deleted == 2
+        assert not paths.run_dir("a1", "run-1").exists()
+        assert read_latest_run(paths.agent_runs_dir("a1")) == "run-3"
+        with registry.connect() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM run_pids").fetchone()[0] == 2
+
+    def test_orphan_dirs_use_mtime(self, workspace):
+        cfg, paths, registry = workspace
+        orphan = paths.run_dir("a1", "legacy-run")
+        orphan.mkdir(parents=True)
+        old = (NOW - timedelta(days=60)).timestamp()
+        os.utime(orphan, (old, old))
+
+        RunCollector(cfg, paths, registry, RunRetention(keep_last=0, keep_days=7)).collect(now=NOW)
+
+        assert not orphan.exists()
+
+    def test_warm_worker_dir_kept(self, workspace):
+        """runs/warm holds the live pool worker's data, it is never a run."""
+        cfg, paths, registry = workspace
+        warm = paths.agent_warm_dir("a1")
+        (warm / "home").mkdir(parents=True)
+        old = (NOW - timedelta(days=60)).timestamp()
+        os.utime(warm, (old, old))
+
+        report = RunCollector(cfg, paths, registry, RunRetention(keep_last=0, keep_days=7)).collect(now=NOW)
+
+        assert warm.exists()
+        assert report.dirs_deleted == 0
+
+    def test_crashed_run_failed_and_port_released(self, workspace, monkeypatch):
+        """A running run with no live worker or process is reaped; its port row goes."""
+        cfg, paths, registry = workspace
+        monkeypatch.setattr(run_gc, "_worker_statuses", lambda: {})
+        self._make_run(paths, registry, "crashed", days_ago=1, status="running")
+        registry.attach_pid("crashed", "cmd", 2 ** 22 + 1)  # no such pid
+        self._make_run(paths, registry, "alive", days_ago=0, status="running")
+        registry.claim_port("agent:a1:port", 37700, 37799)
+        registry.bind_port("agent:a1:port", 37700, "crashed", "now")
+
+        report = RunCollector(cfg, paths, registry).collect(now=NOW)
+
+        statuses = {r["run_id"]: r["status"] for r in registry.list_runs("a1")}
+        assert statuses == {"crashed": "failed", "alive": "running"}
+        assert report.runs_reaped == 1
+        assert registry.get_allocated_ports() == set()
+
+    def test_online_worker_keeps_run(self, workspace, monkeypatch):
+        cfg, paths, registry = workspace
+        monkeypatch.setattr(run_gc, "_worker_statuses", lambda: {"agent-a1": "online"})
+        self._make_run(paths, registry, "r1", days_ago=1, status="running")
+        registry.attach_pid("r1", "cmd", 2 ** 22 + 1)
+        save_agent(paths.agents_dir, AgentRecord(id="a1", port=37700, pm2_name="agent-a1"))
+
+        report = RunCollector(cfg, paths, registry).collect(now=NOW)
+
+        assert report.runs_reaped == 0
+        assert registry.list_runs("a1")[0]["status"] == "running"
+
+    def test_unknown_worker_statuses_keep_run(self, workspace, monkeypatch):
+        """Without pm2 statuses nothing is reaped."""
+        cfg, paths, registry = workspace
+        monkeypatch.setattr(run_gc, "_worker_statuses", lambda: None)
+        self._make_run(paths, registry, "r1", days_ago=1, status="running")
+        registry.attach_pid("r1", "cmd", 2 ** 22 + 1)
+        save_agent(paths.agents_dir, AgentRecord(id="a1", port=37700, pm2_name="agent-a1"))
+
+        report = RunCollector(cfg, paths, registry).collect(now=NOW)
+
+        assert report.runs_reaped == 0
+        assert registry.list_runs("a1")[0]["status"] == "running"
+
+    def test_purged_agent_rows_removed(self, workspace):
+        cfg, paths, registry = workspace
+        registry.create_run(RunSpec(run_id="gone-run", agent_id="gone", status="running"))
+
+        report = RunCollector(cfg, paths, registry).collect(now=NOW)
+
+        assert report.rows_deleted == 1
+        assert registry.list_runs("gone") == []
+
+    def test_collect_async_throttled(self, workspace):
+        cfg, paths, registry = workspace
+        collector = RunCollector(cfg, paths, registry)
+
+        thread = collector.collect_async()
+        assert thread is not None
+        thread.join(timeout=5)
+
+        assert collector.collect_async() is None
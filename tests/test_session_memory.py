@@ -0,0 +1,111 @@
+"""
+Tests for memory/session.py - indexed session insights store.
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.memory.session import SessionMemory, SessionInsights
+
+
+def _insights(n, **kwargs):
+    return SessionInsights(session_number=n, agent_id="agent-1", **kwargs)
+
+
+class TestSessionLog:
+    """Tests for the append-only JSONL store."""
+
+    def test_save_appends_to_log(self, temp_dir):
+        memory = SessionMemory(temp_dir, "agent-1")
+        memory.save_session(_insights(1))
+        memory.save_session(_insights(2))
+
+        lines = memory.log_path.read_text().splitlines()
+
+        assert len(lines) == 2
+        assert json.loads(lines[1])["session_number"] == 2
+        assert not list(memory.memory_dir.glob("session_*.json"))
+
+    def test_recent_first(self, temp_dir):
+        memory = SessionMemory(temp_dir, "agent-1")
+        for n in range(1, 5):
+            memory.save_session(_insights(n))
+
+        recent = memory.get_recent_insights(limit=2)
+
+        assert [i.session_number for i in recent] == [4, 3]
+
+    def test_resave_supersedes(self, temp_dir):
+        """Saving the same session number again replaces it and makes it newest."""
+        memory = SessionMemory(temp_dir, "agent-1")
+        memory.save_session(_insights(1, what_worked=["old"]))
+        memory.save_session(_insights(2))
+        memory.save_session(_insights(1, what_worked=["new"]))
+
+        recent = memory.get_recent_insights()
+
+        assert memory.get_total_sessions() == 2
+        assert recent[0].session_number == 1
+        assert recent[0].what_worked == ["new"]
+
+    def test_incremental_reload_sees_other_writer(self, temp_dir):
+        reader = SessionMemory(temp_dir, "agent-1")
+        writer = SessionMemory(temp_dir, "agent-1")
+        writer.save_session(_insights(1))
+        assert reader.get_total_sessions() == 1
+
+        writer.save_session(_insights(2, recommendations_for_next_session=["Add tests"]))
+
+        assert reader.get_total_sessions() == 2
+        assert reader.get_recommendations() == ["Add tests"]
+
+    def test_partial_line_ignored(self, temp_dir):
+        memory = SessionMemory(temp_dir, "agent-1")
+        memory.save_session(_insights(1))
+        with open(memory.log_path, "a") as f:
+            f.write('{"session_number": 2, "agen')
+
+        assert memory.get_total_sessions() == 1
+
+    def test_imports_legacy_files(self, temp_dir):
+        memory_dir = temp_dir / SessionMemory.MEMORY_DIR_NAME
+        memory_dir.mkdir()
+        for n in (1, 2):
+            (memory_dir / f"session_{n:03d}.json").write_text(json.dumps(
+                _insights(n, subtasks_completed=["a", "b"]).to_dict()
+            ))
+
+        memory = SessionMemory(temp_dir, "agent-1")
+
+        assert memory.get_total_sessions() == 2
+        assert memory.get_total_subtasks_completed() == 4
+        assert memory.log_path.exists()
+
+
+class TestAggregatedViews:
+    """Tests for recommendations / gotchas / patterns / files views."""
+
+    def test_views(self, temp_dir):
+        memory = SessionMemory(temp_dir, "agent-1")
+        memory.save_session(_insights(
+            1,
+            recommendations_for_next_session=["r1", "r2"],
+            gotchas_encountered=["g1"],
+            patterns_found=["p1"],
+            files_understood={"a.py": "entry point"},
+        ))
+        memory.save_session(_insights(
+            2,
+            recommendations_for_next_session=["r2", "r3"],
+            gotchas_encountered=["g1"],
+            files_understood={"b.py": "helpers"},
+        ))
+
+        assert memory.get_recommendations() == ["r2", "r3", "r1"]
+        assert memory.get_gotchas() == ["g1"]
+        assert memory.get_patterns() == ["p1"]
+        assert memory.get_files_understood() == {"a.py": "entry point", "b.py": "helpers"}
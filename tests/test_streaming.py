@@ -0,0 +1,130 @@
+"""
+Tests for streaming.py - agent output streaming pipeline.
+"""
+
+import pytest
+import asyncio
+import threading
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.streaming import (
+    StreamBus,
+    StreamEvent,
+    StreamEventType,
+    StreamSubscriber,
+    TaskLogStreamWriter,
+)
+from claude_agent_manager.task_logger import TaskLogger, LogEntryType
+
+
+class TestStreamSubscriber:
+    """Tests for StreamSubscriber buffering and backpressure."""
+
+    def test_tokens_are_coalesced(self):
+        """Consecutive tokens of one task merge into a single event."""
+        sub = StreamSubscriber()
+        for chunk in ["Hel", "lo", " world"]:
+            sub.push(StreamEvent(StreamEventType.TOKEN, "backend", "t1", chunk))
+
+        events = sub.drain()
+        assert len(events) == 1
+        assert events[0].text == "Hello world"
+
+    def test_different_tasks_not_merged(self):
+        """Tokens from different tasks stay separate."""
+        sub = StreamSubscriber()
+        sub.push(StreamEvent(StreamEventType.TOKEN, "backend", "t1", "a"))
+        sub.push(StreamEvent(StreamEventType.TOKEN, "frontend", "t2", "b"))
+        sub.push(StreamEvent(StreamEventType.TOKEN, "backend", "t1", "c"))
+
+        assert [e.text for e in sub.drain()] == ["a", "b", "c"]
+
+    def test_bounded_buffer_drops_oldest(self):
+        """Overflow drops the oldest events and counts them."""
+        sub = StreamSubscriber(maxsize=2)
+        for i in range(4):
+            sub.push(StreamEvent(StreamEventType.START, f"agent{i}", f"t{i}"))
+
+        events = sub.drain()
+        assert [e.agent_id for e in events] == ["agent2", "agent3"]
+        assert sub.dropped == 2
+
+    def test_drain_max_items(self):
+        sub = StreamSubscriber()
+        sub.push(StreamEvent(StreamEventType.START, "a", "t1"))
+        sub.push(StreamEvent(StreamEventType.END, "a", "t1"))
+
+        assert len(sub.drain(max_items=1)) == 1
+        assert len(sub.drain()) == 1
+        assert sub.drain() == []
+
+    def test_async_get_from_other_thread(self):
+        """Events published from a worker thread wake an asyncio consumer."""
+        async def consume():
+            bus = StreamBus()
+            sub = bus.subscribe(loop=asyncio.get_running_loop())
+
+            def produce():
+                bus.emit(StreamEventType.TOKEN, "qa", "t1", "hi")
+                bus.unsubscribe(sub)
+
+            threading.Thread(target=produce).start()
+            return [event async for event in sub]
+
+        events = asyncio.run(consume())
+        assert [e.text for e in events] == ["hi"]
+
+    def test_get_requires_loop(self):
+        sub = StreamSubscriber()
+        with pytest.raises(RuntimeError):
+            asyncio.run(sub.get())
+
+
+class TestStreamBus:
+    """Tests for StreamBus fan-out."""
+
+    def test_publish_to_listeners_and_subscribers(self):
+        bus = StreamBus()
+        seen = []
+        bus.add_listener(seen.append)
+        sub = bus.subscribe()
+
+        bus.emit(StreamEventType.START, "architect", "t1", "design")
+
+        assert seen[0].text == "design"
+        assert sub.drain()[0].type == StreamEventType.START
+
+    def test_failing_listener_is_isolated(self):
+        bus = StreamBus()
+
+        def broken(event):
+            raise ValueError("boom")
+
+        bus.add_listener(broken)
+        sub = bus.subscribe()
+        bus.emit(StreamEventType.TOKEN, "a", "t1", "x")
+
+        assert sub.drain()[0].text == "x"
+
+
+class TestTaskLogStreamWriter:
+    """Tests for streaming into TaskLogger."""
+
+    def test_writes_one_entry_per_line(self, temp_dir):
+        logger = TaskLogger("agent", "task", log_dir=temp_dir, emit_to_console=False)
+        bus = StreamBus()
+        bus.add_listener(TaskLogStreamWriter(logger, task_id="t1"))
+
+        for chunk in ["first li", "ne\nsecond", " line"]:
+            bus.emit(StreamEventType.TOKEN, "backend", "t1", chunk)
+        bus.emit(StreamEventType.TOKEN, "other", "t2", "ignored\n")
+        bus.emit(StreamEventType.END, "backend", "t1")
+
+        lines = (temp_dir / TaskLogger.ENTRIES_FILE).read_text().splitlines()
+        stream_entries = [l for l in lines if f'"{LogEntryType.STREAM.value}"' in l]
+        assert len(stream_entries) == 2
+        assert "first line" in stream_entries[0]
+        assert "second line" in stream_entries[1]
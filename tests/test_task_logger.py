@@ -330,3 +330,103 @@ class TestPrintTaskSummary:
 
         captured = capsys.readouterr()
         assert "test-task" in captured.out
+
+
+class TestAppendOnlyLog:
+    """Tests for JSONL source of truth, replay and snapshots."""
+
+    def test_entries_buffered_until_flush(self, temp_dir):
+        """Plain log lines are buffered, not written one by one."""
+        logger = TaskLogger("agent-1", "task", log_dir=temp_dir, emit_to_console=False,
+                            flush_every=100, flush_interval=60)
+        logger.start_phase(LogPhase.CODING)
+        size = logger.entries_file.stat().st_size
+
+        logger.log("buffered")
+        assert logger.entries_file.stat().st_size == size
+
+        logger.flush()
+        assert logger.entries_file.stat().st_size > size
+
+    def test_timer_flushes_without_new_entries(self, temp_dir):
+        """The last buffered lines reach disk after flush_interval even if logging stops."""
+        import time
+        logger = TaskLogger("agent-1", "task", log_dir=temp_dir, emit_to_console=False,
+                            flush_every=100, flush_interval=0.05)
+        logger.start_phase(LogPhase.CODING)
+        size = logger.entries_file.stat().st_size
+
+        logger.log("last line")
+        for _ in range(100):
+            if logger.entries_file.stat().st_size > size:
+                break
+            time.sleep(0.01)
+
+        assert "last line" in logger.entries_file.read_text()
+        assert logger._pending == []
+
+    def test_pending_flushed_at_exit(self, temp_dir):
+        """The atexit hook flushes buffers of live loggers."""
+        from claude_agent_manager import task_logger
+        logger = TaskLogger("agent-1", "task", log_dir=temp_dir, emit_to_console=False,
+                            flush_every=100, flush_interval=60)
+        logger.log("before exit")
+
+        task_logger._flush_open_loggers()
+
+        assert "before exit" in logger.entries_file.read_text()
+
+    def test_snapshot_not_rewritten_per_entry(self, temp_dir):
+        logger = TaskLogger("agent-1", "task", log_dir=temp_dir, emit_to_console=False,
+                            flush_every=1, snapshot_interval=60)
+        logger.start_phase(LogPhase.CODING)
+        snapshot = logger.log_file.read_text()
+
+        for i in range(10):
+            logger.log(f"line {i}")
+
+        assert logger.log_file.read_text() == snapshot
+
+    def test_replay_after_snapshot(self, temp_dir):
+        """Entries written after the last snapshot are replayed on load."""
+        logger1 = TaskLogger("agent-1", "task", log_dir=temp_dir, emit_to_console=False,
+                             snapshot_interval=60)
+        logger1.start_phase(LogPhase.CODING)
+        logger1.tool_start("Read", "a.py")
+        logger1.tool_end("Read", success=True)
+        logger1.log("more")
+        logger1.flush()
+        expected = logger1.get_summary()
+
+        logger2 = TaskLogger("agent-1", "task", log_dir=temp_dir, emit_to_console=False)
+        summary = logger2.get_summary()
+
+        assert summary["total_tool_calls"] == 1
+        assert summary["phases"] == expected["phases"]
+        assert summary["current_phase"] == "coding"
+
+    def test_rebuild_without_snapshot(self, temp_dir):
+        logger1 = TaskLogger("agent-1", "task", log_dir=temp_dir, emit_to_console=False)
+        logger1.start_phase(LogPhase.VALIDATION)
+        logger1.log_error("failed check")
+        logger1.end_phase(LogPhase.VALIDATION, success=False)
+        logger1.log_file.unlink()
+
+        logger2 = TaskLogger("agent-1", "task", log_dir=temp_dir, emit_to_console=False)
+
+        assert logger2.data.phases["validation"].status == "failed"
+        assert logger2.data.total_errors == 1
+        assert logger2.data.current_phase is None
+
+    def test_memory_entries_capped(self, temp_dir):
+        logger = TaskLogger("agent-1", "task", log_dir=temp_dir, emit_to_console=False,
+                            max_memory_entries=10)
+        logger.start_phase(LogPhase.CODING)
+        for i in range(50):
+            logger.log(f"line {i}")
+
+        phase = logger.data.phases["coding"]
+
+        assert len(phase.entries) == 10
+        assert phase.to_dict()["entries_count"] == 51
+        assert len(list(logger.iter_entries(LogPhase.CODING))) == 51
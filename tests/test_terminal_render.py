@@ -0,0 +1,146 @@
+"""
+Tests for terminal/widget.py - damage-tracked rendering of the pyte screen.
+"""
+
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+pyte = pytest.importorskip("pyte")
+widget = pytest.importorskip("claude_agent_manager.terminal.widget")
+
+from claude_agent_manager.terminal.widget import (
+    TerminalWidget,
+    RenderStats,
+    line_segments,
+)
+
+
+class _FakeText:
+    """Records Tk Text calls; keeps lines as plain strings."""
+
+    def __init__(self):
+        self.lines = [""]
+        self.inserts = 0
+        self.deletes = 0
+        self.tags = {}
+
+    def configure(self, **kwargs):
+        pass
+
+    def tag_configure(self, name, **kwargs):
+        self.tags[name] = kwargs
+
+    def delete(self, start, end):
+        self.deletes += 1
+        if start == "1.0" and end == "end":
+            self.lines = [""]
+            return
+        row = int(start.split(".")[0]) - 1
+        self.lines[row] = ""
+
+    def insert(self, index, *args):
+        self.inserts += 1
+        text = "".join(args[0::2])
+        if index == "end":
+            joined = "\n".join(self.lines) + text
+            self.lines = joined.split("\n")
+        else:
+            row = int(index.split(".")[0]) - 1
+            self.lines[row] = text + self.lines[row]
+
+    def mark_set(self, name, index):
+        self.cursor = index
+
+    def see(self, index):
+        pass
+
+
+def _terminal(cols=20, rows=4):
+    """TerminalWidget without Tk: only the render state is initialized."""
+    term = TerminalWidget.__new__(TerminalWidget)
+    term.theme = {"bg": "#1e1e1e", "fg": "#d4d4d4"}
+    term.font_family = "Consolas"
+    term.font_size = 10
+    term.screen = pyte.Screen(cols, rows)
+    term.stream = pyte.Stream(term.screen)
+    term.render_stats = RenderStats()
+    term._needs_full_redraw = True
+    term._rendered_lines = 0
+    term._last_cursor = None
+    term.text = _FakeText()
+    term._setup_color_tags()
+    term._style_tags = {}
+    return term
+
+
+class TestLineSegments:
+    """Tests for style run splitting."""
+
+    def test_runs_grouped_by_style(self):
+        screen = pyte.Screen(10, 1)
+        pyte.Stream(screen).feed("ab\x1b[1mCD\x1b[0me")
+
+        segments = line_segments(screen.buffer[0], screen.columns)
+
+        assert [text for text, _ in segments] == ["ab", "CD", "e     "]
+        assert segments[1][1][2] is True  # bold
+        assert segments[0][1] == segments[2][1]
+
+
+class TestDamageTracking:
+    """Tests for incremental redraw."""
+
+    def test_only_dirty_lines_redrawn(self):
+        term = _terminal()
+        term.stream.feed("one\r\ntwo\r\nthree")
+        term._render_screen()
+        assert term.text.lines[:3] == ["one" + " " * 17, "two" + " " * 17, "three" + " " * 15]
+        assert term.render_stats.full_redraws == 1
+
+        term.stream.feed("\x1b[2;1HTWO")
+        term._render_screen()
+
+        assert term.text.lines[1].startswith("TWO")
+        assert term.text.lines[0].startswith("one")
+        assert term.render_stats.full_redraws == 1
+        assert term.render_stats.lines_drawn == 4 + 1
+        assert not term.screen.dirty
+
+    def test_style_tags_cached(self):
+        term = _terminal()
+        term.stream.feed("\x1b[1mbold\x1b[0m plain\r\n\x1b[1mmore bold")
+        term._render_screen()
+
+        assert len(term._style_tags) == 2
+        assert len(term.text.tags) == 2
+
+    def test_resize_forces_full_redraw(self):
+        term = _terminal()
+        term._render_screen()
+        term.screen.resize(6, 20)
+        term._render_screen()
+
+        assert term.render_stats.full_redraws == 2
+        assert len(term.text.lines) == 6
+
+
+class TestRenderStats:
+    """Tests for frame counters."""
+
+    def test_fps_window(self):
+        stats = RenderStats()
+        for i in range(11):
+            stats.record_frame(2.0, 1, False, now=i * 0.1)
+        stats.record_idle(now=1.05)
+
+        assert stats.frames == 11
+        assert stats.skipped == 1
+        assert stats.fps == pytest.approx(10.0)
+        assert stats.to_dict()["avg_frame_ms"] == 2.0
+
+        # No frames drawn for a whole window - FPS drops to zero
+        stats.record_idle(now=2.5)
+        assert stats.fps == 0
@@ -0,0 +1,115 @@
+"""
+Tests for terminal/scrollback.py and UnixPTY bulk reads.
+"""
+
+import sys
+import time
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager.terminal.scrollback import (
+    ScrollbackBuffer,
+    PendingOutput,
+    strip_escapes,
+)
+
+
+class TestScrollbackBuffer:
+    """Tests for the byte ring buffer."""
+
+    def test_append_within_capacity(self):
+        buf = ScrollbackBuffer(max_bytes=64)
+        buf.append("hello\n")
+        buf.append(b"world\n")
+
+        assert buf.getvalue() == b"hello\nworld\n"
+        assert not buf.wrapped
+
+    def test_ring_keeps_newest_bytes(self):
+        buf = ScrollbackBuffer(max_bytes=10)
+        for i in range(7):
+            buf.append(f"{i}ab")
+
+        assert len(buf) == 10
+        assert buf.total_bytes == 21
+        assert buf.getvalue() == b"b4ab5ab6ab"
+
+        buf.append("x" * 25 + "0123456789")
+        assert buf.getvalue() == b"0123456789"
+
+    def test_lines_strip_escapes_and_partial_first_line(self):
+        buf = ScrollbackBuffer(max_bytes=40)
+        buf.append("first line that is cut\n")
+        buf.append("\x1b[32mPASSED\x1b[0m test_a\n")
+        buf.append("50%\r100%\n")
+
+        assert buf.wrapped
+        assert buf.lines() == ["PASSED test_a", "100%", ""]
+
+    def test_search(self):
+        buf = ScrollbackBuffer()
+        buf.append("test_a PASSED\r\ntest_b FAILED\r\ntest_c failed too\r\n")
+
+        assert buf.search("failed") == [(1, "test_b FAILED"), (2, "test_c failed too")]
+        assert buf.search("failed", ignore_case=False) == [(2, "test_c failed too")]
+        assert buf.search(r"test_[ab]", regex=True, limit=1) == [(1, "test_b FAILED")]
+
+    def test_strip_escapes(self):
+        assert strip_escapes("\x1b[?25l\x1b]0;title\x07ok\x1b(B\x07") == "ok"
+
+
+class TestPendingOutput:
+    """Tests for reader/render backpressure."""
+
+    def test_take_all_and_capped(self):
+        pending = PendingOutput(max_chars=100)
+        pending.put("abc")
+        pending.put("defgh")
+
+        assert pending.take(4) == ("abcd", False)
+        assert len(pending) == 4
+        assert pending.take() == ("efgh", False)
+        assert pending.take() == ("", False)
+
+    def test_overflow_drops_oldest_at_line_boundary(self):
+        pending = PendingOutput(max_chars=50, keep_chars=20)
+        for i in range(10):
+            pending.put(f"line {i}\n")
+
+        data, overflowed = pending.take()
+
+        # Overflow at "line 7" (56 chars): kept tail cut to "line 6\nline 7\n"
+        assert overflowed
+        assert data == "line 6\nline 7\nline 8\nline 9\n"
+        assert pending.overflows == 1
+        assert pending.dropped_chars == 42
+        assert pending.take() == ("", False)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix PTY only")
+class TestUnixPTYReads:
+    """Tests for select-based adaptive reads."""
+
+    def test_read_chunk_bulk_output(self, temp_dir):
+        from claude_agent_manager.terminal.pty_backend import UnixPTY, MIN_READ_SIZE
+
+        pty = UnixPTY()
+        pty.spawn([sys.executable, "-c", "print('é' * 50000)"], str(temp_dir))
+        chunks = []
+        deadline = time.monotonic() + 10
+        try:
+            while time.monotonic() < deadline:
+                data = pty.read_chunk(0.2)
+                if data:
+                    chunks.append(data)
+                elif not pty.is_alive():
+                    break
+        finally:
+            pty.terminate()
+
+        text = "".join(chunks)
+        assert text.count("é") == 50000
+        assert "�" not in text
+        assert pty.read_size >= MIN_READ_SIZE
@@ -69,6 +69,245 @@ class TestConnectionManager:
         assert manager.active_connections == []
 
 
+class _FakeSocket:
+    """Минимальный WebSocket для тестов рассылки."""
+
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.fail:
+            raise RuntimeError("closed")
+        self.sent.append(message)
+
+
+class TestSnapshotBroadcaster:
+    """Tests for the shared /ws snapshot broadcaster."""
+
+    def _make(self, temp_dir, **kwargs):
+        try:
+            from claude_agent_manager.web.app import ConnectionManager, SnapshotBroadcaster
+            from claude_agent_manager.monitoring.metrics import MetricsCollector
+        except ImportError:
+            pytest.skip("Web module not available")
+
+        collector = MetricsCollector(db_path=temp_dir / "metrics.db")
+        manager = ConnectionManager()
+        return collector, manager, SnapshotBroadcaster(collector, manager, **kwargs)
+
+    def test_broadcast_drops_failed_connections(self):
+        """Broadcast reaches healthy clients and drops broken ones."""
+        import asyncio
+        try:
+            from claude_agent_manager.web.app import ConnectionManager
+        except ImportError:
+            pytest.skip("Web module not available")
+
+        manager = ConnectionManager()
+        good, bad = _FakeSocket(), _FakeSocket(fail=True)
+        asyncio.run(manager.connect(good))
+        asyncio.run(manager.connect(bad))
+
+        asyncio.run(manager.broadcast({"type": "ping"}))
+
+        assert good.sent == [{"type": "ping"}]
+        assert manager.active_connections == [good]
+
+    def test_single_computation_for_all_clients(self, temp_dir):
+        """One snapshot per refresh regardless of client count."""
+        import asyncio
+        collector, manager, broadcaster = self._make(temp_dir)
+        clients = [_FakeSocket() for _ in range(5)]
+
+        async def scenario():
+            for ws in clients:
+                await manager.connect(ws)
+            full = await broadcaster.ensure_snapshot()
+            collector.record_tool_call("agent-1", "Read", 10)
+            delta = await broadcaster.refresh()
+            unchanged = await broadcaster.refresh()
+            return full, delta, unchanged
+
+        full, delta, unchanged = asyncio.run(scenario())
+
+        assert broadcaster.computed == 3
+        assert full["type"] == "update" and set(broadcaster.SECTIONS) <= set(full)
+        assert delta["type"] == "delta" and delta["seq"] == 2
+        assert delta["overview"]["total_tool_calls"] == 1
+        assert "total_agents" in delta["overview"]
+        assert "success_rate" not in delta["overview"]
+        assert unchanged is None
+        assert all(ws.sent == [delta] for ws in clients)
+
+    def test_metric_event_pushes_immediately(self, temp_dir):
+        """New metrics wake the background task before the interval."""
+        import asyncio
+        collector, manager, broadcaster = self._make(temp_dir, interval=60, debounce=0.01)
+        ws = _FakeSocket()
+
+        async def scenario():
+            await manager.connect(ws)
+            await broadcaster.ensure_snapshot()
+            broadcaster.start()
+            await asyncio.sleep(0)
+            await asyncio.to_thread(collector.record_error, "agent-1", "E", "boom")
+            for _ in range(100):
+                if ws.sent:
+                    break
+                await asyncio.sleep(0.01)
+            manager.disconnect(ws)
+            await broadcaster.stop()
+
+        asyncio.run(scenario())
+
+        assert len(ws.sent) == 1
+        assert ws.sent[0]["activity"][0]["type"] == "error"
+        assert not broadcaster.running
+        assert collector._listeners == []
+
+    def test_metrics_from_other_process_pushed(self, temp_dir):
+        """Metrics written through another collector (another process) are noticed without waiting for the interval."""
+        import asyncio
+        from claude_agent_manager.monitoring.metrics import MetricsCollector
+        collector, manager, broadcaster = self._make(
+            temp_dir, interval=60, debounce=0.01, watch_interval=0.02
+        )
+        other = MetricsCollector(db_path=temp_dir / "metrics.db")
+        ws = _FakeSocket()
+
+        async def scenario():
+            await manager.connect(ws)
+            await broadcaster.ensure_snapshot()
+            broadcaster.start()
+            await asyncio.sleep(0.05)
+            computed = broadcaster.computed
+            other.record_error("agent-2", "E", "boom")
+            for _ in range(100):
+                if ws.sent:
+                    break
+                await asyncio.sleep(0.01)
+            manager.disconnect(ws)
+            await broadcaster.stop()
+            return computed
+
+        idle_computed = asyncio.run(scenario())
+
+        assert idle_computed == 1
+        assert len(ws.sent) == 1
+        assert ws.sent[0]["activity"][0]["agent_id"] == "agent-2"
+
+
+class TestResponseCache:
+    """Tests for the metrics API response cache."""
+
+    def _cache(self, **kwargs):
+        try:
+            from claude_agent_manager.web.app import ResponseCache
+        except ImportError:
+            pytest.skip("Web module not available")
+        return ResponseCache(**kwargs)
+
+    def test_concurrent_misses_share_one_computation(self):
+        """Parallel requests for one key run compute once, off the loop."""
+        import asyncio
+        import threading
+        cache = self._cache(ttl=10)
+        calls = []
+
+        def compute():
+            calls.append(threading.current_thread().name)
+            return {"agents": ["a", "b"]}
+
+        async def scenario():
+            return await asyncio.gather(*(cache.get(("agents",), compute) for _ in range(10)))
+
+        results = asyncio.run(scenario())
+
+        assert len(calls) == 1
+        assert calls[0] != threading.main_thread().name
+        assert len({r for r in results}) == 1
+        body, etag = results[0]
+        assert body == b'{"agents":["a","b"]}'
+        assert cache.misses == 1 and cache.hits == 9
+
+    def test_ttl_expiry_and_etag(self):
+        """Entries expire after TTL; ETag follows content."""
+        import asyncio
+        cache = self._cache(ttl=0)
+        values = iter([{"v": 1}, {"v": 1}, {"v": 2}])
+
+        async def scenario():
+            return [await cache.get(("k",), lambda: next(values)) for _ in range(3)]
+
+        (b1, e1), (b2, e2), (b3, e3) = asyncio.run(scenario())
+
+        assert cache.misses == 3
+        assert e1 == e2 != e3
+
+    def test_errors_not_cached(self):
+        """A failing computation propagates and is retried next time."""
+        import asyncio
+        cache = self._cache(ttl=10)
+
+        def boom():
+            raise RuntimeError("db locked")
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(cache.get(("k",), boom))
+        body, _ = asyncio.run(cache.get(("k",), lambda: [1]))
+        assert body == b"[1]"
+
+    def test_expired_entries_dropped_on_write(self):
+        """Writing a new key evicts entries older than TTL."""
+        import asyncio
+        import time
+        cache = self._cache(ttl=0.05)
+
+        async def scenario():
+            await cache.get(("a",), lambda: 1)
+            await cache.get(("b",), lambda: 2)
+            time.sleep(0.06)
+            await cache.get(("c",), lambda: 3)
+
+        asyncio.run(scenario())
+
+        assert list(cache._entries) == [("c",)]
+
+    def test_lru_cap(self):
+        """Client-controlled keys cannot grow the cache past max_entries."""
+        import asyncio
+        cache = self._cache(ttl=60, max_entries=3)
+
+        async def scenario():
+            for key in ("a", "b", "c"):
+                await cache.get((key,), lambda: key)
+            await cache.get(("a",), lambda: "a")  # hit: a becomes most recent
+            for limit in range(100):
+                await cache.get(("activity", limit), lambda: [])
+            await cache.get(("x",), lambda: "x")
+
+        asyncio.run(scenario())
+
+        assert len(cache) == 3
+        assert list(cache._entries) == [("activity", 98), ("activity", 99), ("x",)]
+
+
+        try:
+            from claude_agent_manager.web.app import ResponseCache
+        except ImportError:
+            pytest.skip("Web module not available")
+
+        assert ResponseCache.not_modified('"abc"', '"abc"')
+        assert ResponseCache.not_modified('"x", W/"abc"', '"abc"')
+        assert ResponseCache.not_modified("*", '"abc"')
+        assert not ResponseCache.not_modified('"x"', '"abc"')
+        assert not ResponseCache.not_modified(None, '"abc"')
+
+
 class TestWebDashboard:
     """Tests for WebDashboard class."""
 
@@ -220,6 +459,33 @@ class TestWebAPIEndpoints:
         assert "activity" in data
         assert isinstance(data["activity"], list)
 
+    def test_activity_limit_clamped(self, temp_dir):
+        """Out-of-range ?limit= values map to the same bounded cache keys."""
+        try:
+            from fastapi.testclient import TestClient
+            from claude_agent_manager.web.app import WebDashboard, MAX_ACTIVITY_LIMIT
+            from claude_agent_manager.monitoring.metrics import MetricsCollector
+        except ImportError:
+            pytest.skip("FastAPI or httpx not installed")
+
+        dashboard = WebDashboard(MetricsCollector(db_path=temp_dir / "metrics.db"))
+        client = TestClient(dashboard.app)
+
+        for limit in (10**9, MAX_ACTIVITY_LIMIT + 1, 0, -5):
+            assert client.get(f"/api/metrics/activity?limit={limit}").status_code == 200
+
+        assert sorted(dashboard.cache._entries) == [("activity", 1), ("activity", MAX_ACTIVITY_LIMIT)]
+
+    def test_etag_not_modified(self, client):
+        """Second request with If-None-Match gets 304."""
+        response = client.get("/api/metrics/overview")
+        etag = response.headers["etag"]
+
+        again = client.get("/api/metrics/overview", headers={"If-None-Match": etag})
+
+        assert again.status_code == 304
+        assert again.headers["etag"] == etag
+
     def test_index_returns_html(self, client):
         """Test index returns HTML."""
         response = client.get("/")
@@ -0,0 +1,147 @@
+"""
+Tests for worker_pool.py - warm claude-mem worker pool.
+"""
+
+import time
+import pytest
+from pathlib import Path
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from claude_agent_manager import manager, worker_pool
+from claude_agent_manager.config import AppConfig
+from claude_agent_manager.core.registry import Registry
+from claude_agent_manager.registry import load_agent
+from claude_agent_manager.worker_pool import WorkerPool
+
+
+@pytest.fixture
+def pm2(monkeypatch):
+    """Fake pm2: tracks started/deleted process names."""
+    state = {"online": set(), "started": []}
+
+    def fake_start_worker(cfg, pm2_name, port, data_dir, base_env=None):
+        state["online"].add(pm2_name)
+        state["started"].append(pm2_name)
+
+    for module in (manager, worker_pool):
+        monkeypatch.setattr(module, "start_worker", fake_start_worker)
+        monkeypatch.setattr(module, "pm2_delete", lambda name: state["online"].discard(name))
+    monkeypatch.setattr(worker_pool, "pm2_statuses", lambda: {n: "online" for n in state["online"]})
+    monkeypatch.setattr(worker_pool, "is_port_free", lambda port: True)
+    monkeypatch.setattr(manager, "pm2_exists", lambda name: name in state["online"])
+    monkeypatch.setattr(manager, "ensure_claude_mem_worker", lambda: True)
+    monkeypatch.setattr(manager, "spawn_cmd_window", lambda *a, **kw: 4242)
+    monkeypatch.setattr(manager, "is_pid_running", lambda pid: False)
+    monkeypatch.setattr(manager, "sync_agent_config_to_project", lambda *a: {})
+    return state
+
+
+@pytest.fixture
+def cfg(temp_dir):
+    return AppConfig(
+        agent_root=str(temp_dir / "agents-root"),
+        claude_mem_root=str(temp_dir),
+        worker_pool_size=2,
+    )
+
+
+class TestWorkerPool:
+    """Tests for WorkerPool fill/claim/health checks."""
+
+    def test_fill_to_size(self, cfg, pm2):
+        pool = WorkerPool(cfg)
+
+        assert pool.fill() == 2
+        assert pool.fill() == 0
+        assert len(pool.slots()) == 2
+        assert {s.port for s in pool.slots()} == {37700, 37701}
+
+    def test_claim_is_exclusive(self, cfg, pm2):
+        pool = WorkerPool(cfg)
+        pool.fill()
+
+        first, second, third = pool.claim(), pool.claim(), pool.claim()
+
+        assert first.agent_id != second.agent_id
+        assert third is None
+        assert 37700 in pool.registry.get_allocated_ports()
+
+    def test_unhealthy_slot_replaced(self, cfg, pm2):
+        pool = WorkerPool(cfg)
+        pool.fill()
+        dead = pool.slots()[0]
+        pm2["online"].discard(dead.pm2_name)
+
+        pool.fill()
+
+        assert dead.agent_id not in {s.agent_id for s in pool.slots()}
+        assert len(pool.slots()) == 2
+
+    def test_idle_timeout(self, cfg, pm2):
+        pool = WorkerPool(cfg, idle_timeout_sec=1)
+        pool.fill()
+        for slot in pool.slots():
+            with pool.registry.tx() as conn:
+                conn.execute(
+                    "UPDATE resources_ports SET allocated_at=? WHERE name=?",
+                    ("2000-01-01T00:00:00+00:00", slot.resource_name),
+                )
+
+        assert pool.health_check() == 2
+        assert pool.slots() == []
+
+    def test_pending_claim_is_leased(self, cfg, pm2, monkeypatch):
+        """The temporary pending:<uuid>:port row expires if the pool dies before renaming it."""
+        pool = WorkerPool(cfg, size=1)
+        leases = {}
+        rename_port = Registry.rename_port
+
+        def spy(self, name, new_name):
+            with self.connect() as conn:
+                row = conn.execute("SELECT lease_expires_at FROM resources_ports WHERE name=?", (name,)).fetchone()
+            leases[name] = row["lease_expires_at"]
+            return rename_port(self, name, new_name)
+
+        monkeypatch.setattr(Registry, "rename_port", spy)
+        pool.fill()
+
+        [(pending, lease)] = leases.items()
+        assert pending.startswith("pending:")
+        assert lease > time.time()
+        assert pool.registry.expire_port_leases() == 0
+        assert len(pool.slots()) == 1
+
+    def test_create_agent_uses_warm_worker(self, cfg, pm2, temp_dir, monkeypatch):
+        """create_agent binds a warm slot and skips the cold worker start."""
+        monkeypatch.setattr(WorkerPool, "fill_async", lambda self: None)
+        pool = WorkerPool(cfg)
+        pool.fill()
+        slot = pool.slots()[0]
+        started_before = len(pm2["started"])
+        project = temp_dir / "project"
+        project.mkdir()
+
+        rec = manager.create_agent("sub", str(project), cfg=cfg)
+
+        assert rec.id == slot.agent_id
+        assert rec.port == slot.port
+        assert len(pm2["started"]) == started_before
+        assert load_agent(pool.paths.agents_dir, rec.id).active_run_id
+        assert len(pool.slots()) == 1
+
+    def test_discard_skips_claimed_slot(self, cfg, pm2, monkeypatch):
+        """drain/health_check racing a claim() leave the claimed worker alone."""
+        pool = WorkerPool(cfg)
+        pool.fill()
+        stale = pool.slots()
+        claimed = pool.claim()
+        agent_dir = pool.paths.agent_dir(claimed.agent_id)
+        monkeypatch.setattr(WorkerPool, "slots", lambda self: stale)
+
+        assert pool.drain() == 1
+
+        assert claimed.pm2_name in pm2["online"]
+        assert agent_dir.exists()
+        assert claimed.port in pool.registry.get_allocated_ports()
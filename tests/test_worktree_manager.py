@@ -12,7 +12,7 @@ from datetime import datetime
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from claude_agent_manager.worktree_manager import WorktreeManager, Worktree
+from claude_agent_manager.worktree_manager import WorktreeManager, Worktree, WorktreeStatsCollector
 
 
 class TestWorktreeManager:
@@ -161,6 +161,26 @@ class TestWorktreeManager:
 
         assert success is True
 
+    def test_merge_worktrees_skips_detached(self, git_repo, temp_dir):
+        """A detached worktree does not abort merging real agent branches."""
+        wm = WorktreeManager(git_repo)
+        worktree = wm.create_task_worktree("1", "t")
+        (worktree.path / "t.py").write_text("# t\n")
+        subprocess.run(["git", "add", "."], cwd=worktree.path, capture_output=True)
+        subprocess.run(["git", "commit", "-m", "t"], cwd=worktree.path, capture_output=True)
+        detached = temp_dir / "detached"
+        subprocess.run(["git", "worktree", "add", "--detach", str(detached), "main"], cwd=git_repo, capture_output=True)
+
+        worktrees = wm.list_worktrees()
+        assert sorted(wt.branch_name for wt in worktrees) == ["agent/1/t", "unknown"]
+        assert [wt.is_agent_branch for wt in worktrees].count(True) == 1
+
+        report = wm.merge_worktrees(worktrees, "main", delete_after=False)
+
+        assert report.merged == ["agent/1/t"]
+        assert report.failed == {}
+        assert detached.exists()
+
     def test_create_worktree_custom_base_branch(self, git_repo):
         """Test creating worktree from custom base branch."""
         wm = WorktreeManager(git_repo)
@@ -198,6 +218,163 @@ class TestWorktreeDataclass:
 
 
 # Integration tests (require git)
+class TestWorktreeStatsCollector:
+    """Tests for batched worktree statistics."""
+
+    def _commit(self, path, name, content, message):
+        (path / name).write_text(content)
+        subprocess.run(["git", "add", "."], cwd=path, capture_output=True)
+        subprocess.run(["git", "commit", "-m", message], cwd=path, capture_output=True)
+
+    def test_batch_matches_per_worktree_stats(self, git_repo):
+        """Batched stats equal the per-worktree git calls."""
+        wm = WorktreeManager(git_repo)
+        wt1 = wm.create_task_worktree("agent-1", "task-1")
+        wt2 = wm.create_task_worktree("agent-2", "task-2")
+        self._commit(wt1.path, "a.py", "x = 1\ny = 2\n", "Add a")
+        self._commit(wt1.path, "README.md", "# Changed\n", "Edit readme")
+        (wt2.path / "untracked.txt").write_text("tmp")
+
+        listed = {wt.path: wt for wt in wm.list_worktrees()}
+
+        for wt in (wt1, wt2):
+            expected = wm._get_worktree_stats(wt.path)
+            got = listed[wt.path]
+            assert got.commit_count == expected["commit_count"]
+            assert got.files_changed == expected["files_changed"]
+            assert got.additions == expected["additions"]
+            assert got.deletions == expected["deletions"]
+            assert got.uncommitted_files == expected["uncommitted_files"]
+            assert got.last_commit == expected["last_commit"]
+            assert sorted(got.changed_files) == sorted(expected["changed_files"])
+
+        assert listed[wt1.path].commit_count == 2
+        assert listed[wt2.path].uncommitted_files == 1
+
+    def test_commits_ahead_shared_history(self, git_repo):
+        """Branches sharing commits are counted independently."""
+        collector = WorktreeStatsCollector(git_repo)
+        self._commit(git_repo, "b.py", "1", "base")
+        subprocess.run(["git", "checkout", "-b", "feature"], cwd=git_repo, capture_output=True)
+        self._commit(git_repo, "c.py", "1", "one")
+        first = subprocess.run(["git", "rev-parse", "HEAD"], cwd=git_repo,
+                               capture_output=True, text=True).stdout.strip()
+        self._commit(git_repo, "d.py", "1", "two")
+        second = subprocess.run(["git", "rev-parse", "HEAD"], cwd=git_repo,
+                                capture_output=True, text=True).stdout.strip()
+
+        counts = collector._commits_ahead("main", [first, second])
+
+        assert counts == {first: 1, second: 2}
+
+    def test_diff_cached_by_commit_pair(self, git_repo):
+        wm = WorktreeManager(git_repo)
+        wt = wm.create_task_worktree("agent-1", "task-1")
+        self._commit(wt.path, "a.py", "x = 1\n", "Add a")
+
+        wm.list_worktrees()
+        assert len(wm._stats_collector._diff_cache) == 1
+
+        self._commit(wt.path, "b.py", "y = 1\n", "Add b")
+        wt_after = wm.list_worktrees()[0]
+
+        # Old pair dropped, new pair computed
+        assert len(wm._stats_collector._diff_cache) == 1
+        assert wt_after.files_changed == 2
+
+    def test_status_cache_invalidated_by_index(self, git_repo):
+        wm = WorktreeManager(git_repo)
+        wm._stats_collector.status_ttl = 3600
+        wt = wm.create_task_worktree("agent-1", "task-1")
+        assert wm.list_worktrees()[0].uncommitted_files == 0
+
+        (wt.path / "new.py").write_text("z = 1\n")
+        subprocess.run(["git", "add", "new.py"], cwd=wt.path, capture_output=True)
+
+        assert wm.list_worktrees()[0].uncommitted_files == 1
+
+
+class TestSparseAndRecycledWorktrees:
+    """Tests for sparse checkout, worktree reuse and batched fetch."""
+
+    @pytest.fixture
+    def layout_repo(self, git_repo):
+        for rel in ("src/api/users.py", "src/ui/app.py", "docs/guide.md"):
+            (git_repo / rel).parent.mkdir(parents=True, exist_ok=True)
+            (git_repo / rel).write_text(rel)
+        subprocess.run(["git", "add", "."], cwd=git_repo, capture_output=True)
+        subprocess.run(["git", "commit", "-m", "layout"], cwd=git_repo, capture_output=True)
+        return git_repo
+
+    def _files(self, path):
+        return sorted(str(p.relative_to(path)) for p in path.rglob("*") if p.is_file() and ".git" not in p.parts)
+
+    def test_sparse_dirs_from_scope(self, layout_repo):
+        wm = WorktreeManager(layout_repo)
+        dirs = wm._sparse_dirs(["./src/api/users.py", "src/ui/", "src/ui/*.py", "new/module", "*.md"], "main")
+        assert dirs == ["new", "src/api", "src/ui"]
+
+    def test_sparse_worktree(self, layout_repo):
+        wm = WorktreeManager(layout_repo)
+        wt = wm.create_task_worktree("agent-1", "api", scope=["src/api/users.py"])
+
+        assert self._files(wt.path) == ["README.md", "src/api/users.py"]
+        status = subprocess.run(["git", "status", "--porcelain"], cwd=wt.path, capture_output=True, text=True)
+        assert status.stdout == ""
+
+    def test_recycled_worktree_is_reused(self, layout_repo):
+        wm = WorktreeManager(layout_repo)
+        wt = wm.create_task_worktree("agent-1", "api", scope=["src/api"])
+        (wt.path / "scratch.txt").write_text("leftover")
+        subprocess.run(["git", "commit", "-qam", "x", "--allow-empty"], cwd=wt.path, capture_output=True)
+
+        assert wm.recycle_worktree(wt)
+        assert not wt.path.exists()
+        assert wm.list_worktrees() == []
+        slot = wm._recycled_paths()[0]
+
+        wt2 = wm.create_task_worktree("agent-2", "ui")
+
+        assert wm._recycled_paths() == []
+        assert not slot.exists()
+        assert self._files(wt2.path) == ["README.md", "docs/guide.md", "src/api/users.py", "src/ui/app.py"]
+        branch = subprocess.run(["git", "branch", "--list", "agent/agent-1/api"], cwd=layout_repo,
+                                capture_output=True, text=True)
+        assert branch.stdout == ""
+        assert [w.branch_name for w in wm.list_worktrees()] == ["agent/agent-2/ui"]
+
+    def test_recycle_pool_is_bounded(self, git_repo):
+        wm = WorktreeManager(git_repo, max_recycled=1)
+        first = wm.create_task_worktree("agent-1", "a")
+        second = wm.create_task_worktree("agent-2", "b")
+
+        assert wm.recycle_worktree(first)
+        assert not wm.recycle_worktree(second)
+        assert len(wm._recycled_paths()) == 1
+        assert wm.cleanup_stale_worktrees() == 0
+
+        wm.cleanup_all()
+        assert wm._recycled_paths() == []
+
+    def test_fetch_once_per_ttl(self, git_repo, temp_dir):
+        clone = temp_dir / "clone"
+        subprocess.run(["git", "clone", "-q", str(git_repo), str(clone)], capture_output=True)
+        (git_repo / "new.txt").write_text("upstream")
+        subprocess.run(["git", "add", "."], cwd=git_repo, capture_output=True)
+        subprocess.run(["git", "commit", "-m", "upstream"], cwd=git_repo, capture_output=True)
+
+        wm = WorktreeManager(clone)
+        subprocess.run(["git", "checkout", "-q", "--detach"], cwd=clone, capture_output=True)
+
+        assert wm.fetch_base() is True
+        assert wm.fetch_base() is False
+        wt = wm.create_task_worktree("agent-1", "task")
+        assert (wt.path / "new.txt").exists()
+        # Main checkout was not switched to the base branch
+        head = subprocess.run(["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=clone, capture_output=True, text=True)
+        assert head.stdout.strip() == "HEAD"
+
+
 class TestWorktreeIntegration:
     """Integration tests for worktree workflows."""
 